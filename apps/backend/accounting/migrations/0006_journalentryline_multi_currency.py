@@ -0,0 +1,33 @@
+# Generated by Django 4.2 on 2026-10-19 13:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0005_accountingsettings_converted_amount_in_base_currency_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='journalentryline',
+            name='converted_amount_in_base_currency',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Amount converted to tenant base currency', max_digits=18, null=True),
+        ),
+        migrations.AddField(
+            model_name='journalentryline',
+            name='exchange_rate',
+            field=models.DecimalField(blank=True, decimal_places=8, help_text='Exchange rate used for conversion (from transaction_currency to base_currency)', max_digits=18, null=True),
+        ),
+        migrations.AddField(
+            model_name='journalentryline',
+            name='exchange_rate_date',
+            field=models.DateTimeField(blank=True, help_text='Date/time when exchange rate was applied', null=True),
+        ),
+        migrations.AddField(
+            model_name='journalentryline',
+            name='transaction_currency',
+            field=models.CharField(blank=True, help_text='Currency code for this transaction (e.g., USD, MYR)', max_length=3, null=True),
+        ),
+    ]
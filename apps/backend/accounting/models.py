@@ -2,7 +2,7 @@ from django.db import models
 from django.utils import timezone
 import uuid
 from decimal import Decimal
-from backend.enhanced_base_models import TenantScopedModel, FinancialModel
+from backend.enhanced_base_models import TenantScopedModel, FinancialModel, MultiCurrencyMixin
 
 
 class GLAccountType(FinancialModel):
@@ -174,7 +174,7 @@ class JournalEntry(FinancialModel):
         self.save()
 
 
-class JournalEntryLine(models.Model):
+class JournalEntryLine(MultiCurrencyMixin):
     """
     Journal Entry Line model for individual line items in journal entries
     """
@@ -206,6 +206,14 @@ class JournalEntryLine(models.Model):
         if self.debit_amount == 0 and self.credit_amount == 0:
             raise ValidationError("A line must have either a debit or credit amount")
 
+    def get_currency_amount(self):
+        """Lines carry either a debit or a credit amount"""
+        return self.debit_amount or self.credit_amount
+
+    def get_exchange_rate_on(self):
+        """Lines are priced at their journal entry date"""
+        return self.journal_entry.date if self.journal_entry_id else None
+
     def save(self, *args, **kwargs):
         self.clean()
         super().save(*args, **kwargs)
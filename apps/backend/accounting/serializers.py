@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from backend.fieldsets import SparseFieldsetMixin
 from decimal import Decimal
 from .models import (
     ChartOfAccounts, JournalEntry, JournalEntryLine, BankReconciliation,
@@ -7,7 +8,7 @@ from .models import (
 )
 
 
-class ChartOfAccountsSerializer(serializers.ModelSerializer):
+class ChartOfAccountsSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Chart of Accounts"""
     balance = serializers.SerializerMethodField()
     children_count = serializers.SerializerMethodField()
@@ -15,6 +16,7 @@ class ChartOfAccountsSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = ChartOfAccounts
+        prefetch_related = ['children']  # read by the method fields
         fields = [
             'id', 'tenant', 'code', 'name', 'type', 'parent', 'parent_name',
             'description', 'is_active', 'is_system', 'normal_balance',
@@ -30,7 +32,7 @@ class ChartOfAccountsSerializer(serializers.ModelSerializer):
         return obj.children.count()
 
 
-class JournalEntrySerializer(serializers.ModelSerializer):
+class JournalEntrySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Journal Entry"""
     total_debit = serializers.SerializerMethodField()
     total_credit = serializers.SerializerMethodField()
@@ -39,6 +41,7 @@ class JournalEntrySerializer(serializers.ModelSerializer):
     
     class Meta:
         model = JournalEntry
+        prefetch_related = ['lines']  # read by the method fields
         fields = [
             'id', 'tenant', 'company', 'date', 'reference', 'description',
             'status', 'entry_type', 'created_by', 'created_by_name',
@@ -54,7 +57,7 @@ class JournalEntrySerializer(serializers.ModelSerializer):
         return sum(line.credit_amount for line in obj.lines.all())
 
 
-class JournalEntryLineSerializer(serializers.ModelSerializer):
+class JournalEntryLineSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Journal Entry Line"""
     account_name = serializers.CharField(source='account.name', read_only=True)
     account_code = serializers.CharField(source='account.code', read_only=True)
@@ -76,7 +79,7 @@ class JournalEntryWithLinesSerializer(JournalEntrySerializer):
         fields = JournalEntrySerializer.Meta.fields + ['lines']
 
 
-class BankReconciliationSerializer(serializers.ModelSerializer):
+class BankReconciliationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Bank Reconciliation"""
     reconciled_amount = serializers.SerializerMethodField()
     unreconciled_amount = serializers.SerializerMethodField()
@@ -124,7 +127,7 @@ class BalanceSheetSerializer(serializers.Serializer):
     as_of_date = serializers.DateField()
 
 
-class FiscalPeriodSerializer(serializers.ModelSerializer):
+class FiscalPeriodSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Fiscal Period"""
     
     class Meta:
@@ -136,7 +139,7 @@ class FiscalPeriodSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class FiscalYearSerializer(serializers.ModelSerializer):
+class FiscalYearSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Fiscal Year"""
     periods = FiscalPeriodSerializer(many=True, read_only=True)
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
@@ -155,7 +158,7 @@ class FiscalYearSerializer(serializers.ModelSerializer):
         return obj.periods.count()
 
 
-class PettyCashAccountSerializer(serializers.ModelSerializer):
+class PettyCashAccountSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Petty Cash Account"""
     custodian_name = serializers.CharField(source='custodian.get_full_name', read_only=True)
     
@@ -169,7 +172,7 @@ class PettyCashAccountSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class PettyCashTransactionSerializer(serializers.ModelSerializer):
+class PettyCashTransactionSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Petty Cash Transaction"""
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
     approved_by_name = serializers.CharField(source='approved_by.get_full_name', read_only=True)
@@ -186,7 +189,7 @@ class PettyCashTransactionSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at', 'approved_at']
 
 
-class CreditDebitNoteSerializer(serializers.ModelSerializer):
+class CreditDebitNoteSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Credit/Debit Note"""
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
     customer_name = serializers.CharField(source='customer.name', read_only=True)
@@ -203,7 +206,7 @@ class CreditDebitNoteSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class AccountingSettingsSerializer(serializers.ModelSerializer):
+class AccountingSettingsSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Accounting Settings"""
     
     class Meta:
@@ -3,7 +3,7 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Sum
+from django.db.models import Sum
 from django.utils import timezone
 from decimal import Decimal
 from datetime import datetime, date
@@ -22,10 +22,12 @@ from .serializers import (
 )
 from authentication.permissions import IsAccountant, IsTenantMember
 from tenants.models import Company
+from backend.query_planning import QueryPlanMixin
 from backend.tenant_utils import get_request_tenant
+from search.indexing import SearchIndexService
 
 
-class ChartOfAccountsListView(generics.ListCreateAPIView):
+class ChartOfAccountsListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create Chart of Accounts"""
     serializer_class = ChartOfAccountsSerializer
     permission_classes = [IsAccountant]
@@ -52,7 +54,7 @@ class ChartOfAccountsListView(generics.ListCreateAPIView):
         return context
 
 
-class ChartOfAccountsDetailView(generics.RetrieveUpdateDestroyAPIView):
+class ChartOfAccountsDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete Chart of Accounts"""
     serializer_class = ChartOfAccountsSerializer
     permission_classes = [IsAccountant]
@@ -70,7 +72,7 @@ class ChartOfAccountsDetailView(generics.RetrieveUpdateDestroyAPIView):
         return context
 
 
-class JournalEntryListView(generics.ListCreateAPIView):
+class JournalEntryListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create Journal Entries"""
     serializer_class = JournalEntrySerializer
     permission_classes = [IsAccountant]
@@ -94,7 +96,7 @@ class JournalEntryListView(generics.ListCreateAPIView):
         )
 
 
-class JournalEntryDetailView(generics.RetrieveUpdateDestroyAPIView):
+class JournalEntryDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete Journal Entry"""
     serializer_class = JournalEntryWithLinesSerializer
     permission_classes = [IsAccountant]
@@ -106,7 +108,7 @@ class JournalEntryDetailView(generics.RetrieveUpdateDestroyAPIView):
         return JournalEntry.objects.filter(tenant=tenant)
 
 
-class JournalEntryLineListView(generics.ListCreateAPIView):
+class JournalEntryLineListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create Journal Entry Lines"""
     serializer_class = JournalEntryLineSerializer
     permission_classes = [IsAccountant]
@@ -356,13 +358,13 @@ def search_accounts(request):
             status=status.HTTP_401_UNAUTHORIZED
         )
     
-    query = request.query_params.get('q', '')
-    
-    accounts = ChartOfAccounts.objects.filter(
-        Q(code__icontains=query) | Q(name__icontains=query),
-        tenant=tenant,
-        is_active=True
-    ).order_by('code')
+    accounts = SearchIndexService.find(
+        tenant,
+        request.query_params.get('q', ''),
+        'account',
+        ChartOfAccounts.objects.filter(tenant=tenant, is_active=True),
+        request.query_params.get('limit')
+    )
     
     serializer = ChartOfAccountsSerializer(accounts, many=True)
     return Response(serializer.data)
@@ -418,7 +420,7 @@ def account_activity(request, account_id):
 
 
 # Fiscal Year Views
-class FiscalYearListView(generics.ListCreateAPIView):
+class FiscalYearListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create Fiscal Years"""
     serializer_class = FiscalYearSerializer
     permission_classes = [IsAccountant]
@@ -438,7 +440,7 @@ class FiscalYearListView(generics.ListCreateAPIView):
         serializer.save(tenant=tenant, company=company, created_by=self.request.user)
 
 
-class FiscalYearDetailView(generics.RetrieveUpdateDestroyAPIView):
+class FiscalYearDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete Fiscal Year"""
     serializer_class = FiscalYearSerializer
     permission_classes = [IsAccountant]
@@ -450,7 +452,7 @@ class FiscalYearDetailView(generics.RetrieveUpdateDestroyAPIView):
         return FiscalYear.objects.filter(tenant=tenant)
 
 
-class FiscalPeriodListView(generics.ListCreateAPIView):
+class FiscalPeriodListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create Fiscal Periods"""
     serializer_class = FiscalPeriodSerializer
     permission_classes = [IsAccountant]
@@ -473,7 +475,7 @@ class FiscalPeriodListView(generics.ListCreateAPIView):
         serializer.save(tenant=tenant)
 
 
-class FiscalPeriodDetailView(generics.RetrieveUpdateDestroyAPIView):
+class FiscalPeriodDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete Fiscal Period"""
     serializer_class = FiscalPeriodSerializer
     permission_classes = [IsAccountant]
@@ -486,7 +488,7 @@ class FiscalPeriodDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 
 # Petty Cash Views
-class PettyCashAccountListView(generics.ListCreateAPIView):
+class PettyCashAccountListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create Petty Cash Accounts"""
     serializer_class = PettyCashAccountSerializer
     permission_classes = [IsAccountant]
@@ -506,7 +508,7 @@ class PettyCashAccountListView(generics.ListCreateAPIView):
         serializer.save(tenant=tenant, company=company)
 
 
-class PettyCashAccountDetailView(generics.RetrieveUpdateDestroyAPIView):
+class PettyCashAccountDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete Petty Cash Account"""
     serializer_class = PettyCashAccountSerializer
     permission_classes = [IsAccountant]
@@ -518,7 +520,7 @@ class PettyCashAccountDetailView(generics.RetrieveUpdateDestroyAPIView):
         return PettyCashAccount.objects.filter(tenant=tenant)
 
 
-class PettyCashTransactionListView(generics.ListCreateAPIView):
+class PettyCashTransactionListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create Petty Cash Transactions"""
     serializer_class = PettyCashTransactionSerializer
     permission_classes = [IsAccountant]
@@ -541,7 +543,7 @@ class PettyCashTransactionListView(generics.ListCreateAPIView):
         serializer.save(tenant=tenant, created_by=self.request.user)
 
 
-class PettyCashTransactionDetailView(generics.RetrieveUpdateDestroyAPIView):
+class PettyCashTransactionDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete Petty Cash Transaction"""
     serializer_class = PettyCashTransactionSerializer
     permission_classes = [IsAccountant]
@@ -596,7 +598,7 @@ def approve_petty_cash_transaction(request, pk):
 
 
 # Credit/Debit Notes Views
-class CreditDebitNoteListView(generics.ListCreateAPIView):
+class CreditDebitNoteListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create Credit/Debit Notes"""
     serializer_class = CreditDebitNoteSerializer
     permission_classes = [IsAccountant]
@@ -620,7 +622,7 @@ class CreditDebitNoteListView(generics.ListCreateAPIView):
         serializer.save(tenant=tenant, company=company, created_by=self.request.user)
 
 
-class CreditDebitNoteDetailView(generics.RetrieveUpdateDestroyAPIView):
+class CreditDebitNoteDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete Credit/Debit Note"""
     serializer_class = CreditDebitNoteSerializer
     permission_classes = [IsAccountant]
@@ -633,7 +635,7 @@ class CreditDebitNoteDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 
 # Accounting Settings Views
-class AccountingSettingsView(generics.RetrieveUpdateAPIView):
+class AccountingSettingsView(QueryPlanMixin, generics.RetrieveUpdateAPIView):
     """Retrieve and update Accounting Settings"""
     serializer_class = AccountingSettingsSerializer
     permission_classes = [IsAccountant]
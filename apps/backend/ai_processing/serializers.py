@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from backend.fieldsets import SparseFieldsetMixin
 from .models import Document, AICategorization, AIExtractionResult, AIProcessingJob, AIModel, AIProcessingLog
 
 
-class DocumentSerializer(serializers.ModelSerializer):
+class DocumentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Document"""
     file_size_mb = serializers.SerializerMethodField()
     
@@ -22,7 +23,7 @@ class DocumentSerializer(serializers.ModelSerializer):
         return 0
 
 
-class AICategorizationSerializer(serializers.ModelSerializer):
+class AICategorizationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for AI Categorization"""
     document_name = serializers.CharField(source='document.original_filename', read_only=True)
     
@@ -35,7 +36,7 @@ class AICategorizationSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
-class AIExtractionResultSerializer(serializers.ModelSerializer):
+class AIExtractionResultSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for AI Extraction Result"""
     document_name = serializers.CharField(source='document.original_filename', read_only=True)
     
@@ -48,7 +49,7 @@ class AIExtractionResultSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
-class AIProcessingJobSerializer(serializers.ModelSerializer):
+class AIProcessingJobSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for AI Processing Job"""
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     job_type_display = serializers.CharField(source='get_job_type_display', read_only=True)
@@ -68,7 +69,7 @@ class AIProcessingJobSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class AIModelSerializer(serializers.ModelSerializer):
+class AIModelSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for AI Model"""
     class Meta:
         model = AIModel
@@ -80,7 +81,7 @@ class AIModelSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class AIProcessingLogSerializer(serializers.ModelSerializer):
+class AIProcessingLogSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for AI Processing Log"""
     class Meta:
         model = AIProcessingLog
@@ -3,7 +3,7 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Avg, Count, Sum
+from django.db.models import Avg, Count, Sum
 from django.utils import timezone
 from decimal import Decimal
 from datetime import datetime, date, timedelta
@@ -19,6 +19,7 @@ from .serializers import (
 from authentication.permissions import IsAccountant, IsTenantMember
 from tenants.models import Company
 from .client import ai_engine_client
+from search.indexing import SearchIndexService
 import logging
 
 logger = logging.getLogger(__name__)
@@ -438,14 +439,13 @@ def search_documents(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    # Simulate AI-powered document search
-    # In a real implementation, this would use vector search or semantic search
-    documents = Document.objects.filter(
-        Q(filename__icontains=query) |
-        Q(original_filename__icontains=query),
-        tenant=request.user.tenant,
-        status='completed'
-    ).order_by('-confidence_score')
+    documents = SearchIndexService.find(
+        request.user.tenant,
+        query,
+        'document',
+        Document.objects.filter(tenant=request.user.tenant, status='completed'),
+        request.query_params.get('limit')
+    )
     
     search_results = []
     for document in documents:
@@ -2,9 +2,7 @@
 Multi-Tenant Navigation System
 Following the Multi-Tenant Implementation Guide patterns
 """
-import json
-import os
-from django.conf import settings
+from presets.catalog import get_catalog, thaw
 from .utils import detect_user_type
 
 
@@ -21,15 +19,15 @@ class TenantNavigation:
     
     def _load_config(self):
         """
-        Load navigation configuration from JSON file
+        Navigation configuration from the preset catalog (read once per process)
         """
-        try:
-            config_path = os.path.join(settings.BASE_DIR, 'navigation_config.json')
-            with open(config_path, 'r') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            print(f"Error loading navigation config: {e}")
-            return {}
+        return get_catalog().navigation
+
+    def _items(self, section, key):
+        """
+        Navigation items of a section as a list the caller may modify
+        """
+        return thaw(self.config.get(section, {}).get(key, ()))
     
     def get_navigation_by_domain_and_role(self, domain, role=None):
         """
@@ -43,13 +41,13 @@ class TenantNavigation:
             
             if multi_tenant_group:
                 # Multi-tenant users get multi-tenant navigation
-                return self.config.get('multi_tenant_navigation', {}).get('admin', [])
+                return self._items('multi_tenant_navigation', 'admin')
             elif tenant_group and self.tenant:
                 # Tenant users get role-based navigation
-                return self.config.get('tenant_navigation', {}).get(role, [])
+                return self._items('tenant_navigation', role)
             else:
                 # Public navigation for unauthenticated users
-                return self.config.get('public_navigation', {}).get('main', [])
+                return self._items('public_navigation', 'main')
                 
         except Exception as e:
             print(f"Error getting navigation: {e}")
@@ -60,7 +58,7 @@ class TenantNavigation:
         Get navigation for current user
         """
         if not self.user or not self.user.is_authenticated:
-            return self.config.get('public_navigation', {}).get('main', [])
+            return self._items('public_navigation', 'main')
         
         # Detect user type and role
         user_info = detect_user_type(self.user, self.tenant)
@@ -100,19 +98,19 @@ class TenantNavigation:
         """
         Get public navigation for unauthenticated users
         """
-        return self.config.get('public_navigation', {}).get('main', [])
+        return self._items('public_navigation', 'main')
     
     def get_multi_tenant_navigation(self, role='admin'):
         """
         Get multi-tenant navigation
         """
-        return self.config.get('multi_tenant_navigation', {}).get(role, [])
+        return self._items('multi_tenant_navigation', role)
     
     def get_tenant_navigation(self, role='user'):
         """
         Get tenant-specific navigation
         """
-        return self.config.get('tenant_navigation', {}).get(role, [])
+        return self._items('tenant_navigation', role)
     
     def validate_navigation_config(self):
         """
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from backend.fieldsets import SparseFieldsetMixin
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
 from django.utils import timezone
@@ -11,7 +12,7 @@ from tenants.models import Tenant, Company, TenantInvitation
 from .utils import is_corporate_email, validate_corporate_email
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for User model"""
     full_name = serializers.SerializerMethodField()
     role_display = serializers.CharField(source='get_role_display', read_only=True)
@@ -142,7 +143,7 @@ class UserSerializer(serializers.ModelSerializer):
         return super().to_internal_value(data)
 
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for UserProfile model"""
     user = UserSerializer(read_only=True)
     
@@ -192,7 +193,7 @@ class LoginSerializer(serializers.Serializer):
         return attrs
 
 
-class CorporateRegisterSerializer(serializers.ModelSerializer):
+class CorporateRegisterSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for corporate email registration (primary method)"""
     password = serializers.CharField(write_only=True, validators=[validate_password])
     password_confirm = serializers.CharField(write_only=True)
@@ -400,7 +401,7 @@ class SocialRegisterSerializer(serializers.Serializer):
         return user
 
 
-class RegisterSerializer(serializers.ModelSerializer):
+class RegisterSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Legacy serializer - redirects to CorporateRegisterSerializer"""
     password = serializers.CharField(write_only=True, validators=[validate_password])
     password_confirm = serializers.CharField(write_only=True)
@@ -466,7 +467,7 @@ class PasswordResetConfirmSerializer(serializers.Serializer):
         return attrs
 
 
-class TenantInvitationSerializer(serializers.ModelSerializer):
+class TenantInvitationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for tenant invitations"""
     invited_by = UserSerializer(read_only=True)
     tenant_name = serializers.CharField(source='tenant.name', read_only=True)
@@ -498,22 +498,29 @@ class MultiCurrencyMixin(models.Model):
         abstract = True
 
     def get_base_currency(self):
-        """Get tenant's base currency"""
+        """Get tenant's base currency (cached on the tenant, see fx_conversion.currency_profile)"""
         if hasattr(self, 'tenant') and self.tenant:
             try:
-                from fx_conversion.models import Currency
-                base_currency = Currency.objects.filter(
-                    tenant=self.tenant,
-                    is_base_currency=True
-                ).first()
-                if base_currency:
-                    return base_currency.code
+                from fx_conversion.currency_profile import get_currency_profile
+                return get_currency_profile(self.tenant).base_currency
             except Exception:
                 pass
             # Fallback to tenant currency_code
             return getattr(self.tenant, 'currency_code', 'USD')
         return 'USD'
 
+    def get_currency_amount(self):
+        """Get the amount converted to base currency (override for other amount fields)"""
+        return getattr(self, 'amount', None)
+
+    def get_exchange_rate_on(self):
+        """Get the date the exchange rate is taken at (None means the latest rate)"""
+        for field in ('transaction_date', 'date', 'order_date', 'invoice_date', 'issue_date'):
+            value = getattr(self, field, None)
+            if value:
+                return value
+        return None
+
     def convert_to_base_currency(self, amount, transaction_currency=None, exchange_rate=None):
         """
         Convert amount to base currency
@@ -545,19 +552,18 @@ class MultiCurrencyMixin(models.Model):
             if self.exchange_rate:
                 exchange_rate = self.exchange_rate
             else:
-                # Fetch latest exchange rate
+                # Fetch the rate effective on the transaction date
                 try:
-                    from fx_conversion.models import ExchangeRate
+                    from fx_conversion.historical import rate_on
                     from django.utils import timezone
-                    rate_obj = ExchangeRate.objects.filter(
-                        tenant=self.tenant if hasattr(self, 'tenant') else None,
-                        from_currency=transaction_currency,
-                        to_currency=base_currency,
-                        is_active=True
-                    ).order_by('-valid_from').first()
-                    
-                    if rate_obj:
-                        exchange_rate = rate_obj.rate
+                    exchange_rate = rate_on(
+                        self.tenant if hasattr(self, 'tenant') else None,
+                        transaction_currency,
+                        base_currency,
+                        self.get_exchange_rate_on(),
+                    )
+
+                    if exchange_rate:
                         self.exchange_rate = exchange_rate
                         self.exchange_rate_date = timezone.now()
                     else:
@@ -573,23 +579,44 @@ class MultiCurrencyMixin(models.Model):
     def save(self, *args, **kwargs):
         """Auto-convert to base currency if transaction_currency is set"""
         # Auto-convert if transaction_currency is different from base
-        if self.transaction_currency and hasattr(self, 'amount'):
-            base_currency = self.get_base_currency()
-            if self.transaction_currency != base_currency:
-                # Try to get amount field (could be 'amount', 'total', 'value', etc.)
-                amount_fields = ['amount', 'total', 'value', 'price', 'subtotal']
-                amount_value = None
-                for field in amount_fields:
-                    if hasattr(self, field):
-                        amount_value = getattr(self, field)
-                        break
-                
-                if amount_value:
-                    converted = self.convert_to_base_currency(amount_value)
-                    self.converted_amount_in_base_currency = converted
+        if self.transaction_currency:
+            amount_value = self.get_currency_amount()
+            if amount_value and self.transaction_currency != self.get_base_currency():
+                converted = self.convert_to_base_currency(amount_value)
+                self.converted_amount_in_base_currency = converted
         
         super().save(*args, **kwargs)
 
+    @classmethod
+    def apply_currency_conversion(cls, objs, **kwargs):
+        """
+        Convert unsaved instances to base currency in memory
+
+        Uses one currency profile and one rate load per tenant instead of
+        the per-row queries save() would make. See
+        fx_conversion.historical.apply_base_conversion for options.
+        """
+        from fx_conversion.historical import apply_base_conversion
+        return apply_base_conversion(objs, **kwargs)
+
+    @classmethod
+    def bulk_create_converted(cls, objs, **kwargs):
+        """bulk_create after converting every row to base currency"""
+        objs = list(objs)
+        cls.apply_currency_conversion(objs)
+        return cls.objects.bulk_create(objs, **kwargs)
+
+    @classmethod
+    def bulk_update_converted(cls, objs, fields, **kwargs):
+        """bulk_update after re-converting rows, including the conversion fields"""
+        objs = list(objs)
+        cls.apply_currency_conversion(objs, reuse_rate=False)
+        fields = list(fields)
+        for field in ('exchange_rate', 'converted_amount_in_base_currency', 'exchange_rate_date'):
+            if field not in fields:
+                fields.append(field)
+        return cls.objects.bulk_update(objs, fields, **kwargs)
+
 
 class FinancialModel(TenantScopedModel, MultiCurrencyMixin):
     """
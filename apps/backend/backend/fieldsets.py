@@ -0,0 +1,114 @@
+"""
+Sparse Fieldsets
+`?fields=id,invoice_number,status` on GET requests trims serializer output
+to the named fields and narrows the SQL to the columns they read.
+
+SparseFieldsetMixin drops unrequested fields from a root serializer (nested
+and write serializers are untouched). sparse_queryset applies the matching
+`only()`: every requested field must map onto a model column or relation,
+otherwise (SerializerMethodField, properties, source='*') the queryset is
+left as is, since deferring columns those fields read would cost a query
+per row.
+"""
+from typing import Iterable, List, Optional
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+from .instrumentation import timed_representation
+
+FIELDS_PARAM = 'fields'
+
+
+def requested_fields(request) -> Optional[List[str]]:
+    """Field names from ?fields= on a GET request, or None"""
+    if request is None or request.method != 'GET':
+        return None
+    raw = request.query_params.get(FIELDS_PARAM, '')
+    names = [name.strip() for name in raw.split(',') if name.strip()]
+    return names or None
+
+
+def prune_fields(fields, names: Iterable[str]):
+    """
+    Keep only the named fields of a serializer's field mapping
+
+    Raises:
+        ValidationError: A name is not a field of the serializer
+    """
+    names = list(dict.fromkeys(names))
+    unknown = [name for name in names if name not in fields]
+    if unknown:
+        raise ValidationError({FIELDS_PARAM: f"Unknown field(s): {', '.join(unknown)}"})
+    for name in list(fields):
+        if name not in names:
+            fields.pop(name)
+    return fields
+
+
+class SparseFieldsetMixin:
+    """Serializer mixin honouring ?fields= on the root serializer of a GET request"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Only serializers constructed with the request in their context (the
+        # root, or the child of a root many=True list) are pruned; declared
+        # nested serializers are built without one
+        names = requested_fields(self.context.get('request'))
+        if names:
+            prune_fields(self.fields, names)
+
+    def to_representation(self, instance):
+        # Counted toward the request's serializer time (backend.instrumentation)
+        return timed_representation(super().to_representation, instance)
+
+
+def _column_paths(serializer, names: List[str]) -> Optional[List[str]]:
+    """Model fields the named serializer fields read, or None when any is not a plain column/relation"""
+    model = serializer.Meta.model
+    paths = []
+    for name in names:
+        field = serializer.fields[name]
+        if isinstance(field, serializers.SerializerMethodField) or field.source == '*':
+            return None
+        attr = field.source.split('.')[0]
+        try:
+            model_field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return None
+        if model_field.concrete:
+            paths.append(model_field.name)
+        # Reverse relations and many-to-many are loaded from the pk (prefetch)
+    return paths
+
+
+def sparse_queryset(queryset, serializer_class, request, extra: Iterable[str] = ()):
+    """
+    Narrow a queryset to the columns the ?fields= subset of a serializer reads
+
+    Args:
+        queryset: Queryset about to be serialized
+        serializer_class: Serializer (with SparseFieldsetMixin) rendering it
+        request: Current request
+        extra: Field paths that must stay loaded (e.g. pagination keys)
+
+    Returns:
+        Queryset (unchanged without ?fields= or when the subset cannot be mapped to columns)
+
+    Raises:
+        ValidationError: Unknown field name
+    """
+    names = requested_fields(request)
+    if not names or serializer_class is None or not issubclass(serializer_class, SparseFieldsetMixin):
+        return queryset
+    serializer = serializer_class(context={'request': request})
+    if getattr(getattr(serializer, 'Meta', None), 'model', None) is not queryset.model:
+        return queryset
+    paths = _column_paths(serializer, names)
+    select_related = queryset.query.select_related
+    if paths is None or select_related is True:
+        return queryset
+    # Relations fetched with select_related cannot be deferred
+    paths += list(select_related or {})
+    paths += [path.split('__')[0] for path in extra if path]
+    return queryset.only(queryset.model._meta.pk.name, *dict.fromkeys(paths))
@@ -0,0 +1,276 @@
+"""
+Keyset Pagination
+Project-wide cursor pagination keyed on each queryset's natural ordering.
+
+The ordering is the queryset's order_by (or the model's Meta.ordering, or
+-created_at), cut at the first term that is not a model column and
+completed with the primary key so every row has a unique position. NULLs
+in nullable keys are placed last in either direction. A page is fetched
+with `WHERE (keys) past cursor ORDER BY keys LIMIT n + 1`, so page 500
+costs the same as page 1 and no COUNT(*) is run. The opaque cursor carries
+the keys of the boundary row and the direction.
+
+Requests with ?page= keep the previous page-number behaviour (with count)
+for existing clients. Function views paginate with paginated_response().
+"""
+import base64
+import binascii
+import json
+from collections import OrderedDict
+from datetime import date, datetime, time
+from typing import List, Optional, Tuple
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db.models import F, Q
+from django.db.models.constants import LOOKUP_SEP
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .fieldsets import FIELDS_PARAM, sparse_queryset
+
+
+class OrderingKey:
+    """One column of a keyset: path, direction and whether it can be NULL"""
+
+    def __init__(self, path: str, descending: bool, field, nullable: bool):
+        self.path = path
+        self.descending = descending
+        self.field = field
+        self.nullable = nullable
+
+    def order_by(self, reverse: bool):
+        descending = self.descending != reverse
+        if not self.nullable:
+            return f"{'-' if descending else ''}{self.path}"
+        # NULLs sort last going forward, so first when walking backwards
+        if descending:
+            return F(self.path).desc(nulls_last=not reverse, nulls_first=reverse)
+        return F(self.path).asc(nulls_last=not reverse, nulls_first=reverse)
+
+    def equal(self, value) -> Q:
+        return Q(**{f"{self.path}__isnull": True}) if value is None else Q(**{self.path: value})
+
+    def beyond(self, value, reverse: bool) -> Optional[Q]:
+        """Rows strictly past value on this key in walking order (None: no such rows)"""
+        if value is None:
+            return Q(**{f"{self.path}__isnull": False}) if reverse else None
+        lookup = 'lt' if self.descending != reverse else 'gt'
+        clause = Q(**{f"{self.path}__{lookup}": value})
+        if self.nullable and not reverse:
+            clause |= Q(**{f"{self.path}__isnull": True})
+        return clause
+
+
+def _key_field(model, path: str):
+    """(model field, nullable) an ordering path ends on, or None when it is not a plain column"""
+    opts = model._meta
+    nullable = False
+    parts = path.split(LOOKUP_SEP)
+    for index, part in enumerate(parts):
+        try:
+            field = opts.get_field(part)
+        except FieldDoesNotExist:
+            return None
+        if not field.concrete:
+            return None
+        nullable = nullable or field.null
+        if index == len(parts) - 1:
+            # Ordering by a relation sorts by the related model's ordering
+            return None if field.is_relation else (field, nullable)
+        if not (field.many_to_one or field.one_to_one):
+            return None
+        opts = field.related_model._meta
+    return None
+
+
+def ordering_keys(queryset) -> List[OrderingKey]:
+    """
+    Keys a queryset is paginated on
+
+    Ends with the primary key unless an earlier non-null key is already unique.
+    """
+    model = queryset.model
+    pk = model._meta.pk
+    ordering = list(queryset.query.order_by)
+    if not ordering and queryset.query.default_ordering:
+        ordering = list(model._meta.ordering)
+    if not ordering and _key_field(model, 'created_at') is not None:
+        ordering = ['-created_at']
+
+    keys = []
+    for term in ordering:
+        if not isinstance(term, str) or term == '?':
+            break
+        descending = term.startswith('-')
+        path = term.lstrip('-+')
+        if path == 'pk':
+            path = pk.name
+        resolved = _key_field(model, path)
+        if resolved is None:
+            break
+        field, nullable = resolved
+        keys.append(OrderingKey(path, descending, field, nullable))
+        if LOOKUP_SEP not in path and not nullable and (field.primary_key or field.unique):
+            return keys
+    keys.append(OrderingKey(pk.name, keys[-1].descending if keys else True, pk, False))
+    return keys
+
+
+def _encode(value):
+    # Full precision: DjangoJSONEncoder truncates microseconds
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination over a queryset's natural ordering"""
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    legacy_page_query_param = 'page'
+
+    def __init__(self):
+        self.page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE') or 20
+        self.max_page_size = getattr(settings, 'API_MAX_PAGE_SIZE', 100)
+        self.legacy = None
+        self.serializer_class = None
+
+    def get_page_size(self, request) -> int:
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def decode_cursor(self, request, keys) -> Optional[Tuple[list, bool]]:
+        """(key values, reverse) from ?cursor=, or None on the first page"""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            raw_values, reverse = payload['v'], bool(payload['r'])
+            if len(raw_values) != len(keys):
+                raise ValueError
+            values = [
+                None if raw is None and key.nullable else key.field.to_python(raw)
+                for key, raw in zip(keys, raw_values)
+            ]
+        except (TypeError, ValueError, KeyError, UnicodeError, binascii.Error, DjangoValidationError):
+            raise NotFound('Invalid cursor')
+        return values, reverse
+
+    def encode_cursor(self, row, keys, reverse: bool) -> str:
+        values = []
+        for key in keys:
+            value = row
+            for part in key.path.split(LOOKUP_SEP):
+                value = getattr(value, part) if value is not None else None
+            values.append(_encode(value))
+        payload = json.dumps({'v': values, 'r': int(reverse)}, separators=(',', ':'))
+        encoded = base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+        url = remove_query_param(self.request.build_absolute_uri(), self.legacy_page_query_param)
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    @staticmethod
+    def seek(keys, values, reverse: bool) -> Q:
+        """Rows strictly after (or, reversed, before) the given key values"""
+        clauses = Q(pk__in=[])
+        for index, key in enumerate(keys):
+            clause = key.beyond(values[index], reverse)
+            if clause is None:
+                continue
+            for previous, value in zip(keys[:index], values[:index]):
+                clause &= previous.equal(value)
+            clauses |= clause
+        # A redundant bound on a non-null leading key lets the database use a range scan
+        leading = keys[0]
+        if not leading.nullable:
+            lookup = 'lte' if leading.descending != reverse else 'gte'
+            clauses &= Q(**{f"{leading.path}__{lookup}": values[0]})
+        return clauses
+
+    def paginate_queryset(self, queryset, request, view=None):
+        serializer_class = self.serializer_class
+        if serializer_class is None and view is not None and hasattr(view, 'get_serializer_class'):
+            serializer_class = view.get_serializer_class()
+        # Plain lists have no ordering to key on
+        if self.legacy_page_query_param in request.query_params or not hasattr(queryset, 'query'):
+            self.legacy = PageNumberPagination()
+            self.legacy.page_size = self.get_page_size(request)
+            if hasattr(queryset, 'query'):
+                queryset = sparse_queryset(queryset, serializer_class, request)
+            return self.legacy.paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        keys = ordering_keys(queryset)
+        queryset = sparse_queryset(queryset, serializer_class, request, extra=[key.path for key in keys])
+
+        cursor = self.decode_cursor(request, keys)
+        reverse = bool(cursor and cursor[1])
+        if cursor:
+            queryset = queryset.filter(self.seek(keys, cursor[0], reverse))
+        queryset = queryset.order_by(*[key.order_by(reverse) for key in keys])
+
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+        has_next, has_previous = (True, has_more) if reverse else (has_more, cursor is not None)
+
+        self.next_link = self.encode_cursor(rows[-1], keys, False) if rows and has_next else None
+        self.previous_link = self.encode_cursor(rows[0], keys, True) if rows and has_previous else None
+        return rows
+
+    def get_paginated_response(self, data):
+        if self.legacy is not None:
+            return self.legacy.get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.next_link),
+            ('previous', self.previous_link),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {'name': self.cursor_query_param, 'required': False, 'in': 'query',
+             'description': 'Opaque cursor from a next/previous link', 'schema': {'type': 'string'}},
+            {'name': self.page_size_query_param, 'required': False, 'in': 'query',
+             'description': f"Results per page (max {self.max_page_size})", 'schema': {'type': 'integer'}},
+            {'name': FIELDS_PARAM, 'required': False, 'in': 'query',
+             'description': 'Comma separated fields to return', 'schema': {'type': 'string'}},
+        ]
+
+
+def paginated_response(request, queryset, serializer_class, context=None) -> Response:
+    """
+    Paginated, ?fields=-aware response for a function view's queryset
+
+    Args:
+        request: Current request
+        queryset: Queryset to page through
+        serializer_class: Serializer rendering each row
+        context: Extra serializer context
+    """
+    paginator = KeysetPagination()
+    paginator.serializer_class = serializer_class
+    page = paginator.paginate_queryset(queryset, request)
+    serializer = serializer_class(page, many=True, context={'request': request, **(context or {})})
+    return paginator.get_paginated_response(serializer.data)
@@ -0,0 +1,202 @@
+"""
+Query Planning
+select_related/prefetch_related/only plans derived from DRF serializers.
+
+QueryPlan.for_serializer walks a serializer's fields once per class and
+caches the result:
+
+- dotted sources (`customer.name`, `created_by.get_full_name`) follow
+  forward relations into select_related and reverse/many-to-many ones
+  into prefetch_related;
+- nested serializers add their relation and are planned recursively under
+  it (everything below a prefetched relation is prefetched too);
+- plain PrimaryKeyRelatedFields read the FK column and add nothing;
+- SerializerMethodFields cannot be introspected, so serializers name what
+  those methods read in `Meta.select_related` / `Meta.prefetch_related`.
+
+When every field maps onto a column or a planned relation, the plan also
+carries the columns for `only()`. QueryPlanMixin applies the plan to a
+generic view's queryset; columns are only narrowed for GET list requests.
+"""
+import threading
+from typing import Dict, Iterable, List, Optional
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models.constants import LOOKUP_SEP
+from rest_framework import serializers
+from rest_framework.relations import PrimaryKeyRelatedField
+import logging
+
+from .pagination import ordering_keys
+
+logger = logging.getLogger(__name__)
+
+
+class QueryPlan:
+    """Relations to join/prefetch and columns to load for one serializer class"""
+
+    _cache: Dict[type, 'QueryPlan'] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, model, select_related: Iterable[str] = (), prefetch_related: Iterable[str] = (),
+                 only: Optional[Iterable[str]] = None):
+        self.model = model
+        self.select_related = _deepest(select_related)
+        self.prefetch_related = _deepest(prefetch_related)
+        self.only = sorted(set(only)) if only is not None else None
+
+    def __repr__(self):
+        return (f"QueryPlan({self.model.__name__}, select_related={self.select_related}, "
+                f"prefetch_related={self.prefetch_related}, only={self.only})")
+
+    @classmethod
+    def for_serializer(cls, serializer_class) -> Optional['QueryPlan']:
+        """Cached plan for a ModelSerializer class (None for other serializers)"""
+        plan = cls._cache.get(serializer_class)
+        if plan is None and serializer_class not in cls._cache:
+            plan = cls.build(serializer_class)
+            with cls._lock:
+                cls._cache[serializer_class] = plan
+        return plan
+
+    @classmethod
+    def build(cls, serializer_class) -> Optional['QueryPlan']:
+        """Plan a serializer class from its declared fields"""
+        model = getattr(getattr(serializer_class, 'Meta', None), 'model', None)
+        if model is None:
+            return None
+        select, prefetch = set(), set()
+        columns = _plan_serializer(serializer_class(), model, '', False, select, prefetch)
+        if columns is not None:
+            # Relations loaded through select_related/prefetch_related need their FK column
+            for lookup in select | prefetch:
+                head = lookup.split(LOOKUP_SEP)[0]
+                field = _get_field(model, head)
+                if field is not None and field.concrete:
+                    columns.add(head)
+        plan = cls(model, select, prefetch, columns)
+        logger.debug(f"Planned {serializer_class.__name__}: {plan}")
+        return plan
+
+    def apply(self, queryset, narrow: bool = False, keep: Iterable[str] = ()):
+        """
+        Apply the plan to a queryset of the planned model
+
+        Args:
+            queryset: Queryset to optimise
+            narrow: Also restrict loaded columns with only()
+            keep: Extra columns to load when narrowing (e.g. ordering keys)
+        """
+        if queryset.model is not self.model:
+            return queryset
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        if narrow and self.only is not None and queryset.query.select_related is not True:
+            joined = list(queryset.query.select_related or {})
+            queryset = queryset.only(
+                self.model._meta.pk.name, *self.only, *joined,
+                *[path.split(LOOKUP_SEP)[0] for path in keep]
+            )
+        return queryset
+
+
+def _deepest(lookups: Iterable[str]) -> List[str]:
+    """Sorted lookups without those another lookup already traverses"""
+    lookups = set(lookups)
+    return sorted(
+        lookup for lookup in lookups
+        if not any(other.startswith(lookup + LOOKUP_SEP) for other in lookups)
+    )
+
+
+def _get_field(model, name):
+    try:
+        return model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+
+
+def _plan_serializer(serializer, model, prefix: str, prefetched: bool, select: set, prefetch: set):
+    """
+    Collect the lookups a serializer instance needs into select/prefetch
+
+    Returns:
+        Set of the model's columns the serializer reads, or None when a field
+        reads something that is not a column (method fields, properties)
+    """
+    columns = set()
+    narrowable = True
+
+    meta = getattr(serializer, 'Meta', None)
+    for lookup in getattr(meta, 'select_related', ()):
+        (prefetch if prefetched else select).add(prefix + lookup)
+    for lookup in getattr(meta, 'prefetch_related', ()):
+        prefetch.add(prefix + lookup)
+
+    for field in serializer.fields.values():
+        if getattr(field, 'write_only', False):
+            continue
+        nested = field.child if isinstance(field, serializers.ListSerializer) else field
+        if field.source == '*':
+            if isinstance(nested, serializers.BaseSerializer):
+                if _plan_serializer(nested, model, prefix, prefetched, select, prefetch) is None:
+                    narrowable = False
+            else:
+                narrowable = False
+            continue
+
+        attrs = field.source.split('.')
+        first = _get_field(model, attrs[0])
+        if first is None or not (first.concrete or first.is_relation):
+            narrowable = False
+        elif first.concrete:
+            columns.add(first.name)
+        if isinstance(field, serializers.SerializerMethodField):
+            narrowable = False
+            continue
+        # A bare FK rendered as its primary key reads only the FK column
+        if isinstance(field, PrimaryKeyRelatedField) and len(attrs) == 1:
+            continue
+
+        path, current, many = [], model, prefetched
+        for attr in attrs:
+            relation = _get_field(current, attr)
+            if relation is None or not relation.is_relation or relation.related_model is None:
+                break
+            if (relation.many_to_one or relation.one_to_one) and not relation.concrete and not relation.auto_created:
+                break  # GenericForeignKey
+            path.append(attr)
+            many = many or relation.one_to_many or relation.many_to_many
+            current = relation.related_model
+        if not path:
+            continue
+        lookup = prefix + LOOKUP_SEP.join(path)
+        (prefetch if many else select).add(lookup)
+
+        if isinstance(nested, serializers.BaseSerializer) and len(path) == len(attrs):
+            _plan_serializer(nested, current, lookup + LOOKUP_SEP, many, select, prefetch)
+
+    return columns if narrowable else None
+
+
+class QueryPlanMixin:
+    """
+    Generic view mixin applying the serializer's QueryPlan to the queryset
+
+    Runs after filtering, so list, retrieve and update all get the joins;
+    columns are narrowed for list GETs only, keeping the ordering keys the
+    paginator reads.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        plan = QueryPlan.for_serializer(self.get_serializer_class())
+        if plan is None:
+            return queryset
+        lookup_kwarg = self.lookup_url_kwarg or self.lookup_field
+        narrow = self.request.method == 'GET' and lookup_kwarg not in self.kwargs
+        keep: List[str] = []
+        if narrow:
+            keep = [key.path for key in ordering_keys(queryset)]
+        return plan.apply(queryset, narrow=narrow, keep=keep)
@@ -13,6 +13,7 @@ from django.conf import settings
 from django.utils import timezone
 from django.db import models
 from django.contrib.auth import get_user_model
+from .instrumentation import record_cache_lookup
 from .row_tenant_middleware import get_current_tenant, get_current_user
 
 User = get_user_model()
@@ -54,6 +55,7 @@ class RedisCacheManager:
         try:
             data = cache.get(cache_key, default)
             execution_time = time.time() - start_time
+            record_cache_lookup(data is not None)
             
             self.performance_logger.debug(
                 f"Cache get: {cache_key} in {execution_time:.3f}s, hit: {data is not None}"
@@ -111,6 +113,7 @@ class RedisCacheManager:
         if not force_refresh:
             cache_key = self._get_dashboard_key(tenant_id, date)
             cached_data = cache.get(cache_key)
+            record_cache_lookup(cached_data is not None)
             if cached_data is not None:
                 return cached_data
         
@@ -132,6 +135,7 @@ class RedisCacheManager:
         if not force_refresh:
             cache_key = self._get_statistics_key(tenant_id, period)
             cached_data = cache.get(cache_key)
+            record_cache_lookup(cached_data is not None)
             if cached_data is not None:
                 return cached_data
         
@@ -87,7 +87,9 @@ DATABASE_ROUTERS = []
 
 # Row-based Multi-Tenant Middleware Stack
 MIDDLEWARE = [
-    # Host validation (validate ALLOWED_HOSTS with subdomain/port support) - MUST be first
+    # Request instrumentation (records only; serves /metrics) - wraps the whole stack
+    'backend.instrumentation.RequestInstrumentationMiddleware',
+    # Host validation (validate ALLOWED_HOSTS with subdomain/port support) - MUST be first to act on a request
     'backend.host_validation_middleware.HostValidationMiddleware',
     # Tenant identification and context (MUST be second)
     'backend.row_tenant_middleware.RowTenantMiddleware',
@@ -196,6 +198,7 @@ TENANT_APPS = [
     'purchase',
     'reporting',
     'sales',
+    'search',
     'tax_optimization',
     'treasury',
     'web3_integration',
@@ -334,7 +337,7 @@ REST_FRAMEWORK = {
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.IsAuthenticated'],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'backend.pagination.KeysetPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
@@ -644,6 +647,57 @@ else:
     # Fallback to local storage for development
     DEFAULT_FILE_STORAGE = 'django.core.files.storage.FileSystemStorage'
 
+# Report export storage ('r2' for Cloudflare R2, 'local' for the filesystem)
+REPORT_EXPORT_STORAGE = os.getenv('REPORT_EXPORT_STORAGE', 'r2' if USE_CLOUDFLARE_R2 else 'local')
+REPORT_EXPORT_LOCAL_ROOT = os.getenv('REPORT_EXPORT_LOCAL_ROOT', str(MEDIA_ROOT / 'report_exports'))
+# Exports are rendered inside the request: larger ones are rejected (1M XLSX rows take ~90s)
+REPORT_EXPORT_MAX_ROWS = int(os.getenv('REPORT_EXPORT_MAX_ROWS', '100000'))
+# Longest lifetime of an export download URL (presigned R2 URLs are capped at 7 days)
+REPORT_EXPORT_MAX_URL_EXPIRATION = int(os.getenv('REPORT_EXPORT_MAX_URL_EXPIRATION', '86400'))
+
+# FX rate matrix: seconds a per-tenant rate matrix is reused in-process
+FX_RATE_MATRIX_TTL_SECONDS = int(os.getenv('FX_RATE_MATRIX_TTL_SECONDS', '300'))
+
+# Treasury: seconds a per-tenant snapshot / daily balance series is cached
+TREASURY_CACHE_TTL_SECONDS = int(os.getenv('TREASURY_CACHE_TTL_SECONDS', '600'))
+
+# Analytics: seconds grouped sales/purchase/pipeline summaries are cached
+ANALYTICS_CACHE_TTL_SECONDS = int(os.getenv('ANALYTICS_CACHE_TTL_SECONDS', '300'))
+
+# Vendor verification: seconds a wallet risk verdict is cached
+VENDOR_VERIFICATION_CACHE_TTL_SECONDS = int(os.getenv('VENDOR_VERIFICATION_CACHE_TTL_SECONDS', '300'))
+
+# Instrumentation: per-view latency/query/cache/serializer histograms at /metrics
+# /metrics is refused unless a bearer token or an allowlist of scraper addresses/networks is set
+INSTRUMENTATION_ENABLED = os.getenv('INSTRUMENTATION_ENABLED', 'True').lower() == 'true'
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+METRICS_ALLOWED_IPS = [ip.strip() for ip in os.getenv('METRICS_ALLOWED_IPS', '').split(',') if ip.strip()]
+
+# Inventory: maximum rows accepted by the bulk item endpoint
+INVENTORY_BULK_MAX_ITEMS = int(os.getenv('INVENTORY_BULK_MAX_ITEMS', '5000'))
+
+# API lists: maximum ?page_size= accepted by the default (keyset) pagination
+API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', '100'))
+
+# Search: default and maximum results per page of /api/v1/search/
+SEARCH_PAGE_SIZE = int(os.getenv('SEARCH_PAGE_SIZE', '20'))
+SEARCH_MAX_PAGE_SIZE = int(os.getenv('SEARCH_MAX_PAGE_SIZE', '100'))
+
+# Onboarding: threads provisioning independent tenant presets at once (1 = one after another)
+PRESET_PROVISIONING_WORKERS = int(os.getenv('PRESET_PROVISIONING_WORKERS', '3'))
+
+# Presets/navigation catalog: re-read changed JSON files (checked at most every interval seconds)
+PRESET_CATALOG_AUTORELOAD = os.getenv('PRESET_CATALOG_AUTORELOAD', str(DEBUG)).lower() == 'true'
+PRESET_CATALOG_RELOAD_INTERVAL = float(os.getenv('PRESET_CATALOG_RELOAD_INTERVAL', '1'))
+
+# ERP sync: connections synced at once (each provider also caps its own concurrency)
+ERP_SYNC_MAX_WORKERS = int(os.getenv('ERP_SYNC_MAX_WORKERS', '4'))
+
+# Chain indexing: backend (see web3_integration.indexer.CHAIN_INDEXERS), blocks per batch, fixture file
+CHAIN_INDEXER = os.getenv('CHAIN_INDEXER', 'fixture')
+CHAIN_INDEXER_BATCH_BLOCKS = int(os.getenv('CHAIN_INDEXER_BATCH_BLOCKS', '2000'))
+CHAIN_INDEXER_FIXTURE = os.getenv('CHAIN_INDEXER_FIXTURE', '')
+
 # Email Configuration
 EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
 EMAIL_HOST = os.getenv('EMAIL_HOST', 'smtp.gmail.com')
@@ -0,0 +1,76 @@
+"""
+Request instrumentation and the /metrics endpoint
+"""
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from authentication.models import User
+from sales.models import Customer
+from tenants.models import Company, Tenant
+from .instrumentation import Histogram, request_metrics
+
+
+class RequestInstrumentationTest(TestCase):
+    """Test per-request telemetry is recorded and exposed"""
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name='Metrics Tenant', slug='metrics_tenant', is_active=True, plan='pro')
+        company = Company.objects.create(tenant=self.tenant, name='Metrics Company', registration_number='123456789')
+        self.user = User.objects.create_user(
+            username='metrics', email='metrics@example.com', password='testpass123',
+            tenant=self.tenant, role='accountant'
+        )
+        Customer.objects.create(tenant=self.tenant, company=company, name='Acme', created_by=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _series(self, histogram, view):
+        return next(
+            (counts, total) for labels, (counts, total) in histogram.series.items() if labels[0] == view
+        )
+
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_request_recorded_and_exposed(self):
+        """Test a list request's queries and serializer time reach /metrics under its view name"""
+        response = self.client.get('/api/v1/sales/customers/')
+        self.assertEqual(response.status_code, 200)
+        view = response.wsgi_request.resolver_match.view_name
+
+        query_counts, queries = self._series(request_metrics.queries, view)
+        self.assertGreaterEqual(queries, 1)
+        self.assertGreater(self._series(request_metrics.serializer_time, view)[1], 0)
+
+        metrics = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-secret').content.decode()
+        self.assertIn(f'http_request_db_queries_count{{view="{view}",plan=', metrics)
+        self.assertIn('# TYPE http_request_duration_seconds histogram', metrics)
+
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_metrics_token(self):
+        """Test /metrics requires the bearer token when one is configured"""
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_TOKEN='', METRICS_ALLOWED_IPS=[])
+    def test_metrics_denied_by_default(self):
+        """Test /metrics is refused when neither a token nor an allowlist is configured"""
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+
+    @override_settings(METRICS_TOKEN='', METRICS_ALLOWED_IPS=['10.0.0.0/8', 'not-an-ip'])
+    def test_metrics_allowed_ips(self):
+        """Test /metrics is served to allowlisted addresses only, ignoring X-Forwarded-For"""
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='10.1.2.3').status_code, 200)
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='192.168.1.5').status_code, 403)
+        response = self.client.get('/metrics', REMOTE_ADDR='192.168.1.5', HTTP_X_FORWARDED_FOR='10.1.2.3')
+        self.assertEqual(response.status_code, 403)
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test bucket bounds are inclusive and cumulated on render"""
+        histogram = Histogram('latency_seconds', 'Latency', ['view'], (0.1, 1.0))
+        for value in (0.1, 0.5, 2.0):
+            histogram.observe(('v',), value)
+        lines = histogram.render()
+        self.assertIn('latency_seconds_bucket{view="v",le="0.1"} 1', lines)
+        self.assertIn('latency_seconds_bucket{view="v",le="1.0"} 2', lines)
+        self.assertIn('latency_seconds_bucket{view="v",le="+Inf"} 3', lines)
+        self.assertIn('latency_seconds_count{view="v"} 3', lines)
@@ -0,0 +1,152 @@
+"""
+Query budgets for list endpoints
+
+Each list endpoint must serve a page in a fixed number of queries however
+many rows (and nested lines) it lists. A new serializer relation without a
+matching select_related/prefetch_related fails here.
+"""
+from datetime import date
+from decimal import Decimal
+from itertools import count
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounting.models import ChartOfAccounts, JournalEntry, JournalEntryLine
+from authentication.models import User
+from inventory.models import Item
+from invoicing.models import Invoice, InvoiceLine, InvoicePayment
+from purchase.models import PurchaseOrder, PurchaseOrderLine, Supplier
+from sales.models import Customer, SalesOrder, SalesOrderLine
+from tenants.models import Company, Tenant
+from .query_planning import QueryPlan
+from .testing import QueryBudgetMixin
+
+
+class ListQueryBudgetTest(QueryBudgetMixin, TestCase):
+    """Test list endpoints serve a page in constant queries"""
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(
+            name='Budget Tenant',
+            slug='budget_tenant',
+            is_active=True
+        )
+        self.company = Company.objects.create(
+            tenant=self.tenant,
+            name='Budget Company',
+            registration_number='123456789'
+        )
+        self.user = User.objects.create_user(
+            username='budget',
+            email='budget@example.com',
+            password='testpass123',
+            tenant=self.tenant,
+            role='accountant'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.numbers = count(1)
+        self.customer = Customer.objects.create(
+            tenant=self.tenant, company=self.company, name='Acme', created_by=self.user
+        )
+        self.supplier = Supplier.objects.create(
+            tenant=self.tenant, company=self.company, name='Globex', created_by=self.user
+        )
+        self.item = Item.objects.create(tenant=self.tenant, company=self.company, sku='SKU-1', name='Widget')
+        self.account = ChartOfAccounts.objects.create(
+            tenant=self.tenant, code='1000', name='Cash', type='asset', normal_balance='debit'
+        )
+
+    def _invoices(self, n):
+        for _ in range(n):
+            invoice = Invoice.objects.create(
+                tenant=self.tenant, company=self.company, invoice_number=f"INV-{next(self.numbers)}",
+                customer=self.customer, invoice_date=date(2024, 1, 1), due_date=date(2024, 1, 31),
+                created_by=self.user
+            )
+            for _ in range(2):
+                InvoiceLine.objects.create(
+                    tenant=self.tenant, invoice=invoice, description='Work', unit_price=Decimal('10'),
+                    line_total=Decimal('10')
+                )
+            InvoicePayment.objects.create(
+                tenant=self.tenant, invoice=invoice, payment_date=date(2024, 1, 5), amount=Decimal('5'),
+                payment_method='bank_transfer', created_by=self.user
+            )
+
+    def _sales_orders(self, n):
+        for _ in range(n):
+            order = SalesOrder.objects.create(
+                tenant=self.tenant, company=self.company, order_number=f"SO-{next(self.numbers)}",
+                customer=self.customer, order_date=date(2024, 1, 1), created_by=self.user
+            )
+            for _ in range(2):
+                SalesOrderLine.objects.create(
+                    tenant=self.tenant, sales_order=order, description='Widget', quantity=Decimal('1'),
+                    unit_price=Decimal('10'), discount_rate=Decimal('0'), tax_rate=Decimal('0'),
+                    line_total=Decimal('10')
+                )
+
+    def _customers(self, n):
+        for _ in range(n):
+            customer = Customer.objects.create(
+                tenant=self.tenant, company=self.company, name=f"Customer {next(self.numbers)}",
+                created_by=self.user
+            )
+            SalesOrder.objects.create(
+                tenant=self.tenant, company=self.company, order_number=f"SO-{next(self.numbers)}",
+                customer=customer, order_date=date(2024, 1, 1), created_by=self.user
+            )
+
+    def _purchase_orders(self, n):
+        for _ in range(n):
+            order = PurchaseOrder.objects.create(
+                tenant=self.tenant, company=self.company, order_number=f"PO-{next(self.numbers)}",
+                supplier=self.supplier, order_date=date(2024, 1, 1), created_by=self.user
+            )
+            for _ in range(2):
+                PurchaseOrderLine.objects.create(
+                    tenant=self.tenant, purchase_order=order, item=self.item, description='Widget',
+                    quantity=Decimal('2'), unit_price=Decimal('5')
+                )
+
+    def _journal_entries(self, n):
+        for _ in range(n):
+            entry = JournalEntry.objects.create(
+                tenant=self.tenant, company=self.company, date=date(2024, 1, 1),
+                reference=f"JE-{next(self.numbers)}", description='Entry', created_by=self.user
+            )
+            for _ in range(2):
+                JournalEntryLine.objects.create(
+                    tenant=self.tenant, journal_entry=entry, account=self.account, description='Line',
+                    debit_amount=Decimal('10')
+                )
+
+    def test_list_endpoints_stay_within_budget(self):
+        """Test each list endpoint's queries per page do not grow with rows"""
+        # (url, budget, seed): the tenant domain lookup, the page, then one query per prefetch
+        endpoints = [
+            ('/api/v1/invoicing/invoices/', 3, self._invoices),
+            ('/api/v1/invoicing/payments/', 2, self._invoices),
+            ('/api/v1/sales/orders/', 3, self._sales_orders),
+            ('/api/v1/sales/customers/', 3, self._customers),
+            ('/api/v1/purchase/orders/', 3, self._purchase_orders),
+            ('/api/v1/accounting/journal-entries/', 3, self._journal_entries),
+        ]
+        for url, budget, seed in endpoints:
+            with self.subTest(url=url):
+                self.assertListQueryBudget(self.client, url, budget, seed)
+
+    def test_plan_follows_serializer_relations(self):
+        """Test plans come from dotted sources, nested serializers and Meta hints"""
+        from invoicing.serializers import InvoicePaymentSerializer, InvoiceWithLinesSerializer
+
+        plan = QueryPlan.for_serializer(InvoicePaymentSerializer)
+        self.assertEqual(plan.select_related, ['invoice__customer'])
+        self.assertIs(QueryPlan.for_serializer(InvoicePaymentSerializer), plan)
+
+        plan = QueryPlan.for_serializer(InvoiceWithLinesSerializer)
+        self.assertEqual(plan.select_related, ['created_by', 'customer'])
+        self.assertEqual(plan.prefetch_related, ['lines'])
+        self.assertIsNone(plan.only)
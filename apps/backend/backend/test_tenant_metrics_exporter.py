@@ -0,0 +1,162 @@
+"""
+Tenant metrics exporter (k8s/tenant-metrics-exporter.py) against a fake cursor
+"""
+import importlib.util
+import re
+from pathlib import Path
+from unittest import skipUnless
+
+from django.test import SimpleTestCase
+
+EXPORTER_PATH = Path(__file__).resolve().parent.parent / 'k8s' / 'tenant-metrics-exporter.py'
+HAS_EXPORTER_DEPENDENCIES = all(
+    importlib.util.find_spec(name) is not None for name in ('prometheus_client', 'psycopg2', 'redis')
+)
+
+
+def load_exporter():
+    spec = importlib.util.spec_from_file_location('tenant_metrics_exporter', EXPORTER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class FakeConnection:
+    """Answers each statement with the rows of the first matching pattern"""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.executed = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def respond(self, sql, params):
+        self.executed.append((sql, params))
+        for pattern, rows in self.responses:
+            if re.search(pattern, sql):
+                return rows(sql, params) if callable(rows) else rows
+        raise AssertionError(f'Unexpected statement: {sql}')
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.rows = self.connection.respond(sql, params)
+
+    def fetchall(self):
+        return self.rows
+
+
+def metric_row(exporter, tenant_id, metric_name, status, values):
+    """A METRICS_SQL result row for the given metric values"""
+    buckets = [sum(1 for value in values if value <= bound) for bound in exporter.BUCKET_BOUNDS]
+    return (tenant_id, metric_name, status, len(values), sum(values), *buckets)
+
+
+@skipUnless(HAS_EXPORTER_DEPENDENCIES, 'prometheus_client, psycopg2 and redis are required by the exporter')
+class TenantMetricsExporterTest(SimpleTestCase):
+    """Test grouped, watermarked collection and sampled data size estimates"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.module = load_exporter()
+
+    def setUp(self):
+        self.watermarks = (10, 100)
+        self.metric_rows = []
+        self.audit_rows = []
+        self.connection = FakeConnection([
+            (r'FROM public\.tenants', [('t1',), ('t2',)]),
+            (r'SELECT \(SELECT MAX', lambda sql, params: [self.watermarks]),
+            (r'FROM audit\.audit_logs', lambda sql, params: self.audit_rows),
+            (r'FROM monitoring\.tenant_metrics', lambda sql, params: self.metric_rows),
+            (r'FROM public\.users', [('t1', 3)]),
+        ])
+        self.exporter = self.module.TenantMetricsExporter()
+        self.exporter.db_connection = self.connection
+
+    def _statements(self, table):
+        """Grouped window queries over a table (not the watermark lookup)"""
+        return [(sql, params) for sql, params in self.connection.executed if table in sql and 'MAX(' not in sql]
+
+    def test_collect_folds_windows_into_running_totals(self):
+        """Test each cycle reads only rows past the watermark and adds them to the totals"""
+        collector = self.exporter.collector
+        self.audit_rows = [('t1', 'INSERT', 4)]
+        self.metric_rows = [
+            metric_row(self.module, 't1', 'response_time', '2xx', [0.05, 0.3]),
+            metric_row(self.module, 't1', 'response_time', '5xx', [2.0]),
+            metric_row(self.module, 't2', 'cpu_usage', '', [40.0, 60.0]),
+        ]
+        self.exporter.collect_tenant_metrics()
+
+        (sql, params), = self._statements('monitoring.tenant_metrics')
+        self.assertIn(self.module.BOOTSTRAP_WINDOW, sql)
+        self.assertEqual(params, {'after': 0, 'upto': 100})
+        self.assertEqual(self.exporter.watermarks, {'audit': 10, 'metrics': 100})
+        self.assertEqual(collector.requests, {('t1', '2xx'): 2, ('t1', '5xx'): 1})
+        self.assertAlmostEqual(collector.error_rate['t1'], 1 / 3)
+        self.assertEqual(collector.resources[('t2', 'cpu_usage')], 50.0)
+        self.assertEqual(collector.active_users, {'t1': 3, 't2': 0})
+        # Buckets per RESPONSE_TIME_BUCKETS (0.1, 0.25, 0.5, 1.0, ...), cumulative
+        self.assertEqual(collector.timings['response_time']['t1'][0][:4], [1, 1, 2, 2])
+
+        # Nothing new: the grouped queries are skipped
+        self.exporter.collect_tenant_metrics()
+        self.assertEqual(len(self._statements('monitoring.tenant_metrics')), 1)
+        self.assertEqual(len(self._statements('audit.audit_logs')), 1)
+
+        # New rows: only the window past the watermark is read and added
+        self.watermarks = (12, 150)
+        self.audit_rows = [('t1', 'INSERT', 1), ('t2', 'DELETE', 2)]
+        self.metric_rows = [metric_row(self.module, 't1', 'response_time', '2xx', [0.05])]
+        self.exporter.collect_tenant_metrics()
+        sql, params = self._statements('monitoring.tenant_metrics')[-1]
+        self.assertNotIn(self.module.BOOTSTRAP_WINDOW, sql)
+        self.assertEqual(params, {'after': 100, 'upto': 150})
+        self.assertEqual(collector.requests[('t1', '2xx')], 3)
+        self.assertEqual(collector.audit_operations, {('t1', 'INSERT'): 5, ('t2', 'DELETE'): 2})
+        self.assertEqual(collector.error_rate['t1'], 0.0)
+
+    def test_windowed_skips_empty_tables_and_unchanged_watermarks(self):
+        """Test _windowed runs no query without new rows"""
+        self.assertEqual(self.exporter._windowed(self.module.AUDIT_SQL, 'audit', None), [])
+        self.exporter.watermarks['audit'] = 10
+        self.assertEqual(self.exporter._windowed(self.module.AUDIT_SQL, 'audit', 10), [])
+        self.assertEqual(self.connection.executed, [])
+
+        self.audit_rows = [('t1', 'UPDATE', 1)]
+        self.assertEqual(self.exporter._windowed(self.module.AUDIT_SQL, 'audit', 11), [('t1', 'UPDATE', 1)])
+        sql, params = self.connection.executed[0]
+        self.assertIn('FROM audit.audit_logs', sql)
+        self.assertEqual(params, {'after': 10, 'upto': 11})
+
+    def test_estimate_data_sizes_samples_large_tables(self):
+        """Test large tables are sampled and scaled, small ones counted exactly"""
+        self.exporter.size_sample_rows = 1000
+        self.connection.responses = [
+            (r'FROM pg_class', [('monitoring.tenant_metrics', 100000, 8000000), ('public.users', 10, 8192)]),
+            (r'monitoring\.tenant_metrics TABLESAMPLE SYSTEM', [('t1', 750), ('t2', 250)]),
+            (r'FROM public\.users GROUP BY', [('t1', 6), ('t2', 2), (None, 2)]),
+        ]
+        sizes = self.exporter.estimate_data_sizes()
+
+        sampled = next(params for sql, params in self.connection.executed if 'TABLESAMPLE' in sql)
+        self.assertEqual(sampled, {'percent': 1.0})
+        t1_rows, t1_bytes = sizes['t1']
+        self.assertEqual(t1_rows, 75000 + 6)
+        # 75% of the sampled table's bytes, 6 of the 10 user rows' bytes
+        self.assertAlmostEqual(t1_bytes, 6000000 + 8192 * 6 / 10)
+        self.assertEqual(sizes['t2'][0], 25000 + 2)
+        self.assertNotIn(None, sizes)
@@ -0,0 +1,47 @@
+"""
+Test helpers shared across apps
+"""
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin asserting that list endpoints stay within a query budget
+
+    A list endpoint is fetched once with a few rows and once with many; it
+    must stay within its budget both times and must not run more queries for
+    more rows (an N+1 shows up as the second count growing).
+    """
+
+    def count_list_queries(self, client, url, params=None):
+        # The site-wide cache middleware would otherwise answer the second request
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url, params or {})
+        self.assertEqual(response.status_code, 200, f"GET {url} returned {response.status_code}")
+        return len(queries), queries
+
+    def assertListQueryBudget(self, client, url, budget: int, seed, few: int = 1, many: int = 6, params=None):
+        """
+        Args:
+            client: Authenticated APIClient
+            url: List endpoint
+            budget: Maximum queries for one page
+            seed: Callable creating n more rows the endpoint lists
+            few, many: Row counts compared
+            params: Query params for both requests
+        """
+        seed(few)
+        few_count, _ = self.count_list_queries(client, url, params)
+        seed(many - few)
+        many_count, queries = self.count_list_queries(client, url, params)
+        statements = '\n'.join(query['sql'] for query in queries.captured_queries)
+        self.assertLessEqual(
+            many_count, budget, f"{url} ran {many_count} queries (budget {budget}):\n{statements}"
+        )
+        self.assertEqual(
+            many_count, few_count,
+            f"{url} ran {few_count} queries for {few} rows but {many_count} for {many}:\n{statements}"
+        )
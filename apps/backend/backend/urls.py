@@ -41,6 +41,7 @@ api_patterns = [
     path('purchase/', include('purchase.urls')),
     path('reporting/', include('reporting.urls')),
     path('sales/', include('sales.urls')),
+    path('search/', include('search.urls')),
     path('tax_optimization/', include('tax_optimization.urls')),
     path('treasury/', include('treasury.urls')),
     path('fx_conversion/', include('fx_conversion.urls')),
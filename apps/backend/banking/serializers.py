@@ -1,9 +1,10 @@
 from rest_framework import serializers
+from backend.fieldsets import SparseFieldsetMixin
 from decimal import Decimal
 from .models import BankAccount, BankTransaction, BankStatement, BankIntegration, PlaidConnection, ImportExportJob, BankingSettings
 
 
-class BankAccountSerializer(serializers.ModelSerializer):
+class BankAccountSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Bank Account"""
     current_balance = serializers.SerializerMethodField()
     available_balance = serializers.SerializerMethodField()
@@ -55,7 +56,7 @@ class BankAccountSerializer(serializers.ModelSerializer):
             return self.get_current_balance(obj)
 
 
-class BankTransactionSerializer(serializers.ModelSerializer):
+class BankTransactionSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Bank Transaction"""
     bank_account_name = serializers.CharField(source='bank_account.name', read_only=True)
     running_balance = serializers.SerializerMethodField()
@@ -87,7 +88,7 @@ class BankTransactionSerializer(serializers.ModelSerializer):
         return balance
 
 
-class BankStatementSerializer(serializers.ModelSerializer):
+class BankStatementSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Bank Statement"""
     bank_account_name = serializers.CharField(source='bank_account.name', read_only=True)
     total_transactions = serializers.SerializerMethodField()
@@ -108,7 +109,7 @@ class BankStatementSerializer(serializers.ModelSerializer):
         ).count()
 
 
-class BankIntegrationSerializer(serializers.ModelSerializer):
+class BankIntegrationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Bank Integration"""
     bank_account_name = serializers.CharField(source='bank_account.name', read_only=True)
     
@@ -170,7 +171,7 @@ class BankStatsSerializer(serializers.Serializer):
     period_end = serializers.DateField()
 
 
-class PlaidConnectionSerializer(serializers.ModelSerializer):
+class PlaidConnectionSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Plaid Connection"""
     bank_account_name = serializers.CharField(source='bank_account.name', read_only=True)
     institution_name = serializers.CharField(read_only=True)
@@ -189,7 +190,7 @@ class PlaidConnectionSerializer(serializers.ModelSerializer):
         }
 
 
-class ImportExportJobSerializer(serializers.ModelSerializer):
+class ImportExportJobSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Import/Export Job"""
     bank_account_name = serializers.CharField(source='bank_account.name', read_only=True)
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
@@ -212,7 +213,7 @@ class ImportExportJobSerializer(serializers.ModelSerializer):
         return int((obj.processed_records / obj.total_records) * 100)
 
 
-class BankingSettingsSerializer(serializers.ModelSerializer):
+class BankingSettingsSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Banking Settings"""
     
     class Meta:
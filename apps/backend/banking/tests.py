@@ -1,3 +1,106 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from authentication.models import User
+from tenants.models import Company, Tenant
+from .models import BankAccount, BankTransaction
+
+
+class BankTransactionPaginationTest(TestCase):
+    """Test keyset pagination and sparse fieldsets on account transactions"""
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(
+            name='Paging Tenant',
+            slug='paging_tenant',
+            is_active=True
+        )
+        self.company = Company.objects.create(
+            tenant=self.tenant,
+            name='Paging Company',
+            registration_number='123456789'
+        )
+        self.user = User.objects.create_user(
+            username='pager',
+            email='pager@example.com',
+            password='testpass123',
+            tenant=self.tenant,
+            role='accountant'
+        )
+        self.account = BankAccount.objects.create(
+            tenant=self.tenant, company=self.company, name='Operating', bank_name='First Bank'
+        )
+        # Ten dates shared by three transactions each, plus undated ones
+        start = date(2024, 1, 1)
+        BankTransaction.objects.bulk_create([
+            BankTransaction(
+                tenant=self.tenant, bank_account=self.account, date=start, description=f"Transaction {index}",
+                transaction_date=start + timedelta(days=index % 10) if index < 30 else None,
+                amount=Decimal(index), notes='Long free-text notes'
+            )
+            for index in range(36)
+        ])
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = f"/api/v1/banking/accounts/{self.account.id}/transactions/"
+
+    def _walk(self, url, link):
+        ids, pages, query_counts = [], [], []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.data)
+            ids.extend(row['id'] for row in response.data['results'])
+            url = response.data[link]
+            query_counts.append(len(queries))
+        # Every page costs the same number of queries
+        self.assertEqual(len(set(query_counts)), 1)
+        return ids, pages
+
+    def test_cursor_pages_follow_natural_ordering(self):
+        """Test next/previous links walk -transaction_date (NULLs last) without gaps or repeats"""
+        # Ties on transaction_date are broken by the primary key, descending
+        by_date = {}
+        for transaction in BankTransaction.objects.all():
+            by_date.setdefault(transaction.transaction_date, []).append(str(transaction.id))
+        expected = []
+        for day in sorted((day for day in by_date if day is not None), reverse=True) + [None]:
+            expected.extend(sorted(by_date[day], reverse=True))
+
+        forward, pages = self._walk(f"{self.url}?page_size=10&fields=id,transaction_date", 'next')
+        self.assertEqual(forward, expected)
+        self.assertEqual([len(page['results']) for page in pages], [10, 10, 10, 6])
+        self.assertNotIn('count', pages[0])
+        self.assertIsNone(pages[0]['previous'])
+        self.assertEqual(set(pages[0]['results'][0]), {'id', 'transaction_date'})
+
+        backward, _ = self._walk(pages[-1]['previous'], 'previous')
+        self.assertEqual(backward, [row['id'] for page in reversed(pages[:-1]) for row in page['results']])
+        self.assertEqual(self.client.get(f"{self.url}?cursor=not-a-cursor").status_code, 404)
+
+    def test_sparse_fieldset_narrows_columns_and_deep_pages_cost_the_same(self):
+        """Test ?fields= trims output and SQL, and a deep page runs the same queries as page 1"""
+        with CaptureQueriesContext(connection) as first:
+            response = self.client.get(self.url, {'page_size': 5, 'fields': 'id,description'})
+        self.assertEqual(list(response.data['results'][0]), ['id', 'description'])
+        page_sql = first.captured_queries[-1]['sql']
+        self.assertNotIn('"notes"', page_sql)
+        self.assertNotIn('COUNT(', page_sql.upper())
+
+        url = response.data['next']
+        for _ in range(5):
+            url = self.client.get(url).data['next']
+        with CaptureQueriesContext(connection) as deep:
+            response = self.client.get(url)
+        self.assertEqual(len(deep), len(first))
+        self.assertNotIn('OFFSET', deep.captured_queries[-1]['sql'].upper())
 
-# Create your tests here.
+        response = self.client.get(self.url, {'fields': 'id,nope'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(self.client.get(self.url, {'page': 1}).data['results']), 20)
@@ -3,7 +3,7 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Sum
+from django.db.models import Sum
 from django.utils import timezone
 from decimal import Decimal
 from datetime import datetime, date, timedelta
@@ -19,11 +19,14 @@ from .serializers import (
     ImportExportJobSerializer, BankingSettingsSerializer
 )
 from authentication.permissions import IsAccountant, IsTenantMember
+from backend.pagination import paginated_response
+from backend.query_planning import QueryPlanMixin
 from backend.tenant_utils import get_request_tenant
+from search.indexing import SearchIndexService
 from tenants.models import Company
 
 
-class BankAccountListView(generics.ListCreateAPIView):
+class BankAccountListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create bank accounts"""
     serializer_class = BankAccountSerializer
     permission_classes = [IsAccountant]
@@ -45,7 +48,7 @@ class BankAccountListView(generics.ListCreateAPIView):
         serializer.save(tenant=tenant)
 
 
-class BankAccountDetailView(generics.RetrieveUpdateDestroyAPIView):
+class BankAccountDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete bank account"""
     serializer_class = BankAccountSerializer
     permission_classes = [IsAccountant]
@@ -57,7 +60,7 @@ class BankAccountDetailView(generics.RetrieveUpdateDestroyAPIView):
         return BankAccount.objects.filter(tenant=tenant)
 
 
-class BankTransactionListView(generics.ListCreateAPIView):
+class BankTransactionListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create bank transactions"""
     serializer_class = BankTransactionSerializer
     permission_classes = [IsAccountant]
@@ -90,7 +93,7 @@ class BankTransactionListView(generics.ListCreateAPIView):
             serializer.save(tenant=tenant)
 
 
-class BankTransactionDetailView(generics.RetrieveUpdateDestroyAPIView):
+class BankTransactionDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete bank transaction"""
     serializer_class = BankTransactionSerializer
     permission_classes = [IsAccountant]
@@ -102,7 +105,7 @@ class BankTransactionDetailView(generics.RetrieveUpdateDestroyAPIView):
         return BankTransaction.objects.filter(tenant=tenant)
 
 
-class BankStatementListView(generics.ListCreateAPIView):
+class BankStatementListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create bank statements"""
     serializer_class = BankStatementSerializer
     permission_classes = [IsAccountant]
@@ -129,7 +132,7 @@ class BankStatementListView(generics.ListCreateAPIView):
         serializer.save(bank_account=bank_account)
 
 
-class BankStatementDetailView(generics.RetrieveUpdateDestroyAPIView):
+class BankStatementDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete bank statement"""
     serializer_class = BankStatementSerializer
     permission_classes = [IsAccountant]
@@ -141,7 +144,7 @@ class BankStatementDetailView(generics.RetrieveUpdateDestroyAPIView):
         return BankStatement.objects.filter(bank_account__tenant=tenant)
 
 
-class BankIntegrationListView(generics.ListCreateAPIView):
+class BankIntegrationListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create bank integrations"""
     serializer_class = BankIntegrationSerializer
     permission_classes = [IsAccountant]
@@ -169,7 +172,7 @@ class BankIntegrationListView(generics.ListCreateAPIView):
         serializer.save(bank_account=bank_account)
 
 
-class BankIntegrationDetailView(generics.RetrieveUpdateDestroyAPIView):
+class BankIntegrationDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete bank integration"""
     serializer_class = BankIntegrationSerializer
     permission_classes = [IsAccountant]
@@ -211,8 +214,7 @@ def bank_account_transactions(request, account_id):
     
     transactions = transactions.order_by('-transaction_date')
     
-    serializer = BankTransactionSerializer(transactions, many=True)
-    return Response(serializer.data)
+    return paginated_response(request, transactions, BankTransactionSerializer)
 
 
 @api_view(['POST'])
@@ -374,14 +376,13 @@ def search_transactions(request):
         from rest_framework.exceptions import PermissionDenied
         raise PermissionDenied("Tenant context required")
     
-    query = request.query_params.get('q', '')
-    
-    transactions = BankTransaction.objects.filter(
-        Q(description__icontains=query) |
-        Q(reference__icontains=query) |
-        Q(notes__icontains=query),
-        tenant=tenant
-    ).order_by('-transaction_date') if tenant else BankTransaction.objects.none()
+    transactions = SearchIndexService.find(
+        tenant,
+        request.query_params.get('q', ''),
+        'bank_transaction',
+        BankTransaction.objects.filter(tenant=tenant),
+        request.query_params.get('limit')
+    )
     
     serializer = BankTransactionSerializer(transactions, many=True)
     return Response(serializer.data)
@@ -485,7 +486,7 @@ def test_bank_integration(request, pk):
 
 
 # Plaid Connection Views
-class PlaidConnectionListView(generics.ListCreateAPIView):
+class PlaidConnectionListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create Plaid Connections"""
     serializer_class = PlaidConnectionSerializer
     permission_classes = [IsAccountant]
@@ -504,7 +505,7 @@ class PlaidConnectionListView(generics.ListCreateAPIView):
         serializer.save(tenant=tenant)
 
 
-class PlaidConnectionDetailView(generics.RetrieveUpdateDestroyAPIView):
+class PlaidConnectionDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete Plaid Connection"""
     serializer_class = PlaidConnectionSerializer
     permission_classes = [IsAccountant]
@@ -565,7 +566,7 @@ def create_plaid_link_token(request):
 
 
 # Import/Export Views
-class ImportExportJobListView(generics.ListCreateAPIView):
+class ImportExportJobListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create Import/Export Jobs"""
     serializer_class = ImportExportJobSerializer
     permission_classes = [IsAccountant]
@@ -588,7 +589,7 @@ class ImportExportJobListView(generics.ListCreateAPIView):
         serializer.save(tenant=tenant, created_by=self.request.user)
 
 
-class ImportExportJobDetailView(generics.RetrieveUpdateDestroyAPIView):
+class ImportExportJobDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete Import/Export Job"""
     serializer_class = ImportExportJobSerializer
     permission_classes = [IsAccountant]
@@ -683,7 +684,7 @@ def generate_export_job(request):
 
 
 # Banking Settings Views
-class BankingSettingsView(generics.RetrieveUpdateAPIView):
+class BankingSettingsView(QueryPlanMixin, generics.RetrieveUpdateAPIView):
     """Retrieve and update Banking Settings"""
     serializer_class = BankingSettingsSerializer
     permission_classes = [IsAccountant]
@@ -1,11 +1,12 @@
 from rest_framework import serializers
+from backend.fieldsets import SparseFieldsetMixin
 from django.contrib.auth import get_user_model
 from .models import SalesInquiry, SalesInquiryResponse, SalesInquiryAttachment
 
 User = get_user_model()
 
 
-class SalesInquiryAttachmentSerializer(serializers.ModelSerializer):
+class SalesInquiryAttachmentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for sales inquiry attachments"""
     
     class Meta:
@@ -17,7 +18,7 @@ class SalesInquiryAttachmentSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
-class SalesInquiryResponseSerializer(serializers.ModelSerializer):
+class SalesInquiryResponseSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for sales inquiry responses"""
     responded_by_name = serializers.CharField(source='responded_by.get_full_name', read_only=True)
     
@@ -30,7 +31,7 @@ class SalesInquiryResponseSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'responded_by', 'created_at']
 
 
-class SalesInquirySerializer(serializers.ModelSerializer):
+class SalesInquirySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for sales inquiries"""
     full_name = serializers.ReadOnlyField()
     assigned_to_name = serializers.CharField(source='assigned_to.get_full_name', read_only=True)
@@ -50,7 +51,7 @@ class SalesInquirySerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'full_name', 'assigned_to_name', 'created_at', 'updated_at', 'contacted_at']
 
 
-class SalesInquiryCreateSerializer(serializers.ModelSerializer):
+class SalesInquiryCreateSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for creating new sales inquiries (public endpoint)"""
     
     class Meta:
@@ -75,7 +76,7 @@ class SalesInquiryCreateSerializer(serializers.ModelSerializer):
         return value.strip()
 
 
-class SalesInquiryUpdateSerializer(serializers.ModelSerializer):
+class SalesInquiryUpdateSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for updating sales inquiries (admin endpoint)"""
     
     class Meta:
@@ -85,7 +86,7 @@ class SalesInquiryUpdateSerializer(serializers.ModelSerializer):
         ]
 
 
-class SalesInquirySummarySerializer(serializers.ModelSerializer):
+class SalesInquirySummarySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for sales inquiry summaries (dashboard views)"""
     full_name = serializers.ReadOnlyField()
     assigned_to_name = serializers.CharField(source='assigned_to.get_full_name', read_only=True)
@@ -132,7 +133,7 @@ class SalesInquiryStatsSerializer(serializers.Serializer):
     last_month = serializers.IntegerField()
 
 
-class SalesInquiryResponseCreateSerializer(serializers.ModelSerializer):
+class SalesInquiryResponseCreateSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for creating responses to sales inquiries"""
     
     class Meta:
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from backend.fieldsets import SparseFieldsetMixin
 from decimal import Decimal
 from .models import (
     DocumentFile, DocumentFolder, DocumentTemplate, DocumentVersion,
@@ -7,7 +8,7 @@ from .models import (
 )
 
 
-class DocumentFolderSerializer(serializers.ModelSerializer):
+class DocumentFolderSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Document Folder"""
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
     files_count = serializers.SerializerMethodField()
@@ -29,7 +30,7 @@ class DocumentFolderSerializer(serializers.ModelSerializer):
         return obj.children.count()
 
 
-class DocumentTemplateSerializer(serializers.ModelSerializer):
+class DocumentTemplateSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Document Template"""
     template_type_display = serializers.CharField(source='get_template_type_display', read_only=True)
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
@@ -45,7 +46,7 @@ class DocumentTemplateSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class DocumentFileSerializer(serializers.ModelSerializer):
+class DocumentFileSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Document File"""
     document_type_display = serializers.CharField(source='get_document_type_display', read_only=True)
     uploaded_by_name = serializers.CharField(source='uploaded_by.get_full_name', read_only=True)
@@ -73,7 +74,7 @@ class DocumentFileSerializer(serializers.ModelSerializer):
         return obj.get_file_extension()
 
 
-class DocumentVersionSerializer(serializers.ModelSerializer):
+class DocumentVersionSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Document Version"""
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
     
@@ -86,7 +87,7 @@ class DocumentVersionSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
-class DocumentShareSerializer(serializers.ModelSerializer):
+class DocumentShareSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Document Share"""
     document_name = serializers.CharField(source='document.original_filename', read_only=True)
     shared_by_name = serializers.CharField(source='shared_by.get_full_name', read_only=True)
@@ -108,7 +109,7 @@ class DocumentShareSerializer(serializers.ModelSerializer):
         return obj.is_expired()
 
 
-class DocumentCommentSerializer(serializers.ModelSerializer):
+class DocumentCommentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Document Comment"""
     user_name = serializers.CharField(source='user.get_full_name', read_only=True)
     user_email = serializers.CharField(source='user.email', read_only=True)
@@ -127,7 +128,7 @@ class DocumentCommentSerializer(serializers.ModelSerializer):
         return obj.replies.count()
 
 
-class DocumentAuditLogSerializer(serializers.ModelSerializer):
+class DocumentAuditLogSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Document Audit Log"""
     document_name = serializers.CharField(source='document.original_filename', read_only=True)
     user_name = serializers.CharField(source='user.get_full_name', read_only=True)
@@ -144,7 +145,7 @@ class DocumentAuditLogSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
-class DocumentWorkflowStepSerializer(serializers.ModelSerializer):
+class DocumentWorkflowStepSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Document Workflow Step"""
     assigned_to_name = serializers.CharField(source='assigned_to.get_full_name', read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
@@ -159,7 +160,7 @@ class DocumentWorkflowStepSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'started_at', 'completed_at']
 
 
-class DocumentWorkflowInstanceSerializer(serializers.ModelSerializer):
+class DocumentWorkflowInstanceSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Document Workflow Instance"""
     workflow_name = serializers.CharField(source='workflow.name', read_only=True)
     document_name = serializers.CharField(source='document.original_filename', read_only=True)
@@ -177,7 +178,7 @@ class DocumentWorkflowInstanceSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'started_at', 'completed_at']
 
 
-class DocumentWorkflowSerializer(serializers.ModelSerializer):
+class DocumentWorkflowSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Document Workflow"""
     workflow_type_display = serializers.CharField(source='get_workflow_type_display', read_only=True)
     trigger_type_display = serializers.CharField(source='get_trigger_type_display', read_only=True)
@@ -199,7 +200,7 @@ class DocumentWorkflowSerializer(serializers.ModelSerializer):
         return obj.instances.count()
 
 
-class DocumentStorageSerializer(serializers.ModelSerializer):
+class DocumentStorageSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Document Storage"""
     storage_type_display = serializers.CharField(source='get_storage_type_display', read_only=True)
     used_space_percentage = serializers.SerializerMethodField()
@@ -224,7 +225,7 @@ class DocumentStorageSerializer(serializers.ModelSerializer):
         return obj.get_used_space_percentage()
 
 
-class DocumentSettingsSerializer(serializers.ModelSerializer):
+class DocumentSettingsSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Document Settings"""
     default_storage_name = serializers.CharField(source='default_storage.name', read_only=True)
     default_workflow_name = serializers.CharField(source='default_workflow.name', read_only=True)
@@ -1,59 +1,834 @@
 """
 ERP Integration Service
-Base service for QuickBooks, Xero, NetSuite integrations
+Incremental sync of customers, invoices and payments from QuickBooks, Xero and NetSuite
+
+Each entity is read page by page from where the previous run stopped: the
+connection's sync_cursors hold, per entity, the change timestamp the run
+started from ('since'), the next page to read ('page') and the newest change
+seen so far ('high_water'). A batch's rows, its ERPSyncLog entry and the
+advanced cursor commit together, so an interrupted run resumes at the next
+page and a finished one makes the next run start at its high-water mark.
+
+Provider ids are turned into OASYS ids through ERPMapping, loaded into
+memory once per run, and each page is written with one bulk insert and one
+bulk update per table. The next page is fetched while the current one is
+written; requests are paced per provider account and connections of one
+provider sync at most MAX_CONCURRENCY at a time.
 """
 import logging
-from typing import Dict, List, Optional
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, List, Optional, Tuple
+from django.apps import apps
+from django.conf import settings
+from django.db import connection as db_connection, connections as db_connections, transaction
 from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+import requests
 
 logger = logging.getLogger(__name__)
 
+# Entity -> how its records land in OASYS. Entities sync in this order so
+# references (an invoice's customer, a payment's invoice) are mapped first.
+SYNC_ENTITIES = {
+    'customers': {
+        'oasys_type': 'customer',
+        'model': 'sales.Customer',
+        'fields': (
+            'name', 'email', 'phone', 'address', 'city', 'state', 'country',
+            'postal_code', 'tax_id', 'currency', 'is_active',
+        ),
+        'refs': {},
+        'natural_key': 'name',
+        'company': True,
+        'search': 'customer',
+    },
+    'invoices': {
+        'oasys_type': 'invoice',
+        'model': 'invoicing.Invoice',
+        'fields': (
+            'invoice_number', 'invoice_date', 'due_date', 'status', 'subtotal',
+            'tax_amount', 'total_amount', 'currency', 'notes',
+        ),
+        'refs': {'customer': 'customer'},
+        'natural_key': 'invoice_number',
+        'company': True,
+        'search': 'invoice',
+    },
+    'payments': {
+        'oasys_type': 'payment',
+        'model': 'invoicing.InvoicePayment',
+        'fields': ('payment_date', 'amount', 'payment_method', 'reference', 'currency'),
+        'refs': {'invoice': 'invoice'},
+        'natural_key': None,
+        'company': False,
+        'search': None,
+    },
+}
+
+XERO_DATE = re.compile(r'/Date\((-?\d+)([+-]\d{4})?\)/')
+
+
+def _parse_datetime(value) -> Optional[datetime]:
+    """Aware datetime from ISO 8601, a Xero /Date(ms)/ string or a date"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        result = value
+    elif isinstance(value, date):
+        result = datetime(value.year, value.month, value.day)
+    else:
+        match = XERO_DATE.match(value)
+        if match:
+            return datetime.fromtimestamp(int(match.group(1)) / 1000, tz=dt_timezone.utc)
+        result = parse_datetime(value)
+        if result is None:
+            parsed = parse_date(value)
+            result = datetime(parsed.year, parsed.month, parsed.day) if parsed else None
+        if result is None:
+            raise ValueError(f"Unparseable timestamp {value!r}")
+    if timezone.is_naive(result):
+        result = timezone.make_aware(result, dt_timezone.utc)
+    return result
+
+
+def _parse_date(value) -> Optional[date]:
+    parsed = _parse_datetime(value)
+    return parsed.date() if parsed else None
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _decimal(value, default='0') -> Decimal:
+    try:
+        return Decimal(str(value if value not in (None, '') else default))
+    except InvalidOperation:
+        return Decimal(default)
+
+
+def _record(erp_id, erp_type: str, updated_at, values: Dict, refs: Optional[Dict] = None) -> Dict:
+    """Provider-neutral record as produced by normalize()"""
+    return {
+        'erp_id': str(erp_id),
+        'erp_type': erp_type,
+        'updated_at': _parse_datetime(updated_at),
+        'values': values,
+        'refs': {field: str(ref) if ref is not None else None for field, ref in (refs or {}).items()},
+    }
+
+
+class RateLimiter:
+    """Spaces requests evenly to stay under a per-minute limit, shared by all threads"""
+
+    _limiters: Dict[Tuple, 'RateLimiter'] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, per_minute: int):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next_at = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_key(cls, key: Tuple, per_minute: int) -> 'RateLimiter':
+        with cls._registry_lock:
+            limiter = cls._limiters.get(key)
+            if limiter is None:
+                limiter = cls._limiters[key] = cls(per_minute)
+            return limiter
+
+    def wait(self):
+        """Block until the next request may be sent"""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_at)
+            self._next_at = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
 
 class ERPIntegrationService:
-    """Base service for ERP integrations"""
-    
+    """
+    Base service for ERP integrations
+
+    Providers implement fetch_page() and normalize(); the base class pages,
+    maps, upserts and records progress.
+    """
+
+    PROVIDER = None
+    # Provider rate limit per account, and connections of the provider synced at once
+    REQUESTS_PER_MINUTE = 60
+    MAX_CONCURRENCY = 2
+    PAGE_SIZE = 100
+    REQUEST_TIMEOUT = 30
+    MAX_RETRIES = 3
+
+    _slots: Dict[str, threading.BoundedSemaphore] = {}
+    _slots_lock = threading.Lock()
+
+    def __init__(self, connection, user=None):
+        """
+        Args:
+            connection: ERPConnection to sync
+            user: User recorded as creator of synced rows (default: the connection's creator)
+        """
+        self.connection = connection
+        self.user = user or connection.created_by
+        self.limiter = RateLimiter.for_key((self.PROVIDER, connection.realm_id), self.REQUESTS_PER_MINUTE)
+        self._id_maps: Dict[str, Dict[str, uuid.UUID]] = {}
+        self._company_id = None
+
+    @staticmethod
+    def for_connection(connection, user=None) -> 'ERPIntegrationService':
+        """Service for a connection's provider"""
+        service_class = PROVIDER_SERVICES.get(connection.provider)
+        if service_class is None:
+            raise ValueError(f"Unsupported ERP provider: {connection.provider}")
+        return service_class(connection, user)
+
     @staticmethod
     def sync_invoices(connection, since_date=None) -> Dict:
         """Sync invoices from ERP system"""
-        # TODO: Implement provider-specific sync logic
-        return {
-            'success': True,
-            'records_synced': 0,
-            'records_failed': 0,
-        }
-    
+        return ERPIntegrationService.for_connection(connection).sync('invoices', since_date)
+
     @staticmethod
     def sync_customers(connection, since_date=None) -> Dict:
         """Sync customers from ERP system"""
-        # TODO: Implement provider-specific sync logic
-        return {
-            'success': True,
-            'records_synced': 0,
-            'records_failed': 0,
-        }
-    
+        return ERPIntegrationService.for_connection(connection).sync('customers', since_date)
+
     @staticmethod
     def sync_payments(connection, since_date=None) -> Dict:
         """Sync payments from ERP system"""
-        # TODO: Implement provider-specific sync logic
+        return ERPIntegrationService.for_connection(connection).sync('payments', since_date)
+
+    @staticmethod
+    def sync_connections(connections: Iterable, user=None) -> Dict[str, Dict]:
+        """
+        Sync several connections, bounded by ERP_SYNC_MAX_WORKERS and each provider's MAX_CONCURRENCY
+
+        Returns:
+            Dict of connection id -> sync_all() result (or {'success': False, 'error': ...})
+        """
+        connections = list(connections)
+
+        def run(connection):
+            try:
+                service = ERPIntegrationService.for_connection(connection, user)
+                with service.slot():
+                    return service.sync_all()
+            except Exception as e:
+                logger.error(f"ERP sync failed for connection {connection.id}: {e}")
+                return {'success': False, 'error': str(e)}
+
+        def run_in_thread(connection):
+            try:
+                return run(connection)
+            finally:
+                db_connections.close_all()
+
+        workers = min(getattr(settings, 'ERP_SYNC_MAX_WORKERS', 1), len(connections))
+        # Worker threads have their own database connections: they cannot see an
+        # open transaction's rows, and SQLite serialises writers anyway
+        if workers <= 1 or db_connection.in_atomic_block or db_connection.vendor == 'sqlite':
+            return {str(connection.id): run(connection) for connection in connections}
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='erp-sync') as executor:
+            futures = {str(connection.id): executor.submit(run_in_thread, connection) for connection in connections}
+            return {connection_id: future.result() for connection_id, future in futures.items()}
+
+    @contextmanager
+    def slot(self):
+        """Hold one of the provider's concurrent sync slots"""
+        with self._slots_lock:
+            semaphore = self._slots.get(self.PROVIDER)
+            if semaphore is None:
+                semaphore = self._slots[self.PROVIDER] = threading.BoundedSemaphore(self.MAX_CONCURRENCY)
+        with semaphore:
+            yield
+
+    def sync_all(self, since_date=None) -> Dict[str, Dict]:
+        """
+        Sync every entity the connection has enabled, in dependency order
+
+        Returns:
+            Dict of entity -> sync() result, plus 'success'
+        """
+        from .models import ERPConnection
+
+        enabled = [entity for entity in SYNC_ENTITIES if getattr(self.connection, f"sync_{entity}", False)]
+        ERPConnection.objects.filter(pk=self.connection.pk).update(last_sync_status='in_progress')
+        results = {}
+        for entity in enabled:
+            results[entity] = self.sync(entity, since_date)
+        success = all(result['success'] for result in results.values())
+        errors = [result['error'] for result in results.values() if result.get('error')]
+
+        self.connection.last_sync_at = timezone.now()
+        self.connection.last_sync_status = 'success' if success else 'failed'
+        self.connection.last_sync_error = '\n'.join(errors)
+        ERPConnection.objects.filter(pk=self.connection.pk).update(
+            last_sync_at=self.connection.last_sync_at,
+            last_sync_status=self.connection.last_sync_status,
+            last_sync_error=self.connection.last_sync_error,
+        )
+        results['success'] = success
+        return results
+
+    def sync(self, entity: str, since_date=None) -> Dict:
+        """
+        Sync one entity from the stored cursor (or from since_date, restarting the cursor)
+
+        Args:
+            entity: 'customers', 'invoices' or 'payments'
+            since_date: Optional date/datetime to re-read changes from
+
+        Returns:
+            Dict with success, records_synced, records_failed, batches and any error
+        """
+        totals = {'success': True, 'records_synced': 0, 'records_failed': 0, 'batches': 0}
+        state = dict((self.connection.sync_cursors or {}).get(entity) or {})
+        if since_date is not None:
+            state = {'since': _isoformat(_parse_datetime(since_date))}
+        since = _parse_datetime(state.get('since'))
+        high_water = _parse_datetime(state.get('high_water')) or since
+        page = state.get('page')
+
+        try:
+            self._prepare(entity)
+        except Exception as e:
+            self._log_batch(entity, 0, 0, str(e), status='failed')
+            return dict(totals, success=False, error=str(e))
+
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"erp-{self.PROVIDER}") as prefetcher:
+            pending = prefetcher.submit(self.fetch_page, entity, since, page)
+            while pending is not None:
+                try:
+                    result = pending.result()
+                except Exception as e:
+                    logger.error(f"Fetching {entity} from {self.PROVIDER} failed: {e}")
+                    self._log_batch(entity, 0, 0, str(e), status='failed')
+                    return dict(totals, success=False, error=str(e))
+
+                next_page = result.get('next_page')
+                # Read ahead while this page is written
+                pending = prefetcher.submit(self.fetch_page, entity, since, next_page) if next_page is not None else None
+
+                records, errors = [], []
+                for raw in result.get('records', []):
+                    try:
+                        records.append(self.normalize(entity, raw))
+                    except Exception as e:
+                        errors.append(f"Unreadable {entity} record: {e}")
+                for record in records:
+                    if record['updated_at'] and (high_water is None or record['updated_at'] > high_water):
+                        high_water = record['updated_at']
+
+                if next_page is not None:
+                    cursor = {'since': _isoformat(since), 'page': next_page, 'high_water': _isoformat(high_water)}
+                else:
+                    cursor = {'since': _isoformat(high_water), 'page': None, 'high_water': None}
+                try:
+                    synced, failed = self._write_batch(entity, records, cursor, errors)
+                except Exception as e:
+                    logger.error(f"Writing a page of {entity} from {self.PROVIDER} failed: {e}")
+                    self._log_batch(entity, 0, len(records) + len(errors), str(e), status='failed')
+                    return dict(totals, success=False, error=str(e))
+                totals['records_synced'] += synced
+                totals['records_failed'] += failed
+                totals['batches'] += 1
+
+        logger.info(
+            f"Synced {entity} for ERP connection {self.connection.id}: "
+            f"{totals['records_synced']} synced, {totals['records_failed']} failed in {totals['batches']} batches"
+        )
+        return totals
+
+    # Provider hooks
+
+    def fetch_page(self, entity: str, since: Optional[datetime], page) -> Dict:
+        """
+        Read one page of records changed at or after since
+
+        Args:
+            entity: Entity name
+            since: Only records changed at or after this time (None for all)
+            page: Provider page token, None for the first page
+
+        Returns:
+            Dict with 'records' (raw provider records) and 'next_page' (None on the last page)
+        """
+        raise NotImplementedError
+
+    def normalize(self, entity: str, raw: Dict) -> Dict:
+        """
+        Turn a raw provider record into a record built by _record()
+
+        Leave out fields the provider does not return: updates write only
+        the fields a record carries, so a placeholder would overwrite the
+        value kept in OASYS.
+        """
+        raise NotImplementedError
+
+    def _headers(self) -> Dict[str, str]:
         return {
-            'success': True,
-            'records_synced': 0,
-            'records_failed': 0,
+            'Authorization': f"Bearer {self.connection.access_token}",
+            'Accept': 'application/json',
         }
 
+    def _request(self, method: str, url: str, **kwargs) -> Dict:
+        """Paced JSON request, retrying when the provider answers 429"""
+        headers = dict(self._headers(), **kwargs.pop('headers', {}))
+        for attempt in range(self.MAX_RETRIES + 1):
+            self.limiter.wait()
+            response = requests.request(method, url, headers=headers, timeout=self.REQUEST_TIMEOUT, **kwargs)
+            if response.status_code == 429 and attempt < self.MAX_RETRIES:
+                retry_after = response.headers.get('Retry-After', '')
+                time.sleep(int(retry_after) if retry_after.isdigit() else 2 ** attempt)
+                continue
+            response.raise_for_status()
+            return response.json()
+
+    # Writing
+
+    def _prepare(self, entity: str):
+        """Load what a run needs once: the id maps it resolves against and the company"""
+        config = SYNC_ENTITIES[entity]
+        if self.user is None:
+            raise ValueError('ERP sync needs a user to record as creator; the connection has none')
+        for oasys_type in {config['oasys_type'], *config['refs'].values()}:
+            self._id_map(oasys_type)
+        if config['company'] and self._company_id is None:
+            Company = apps.get_model('tenants.Company')
+            companies = Company.objects.filter(tenant_id=self.connection.tenant_id)
+            self._company_id = (
+                companies.filter(is_primary=True).values_list('pk', flat=True).first()
+                or companies.values_list('pk', flat=True).first()
+            )
+            if self._company_id is None:
+                raise ValueError('ERP sync needs a company to file customers and invoices under')
+
+    def _id_map(self, oasys_type: str) -> Dict[str, uuid.UUID]:
+        """ERP id -> OASYS id for a type, read once per run"""
+        id_map = self._id_maps.get(oasys_type)
+        if id_map is None:
+            from .models import ERPMapping
+
+            id_map = self._id_maps[oasys_type] = dict(
+                ERPMapping.objects.filter(connection=self.connection, oasys_type=oasys_type)
+                .values_list('erp_id', 'oasys_id')
+            )
+        return id_map
+
+    def _write_batch(self, entity: str, records: List[Dict], cursor: Dict, errors: List[str]) -> Tuple[int, int]:
+        """Upsert one page, log it and advance the cursor in one transaction"""
+        from .models import ERPConnection
+
+        id_maps = {oasys_type: dict(id_map) for oasys_type, id_map in self._id_maps.items()}
+        try:
+            with transaction.atomic():
+                synced = self._upsert(entity, records, errors)
+                self._log_batch(entity, synced, len(errors), '\n'.join(errors))
+                cursors = dict(self.connection.sync_cursors or {})
+                cursors[entity] = cursor
+                ERPConnection.objects.filter(pk=self.connection.pk).update(sync_cursors=cursors)
+                self.connection.sync_cursors = cursors
+        except Exception:
+            # The batch rolled back; so must the ids it added to the maps
+            self._id_maps = id_maps
+            raise
+        if errors:
+            logger.warning(f"{len(errors)} {entity} records failed to sync: {errors[:5]}")
+        return synced, len(errors)
+
+    def _log_batch(self, entity: str, synced: int, failed: int, error_message: str = '', status: Optional[str] = None):
+        from .models import ERPSyncLog
+
+        if status is None:
+            status = 'success' if not failed else ('partial' if synced else 'failed')
+        ERPSyncLog.objects.create(
+            tenant_id=self.connection.tenant_id,
+            connection=self.connection,
+            sync_type=entity,
+            status=status,
+            records_synced=synced,
+            records_failed=failed,
+            error_message=error_message,
+            completed_at=timezone.now(),
+            created_by=self.user,
+        )
+
+    def _upsert(self, entity: str, records: List[Dict], errors: List[str]) -> int:
+        """
+        Create or update the OASYS rows for a page of records
+
+        Records already mapped are updated; unmapped ones are matched on the
+        entity's natural key (an invoice number, a customer name) or created.
+
+        Returns:
+            Number of records written; failures are appended to errors
+        """
+        from .models import ERPMapping
+
+        config = SYNC_ENTITIES[entity]
+        model = apps.get_model(config['model'])
+        oasys_type = config['oasys_type']
+        id_map = self._id_map(oasys_type)
+        tenant_id = self.connection.tenant_id
+        now = timezone.now()
+
+        # Later versions of a record in the same page win
+        latest = {}
+        for record in records:
+            latest[record['erp_id']] = record
+
+        updates, creates = [], []
+        for record in latest.values():
+            values = {field: record['values'][field] for field in config['fields'] if field in record['values']}
+            missing = None
+            for field, ref_type in config['refs'].items():
+                ref = record['refs'].get(field)
+                ref_id = self._id_map(ref_type).get(ref)
+                if ref_id is None:
+                    missing = f"{ref_type} {ref}"
+                    break
+                values[f"{field}_id"] = ref_id
+            if missing:
+                errors.append(f"{record['erp_type']} {record['erp_id']}: unknown {missing}")
+                continue
+            oasys_id = id_map.get(record['erp_id'])
+            (updates if oasys_id else creates).append([record, values, oasys_id])
+
+        # Unmapped records whose natural key already exists take over that row
+        new_mappings = []
+        natural_key = config['natural_key']
+        if natural_key and creates:
+            scope = {'tenant_id': tenant_id}
+            if config['company']:
+                scope['company_id'] = self._company_id
+            keys = {values.get(natural_key) for _, values, _ in creates}
+            existing = dict(
+                model.objects.filter(**scope, **{f"{natural_key}__in": keys}).values_list(natural_key, 'pk')
+            )
+            mapped = set(id_map.values())
+            remaining, seen = [], set()
+            for item in creates:
+                record, values, _ = item
+                key = values.get(natural_key)
+                if key in seen or existing.get(key) in mapped:
+                    errors.append(f"{record['erp_type']} {record['erp_id']}: {natural_key} {key!r} is already synced")
+                    continue
+                seen.add(key)
+                if key in existing:
+                    item[2] = existing[key]
+                    updates.append(item)
+                    new_mappings.append(item)
+                else:
+                    remaining.append(item)
+            creates = remaining
+
+        for item in creates:
+            item[2] = uuid.uuid4()
+            new_mappings.append(item)
+
+        if creates:
+            extra = {'company_id': self._company_id} if config['company'] else {}
+            model.objects.bulk_create([
+                model(id=oasys_id, tenant_id=tenant_id, created_by=self.user, **extra, **values)
+                for _, values, oasys_id in creates
+            ])
+        if updates:
+            # Only the fields a record carries are written; records of one
+            # provider normally carry the same set, so this is one bulk_update
+            by_fields = {}
+            for _, values, oasys_id in updates:
+                obj = model(pk=oasys_id, tenant_id=tenant_id, **values)
+                obj.updated_at = now
+                by_fields.setdefault(tuple(values), []).append(obj)
+            for fields, objs in by_fields.items():
+                model.objects.bulk_update(objs, list(fields) + ['updated_at'])
+        remapped = [record['erp_id'] for record, _, _ in updates if record['erp_id'] in id_map]
+        if new_mappings:
+            ERPMapping.objects.bulk_create([
+                ERPMapping(
+                    tenant_id=tenant_id, connection=self.connection, oasys_type=oasys_type,
+                    oasys_id=oasys_id, erp_id=record['erp_id'], erp_type=record['erp_type'],
+                )
+                for record, _, oasys_id in new_mappings
+            ])
+            for record, _, oasys_id in new_mappings:
+                id_map[record['erp_id']] = oasys_id
+        if remapped:
+            ERPMapping.objects.filter(
+                connection=self.connection, oasys_type=oasys_type, erp_id__in=remapped
+            ).update(last_updated=now)
+
+        written = [oasys_id for _, _, oasys_id in updates + creates]
+        if written:
+            self._after_write(entity, model, written)
+        return len(written)
+
+    def _after_write(self, entity: str, model, ids: List):
+        """Do what the skipped save() signals would: search entries and customer balances"""
+        from search.indexing import SearchIndexService
+        from sales.balances import CustomerBalanceService
+
+        config = SYNC_ENTITIES[entity]
+        tenant_id = self.connection.tenant_id
+        if config['search']:
+            SearchIndexService.reindex_queryset(config['search'], model.objects.filter(pk__in=ids))
+        if entity == 'customers':
+            customer_ids = ids
+        elif entity == 'invoices':
+            customer_ids = model.objects.filter(pk__in=ids).values_list('customer_id', flat=True).distinct()
+        else:
+            Invoice = apps.get_model('invoicing.Invoice')
+            customer_ids = Invoice.objects.filter(payments__pk__in=ids).values_list('customer_id', flat=True).distinct()
+        CustomerBalanceService.refresh(tenant_id, list(customer_ids))
+
 
 class QuickBooksService(ERPIntegrationService):
-    """QuickBooks integration service"""
-    pass
+    """QuickBooks Online integration service (query API, offset paging)"""
+
+    PROVIDER = 'quickbooks'
+    REQUESTS_PER_MINUTE = 500  # Per realm
+    MAX_CONCURRENCY = 10
+    PAGE_SIZE = 500
+    ERP_TYPES = {'customers': 'Customer', 'invoices': 'Invoice', 'payments': 'Payment'}
+
+    def _base_url(self) -> str:
+        if self.connection.environment == 'production':
+            return 'https://quickbooks.api.intuit.com'
+        return 'https://sandbox-quickbooks.api.intuit.com'
+
+    def fetch_page(self, entity, since, page):
+        erp_type = self.ERP_TYPES[entity]
+        start = page or 1
+        where = f" WHERE Metadata.LastUpdatedTime >= '{since.isoformat()}'" if since else ''
+        query = (
+            f"SELECT * FROM {erp_type}{where} ORDERBY Metadata.LastUpdatedTime "
+            f"STARTPOSITION {start} MAXRESULTS {self.PAGE_SIZE}"
+        )
+        data = self._request(
+            'GET', f"{self._base_url()}/v3/company/{self.connection.realm_id}/query",
+            params={'query': query, 'minorversion': 65},
+        )
+        rows = data.get('QueryResponse', {}).get(erp_type, [])
+        return {'records': rows, 'next_page': start + len(rows) if len(rows) >= self.PAGE_SIZE else None}
+
+    def normalize(self, entity, raw):
+        updated_at = (raw.get('MetaData') or {}).get('LastUpdatedTime')
+        currency = (raw.get('CurrencyRef') or {}).get('value') or 'USD'
+        if entity == 'customers':
+            address = raw.get('BillAddr') or {}
+            return _record(raw['Id'], 'Customer', updated_at, {
+                'name': raw.get('DisplayName') or raw.get('CompanyName') or f"Customer {raw['Id']}",
+                'email': (raw.get('PrimaryEmailAddr') or {}).get('Address', ''),
+                'phone': ((raw.get('PrimaryPhone') or {}).get('FreeFormNumber') or '')[:20],
+                'address': address.get('Line1', ''),
+                'city': address.get('City', ''),
+                'state': address.get('CountrySubDivisionCode', ''),
+                'country': address.get('Country') or 'US',
+                'postal_code': address.get('PostalCode', ''),
+                'tax_id': raw.get('PrimaryTaxIdentifier', ''),
+                'currency': currency,
+                'is_active': raw.get('Active', True),
+            })
+        if entity == 'invoices':
+            total = _decimal(raw.get('TotalAmt'))
+            tax = _decimal((raw.get('TxnTaxDetail') or {}).get('TotalTax'))
+            balance = _decimal(raw.get('Balance'), default=str(total))
+            return _record(raw['Id'], 'Invoice', updated_at, {
+                'invoice_number': raw.get('DocNumber') or f"QB-{raw['Id']}",
+                'invoice_date': _parse_date(raw.get('TxnDate')),
+                'due_date': _parse_date(raw.get('DueDate') or raw.get('TxnDate')),
+                'status': 'paid' if balance == 0 else 'sent',
+                'subtotal': total - tax,
+                'tax_amount': tax,
+                'total_amount': total,
+                'currency': currency,
+                'notes': raw.get('PrivateNote', ''),
+            }, {'customer': (raw.get('CustomerRef') or {}).get('value')})
+        # A payment may settle several invoices; it is recorded against the first
+        invoice_id = None
+        for line in raw.get('Line', []):
+            for linked in line.get('LinkedTxn', []):
+                if linked.get('TxnType') == 'Invoice':
+                    invoice_id = invoice_id or linked.get('TxnId')
+        return _record(raw['Id'], 'Payment', updated_at, {
+            'payment_date': _parse_date(raw.get('TxnDate')),
+            'amount': _decimal(raw.get('TotalAmt')),
+            'payment_method': 'other',
+            'reference': (raw.get('PaymentRefNum') or '')[:100],
+            'currency': currency,
+        }, {'invoice': invoice_id})
 
 
 class XeroService(ERPIntegrationService):
-    """Xero integration service"""
-    pass
+    """Xero Accounting API integration service (If-Modified-Since, page numbers)"""
+
+    PROVIDER = 'xero'
+    REQUESTS_PER_MINUTE = 60  # Per organisation
+    MAX_CONCURRENCY = 5
+    PAGE_SIZE = 100  # Fixed by Xero
+    BASE_URL = 'https://api.xero.com/api.xro/2.0'
+    ENDPOINTS = {
+        'customers': ('Contacts', {'where': 'IsCustomer==true'}),
+        'invoices': ('Invoices', {'where': 'Type=="ACCREC"'}),
+        'payments': ('Payments', {'where': 'PaymentType=="ACCRECPAYMENT"'}),
+    }
+    STATUSES = {'DRAFT': 'draft', 'SUBMITTED': 'draft', 'AUTHORISED': 'sent', 'PAID': 'paid', 'VOIDED': 'cancelled'}
+
+    def _headers(self):
+        headers = super()._headers()
+        headers['xero-tenant-id'] = self.connection.realm_id
+        return headers
+
+    def fetch_page(self, entity, since, page):
+        resource, params = self.ENDPOINTS[entity]
+        page = page or 1
+        headers = {'If-Modified-Since': since.strftime('%Y-%m-%dT%H:%M:%S')} if since else {}
+        data = self._request(
+            'GET', f"{self.BASE_URL}/{resource}", params=dict(params, page=page, order='UpdatedDateUTC'),
+            headers=headers,
+        )
+        rows = data.get(resource, [])
+        return {'records': rows, 'next_page': page + 1 if len(rows) >= self.PAGE_SIZE else None}
+
+    def normalize(self, entity, raw):
+        updated_at = raw.get('UpdatedDateUTC')
+        if entity == 'customers':
+            address = next(iter(raw.get('Addresses') or []), {})
+            phone = next((p for p in raw.get('Phones') or [] if p.get('PhoneNumber')), {})
+            return _record(raw['ContactID'], 'Contact', updated_at, {
+                'name': raw.get('Name') or f"Contact {raw['ContactID']}",
+                'email': raw.get('EmailAddress', ''),
+                'phone': ' '.join(filter(None, [phone.get('PhoneAreaCode'), phone.get('PhoneNumber')]))[:20],
+                'address': address.get('AddressLine1', ''),
+                'city': address.get('City', ''),
+                'state': address.get('Region', ''),
+                'country': address.get('Country') or 'US',
+                'postal_code': address.get('PostalCode', ''),
+                'tax_id': raw.get('TaxNumber', ''),
+                'currency': raw.get('DefaultCurrency') or 'USD',
+                'is_active': raw.get('ContactStatus', 'ACTIVE') == 'ACTIVE',
+            })
+        if entity == 'invoices':
+            return _record(raw['InvoiceID'], 'Invoice', updated_at, {
+                'invoice_number': raw.get('InvoiceNumber') or f"XERO-{raw['InvoiceID'][:8]}",
+                'invoice_date': _parse_date(raw.get('DateString') or raw.get('Date')),
+                'due_date': _parse_date(raw.get('DueDateString') or raw.get('DueDate') or raw.get('Date')),
+                'status': self.STATUSES.get(raw.get('Status'), 'draft'),
+                'subtotal': _decimal(raw.get('SubTotal')),
+                'tax_amount': _decimal(raw.get('TotalTax')),
+                'total_amount': _decimal(raw.get('Total')),
+                'currency': raw.get('CurrencyCode') or 'USD',
+                'notes': raw.get('Reference', ''),
+            }, {'customer': (raw.get('Contact') or {}).get('ContactID')})
+        invoice = raw.get('Invoice') or {}
+        return _record(raw['PaymentID'], 'Payment', updated_at, {
+            'payment_date': _parse_date(raw.get('Date')),
+            'amount': _decimal(raw.get('Amount')),
+            'payment_method': 'bank_transfer',
+            'reference': (raw.get('Reference') or '')[:100],
+            'currency': invoice.get('CurrencyCode') or 'USD',
+        }, {'invoice': invoice.get('InvoiceID')})
 
 
 class NetSuiteService(ERPIntegrationService):
-    """NetSuite integration service"""
-    pass
+    """NetSuite integration service (SuiteQL over REST, offset paging)"""
+
+    PROVIDER = 'netsuite'
+    REQUESTS_PER_MINUTE = 300
+    MAX_CONCURRENCY = 5  # Default account concurrency limit
+    PAGE_SIZE = 1000
+    QUERIES = {
+        'customers': (
+            "SELECT id, companyname, entityid, email, phone, isinactive, "
+            "TO_CHAR(lastmodifieddate, 'YYYY-MM-DD\"T\"HH24:MI:SS') AS lastmodified "
+            "FROM customer{where} ORDER BY lastmodifieddate, id"
+        ),
+        'invoices': (
+            "SELECT id, tranid, entity, TO_CHAR(trandate, 'YYYY-MM-DD') AS trandate, "
+            "TO_CHAR(duedate, 'YYYY-MM-DD') AS duedate, foreigntotal, taxtotal, "
+            "BUILTIN.DF(currency) AS currency, BUILTIN.DF(status) AS status, memo, "
+            "TO_CHAR(lastmodifieddate, 'YYYY-MM-DD\"T\"HH24:MI:SS') AS lastmodified "
+            "FROM transaction WHERE type = 'CustInvc'{and_where} ORDER BY lastmodifieddate, id"
+        ),
+        'payments': (
+            "SELECT t.id, t.tranid, TO_CHAR(t.trandate, 'YYYY-MM-DD') AS trandate, t.foreigntotal, "
+            "BUILTIN.DF(t.currency) AS currency, MIN(l.previousdoc) AS invoice, "
+            "TO_CHAR(t.lastmodifieddate, 'YYYY-MM-DD\"T\"HH24:MI:SS') AS lastmodified "
+            "FROM transaction t JOIN NextTransactionLineLink l ON l.nextdoc = t.id "
+            "WHERE t.type = 'CustPymt'{and_where_t} "
+            "GROUP BY t.id, t.tranid, t.trandate, t.foreigntotal, t.currency, t.lastmodifieddate "
+            "ORDER BY t.lastmodifieddate, t.id"
+        ),
+    }
+
+    def _base_url(self) -> str:
+        account = self.connection.realm_id.lower().replace('_', '-')
+        return f"https://{account}.suitetalk.api.netsuite.com/services/rest/query/v1/suiteql"
+
+    def fetch_page(self, entity, since, page):
+        condition = ''
+        if since:
+            stamp = since.astimezone(dt_timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+            condition = f"lastmodifieddate >= TO_TIMESTAMP('{stamp}', 'YYYY-MM-DD HH24:MI:SS')"
+        query = self.QUERIES[entity].format(
+            where=f" WHERE {condition}" if condition else '',
+            and_where=f" AND {condition}" if condition else '',
+            and_where_t=f" AND t.{condition}" if condition else '',
+        )
+        offset = page or 0
+        data = self._request(
+            'POST', self._base_url(), params={'limit': self.PAGE_SIZE, 'offset': offset},
+            json={'q': query}, headers={'Prefer': 'transient'},
+        )
+        rows = data.get('items', [])
+        return {'records': rows, 'next_page': offset + len(rows) if data.get('hasMore') else None}
+
+    def normalize(self, entity, raw):
+        updated_at = raw.get('lastmodified')
+        if entity == 'customers':
+            return _record(raw['id'], 'customer', updated_at, {
+                # The SuiteQL query reads no address, tax id or currency; those keep their OASYS values
+                'name': raw.get('companyname') or raw.get('entityid') or f"Customer {raw['id']}",
+                'email': raw.get('email') or '',
+                'phone': (raw.get('phone') or '')[:20],
+                'is_active': raw.get('isinactive') != 'T',
+            })
+        if entity == 'invoices':
+            total = _decimal(raw.get('foreigntotal'))
+            tax = _decimal(raw.get('taxtotal'))
+            status = (raw.get('status') or '').lower()
+            return _record(raw['id'], 'invoice', updated_at, {
+                'invoice_number': raw.get('tranid') or f"NS-{raw['id']}",
+                'invoice_date': _parse_date(raw.get('trandate')),
+                'due_date': _parse_date(raw.get('duedate') or raw.get('trandate')),
+                'status': 'paid' if 'paid' in status else ('cancelled' if 'void' in status else 'sent'),
+                'subtotal': total - tax,
+                'tax_amount': tax,
+                'total_amount': total,
+                'currency': (raw.get('currency') or 'USD')[:3],
+                'notes': raw.get('memo') or '',
+            }, {'customer': raw.get('entity')})
+        return _record(raw['id'], 'customerpayment', updated_at, {
+            'payment_date': _parse_date(raw.get('trandate')),
+            'amount': _decimal(raw.get('foreigntotal')),
+            'payment_method': 'other',
+            'reference': (raw.get('tranid') or '')[:100],
+            'currency': (raw.get('currency') or 'USD')[:3],
+        }, {'invoice': raw.get('invoice')})
+
 
+PROVIDER_SERVICES = {
+    'quickbooks': QuickBooksService,
+    'xero': XeroService,
+    'netsuite': NetSuiteService,
+}
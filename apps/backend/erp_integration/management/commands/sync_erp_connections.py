@@ -0,0 +1,54 @@
+"""
+Management command to sync ERP connections
+Usage: python manage.py sync_erp_connections [--connection <id>] [--since 2024-01-01] [--all]
+
+Without --connection, syncs the active auto-sync connections whose
+sync_frequency_hours has elapsed since their last sync (--all: every active one).
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import F, Q
+from django.utils import timezone
+
+from erp_integration.erp_service import ERPIntegrationService
+from erp_integration.models import ERPConnection
+
+
+class Command(BaseCommand):
+    help = 'Incrementally sync customers, invoices and payments from connected ERP systems'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connection', help='Sync only this connection id')
+        parser.add_argument('--since', help='Re-read changes since this date instead of the stored cursors')
+        parser.add_argument('--all', action='store_true', help='Sync every active connection, due or not')
+
+    def handle(self, *args, **options):
+        connections = ERPConnection.objects.filter(is_active=True).select_related('created_by')
+        if options['connection']:
+            connections = connections.filter(pk=options['connection'])
+        elif not options['all']:
+            connections = connections.filter(auto_sync=True).filter(
+                Q(last_sync_at__isnull=True)
+                | Q(last_sync_at__lte=timezone.now() - timedelta(hours=1) * F('sync_frequency_hours'))
+            )
+        connections = list(connections)
+
+        if options['since']:
+            results = {}
+            for connection in connections:
+                service = ERPIntegrationService.for_connection(connection)
+                results[str(connection.id)] = service.sync_all(since_date=options['since'])
+        else:
+            results = ERPIntegrationService.sync_connections(connections)
+
+        for connection in connections:
+            result = results[str(connection.id)]
+            if 'error' in result:
+                self.stdout.write(f"{connection}: failed ({result['error']})")
+                continue
+            summary = ', '.join(
+                f"{entity} {stats['records_synced']} synced/{stats['records_failed']} failed"
+                for entity, stats in result.items() if entity != 'success'
+            )
+            self.stdout.write(f"{connection}: {'ok' if result['success'] else 'with errors'} - {summary}")
@@ -0,0 +1,95 @@
+# Generated by Django 4.2 on 2026-10-19 15:28
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tenants', '0004_tenantonboardingprogress_preset_progress'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ERPConnection',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('provider', models.CharField(choices=[('quickbooks', 'QuickBooks'), ('xero', 'Xero'), ('netsuite', 'NetSuite')], max_length=50)),
+                ('name', models.CharField(help_text='Connection name/identifier', max_length=255)),
+                ('is_active', models.BooleanField(default=True)),
+                ('access_token', models.TextField(blank=True, help_text='OAuth access token (encrypted)')),
+                ('refresh_token', models.TextField(blank=True, help_text='OAuth refresh token (encrypted)')),
+                ('token_expires_at', models.DateTimeField(blank=True, null=True)),
+                ('realm_id', models.CharField(blank=True, help_text='QuickBooks Realm ID or Xero Tenant ID', max_length=255)),
+                ('company_name', models.CharField(blank=True, max_length=255)),
+                ('environment', models.CharField(choices=[('sandbox', 'Sandbox'), ('production', 'Production')], default='sandbox', max_length=20)),
+                ('auto_sync', models.BooleanField(default=False, help_text='Enable automatic synchronization')),
+                ('sync_frequency_hours', models.IntegerField(default=24, help_text='Sync frequency in hours')),
+                ('last_sync_at', models.DateTimeField(blank=True, null=True)),
+                ('last_sync_status', models.CharField(blank=True, choices=[('success', 'Success'), ('failed', 'Failed'), ('in_progress', 'In Progress')], max_length=20)),
+                ('last_sync_error', models.TextField(blank=True)),
+                ('sync_invoices', models.BooleanField(default=True)),
+                ('sync_customers', models.BooleanField(default=True)),
+                ('sync_payments', models.BooleanField(default=True)),
+                ('sync_expenses', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='erp_connections', to='tenants.tenant')),
+            ],
+            options={
+                'verbose_name': 'ERP Connection',
+                'verbose_name_plural': 'ERP Connections',
+                'db_table': 'erp_connections',
+                'unique_together': {('tenant', 'provider', 'realm_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ERPSyncLog',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('sync_type', models.CharField(choices=[('invoices', 'Invoices'), ('customers', 'Customers'), ('payments', 'Payments'), ('expenses', 'Expenses'), ('full', 'Full Sync')], max_length=50)),
+                ('status', models.CharField(choices=[('success', 'Success'), ('failed', 'Failed'), ('in_progress', 'In Progress'), ('partial', 'Partial Success')], max_length=20)),
+                ('records_synced', models.IntegerField(default=0)),
+                ('records_failed', models.IntegerField(default=0)),
+                ('error_message', models.TextField(blank=True)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('connection', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sync_logs', to='erp_integration.erpconnection')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='erp_sync_logs', to='tenants.tenant')),
+            ],
+            options={
+                'verbose_name': 'ERP Sync Log',
+                'verbose_name_plural': 'ERP Sync Logs',
+                'db_table': 'erp_sync_logs',
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ERPMapping',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('oasys_type', models.CharField(choices=[('customer', 'Customer'), ('invoice', 'Invoice'), ('payment', 'Payment'), ('expense', 'Expense')], max_length=50)),
+                ('oasys_id', models.UUIDField(help_text='OASYS entity ID')),
+                ('erp_id', models.CharField(help_text='ERP entity ID', max_length=255)),
+                ('erp_type', models.CharField(help_text='ERP entity type', max_length=50)),
+                ('synced_at', models.DateTimeField(auto_now_add=True)),
+                ('last_updated', models.DateTimeField(auto_now=True)),
+                ('connection', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mappings', to='erp_integration.erpconnection')),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='erp_mappings', to='tenants.tenant')),
+            ],
+            options={
+                'verbose_name': 'ERP Mapping',
+                'verbose_name_plural': 'ERP Mappings',
+                'db_table': 'erp_mappings',
+                'unique_together': {('tenant', 'connection', 'oasys_type', 'oasys_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 15:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('erp_integration', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='erpconnection',
+            name='sync_cursors',
+            field=models.JSONField(blank=True, default=dict, help_text='Per-entity change cursor: {"invoices": {"since": ..., "page": ..., "high_water": ...}}'),
+        ),
+    ]
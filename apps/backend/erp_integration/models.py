@@ -44,7 +44,11 @@ class ERPConnection(models.Model):
         ('in_progress', 'In Progress'),
     ])
     last_sync_error = models.TextField(blank=True)
-    
+    sync_cursors = models.JSONField(
+        default=dict, blank=True,
+        help_text='Per-entity change cursor: {"invoices": {"since": ..., "page": ..., "high_water": ...}}'
+    )
+
     # Sync scope
     sync_invoices = models.BooleanField(default=True)
     sync_customers = models.BooleanField(default=True)
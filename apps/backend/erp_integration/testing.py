@@ -0,0 +1,78 @@
+"""
+Local fake ERP provider
+Serves in-memory records with the paging and change-filter semantics of a real
+provider, so the sync engine can run in tests and development without network access.
+"""
+from typing import Dict, List, Optional
+
+from .erp_service import ERPIntegrationService, _decimal, _parse_date, _parse_datetime, _record
+
+
+class FakeERPService(ERPIntegrationService):
+    """
+    In-memory provider
+
+    records maps an entity to raw dicts, each with an 'id' and 'updated_at':
+        customers: name, email
+        invoices: number, customer, date, due, total, status
+        payments: invoice, date, amount
+    Every fetch_page() call is kept in requests as (entity, since, page).
+    """
+
+    PROVIDER = 'fake'
+    REQUESTS_PER_MINUTE = 0  # Unpaced
+    MAX_CONCURRENCY = 4
+
+    def __init__(self, connection, user=None, records: Optional[Dict[str, List[Dict]]] = None, page_size: int = 2):
+        super().__init__(connection, user)
+        self.records = records if records is not None else {}
+        self.PAGE_SIZE = page_size
+        self.requests = []
+
+    def fetch_page(self, entity, since, page):
+        self.requests.append((entity, since, page))
+        changed = sorted(
+            (raw for raw in self.records.get(entity, [])
+             if since is None or _parse_datetime(raw['updated_at']) >= since),
+            key=lambda raw: (_parse_datetime(raw['updated_at']), str(raw['id']))
+        )
+        offset = page or 0
+        rows = changed[offset:offset + self.PAGE_SIZE]
+        next_offset = offset + len(rows)
+        return {'records': rows, 'next_page': next_offset if next_offset < len(changed) else None}
+
+    def normalize(self, entity, raw):
+        if entity == 'customers':
+            return _record(raw['id'], 'Customer', raw['updated_at'], {
+                'name': raw['name'],
+                'email': raw.get('email', ''),
+                'phone': '',
+                'address': '',
+                'city': '',
+                'state': '',
+                'country': 'US',
+                'postal_code': '',
+                'tax_id': '',
+                'currency': 'USD',
+                'is_active': True,
+            })
+        if entity == 'invoices':
+            total = _decimal(raw.get('total'))
+            return _record(raw['id'], 'Invoice', raw['updated_at'], {
+                'invoice_number': raw['number'],
+                'invoice_date': _parse_date(raw['date']),
+                'due_date': _parse_date(raw.get('due') or raw['date']),
+                'status': raw.get('status', 'sent'),
+                'subtotal': total,
+                'tax_amount': _decimal(0),
+                'total_amount': total,
+                'currency': 'USD',
+                'notes': '',
+            }, {'customer': raw['customer']})
+        return _record(raw['id'], 'Payment', raw['updated_at'], {
+            'payment_date': _parse_date(raw['date']),
+            'amount': _decimal(raw['amount']),
+            'payment_method': 'bank_transfer',
+            'reference': '',
+            'currency': 'USD',
+        }, {'invoice': raw['invoice']})
@@ -0,0 +1,166 @@
+"""
+Unit tests for erp_integration app
+"""
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from authentication.models import User
+from invoicing.models import Invoice, InvoicePayment
+from sales.models import Customer
+from tenants.models import Company, Tenant
+from .erp_service import NetSuiteService, QuickBooksService
+from .models import ERPConnection, ERPMapping, ERPSyncLog
+from .testing import FakeERPService
+
+
+class ERPSyncEngineTest(TestCase):
+    """Test incremental ERP sync against the fake provider"""
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name='ERP Tenant', slug='erp_tenant', is_active=True)
+        self.company = Company.objects.create(
+            tenant=self.tenant, name='ERP Company', registration_number='123456789', is_primary=True
+        )
+        self.user = User.objects.create_user(
+            username='erp', email='erp@example.com', password='testpass123', tenant=self.tenant
+        )
+        self.connection = ERPConnection.objects.create(
+            tenant=self.tenant, provider='quickbooks', name='Books', realm_id='realm-1', created_by=self.user
+        )
+        self.records = {
+            'customers': [
+                {'id': 'C1', 'name': 'Acme', 'updated_at': '2024-01-01T00:00:00Z'},
+                {'id': 'C2', 'name': 'Globex', 'updated_at': '2024-01-02T00:00:00Z'},
+                {'id': 'C3', 'name': 'Initech', 'updated_at': '2024-01-03T00:00:00Z'},
+            ],
+            'invoices': [
+                {'id': 'I1', 'number': 'QB-1', 'customer': 'C1', 'date': '2024-01-05', 'total': '100',
+                 'updated_at': '2024-01-05T00:00:00Z'},
+                {'id': 'I2', 'number': 'QB-2', 'customer': 'C2', 'date': '2024-01-06', 'total': '50',
+                 'updated_at': '2024-01-06T00:00:00Z'},
+            ],
+            'payments': [
+                {'id': 'P1', 'invoice': 'I1', 'date': '2024-01-07', 'amount': '40',
+                 'updated_at': '2024-01-07T00:00:00Z'},
+                {'id': 'P2', 'invoice': 'I9', 'date': '2024-01-08', 'amount': '10',
+                 'updated_at': '2024-01-08T00:00:00Z'},
+            ],
+        }
+
+    def _service(self):
+        self.connection.refresh_from_db()
+        return FakeERPService(self.connection, records=self.records, page_size=2)
+
+    def test_sync_all_maps_and_resumes_from_cursor(self):
+        """Test a full sync maps every record and the next run reads only newer changes"""
+        results = self._service().sync_all()
+
+        self.assertEqual(results['customers']['records_synced'], 3)
+        self.assertEqual(results['customers']['batches'], 2)
+        self.assertEqual(results['invoices']['records_synced'], 2)
+        self.assertEqual((results['payments']['records_synced'], results['payments']['records_failed']), (1, 1))
+        self.assertEqual(ERPMapping.objects.filter(connection=self.connection).count(), 6)
+        invoice = Invoice.objects.get(tenant=self.tenant, invoice_number='QB-1')
+        self.assertEqual(invoice.customer.name, 'Acme')
+        self.assertEqual(InvoicePayment.objects.get(invoice=invoice).amount, Decimal('40.00'))
+        self.assertEqual(
+            ERPSyncLog.objects.filter(connection=self.connection, sync_type='payments').get().status, 'partial'
+        )
+        self.connection.refresh_from_db()
+        self.assertEqual(self.connection.last_sync_status, 'success')
+        self.assertEqual(
+            self.connection.sync_cursors['customers'],
+            {'since': '2024-01-03T00:00:00+00:00', 'page': None, 'high_water': None}
+        )
+
+        # Only changes since the cursor are read; known records update in place
+        self.records['customers'][0].update(name='Acme Corp', updated_at='2024-02-01T00:00:00Z')
+        service = self._service()
+        result = service.sync('customers')
+        self.assertEqual(result['records_synced'], 2)  # C3 at the boundary and the changed C1
+        self.assertEqual(service.requests[0][1].isoformat(), '2024-01-03T00:00:00+00:00')
+        self.assertEqual(Customer.objects.filter(tenant=self.tenant).count(), 3)
+        self.assertEqual(Customer.objects.get(pk=invoice.customer_id).name, 'Acme Corp')
+
+    def test_interrupted_sync_resumes_at_next_page(self):
+        """Test a failed page leaves the cursor at the last written page"""
+        service = self._service()
+        fetch_page = service.fetch_page
+
+        def fail_second_page(entity, since, page):
+            if page:
+                raise ConnectionError('provider unavailable')
+            return fetch_page(entity, since, page)
+
+        with patch.object(service, 'fetch_page', side_effect=fail_second_page):
+            result = service.sync('customers')
+        self.assertFalse(result['success'])
+        self.assertEqual(result['records_synced'], 2)
+        self.connection.refresh_from_db()
+        self.assertEqual(self.connection.sync_cursors['customers']['page'], 2)
+
+        service = self._service()
+        self.assertEqual(service.sync('customers')['records_synced'], 1)
+        self.assertEqual(service.requests[0][2], 2)
+        self.assertEqual(Customer.objects.filter(tenant=self.tenant).count(), 3)
+
+    def test_batch_queries_do_not_grow_with_page_size(self):
+        """Test a page is written in the same number of queries however many records it holds"""
+        counts = []
+        for n in (2, 6):
+            self.records['customers'] = [
+                {'id': f"N{n}-{i}", 'name': f"Customer {n}-{i}", 'updated_at': f"2024-03-0{1 + i % 5}T00:00:00Z"}
+                for i in range(n)
+            ]
+            service = FakeERPService(self.connection, records=self.records, page_size=10)
+            service.sync('customers', since_date='2024-03-01')  # Loads the id maps and company
+            self.records['customers'] = [dict(raw, updated_at='2024-04-01T00:00:00Z') for raw in self.records['customers']]
+            with CaptureQueriesContext(connection) as queries:
+                service.sync('customers', since_date='2024-04-01')
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_quickbooks_records_normalize(self):
+        """Test a recorded QuickBooks invoice and the next page offset"""
+        raw = {
+            'Id': '130', 'DocNumber': '1037', 'TxnDate': '2024-01-15', 'DueDate': '2024-02-14',
+            'TotalAmt': 362.07, 'Balance': 0, 'CustomerRef': {'value': '3', 'name': 'Cool Cars'},
+            'TxnTaxDetail': {'TotalTax': 26.82}, 'CurrencyRef': {'value': 'USD'},
+            'MetaData': {'LastUpdatedTime': '2024-01-15T13:48:07-08:00'},
+        }
+        service = QuickBooksService(self.connection)
+        record = service.normalize('invoices', raw)
+        self.assertEqual(record['refs'], {'customer': '3'})
+        self.assertEqual(record['values']['status'], 'paid')
+        self.assertEqual(record['values']['subtotal'], Decimal('335.25'))
+        self.assertEqual(record['updated_at'].isoformat(), '2024-01-15T13:48:07-08:00')
+
+        page = {'QueryResponse': {'Invoice': [raw] * service.PAGE_SIZE}}
+        with patch.object(QuickBooksService, '_request', return_value=page) as request:
+            self.assertEqual(service.fetch_page('invoices', None, None)['next_page'], 1 + service.PAGE_SIZE)
+        self.assertIn('STARTPOSITION 1 ', request.call_args.kwargs['params']['query'])
+
+    def test_netsuite_sync_keeps_fields_it_does_not_read(self):
+        """Test a NetSuite re-sync updates only the fields its query returns"""
+        customer = Customer.objects.create(
+            tenant=self.tenant, company=self.company, name='Acme', address='1 Main St', city='Springfield',
+            tax_id='TAX-1', currency='EUR', created_by=self.user
+        )
+        page = {'items': [
+            {'id': '7', 'companyname': 'Acme', 'email': 'ap@acme.example', 'isinactive': 'F',
+             'lastmodified': '2024-01-05T00:00:00'},
+        ], 'hasMore': False}
+        with patch.object(NetSuiteService, '_request', return_value=page):
+            result = NetSuiteService(self.connection).sync('customers')
+        self.assertEqual(result['records_synced'], 1)
+
+        customer.refresh_from_db()
+        self.assertEqual(customer.email, 'ap@acme.example')
+        self.assertEqual(
+            (customer.address, customer.city, customer.tax_id, customer.currency),
+            ('1 Main St', 'Springfield', 'TAX-1', 'EUR')
+        )
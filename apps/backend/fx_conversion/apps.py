@@ -5,3 +5,5 @@ class FxConversionConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'fx_conversion'
 
+    def ready(self):
+        import fx_conversion.signals  # noqa
@@ -0,0 +1,98 @@
+"""
+Tenant Currency Profile
+Base currency and enabled currencies for a tenant, cached on the tenant object.
+
+The profile is loaded with one query the first time a tenant instance needs
+it, so saving many FinancialModel rows that share a tenant does not query
+Currency per row. Currency changes bump a per-tenant version (see
+fx_conversion.signals), which makes cached profiles reload on next use.
+"""
+import threading
+from typing import Dict, FrozenSet, Optional
+
+PROFILE_ATTR = '_fx_currency_profile'
+
+
+class TenantCurrencyProfile:
+    """Currency settings for one tenant"""
+
+    __slots__ = ('tenant_id', 'base_currency', 'has_base_currency', 'currencies', 'version')
+
+    def __init__(self, tenant_id, base_currency: str, has_base_currency: bool,
+                 currencies: FrozenSet[str], version: int):
+        self.tenant_id = str(tenant_id)
+        self.base_currency = base_currency
+        # False when base_currency is the tenant.currency_code fallback
+        self.has_base_currency = has_base_currency
+        self.currencies = currencies
+        self.version = version
+
+    def needs_conversion(self, currency: Optional[str]) -> bool:
+        return bool(currency) and currency.upper() != self.base_currency
+
+
+class CurrencyProfileCache:
+    """Loads and invalidates tenant currency profiles"""
+
+    _versions: Dict[str, int] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_version(cls, tenant_id) -> int:
+        return cls._versions.get(str(tenant_id), 0)
+
+    @classmethod
+    def get_profile(cls, tenant) -> TenantCurrencyProfile:
+        """
+        Get the tenant's currency profile
+
+        Args:
+            tenant: Tenant instance (the profile is cached on it)
+
+        Returns:
+            TenantCurrencyProfile, reloaded if Currency rows changed since
+            it was cached
+        """
+        version = cls.get_version(tenant.id)
+        profile = getattr(tenant, PROFILE_ATTR, None)
+        if profile is not None and profile.version == version:
+            return profile
+
+        profile = cls.load_profile(tenant, version)
+        setattr(tenant, PROFILE_ATTR, profile)
+        return profile
+
+    @staticmethod
+    def load_profile(tenant, version: int = 0) -> TenantCurrencyProfile:
+        """Build a profile from the tenant's active currencies in one query"""
+        from .models import Currency
+
+        base_currency = None
+        currencies = set()
+        rows = Currency.objects.filter(tenant=tenant).values_list('code', 'is_base_currency', 'is_active')
+        for code, is_base, is_active in rows:
+            if is_active:
+                currencies.add(code.upper())
+            if is_base:
+                base_currency = code.upper()
+
+        has_base_currency = base_currency is not None
+        if not has_base_currency:
+            base_currency = (getattr(tenant, 'currency_code', None) or 'USD').upper()
+        currencies.add(base_currency)
+
+        return TenantCurrencyProfile(
+            tenant.id, base_currency, has_base_currency, frozenset(currencies), version
+        )
+
+    @classmethod
+    def invalidate(cls, tenant_id):
+        """Force cached profiles for a tenant to reload"""
+        tenant_id = str(tenant_id)
+        with cls._lock:
+            cls._versions[tenant_id] = cls._versions.get(tenant_id, 0) + 1
+
+
+def get_currency_profile(tenant) -> TenantCurrencyProfile:
+    """Shortcut for CurrencyProfileCache.get_profile"""
+    return CurrencyProfileCache.get_profile(tenant)
@@ -4,12 +4,11 @@ Real-time foreign exchange rate fetching and conversion
 """
 from django.utils import timezone
 from decimal import Decimal
-from datetime import timedelta
-from typing import Dict, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 import logging
-import requests
 
-from .models import ExchangeRate, CurrencyConfig, CurrencyConversion
+from .models import ExchangeRate, CurrencyConversion
+from .rate_engine import FXRateEngine, RATE_PLACES
 
 logger = logging.getLogger(__name__)
 
@@ -34,128 +33,37 @@ class FXConversionService:
             force_refresh: Force refresh from API
         
         Returns:
-            ExchangeRate instance or None
+            ExchangeRate instance or None. Pairs without a stored row are
+            derived through the tenant's pivot currency and returned as
+            unsaved instances with provider 'derived'.
         """
-        # Check for cached rate
-        if not force_refresh:
-            rate = ExchangeRate.objects.filter(
-                tenant=tenant,
-                from_currency=from_currency.upper(),
-                to_currency=to_currency.upper(),
-                is_active=True
-            ).order_by('-valid_from').first()
-            
-            if rate:
-                # Check if rate is still fresh (within 24 hours by default)
-                config = FXConversionService._get_currency_config(tenant)
-                max_age = timedelta(hours=config.update_frequency_hours if config else 24)
-                
-                if timezone.now() - rate.last_updated < max_age:
-                    return rate
+        from_currency = from_currency.upper()
+        to_currency = to_currency.upper()
+        matrix = FXRateEngine.get_rate_matrix(tenant, force_refresh=force_refresh)
         
-        # Fetch fresh rate from API
-        return FXConversionService._fetch_and_save_rate(tenant, from_currency, to_currency)
-    
-    @staticmethod
-    def _get_currency_config(tenant):
-        """Get or create currency config for tenant"""
-        config, created = CurrencyConfig.objects.get_or_create(
-            tenant=tenant,
-            defaults={
-                'base_currency': 'USD',
-                'default_exchange_rate_provider': 'exchangerate-api',
-            }
-        )
-        return config
-    
-    @staticmethod
-    def _fetch_and_save_rate(tenant, from_currency: str, to_currency: str) -> Optional[ExchangeRate]:
-        """Fetch rate from API and save"""
-        config = FXConversionService._get_currency_config(tenant)
+        row = matrix.rows.get((from_currency, to_currency))
+        if row is not None:
+            return row
         
-        try:
-            if config.default_exchange_rate_provider == 'exchangerate-api':
-                rate = FXConversionService._fetch_from_exchangerate_api(
-                    from_currency, to_currency, config.api_key
-                )
-            elif config.default_exchange_rate_provider == 'fixer':
-                rate = FXConversionService._fetch_from_fixer(
-                    from_currency, to_currency, config.api_key
-                )
-            else:
-                logger.warning(f"Unsupported provider: {config.default_exchange_rate_provider}")
-                return None
-            
-            if rate:
-                # Save rate
-                exchange_rate = ExchangeRate.objects.create(
-                    tenant=tenant,
-                    from_currency=from_currency.upper(),
-                    to_currency=to_currency.upper(),
-                    rate=Decimal(str(rate)),
-                    source='api',
-                    provider=config.default_exchange_rate_provider,
-                    is_active=True,
-                )
-                
-                # Update config last update time
-                config.last_rate_update = timezone.now()
-                config.save()
-                
-                return exchange_rate
-            
-        except Exception as e:
-            logger.error(f"Error fetching exchange rate: {e}")
+        rate = matrix.rate(from_currency, to_currency)
+        if rate is None:
             return None
         
-        return None
-    
-    @staticmethod
-    def _fetch_from_exchangerate_api(from_currency: str, to_currency: str, api_key: str = None) -> Optional[float]:
-        """Fetch rate from ExchangeRate-API"""
-        try:
-            if api_key:
-                url = f"https://v6.exchangerate-api.com/v6/{api_key}/pair/{from_currency.upper()}/{to_currency.upper()}"
-            else:
-                url = f"https://api.exchangerate-api.com/v4/latest/{from_currency.upper()}"
-            
-            response = requests.get(url, timeout=5)
-            response.raise_for_status()
-            data = response.json()
-            
-            if api_key:
-                return data.get('conversion_rate')
-            else:
-                rates = data.get('rates', {})
-                return rates.get(to_currency.upper())
-        except Exception as e:
-            logger.error(f"Error fetching from ExchangeRate-API: {e}")
-            return None
+        return ExchangeRate(
+            tenant=tenant,
+            from_currency=from_currency,
+            to_currency=to_currency,
+            rate=rate.quantize(RATE_PLACES),
+            source='api',
+            provider='derived',
+            is_active=True,
+            valid_from=matrix.fetched_at or timezone.now(),
+        )
     
     @staticmethod
-    def _fetch_from_fixer(from_currency: str, to_currency: str, api_key: str) -> Optional[float]:
-        """Fetch rate from Fixer.io"""
-        if not api_key:
-            logger.warning("Fixer.io API key not configured")
-            return None
-        
-        try:
-            url = f"http://data.fixer.io/api/latest"
-            params = {
-                'access_key': api_key,
-                'base': from_currency.upper(),
-                'symbols': to_currency.upper(),
-            }
-            response = requests.get(url, params=params, timeout=5)
-            response.raise_for_status()
-            data = response.json()
-            
-            if data.get('success'):
-                rates = data.get('rates', {})
-                return rates.get(to_currency.upper())
-        except Exception as e:
-            logger.error(f"Error fetching from Fixer.io: {e}")
-            return None
+    def _get_currency_config(tenant):
+        """Get or create currency config for tenant"""
+        return FXRateEngine.get_currency_config(tenant)
     
     @staticmethod
     def convert_currency(
@@ -205,7 +113,7 @@ class FXConversionService:
             from_amount=amount,
             to_amount=to_amount,
             exchange_rate=rate_obj.rate,
-            exchange_rate_id=rate_obj,
+            exchange_rate_id=None if rate_obj._state.adding else rate_obj,
             created_by=user
         )
         
@@ -243,38 +151,39 @@ class FXConversionService:
         ]
     
     @staticmethod
-    def update_all_rates(tenant, base_currency: str = 'USD') -> Dict:
-        """Update exchange rates for all currency pairs"""
-        config = FXConversionService._get_currency_config(tenant)
-        currencies = FXConversionService.get_currency_list()
-        
-        updated_count = 0
-        failed_count = 0
+    def convert_amounts(tenant, items: Iterable[Tuple[Decimal, str]], to_currency: str) -> List[Optional[Decimal]]:
+        """
+        Convert many (amount, currency) pairs with one rate matrix lookup
         
-        for currency in currencies:
-            if currency.upper() == base_currency.upper():
-                continue
-            
-            try:
-                rate_obj = FXConversionService._fetch_and_save_rate(
-                    tenant, base_currency, currency
-                )
-                if rate_obj:
-                    updated_count += 1
-                else:
-                    failed_count += 1
-            except Exception as e:
-                logger.error(f"Error updating rate for {base_currency}/{currency}: {e}")
-                failed_count += 1
+        Returns:
+            Converted amounts in input order; None where no rate is known
+        """
+        matrix = FXRateEngine.get_rate_matrix(tenant)
+        to_currency = to_currency.upper()
+        rate_cache = {}
+        converted = []
+        for amount, currency in items:
+            currency = (currency or to_currency).upper()
+            if currency not in rate_cache:
+                rate_cache[currency] = matrix.rate(currency, to_currency)
+            rate = rate_cache[currency]
+            converted.append(None if rate is None else Decimal(str(amount)) * rate)
+        return converted
+    
+    @staticmethod
+    def update_all_rates(tenant, base_currency: str = 'USD') -> Dict:
+        """
+        Update exchange rates for all currency pairs
         
-        # Update config
-        config.last_rate_update = timezone.now()
-        config.save()
+        The provider returns the whole table for the base currency, so this
+        is a single API call followed by a single bulk upsert.
+        """
+        stored = FXRateEngine.refresh_rates(tenant, base_currency)
+        expected = len(FXConversionService.get_currency_list()) - 1
         
         return {
-            'updated': updated_count,
-            'failed': failed_count,
-            'total': len(currencies) - 1,
+            'updated': stored,
+            'failed': 0 if stored else expected,
+            'total': stored or expected,
             'updated_at': timezone.now().isoformat()
         }
-
@@ -0,0 +1,322 @@
+"""
+Historical FX Rates
+Point-in-time exchange rate lookup backed by a per-pair interval index.
+
+Rates for a tenant are loaded with one query into sorted valid_from arrays
+per currency pair, and each lookup is a binary search. Wrap a batch of
+work in `historical_rates(tenant)` so every lookup inside it shares one
+loaded index instead of querying per transaction.
+"""
+import contextvars
+from bisect import bisect_right
+from contextlib import contextmanager
+from datetime import date, datetime, time, timezone as dt_timezone
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+from django.utils import timezone
+import logging
+
+from .models import ExchangeRate
+
+logger = logging.getLogger(__name__)
+
+_active_index = contextvars.ContextVar('fx_historical_rate_index', default=None)
+
+
+def _as_datetime(value) -> datetime:
+    """Normalise a date/datetime to an aware datetime (dates are end of day)"""
+    if value is None:
+        return timezone.now()
+    if isinstance(value, datetime):
+        if timezone.is_naive(value):
+            return timezone.make_aware(value, dt_timezone.utc)
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, time.max, tzinfo=dt_timezone.utc)
+    raise TypeError(f"Unsupported date value: {value!r}")
+
+
+class RateSeries:
+    """Sorted validity intervals for one currency pair"""
+
+    __slots__ = ('starts', 'ends', 'rates')
+
+    def __init__(self):
+        self.starts: List[datetime] = []
+        self.ends: List[Optional[datetime]] = []
+        self.rates: List[Decimal] = []
+
+    def append(self, valid_from, valid_until, rate):
+        self.starts.append(valid_from)
+        self.ends.append(valid_until)
+        self.rates.append(rate)
+
+    def rate_at(self, when: datetime) -> Optional[Decimal]:
+        """Rate of the latest interval starting at or before `when`"""
+        position = bisect_right(self.starts, when) - 1
+        if position < 0:
+            return None
+        valid_until = self.ends[position]
+        if valid_until is not None and when > valid_until:
+            return None
+        return self.rates[position]
+
+
+class HistoricalRateIndex:
+    """Point-in-time rate lookups for one tenant"""
+
+    def __init__(self, tenant_id, series: Dict[Tuple[str, str], RateSeries], pivot: str = None):
+        self.tenant_id = str(tenant_id)
+        self.series = series
+        self.pivot = pivot
+
+    @classmethod
+    def load(cls, tenant, currencies: Iterable[str] = None, until=None, pivot: str = None) -> 'HistoricalRateIndex':
+        """
+        Load a tenant's rate history with a single query
+
+        Args:
+            tenant: Tenant instance
+            currencies: Optional currency codes to restrict the load to
+                (the pivot is always included so cross rates resolve)
+            until: Optional date; later rates are not loaded
+            pivot: Currency used to derive cross rates
+                (defaults to the tenant's CurrencyConfig base currency)
+        """
+        if pivot is None:
+            from .models import CurrencyConfig
+            pivot = CurrencyConfig.objects.filter(tenant=tenant).values_list(
+                'base_currency', flat=True
+            ).first() or 'USD'
+        pivot = pivot.upper()
+
+        queryset = ExchangeRate.objects.filter(tenant=tenant, is_active=True)
+        if currencies is not None:
+            codes = {code.upper() for code in currencies if code} | {pivot}
+            queryset = queryset.filter(from_currency__in=codes, to_currency__in=codes)
+        if until is not None:
+            queryset = queryset.filter(valid_from__lte=_as_datetime(until))
+
+        series: Dict[Tuple[str, str], RateSeries] = {}
+        rows = queryset.order_by('from_currency', 'to_currency', 'valid_from').values_list(
+            'from_currency', 'to_currency', 'valid_from', 'valid_until', 'rate'
+        )
+        for from_currency, to_currency, valid_from, valid_until, rate in rows.iterator(chunk_size=5000):
+            key = (from_currency, to_currency)
+            if key not in series:
+                series[key] = RateSeries()
+            series[key].append(valid_from, valid_until, rate)
+
+        return cls(getattr(tenant, 'id', None), series, pivot=pivot)
+
+    def _direct(self, from_currency: str, to_currency: str, when: datetime) -> Optional[Decimal]:
+        series = self.series.get((from_currency, to_currency))
+        if series is not None:
+            rate = series.rate_at(when)
+            if rate:
+                return rate
+        inverse = self.series.get((to_currency, from_currency))
+        if inverse is not None:
+            rate = inverse.rate_at(when)
+            if rate:
+                return Decimal('1') / rate
+        return None
+
+    def rate_on(self, from_currency: str, to_currency: str, on=None) -> Optional[Decimal]:
+        """
+        Rate for a pair effective at a date
+
+        Tries the stored pair, then its inverse, then a cross rate through
+        the pivot currency. Dates resolve to the end of that day.
+        """
+        from_currency = from_currency.upper()
+        to_currency = to_currency.upper()
+        if from_currency == to_currency:
+            return Decimal('1')
+
+        when = _as_datetime(on)
+        rate = self._direct(from_currency, to_currency, when)
+        if rate is not None or not self.pivot:
+            return rate
+
+        if self.pivot in (from_currency, to_currency):
+            return None
+        from_leg = self._direct(self.pivot, from_currency, when)
+        to_leg = self._direct(self.pivot, to_currency, when)
+        if from_leg is None or to_leg is None:
+            return None
+        return to_leg / from_leg
+
+    def convert(self, amount, from_currency: str, to_currency: str, on=None) -> Optional[Decimal]:
+        rate = self.rate_on(from_currency, to_currency, on)
+        if rate is None:
+            return None
+        return Decimal(str(amount)) * rate
+
+
+@contextmanager
+def historical_rates(tenant, currencies: Iterable[str] = None, until=None):
+    """
+    Share one loaded rate index across all lookups in a block
+
+    Example:
+        with historical_rates(tenant) as index:
+            for txn in transactions:
+                txn.save()  # MultiCurrencyMixin reuses the index
+    """
+    index = HistoricalRateIndex.load(tenant, currencies=currencies, until=until)
+    token = _active_index.set(index)
+    try:
+        yield index
+    finally:
+        _active_index.reset(token)
+
+
+def get_active_index(tenant) -> Optional[HistoricalRateIndex]:
+    """Return the index loaded by an enclosing historical_rates block for tenant"""
+    index = _active_index.get()
+    if index is not None and index.tenant_id == str(getattr(tenant, 'id', tenant)):
+        return index
+    return None
+
+
+def rate_on(tenant, from_currency: str, to_currency: str, on=None) -> Optional[Decimal]:
+    """
+    Exchange rate for a pair effective on a date
+
+    Uses the active batch index when inside `historical_rates(tenant)`;
+    otherwise loads just the pair (and its legs through the tenant's base
+    currency) in one query.
+    """
+    index = get_active_index(tenant)
+    if index is None:
+        pivot = None
+        if tenant is not None:
+            from .currency_profile import get_currency_profile
+            pivot = get_currency_profile(tenant).base_currency
+        index = HistoricalRateIndex.load(tenant, currencies=[from_currency, to_currency], until=on, pivot=pivot or 'USD')
+    return index.rate_on(from_currency, to_currency, on)
+
+
+def apply_base_conversion(objs, amount_getter=None, date_getter=None, as_of=None,
+                          reuse_rate: bool = True, base_currency: Optional[str] = None) -> Dict[str, int]:
+    """
+    Convert MultiCurrencyMixin instances to base currency in memory
+
+    Rows are grouped by tenant; each tenant costs one currency profile load
+    and one rate-index load, however many rows it has. Nothing is saved.
+
+    Args:
+        objs: Model instances using MultiCurrencyMixin
+        amount_getter: Callable returning the amount to convert
+            (defaults to obj.get_currency_amount())
+        date_getter: Callable returning the pricing date
+            (defaults to obj.get_exchange_rate_on())
+        as_of: Price every row at this date instead (e.g. month-end revaluation)
+        reuse_rate: Keep an exchange_rate already set on the instance
+        base_currency: Override the tenant's base currency
+
+    Returns:
+        dict with 'converted' and 'missing_rate' counts
+    """
+    from .currency_profile import get_currency_profile
+
+    amount_getter = amount_getter or (lambda obj: obj.get_currency_amount())
+    date_getter = date_getter or (lambda obj: obj.get_exchange_rate_on())
+    applied_at = timezone.now()
+
+    by_tenant: Dict[str, list] = {}
+    for obj in objs:
+        if obj.transaction_currency:
+            by_tenant.setdefault(obj.tenant_id, []).append(obj)
+
+    converted_count = 0
+    missing_count = 0
+    for tenant_id, tenant_objs in by_tenant.items():
+        tenant = tenant_objs[0].tenant
+        base = (base_currency or get_currency_profile(tenant).base_currency).upper()
+        index = get_active_index(tenant)
+
+        for obj in tenant_objs:
+            amount = amount_getter(obj)
+            if amount is None:
+                continue
+            if obj.transaction_currency.upper() == base:
+                obj.converted_amount_in_base_currency = amount
+                continue
+
+            rate = obj.exchange_rate if reuse_rate else None
+            if not rate:
+                if index is None:
+                    index = HistoricalRateIndex.load(tenant, until=as_of)
+                rate = index.rate_on(obj.transaction_currency, base, as_of if as_of is not None else date_getter(obj))
+                if rate is None:
+                    missing_count += 1
+                    continue
+                obj.exchange_rate = rate
+                obj.exchange_rate_date = applied_at
+
+            obj.converted_amount_in_base_currency = Decimal(str(amount)) * Decimal(str(rate))
+            converted_count += 1
+
+    return {'converted': converted_count, 'missing_rate': missing_count}
+
+
+def revalue_queryset(
+    queryset,
+    tenant,
+    amount_field: str,
+    date_field: Optional[str] = None,
+    currency_field: str = 'transaction_currency',
+    base_currency: Optional[str] = None,
+    as_of=None,
+    batch_size: int = 2000,
+) -> Dict[str, int]:
+    """
+    Bulk-convert a queryset of MultiCurrencyMixin rows to base currency
+
+    All rates are loaded once, each row is priced in memory at its own
+    date (or at `as_of` for a month-end revaluation), and the results are
+    written back with bulk_update in batches.
+
+    Returns:
+        dict with 'converted' and 'missing_rate' counts
+    """
+    from .currency_profile import get_currency_profile
+
+    base_currency = (base_currency or get_currency_profile(tenant).base_currency).upper()
+    index = get_active_index(tenant) or HistoricalRateIndex.load(tenant, until=as_of)
+    applied_at = timezone.now()
+
+    fields = ['pk', amount_field, currency_field] + ([date_field] if date_field else [])
+    update_fields = ['exchange_rate', 'converted_amount_in_base_currency', 'exchange_rate_date']
+
+    converted_count = 0
+    missing_count = 0
+    batch = []
+    for obj in queryset.only(*fields).iterator(chunk_size=batch_size):
+        currency = getattr(obj, currency_field)
+        amount = getattr(obj, amount_field)
+        if not currency or amount is None:
+            continue
+
+        on = as_of if as_of is not None else (getattr(obj, date_field) if date_field else None)
+        rate = index.rate_on(currency, base_currency, on)
+        if rate is None:
+            missing_count += 1
+            continue
+
+        obj.exchange_rate = rate
+        obj.converted_amount_in_base_currency = Decimal(str(amount)) * rate
+        obj.exchange_rate_date = applied_at
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            queryset.model.objects.bulk_update(batch, update_fields)
+            converted_count += len(batch)
+            batch = []
+
+    if batch:
+        queryset.model.objects.bulk_update(batch, update_fields)
+        converted_count += len(batch)
+
+    return {'converted': converted_count, 'missing_rate': missing_count}
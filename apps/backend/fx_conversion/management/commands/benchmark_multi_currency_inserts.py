@@ -0,0 +1,128 @@
+"""
+Management command to benchmark multi-currency inserts
+Usage: python manage.py benchmark_multi_currency_inserts --rows 5000
+
+Creates a throwaway tenant with a MYR base currency and USD/EUR rates,
+inserts BankTransaction and JournalEntryLine rows with per-row save() and
+with bulk_create_converted(), and rolls everything back.
+"""
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from accounting.models import ChartOfAccounts, GLAccountType, JournalEntry, JournalEntryLine
+from authentication.models import User
+from banking.models import BankTransaction
+from fx_conversion.models import Currency, CurrencyConfig
+from fx_conversion.rate_engine import FXRateEngine
+from tenants.models import Company, Tenant
+
+
+class Command(BaseCommand):
+    help = 'Benchmark BankTransaction and JournalEntryLine inserts with multi-currency conversion'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000, help='Rows inserted per model and mode')
+        parser.add_argument('--batch-size', type=int, default=1000, help='bulk_create batch size')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        with transaction.atomic():
+            fixtures = self._create_fixtures()
+            self.stdout.write(f"Inserting {rows:,} rows per model and mode (base MYR, USD/EUR transactions)")
+
+            for model_name, build in (
+                ('BankTransaction', self._bank_transactions),
+                ('JournalEntryLine', self._journal_lines),
+            ):
+                model = BankTransaction if model_name == 'BankTransaction' else JournalEntryLine
+                self._report(model_name, 'save()', lambda: [obj.save() for obj in build(fixtures, rows)], rows)
+                self._report(
+                    model_name,
+                    'bulk_create_converted()',
+                    lambda: model.bulk_create_converted(build(fixtures, rows), batch_size=options['batch_size']),
+                    rows,
+                )
+
+            transaction.set_rollback(True)
+        FXRateEngine.invalidate()
+
+    def _report(self, model_name, mode, run, rows):
+        queries = [0]
+
+        def count_queries(execute, sql, params, many, context):
+            queries[0] += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count_queries):
+            started = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"{model_name:>16} {mode:<24} {rows / elapsed if elapsed else 0:>10,.0f} rows/s "
+            f"({elapsed:.2f}s, {queries[0]:,} queries)"
+        )
+
+    def _create_fixtures(self):
+        suffix = uuid.uuid4().hex[:8]
+        tenant = Tenant.objects.create(name=f'FX benchmark {suffix}', slug=f'fx-bench-{suffix}', currency_code='MYR')
+        company = Company.objects.create(tenant=tenant, name='FX benchmark', registration_number=suffix)
+        user = User.objects.create_user(
+            username=f'fx-bench-{suffix}', email=f'fx-bench-{suffix}@example.com',
+            password=uuid.uuid4().hex, tenant=tenant, role='accountant'
+        )
+        Currency.objects.create(tenant=tenant, code='MYR', name='Malaysian Ringgit', is_base_currency=True)
+        Currency.objects.create(tenant=tenant, code='USD', name='US Dollar')
+        Currency.objects.create(tenant=tenant, code='EUR', name='Euro')
+        CurrencyConfig.objects.create(tenant=tenant, base_currency='MYR', auto_update_rates=False)
+        for month in range(1, 13):
+            FXRateEngine.ingest_rates(
+                tenant, 'MYR', {'USD': Decimal('0.21') + Decimal(month) / 1000, 'EUR': Decimal('0.19')},
+                valid_from=datetime(2024, month, 1, tzinfo=dt_timezone.utc),
+            )
+
+        asset_type = GLAccountType.objects.create(tenant=tenant, code='asset', name='Asset', normal_balance='debit')
+        account = ChartOfAccounts.objects.create(
+            tenant=tenant, code='1000', name='Cash', account_type=asset_type, type='asset',
+            created_by=user, normal_balance='debit'
+        )
+        entry = JournalEntry.objects.create(
+            tenant=tenant, company=company, date=date(2024, 6, 30), reference='FX-BENCH',
+            description='FX benchmark', created_by=user
+        )
+        return {'tenant': tenant, 'account': account, 'entry': entry}
+
+    @staticmethod
+    def _bank_transactions(fixtures, rows):
+        start = date(2024, 1, 1)
+        return [
+            BankTransaction(
+                tenant=fixtures['tenant'],
+                date=start + timedelta(days=index % 365),
+                description=f'Benchmark {index}',
+                type='deposit',
+                transaction_type='deposit',
+                amount=Decimal(index % 1000 + 1),
+                transaction_currency='USD' if index % 2 else 'EUR',
+            )
+            for index in range(rows)
+        ]
+
+    @staticmethod
+    def _journal_lines(fixtures, rows):
+        return [
+            JournalEntryLine(
+                tenant=fixtures['tenant'],
+                journal_entry=fixtures['entry'],
+                account=fixtures['account'],
+                description=f'Benchmark {index}',
+                debit_amount=Decimal(index % 1000 + 1) if index % 2 else Decimal('0'),
+                credit_amount=Decimal('0') if index % 2 else Decimal(index % 1000 + 1),
+                transaction_currency='USD' if index % 2 else 'EUR',
+            )
+            for index in range(rows)
+        ]
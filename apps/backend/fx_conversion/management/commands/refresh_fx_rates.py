@@ -0,0 +1,33 @@
+"""
+Management command to refresh stored exchange rates
+Usage: python manage.py refresh_fx_rates [--tenant <id>] [--all]
+
+Request paths serve stored rates even when they are stale, so run this on a
+schedule (e.g. hourly). Without --tenant, refreshes the auto-updating
+tenants whose update_frequency_hours has elapsed since their last update
+(--all: every tenant with a currency config).
+"""
+from django.core.management.base import BaseCommand
+
+from fx_conversion.models import CurrencyConfig
+from fx_conversion.rate_engine import FXRateEngine
+
+
+class Command(BaseCommand):
+    help = 'Fetch fresh exchange rate tables for tenants whose stored rates are due'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', help='Refresh only this tenant id')
+        parser.add_argument('--all', action='store_true', help='Refresh every tenant, due or not')
+
+    def handle(self, *args, **options):
+        configs = None
+        if options['tenant'] or options['all']:
+            configs = CurrencyConfig.objects.select_related('tenant')
+            if options['tenant']:
+                configs = configs.filter(tenant_id=options['tenant'])
+
+        results = FXRateEngine.refresh_due_rates(configs)
+        for tenant_id, stored in results.items():
+            self.stdout.write(f"{tenant_id}: {f'{stored} rates stored' if stored else 'failed'}")
+        self.stdout.write(f"Refreshed {sum(1 for stored in results.values() if stored)}/{len(results)} tenants")
@@ -0,0 +1,329 @@
+"""
+FX Rate Engine
+Bulk rate-table ingestion and an in-process, per-tenant rate matrix.
+
+A provider's /latest/{base} response already carries every rate for the
+base currency, so a whole table is fetched in one call and upserted in one
+statement. Conversions then read from a cached matrix keyed on a single
+pivot currency, which also yields cross rates (EUR -> MYR via USD).
+"""
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Optional, Tuple
+from django.conf import settings
+from django.db.models import F, OuterRef, Q, Subquery
+from django.utils import timezone
+import logging
+import requests
+
+from .models import ExchangeRate, CurrencyConfig
+
+logger = logging.getLogger(__name__)
+
+RATE_PLACES = Decimal('0.00000001')
+
+
+class RateMatrix:
+    """
+    Rates for one tenant expressed against a single pivot currency
+
+    rates[code] is the number of `code` units per one pivot unit, so any
+    pair converts as rates[to] / rates[from].
+    """
+
+    def __init__(self, pivot: str, rates: Dict[str, Decimal], rows=None, fetched_at=None):
+        self.pivot = pivot.upper()
+        self.rates = {code.upper(): rate for code, rate in rates.items() if rate}
+        self.rates[self.pivot] = Decimal('1')
+        # Latest stored ExchangeRate per (from, to), used to return real rows
+        self.rows: Dict[Tuple[str, str], ExchangeRate] = rows or {}
+        self.fetched_at = fetched_at
+
+    def has(self, currency: str) -> bool:
+        return currency.upper() in self.rates
+
+    def rate(self, from_currency: str, to_currency: str) -> Optional[Decimal]:
+        """Get the rate for a pair, deriving cross rates through the pivot"""
+        from_currency = from_currency.upper()
+        to_currency = to_currency.upper()
+        if from_currency == to_currency:
+            return Decimal('1')
+
+        row = self.rows.get((from_currency, to_currency))
+        if row is not None:
+            return row.rate
+
+        from_rate = self.rates.get(from_currency)
+        to_rate = self.rates.get(to_currency)
+        if from_rate is None or to_rate is None:
+            return None
+        return to_rate / from_rate
+
+    def convert(self, amount: Decimal, from_currency: str, to_currency: str) -> Optional[Decimal]:
+        """Convert an amount, or None when the pair cannot be priced"""
+        rate = self.rate(from_currency, to_currency)
+        if rate is None:
+            return None
+        return Decimal(str(amount)) * rate
+
+    def is_stale(self, max_age: timedelta) -> bool:
+        return self.fetched_at is None or timezone.now() - self.fetched_at >= max_age
+
+
+class FXRateEngine:
+    """Fetches, stores and caches per-tenant rate matrices"""
+
+    _cache: Dict[str, Tuple[float, RateMatrix]] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_matrix_ttl(cls) -> int:
+        """Seconds a matrix is reused in-process before reloading from the database"""
+        return getattr(settings, 'FX_RATE_MATRIX_TTL_SECONDS', 300)
+
+    @classmethod
+    def get_rate_matrix(cls, tenant, force_refresh: bool = False) -> RateMatrix:
+        """
+        Get the tenant's rate matrix
+
+        Served from the process cache while within TTL; otherwise rebuilt
+        from stored rates. Stale stored rates are still served: the provider
+        is only called on force_refresh, and tables are otherwise kept
+        current by update_all_rates and the refresh_fx_rates command, so
+        request paths never block on provider HTTP calls.
+        """
+        cache_key = str(tenant.id)
+        now = time.monotonic()
+
+        if not force_refresh:
+            with cls._lock:
+                cached = cls._cache.get(cache_key)
+            if cached and cached[0] > now:
+                return cached[1]
+
+        config = cls.get_currency_config(tenant)
+        pivot = config.base_currency.upper()
+
+        if force_refresh:
+            cls.refresh_rates(tenant, pivot, config=config)
+        matrix = cls.load_matrix(tenant, pivot)
+        if matrix is None:
+            matrix = RateMatrix(pivot, {})
+        elif config.auto_update_rates and matrix.is_stale(timedelta(hours=config.update_frequency_hours or 24)):
+            logger.warning(f"Serving stale FX rates for tenant {tenant.id} (fetched {matrix.fetched_at})")
+
+        with cls._lock:
+            cls._cache[cache_key] = (now + cls.get_matrix_ttl(), matrix)
+        return matrix
+
+    @classmethod
+    def invalidate(cls, tenant=None):
+        """Drop cached matrices for one tenant (or all tenants)"""
+        with cls._lock:
+            if tenant is None:
+                cls._cache.clear()
+            else:
+                cls._cache.pop(str(tenant.id), None)
+
+    @staticmethod
+    def get_currency_config(tenant) -> CurrencyConfig:
+        """Get or create currency config for tenant"""
+        config, created = CurrencyConfig.objects.get_or_create(
+            tenant=tenant,
+            defaults={
+                'base_currency': 'USD',
+                'default_exchange_rate_provider': 'exchangerate-api',
+            }
+        )
+        return config
+
+    @staticmethod
+    def load_matrix(tenant, pivot: str) -> Optional[RateMatrix]:
+        """
+        Build a matrix from stored rates with a single query
+
+        Only the latest active row per pair is kept. Pivot-quoted pairs
+        define the matrix directly; pairs quoted the other way are inverted.
+        """
+        latest_for_pair = ExchangeRate.objects.filter(
+            tenant=tenant,
+            from_currency=OuterRef('from_currency'),
+            to_currency=OuterRef('to_currency'),
+            is_active=True,
+        ).order_by('-valid_from').values('id')[:1]
+        queryset = ExchangeRate.objects.filter(
+            tenant=tenant,
+            is_active=True,
+            id=Subquery(latest_for_pair),
+        )
+        rows = {(row.from_currency, row.to_currency): row for row in queryset}
+
+        if not rows:
+            return None
+
+        rates = {}
+        fetched_at = None
+        for (from_currency, to_currency), row in rows.items():
+            if from_currency == pivot and row.rate:
+                rates[to_currency] = row.rate
+                if fetched_at is None or row.last_updated > fetched_at:
+                    fetched_at = row.last_updated
+        for (from_currency, to_currency), row in rows.items():
+            if to_currency == pivot and from_currency not in rates and row.rate:
+                rates[from_currency] = Decimal('1') / row.rate
+
+        return RateMatrix(pivot, rates, rows=rows, fetched_at=fetched_at)
+
+    @classmethod
+    def refresh_rates(cls, tenant, base_currency: str, config: CurrencyConfig = None) -> int:
+        """
+        Fetch the full rate table for a base currency and upsert it
+
+        Returns:
+            Number of rates stored (0 when the provider call failed)
+        """
+        config = config or cls.get_currency_config(tenant)
+        table = cls.fetch_rate_table(
+            base_currency,
+            config.default_exchange_rate_provider,
+            config.api_key,
+        )
+        if not table:
+            return 0
+
+        rates, valid_from = table
+        stored = cls.ingest_rates(
+            tenant,
+            base_currency,
+            rates,
+            provider=config.default_exchange_rate_provider,
+            valid_from=valid_from,
+        )
+
+        config.last_rate_update = timezone.now()
+        config.save(update_fields=['last_rate_update', 'updated_at'])
+        return stored
+
+    @classmethod
+    def refresh_due_rates(cls, configs=None) -> Dict[str, int]:
+        """
+        Refresh every auto-updating tenant whose rates are older than its
+        update frequency
+
+        Returns:
+            Rates stored per tenant id (0 when the provider call failed)
+        """
+        if configs is None:
+            configs = CurrencyConfig.objects.filter(auto_update_rates=True).filter(
+                Q(last_rate_update__isnull=True)
+                | Q(last_rate_update__lte=timezone.now() - timedelta(hours=1) * F('update_frequency_hours'))
+            ).select_related('tenant')
+        return {
+            str(config.tenant_id): cls.refresh_rates(config.tenant, config.base_currency, config=config)
+            for config in configs
+        }
+
+    @staticmethod
+    def fetch_rate_table(base_currency: str, provider: str, api_key: str = None):
+        """
+        Fetch every rate for a base currency in one HTTP call
+
+        Returns:
+            (rates dict, provider timestamp) or None on failure
+        """
+        base_currency = base_currency.upper()
+        try:
+            if provider == 'exchangerate-api':
+                if api_key:
+                    url = f"https://v6.exchangerate-api.com/v6/{api_key}/latest/{base_currency}"
+                else:
+                    url = f"https://api.exchangerate-api.com/v4/latest/{base_currency}"
+                response = requests.get(url, timeout=5)
+                response.raise_for_status()
+                data = response.json()
+                rates = data.get('conversion_rates') or data.get('rates') or {}
+                timestamp = data.get('time_last_update_unix') or data.get('time_last_updated')
+            elif provider == 'fixer':
+                if not api_key:
+                    logger.warning("Fixer.io API key not configured")
+                    return None
+                response = requests.get(
+                    "http://data.fixer.io/api/latest",
+                    params={'access_key': api_key, 'base': base_currency},
+                    timeout=5,
+                )
+                response.raise_for_status()
+                data = response.json()
+                if not data.get('success'):
+                    logger.error(f"Fixer.io error: {data.get('error')}")
+                    return None
+                rates = data.get('rates', {})
+                timestamp = data.get('timestamp')
+            else:
+                logger.warning(f"Unsupported provider: {provider}")
+                return None
+        except Exception as e:
+            logger.error(f"Error fetching rate table for {base_currency}: {e}")
+            return None
+
+        valid_from = (
+            datetime.fromtimestamp(int(timestamp), tz=dt_timezone.utc) if timestamp else timezone.now()
+        )
+        return rates, valid_from
+
+    @classmethod
+    def ingest_rates(cls, tenant, base_currency: str, rates: Dict, provider: str = '',
+                     valid_from=None, source: str = 'api') -> int:
+        """
+        Upsert a base-currency rate table in one statement
+
+        Rows are keyed on (tenant, from, to, valid_from), so re-ingesting
+        the same provider snapshot updates rates instead of adding rows.
+        """
+        base_currency = base_currency.upper()
+        valid_from = valid_from or timezone.now()
+
+        objs = []
+        for code, value in rates.items():
+            code = str(code).upper()
+            if code == base_currency or len(code) != 3:
+                continue
+            try:
+                rate = Decimal(str(value)).quantize(RATE_PLACES)
+            except (InvalidOperation, TypeError):
+                continue
+            if rate <= 0:
+                continue
+            objs.append(ExchangeRate(
+                tenant=tenant,
+                from_currency=base_currency,
+                to_currency=code,
+                rate=rate,
+                source=source,
+                provider=provider,
+                is_active=True,
+                valid_from=valid_from,
+            ))
+
+        if objs:
+            ExchangeRate.objects.bulk_create(
+                objs,
+                batch_size=500,
+                update_conflicts=True,
+                unique_fields=['tenant', 'from_currency', 'to_currency', 'valid_from'],
+                update_fields=['rate', 'source', 'provider', 'is_active', 'last_updated'],
+            )
+        cls.invalidate(tenant)
+        return len(objs)
+
+    @classmethod
+    def get_rate(cls, tenant, from_currency: str, to_currency: str) -> Optional[Decimal]:
+        """Get a rate for a pair from the tenant's matrix"""
+        return cls.get_rate_matrix(tenant).rate(from_currency, to_currency)
+
+    @classmethod
+    def convert(cls, tenant, amount: Decimal, from_currency: str, to_currency: str) -> Optional[Decimal]:
+        """Convert an amount using the tenant's matrix"""
+        return cls.get_rate_matrix(tenant).convert(amount, from_currency, to_currency)
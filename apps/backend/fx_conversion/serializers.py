@@ -2,10 +2,11 @@
 FX Conversion Serializers
 """
 from rest_framework import serializers
+from backend.fieldsets import SparseFieldsetMixin
 from .models import ExchangeRate, CurrencyConversion, CurrencyConfig
 
 
-class ExchangeRateSerializer(serializers.ModelSerializer):
+class ExchangeRateSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Exchange Rate"""
     from_currency_display = serializers.CharField(source='from_currency', read_only=True)
     to_currency_display = serializers.CharField(source='to_currency', read_only=True)
@@ -21,7 +22,7 @@ class ExchangeRateSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'last_updated', 'created_at']
 
 
-class CurrencyConversionSerializer(serializers.ModelSerializer):
+class CurrencyConversionSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Currency Conversion"""
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
     
@@ -36,7 +37,7 @@ class CurrencyConversionSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
-class CurrencyConfigSerializer(serializers.ModelSerializer):
+class CurrencyConfigSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Currency Config"""
     
     class Meta:
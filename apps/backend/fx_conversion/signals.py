@@ -0,0 +1,15 @@
+"""
+FX Conversion Signals
+Invalidate cached tenant currency profiles when currencies change
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Currency
+from .currency_profile import CurrencyProfileCache
+
+
+@receiver(post_save, sender=Currency)
+@receiver(post_delete, sender=Currency)
+def invalidate_currency_profile(sender, instance, **kwargs):
+    """Reload the tenant's currency profile on next use"""
+    CurrencyProfileCache.invalidate(instance.tenant_id)
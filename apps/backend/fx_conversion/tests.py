@@ -0,0 +1,271 @@
+"""
+Unit tests for fx_conversion app
+"""
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+from unittest.mock import patch, MagicMock
+
+from django.test import TestCase
+
+from tenants.models import Tenant
+from banking.models import BankTransaction
+from .models import Currency, ExchangeRate, CurrencyConfig
+from .rate_engine import FXRateEngine, RateMatrix
+from .fx_service import FXConversionService
+from .historical import HistoricalRateIndex, historical_rates, rate_on, revalue_queryset
+from .utils import convert_to_base
+from .currency_profile import get_currency_profile
+
+
+def _mock_response(payload):
+    response = MagicMock()
+    response.json.return_value = payload
+    response.raise_for_status.return_value = None
+    return response
+
+
+class RateMatrixTest(TestCase):
+    """Test in-memory rate matrix arithmetic"""
+
+    def setUp(self):
+        self.matrix = RateMatrix('USD', {'EUR': Decimal('0.5'), 'MYR': Decimal('4')})
+
+    def test_direct_and_inverse_rates(self):
+        """Test pivot-quoted rates and their inverses"""
+        self.assertEqual(self.matrix.rate('usd', 'myr'), Decimal('4'))
+        self.assertEqual(self.matrix.rate('MYR', 'USD'), Decimal('0.25'))
+        self.assertEqual(self.matrix.rate('MYR', 'MYR'), Decimal('1'))
+
+    def test_cross_rate_via_pivot(self):
+        """Test EUR -> MYR is derived through USD"""
+        self.assertEqual(self.matrix.rate('EUR', 'MYR'), Decimal('8'))
+        self.assertEqual(self.matrix.convert(Decimal('10'), 'EUR', 'MYR'), Decimal('80'))
+
+    def test_unknown_currency(self):
+        """Test pairs outside the matrix cannot be priced"""
+        self.assertIsNone(self.matrix.rate('EUR', 'XYZ'))
+        self.assertIsNone(self.matrix.convert(Decimal('1'), 'XYZ', 'USD'))
+
+
+class FXRateEngineTest(TestCase):
+    """Test bulk rate ingestion and the per-tenant matrix cache"""
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(
+            name='FX Tenant',
+            slug='fx_tenant',
+            is_active=True
+        )
+        CurrencyConfig.objects.create(tenant=self.tenant, base_currency='USD')
+        FXRateEngine.invalidate()
+        self.payload = {
+            'base': 'USD',
+            'time_last_updated': 1700000000,
+            'rates': {'USD': 1, 'EUR': 0.5, 'MYR': 4.5, 'SGD': 1.35},
+        }
+
+    def tearDown(self):
+        FXRateEngine.invalidate()
+
+    def test_ingest_rates_upserts(self):
+        """Test re-ingesting a snapshot updates rows instead of duplicating them"""
+        valid_from = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+        FXRateEngine.ingest_rates(self.tenant, 'USD', {'EUR': '0.5', 'MYR': '4.5'}, valid_from=valid_from)
+        FXRateEngine.ingest_rates(self.tenant, 'USD', {'EUR': '0.6', 'MYR': '4.5'}, valid_from=valid_from)
+
+        self.assertEqual(ExchangeRate.objects.filter(tenant=self.tenant).count(), 2)
+        self.assertEqual(
+            ExchangeRate.objects.get(tenant=self.tenant, to_currency='EUR').rate,
+            Decimal('0.60000000')
+        )
+
+    @patch('fx_conversion.rate_engine.requests.get')
+    def test_refresh_fetches_whole_table_once(self, mock_get):
+        """Test one provider call fills the matrix for every pair"""
+        mock_get.return_value = _mock_response(self.payload)
+
+        FXConversionService.update_all_rates(self.tenant, 'USD')
+        matrix = FXRateEngine.get_rate_matrix(self.tenant)
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertIn('/latest/USD', mock_get.call_args[0][0])
+        self.assertEqual(ExchangeRate.objects.filter(tenant=self.tenant).count(), 3)
+        self.assertEqual(matrix.rate('EUR', 'MYR'), Decimal('9'))
+
+        # Served from the process cache without further queries or calls
+        with self.assertNumQueries(0):
+            self.assertIs(FXRateEngine.get_rate_matrix(self.tenant), matrix)
+        self.assertEqual(mock_get.call_count, 1)
+
+    @patch('fx_conversion.rate_engine.requests.get')
+    def test_stale_rates_served_and_refreshed_out_of_band(self, mock_get):
+        """Test stale rates are served without a provider call and refreshed when due"""
+        mock_get.return_value = _mock_response(self.payload)
+        FXRateEngine.ingest_rates(
+            self.tenant, 'USD', {'EUR': '0.4'}, valid_from=datetime(2020, 1, 1, tzinfo=dt_timezone.utc)
+        )
+        ExchangeRate.objects.filter(tenant=self.tenant).update(last_updated=datetime(2020, 1, 1, tzinfo=dt_timezone.utc))
+
+        self.assertEqual(FXRateEngine.get_rate(self.tenant, 'USD', 'EUR'), Decimal('0.40000000'))
+        self.assertEqual(mock_get.call_count, 0)
+
+        self.assertEqual(FXRateEngine.refresh_due_rates(), {str(self.tenant.id): 3})
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(FXRateEngine.get_rate(self.tenant, 'USD', 'EUR'), Decimal('0.50000000'))
+        # Refreshed tenants are not due again until their update frequency elapses
+        self.assertEqual(FXRateEngine.refresh_due_rates(), {})
+
+    @patch('fx_conversion.rate_engine.requests.get')
+    def test_get_exchange_rate_returns_stored_or_derived(self, mock_get):
+        """Test stored pairs return rows and cross pairs return derived rates"""
+        mock_get.return_value = _mock_response(self.payload)
+        FXRateEngine.refresh_rates(self.tenant, 'USD')
+
+        stored = FXConversionService.get_exchange_rate(self.tenant, 'USD', 'MYR')
+        self.assertFalse(stored._state.adding)
+        self.assertEqual(stored.rate, Decimal('4.50000000'))
+
+        derived = FXConversionService.get_exchange_rate(self.tenant, 'SGD', 'MYR')
+        self.assertTrue(derived._state.adding)
+        self.assertEqual(derived.provider, 'derived')
+        self.assertEqual(derived.rate, (Decimal('4.5') / Decimal('1.35')).quantize(Decimal('0.00000001')))
+
+        self.assertIsNone(FXConversionService.get_exchange_rate(self.tenant, 'USD', 'XYZ'))
+
+    @patch('fx_conversion.rate_engine.requests.get')
+    def test_convert_amounts_in_memory(self, mock_get):
+        """Test a multi-currency batch converts without per-line queries"""
+        mock_get.return_value = _mock_response(self.payload)
+        FXRateEngine.refresh_rates(self.tenant, 'USD')
+        FXRateEngine.get_rate_matrix(self.tenant)
+
+        items = [(Decimal('10'), 'EUR'), (Decimal('2'), 'USD'), (Decimal('9'), 'MYR'), (Decimal('1'), 'XYZ')] * 2500
+        with self.assertNumQueries(0):
+            converted = FXConversionService.convert_amounts(self.tenant, items, 'MYR')
+
+        self.assertEqual(len(converted), 10000)
+        self.assertEqual(converted[:4], [Decimal('90'), Decimal('9'), Decimal('9'), None])
+
+
+class HistoricalRateTest(TestCase):
+    """Test point-in-time rate lookups"""
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(
+            name='FX History Tenant',
+            slug='fx_history_tenant',
+            is_active=True
+        )
+        CurrencyConfig.objects.create(tenant=self.tenant, base_currency='USD')
+        for month, eur, myr in ((1, '0.90', '4.60'), (2, '0.92', '4.70'), (3, '0.95', '4.80')):
+            valid_from = datetime(2024, month, 1, tzinfo=dt_timezone.utc)
+            FXRateEngine.ingest_rates(self.tenant, 'USD', {'EUR': eur, 'MYR': myr}, valid_from=valid_from)
+
+    def test_rate_on_picks_interval(self):
+        """Test lookups use the rate valid on the given date"""
+        index = HistoricalRateIndex.load(self.tenant)
+
+        self.assertEqual(index.rate_on('USD', 'MYR', date(2024, 2, 15)), Decimal('4.7'))
+        self.assertEqual(index.rate_on('USD', 'MYR', date(2024, 3, 1)), Decimal('4.8'))
+        self.assertEqual(index.rate_on('USD', 'MYR', date(2030, 1, 1)), Decimal('4.8'))
+        self.assertIsNone(index.rate_on('USD', 'MYR', date(2023, 12, 31)))
+
+    def test_inverse_and_cross_rates(self):
+        """Test inverse pairs and cross rates through the pivot"""
+        index = HistoricalRateIndex.load(self.tenant)
+
+        self.assertEqual(index.rate_on('MYR', 'USD', date(2024, 1, 10)), Decimal('1') / Decimal('4.6'))
+        self.assertEqual(index.rate_on('EUR', 'MYR', date(2024, 2, 10)), Decimal('4.7') / Decimal('0.92'))
+
+    def test_batch_shares_one_load(self):
+        """Test lookups inside historical_rates do not query per call"""
+        with historical_rates(self.tenant):
+            with self.assertNumQueries(0):
+                for day in range(1, 29):
+                    rate_on(self.tenant, 'USD', 'EUR', date(2024, 2, day))
+                self.assertEqual(rate_on(self.tenant, 'USD', 'EUR', date(2024, 2, 1)), Decimal('0.92'))
+
+    def test_convert_to_base_uses_transaction_date(self):
+        """Test convert_to_base prices historical transactions at their date"""
+        Currency.objects.create(tenant=self.tenant, code='MYR', name='Ringgit', is_base_currency=True)
+
+        converted, rate, base = convert_to_base(
+            Decimal('10'), 'USD', str(self.tenant.id), datetime(2024, 1, 20, tzinfo=dt_timezone.utc)
+        )
+        self.assertEqual((converted, rate, base), (Decimal('46.0'), Decimal('4.6'), 'MYR'))
+
+    def test_revalue_queryset_in_bulk(self):
+        """Test a queryset is converted with one rate load and one bulk update"""
+        BankTransaction.objects.bulk_create([
+            BankTransaction(
+                tenant=self.tenant,
+                date=date(2024, month, 10),
+                description=f'Transfer {month}',
+                type='deposit',
+                transaction_type='deposit',
+                amount=Decimal('100.00'),
+                transaction_currency='EUR'
+            )
+            for month in (1, 2, 3)
+        ])
+        queryset = BankTransaction.objects.filter(tenant=self.tenant)
+
+        # Rate load (config + rates), row fetch, bulk update
+        with self.assertNumQueries(4):
+            result = revalue_queryset(queryset, self.tenant, 'amount', 'date', base_currency='USD')
+
+        self.assertEqual(result, {'converted': 3, 'missing_rate': 0})
+        converted = dict(queryset.values_list('date__month', 'converted_amount_in_base_currency'))
+        self.assertEqual(converted[1], (Decimal('100') / Decimal('0.90')).quantize(Decimal('0.01')))
+        self.assertEqual(converted[3], (Decimal('100') / Decimal('0.95')).quantize(Decimal('0.01')))
+
+
+class CurrencyProfileTest(TestCase):
+    """Test the cached tenant currency profile and bulk conversion"""
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(
+            name='FX Profile Tenant',
+            slug='fx_profile_tenant',
+            currency_code='SGD',
+            is_active=True
+        )
+        CurrencyConfig.objects.create(tenant=self.tenant, base_currency='MYR')
+        FXRateEngine.ingest_rates(
+            self.tenant, 'MYR', {'USD': '0.25'}, valid_from=datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+        )
+
+    def test_profile_cached_and_invalidated(self):
+        """Test the profile is reused until a Currency changes"""
+        self.assertEqual(get_currency_profile(self.tenant).base_currency, 'SGD')
+        with self.assertNumQueries(0):
+            get_currency_profile(self.tenant)
+
+        Currency.objects.create(tenant=self.tenant, code='MYR', name='Ringgit', is_base_currency=True)
+        profile = get_currency_profile(self.tenant)
+        self.assertEqual(profile.base_currency, 'MYR')
+        self.assertTrue(profile.has_base_currency)
+
+    def test_bulk_create_converted(self):
+        """Test bulk inserts convert without per-row queries"""
+        Currency.objects.create(tenant=self.tenant, code='MYR', name='Ringgit', is_base_currency=True)
+        transactions = [
+            BankTransaction(
+                tenant=self.tenant,
+                date=date(2024, 2, index + 1),
+                description=f'Deposit {index}',
+                type='deposit',
+                transaction_type='deposit',
+                amount=Decimal('10.00'),
+                transaction_currency='USD' if index else 'MYR'
+            )
+            for index in range(20)
+        ]
+
+        # Profile, rate load (config + rates), insert
+        with self.assertNumQueries(4):
+            BankTransaction.bulk_create_converted(transactions)
+
+        amounts = BankTransaction.objects.filter(tenant=self.tenant).values_list(
+            'transaction_currency', 'converted_amount_in_base_currency'
+        )
+        self.assertEqual(set(amounts), {('MYR', Decimal('10.00')), ('USD', Decimal('40.00'))})
@@ -36,7 +36,7 @@ def convert_to_base(
         converted, rate, base = convert_to_base(Decimal('10.00'), 'USD', tenant_id)
         # Returns: (Decimal('47.20'), Decimal('4.72'), 'MYR')
     """
-    from fx_conversion.models import Currency, ExchangeRate
+    from fx_conversion.historical import rate_on
     from tenants.models import Tenant
     
     try:
@@ -45,44 +45,21 @@ def convert_to_base(
         logger.error(f"Tenant {tenant_id} not found")
         return amount, Decimal('1.0'), currency_code
     
-    # Get base currency
-    base_currency = Currency.objects.filter(
-        tenant=tenant,
-        is_base_currency=True
-    ).first()
-    
-    if not base_currency:
+    base_currency_code = get_base_currency_code(tenant, default=None)
+    if not base_currency_code:
         # Fallback to tenant currency_code
         base_currency_code = getattr(tenant, 'currency_code', 'USD')
         logger.warning(f"No base currency found for tenant {tenant_id}, using {base_currency_code}")
         return amount, Decimal('1.0'), base_currency_code
     
-    base_currency_code = base_currency.code
-    
     # If same currency, no conversion needed
     if currency_code == base_currency_code:
         return amount, Decimal('1.0'), base_currency_code
     
-    # Find latest exchange rate
-    if transaction_date:
-        # Find rate valid at transaction date
-        rate_obj = ExchangeRate.objects.filter(
-            tenant=tenant,
-            from_currency=currency_code,
-            to_currency=base_currency_code,
-            is_active=True,
-            valid_from__lte=transaction_date
-        ).order_by('-valid_from').first()
-    else:
-        # Find latest active rate
-        rate_obj = ExchangeRate.objects.filter(
-            tenant=tenant,
-            from_currency=currency_code,
-            to_currency=base_currency_code,
-            is_active=True
-        ).order_by('-valid_from').first()
+    # Rate effective at the transaction date (latest active rate when no date)
+    rate_used = rate_on(tenant, currency_code, base_currency_code, transaction_date)
     
-    if not rate_obj:
+    if not rate_used:
         logger.warning(
             f"No exchange rate found for {currency_code} -> {base_currency_code} "
             f"for tenant {tenant_id}. Using 1.0 as fallback."
@@ -90,8 +67,28 @@ def convert_to_base(
         return amount, Decimal('1.0'), base_currency_code
     
     # Convert amount
-    rate_used = rate_obj.rate
     converted_amount = amount * rate_used
     
     return converted_amount, rate_used, base_currency_code
 
+
+def get_base_currency_code(tenant, default: Optional[str] = 'USD') -> Optional[str]:
+    """
+    Get a tenant's base currency code
+
+    Args:
+        tenant: Tenant instance
+        default: Returned when the tenant has no base Currency; pass None to
+            detect that case (convert_to_base falls back to tenant.currency_code)
+
+    Returns:
+        Base currency code, falling back to tenant.currency_code then default
+    """
+    from fx_conversion.currency_profile import get_currency_profile
+
+    profile = get_currency_profile(tenant)
+    if profile.has_base_currency:
+        return profile.base_currency
+    if default is None:
+        return None
+    return getattr(tenant, 'currency_code', None) or default
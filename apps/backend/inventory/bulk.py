@@ -0,0 +1,287 @@
+"""
+Inventory Bulk Item Operations
+Validate and apply item changes for a whole batch in a handful of queries.
+
+A batch is validated row by row in memory. Targets are fetched with one
+in_bulk() (plus one sku lookup for upserts, which also catches skus already
+taken in the company or claimed twice by the batch), and writes are one
+bulk_create and one bulk_update over only the fields the batch touched,
+however many rows it has.
+"""
+import uuid
+from typing import Dict, List, Optional, Tuple
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.utils import timezone
+import logging
+
+from .models import Item, ItemCategory
+
+logger = logging.getLogger(__name__)
+
+# Operation -> fields a row may set
+OPERATION_FIELDS = {
+    'reorder_points': ('reorder_point', 'min_stock_level', 'max_stock_level'),
+    'prices': ('cost_price', 'selling_price'),
+    'activation': ('is_active',),
+    'upsert': (
+        'sku', 'name', 'description', 'category', 'item_type', 'unit', 'cost_price', 'selling_price',
+        'min_stock_level', 'max_stock_level', 'reorder_point', 'is_active', 'is_tracked', 'barcode',
+        'weight', 'dimensions',
+    ),
+}
+
+# Fields a new item must have
+REQUIRED_ON_CREATE = ('sku', 'name')
+
+
+class ItemBulkService:
+    """Bulk create/update of inventory items"""
+
+    WRITE_BATCH_SIZE = 500
+
+    @staticmethod
+    def get_max_batch_size() -> int:
+        """Maximum rows accepted in one request (INVENTORY_BULK_MAX_ITEMS)"""
+        return getattr(settings, 'INVENTORY_BULK_MAX_ITEMS', 5000)
+
+    @staticmethod
+    def _clean_value(name: str, raw):
+        field = Item._meta.get_field(name)
+        if isinstance(field, models.ForeignKey):
+            return field.target_field.to_python(raw) if raw not in (None, '') else None
+        if isinstance(field, models.BooleanField) and isinstance(raw, str):
+            raw = {'true': True, 'false': False}.get(raw.strip().lower(), raw)
+        value = field.clean(raw, None)
+        if isinstance(field, models.DecimalField) and value is not None and value < 0:
+            raise ValidationError('Must be zero or greater.')
+        return value
+
+    @classmethod
+    def clean_row(cls, operation: str, row) -> Tuple[Optional[uuid.UUID], Dict, Dict]:
+        """
+        Validate one payload row
+
+        Returns:
+            (item id or None, cleaned field values, errors)
+        """
+        if not isinstance(row, dict):
+            return None, {}, {'non_field_errors': ['Expected an object.']}
+
+        errors = {}
+        item_id = None
+        raw_id = row.get('id', row.get('item_id'))
+        if raw_id not in (None, ''):
+            try:
+                item_id = uuid.UUID(str(raw_id))
+            except ValueError:
+                errors['id'] = ['Must be a valid UUID.']
+        elif operation != 'upsert':
+            errors['id'] = ['This field is required.']
+
+        allowed = OPERATION_FIELDS[operation]
+        values = {}
+        for name, raw in row.items():
+            if name in ('id', 'item_id', 'company'):
+                continue
+            if name not in allowed:
+                errors[name] = [f"Cannot be set by the '{operation}' operation."]
+                continue
+            try:
+                values[name] = cls._clean_value(name, raw)
+            except ValidationError as e:
+                errors[name] = list(e.messages)
+
+        if operation == 'upsert':
+            if row.get('company') not in (None, ''):
+                try:
+                    values['company'] = cls._clean_value('company', row['company'])
+                except ValidationError as e:
+                    errors['company'] = list(e.messages)
+            if item_id is None and 'sku' not in values and 'sku' not in errors:
+                errors['sku'] = ['Either id or sku is required.']
+        elif not values and not errors:
+            errors['non_field_errors'] = ['No fields to update.']
+
+        return item_id, values, errors
+
+    @classmethod
+    def apply(cls, tenant, operation: str, rows: List, company=None, partial: bool = False,
+              dry_run: bool = False) -> Dict:
+        """
+        Validate and apply a batch of item changes
+
+        Args:
+            tenant: Tenant the items belong to
+            operation: One of OPERATION_FIELDS
+            rows: List of dicts; each has an item `id` (upserts may use `sku`
+                plus an optional `company` instead) and the fields to set
+            company: Default company id for upserted items
+            partial: Write valid rows even if others fail
+                (by default any error rejects the whole batch)
+            dry_run: Validate only
+
+        Returns:
+            dict with 'ok', 'counts' and a per-row 'results' list of
+            {'index', 'id', 'status'[, 'errors']}; status is one of
+            created / updated / unchanged / error
+
+        Raises:
+            ValueError: Unknown operation, rows not a list, or batch too large
+        """
+        if operation not in OPERATION_FIELDS:
+            raise ValueError(f"Unsupported operation: {operation}")
+        if not isinstance(rows, list):
+            raise ValueError('items must be a list')
+        max_batch_size = cls.get_max_batch_size()
+        if len(rows) > max_batch_size:
+            raise ValueError(f"At most {max_batch_size} items can be sent in one request")
+
+        try:
+            default_company = cls._clean_value('company', company)
+        except ValidationError:
+            raise ValueError('company must be a valid company id')
+
+        cleaned = [cls.clean_row(operation, row) for row in rows]
+        targets, by_sku = cls._fetch_targets(tenant, operation, cleaned)
+        category_ids, company_ids = cls._fetch_references(tenant, cleaned, default_company)
+
+        now = timezone.now()
+        results = []
+        to_create = []
+        to_update = {}
+        touched = set()
+        seen = set()
+        claimed = set()  # (company, sku) pairs the batch's items will hold
+
+        for index, (item_id, values, errors) in enumerate(cleaned):
+            errors = dict(errors)
+            company_id = values.pop('company', None) or default_company
+            category_id = values.pop('category', None) if 'category' in values else False
+
+            if category_id and category_id not in category_ids:
+                errors['category'] = ['Category not found.']
+            if operation == 'upsert' and company_id is not None and company_id not in company_ids:
+                errors['company'] = ['Company not found.']
+
+            item = None
+            if not errors:
+                if item_id is not None:
+                    item = targets.get(item_id)
+                    if item is None:
+                        errors['id'] = ['Item not found.']
+                elif operation == 'upsert':
+                    if company_id is None:
+                        errors['company'] = ['This field is required when upserting by sku.']
+                    else:
+                        item = by_sku.get((company_id, values['sku']))
+
+            key = item.pk if item is not None else (company_id, values.get('sku'))
+            if not errors and key in seen:
+                errors['non_field_errors'] = ['Item appears more than once in this batch.']
+            seen.add(key)
+
+            sku = values.get('sku')
+            if not errors and sku:
+                owner = item.company_id if item is not None else company_id
+                holder = by_sku.get((owner, sku))
+                if holder is not None and holder.pk != key:
+                    errors['sku'] = ['An item with this sku already exists in the company.']
+                elif (owner, sku) in claimed:
+                    errors['sku'] = ['Another item in this batch uses this sku.']
+                claimed.add((owner, sku))
+
+            if not errors and item is None:
+                missing = [name for name in REQUIRED_ON_CREATE if values.get(name) in (None, '')]
+                if company_id is None:
+                    errors['company'] = ['This field is required.']
+                for name in missing:
+                    errors[name] = ['This field is required.']
+
+            if errors:
+                results.append({'index': index, 'id': str(item_id) if item_id else None,
+                                'status': 'error', 'errors': errors})
+                continue
+
+            if category_id is not False:
+                values['category_id'] = category_id
+
+            if item is None:
+                item = Item(tenant=tenant, company_id=company_id, **values)
+                to_create.append(item)
+                results.append({'index': index, 'id': str(item.pk), 'status': 'created'})
+                continue
+
+            changed = [name for name, value in values.items() if getattr(item, name) != value]
+            for name in changed:
+                setattr(item, name, values[name])
+            if changed:
+                item.updated_at = now
+                to_update[item.pk] = item
+                touched.update('category' if name == 'category_id' else name for name in changed)
+            results.append({'index': index, 'id': str(item.pk), 'status': 'updated' if changed else 'unchanged'})
+
+        counts = {status: 0 for status in ('created', 'updated', 'unchanged', 'error')}
+        for result in results:
+            counts[result['status']] += 1
+        ok = counts['error'] == 0
+
+        if not dry_run and (ok or partial):
+            with transaction.atomic():
+                if to_create:
+                    Item.objects.bulk_create(to_create, batch_size=cls.WRITE_BATCH_SIZE)
+                if to_update:
+                    Item.objects.bulk_update(
+                        list(to_update.values()), sorted(touched) + ['updated_at'], batch_size=cls.WRITE_BATCH_SIZE
+                    )
+        elif not ok:
+            # Nothing was written; make that explicit per row
+            for result in results:
+                if result['status'] != 'error':
+                    result['status'] = 'skipped'
+            counts = {'skipped': len(results) - counts['error'], 'error': counts['error']}
+
+        return {'ok': ok, 'dry_run': dry_run, 'counts': counts, 'results': results}
+
+    @staticmethod
+    def _fetch_targets(tenant, operation: str, cleaned) -> Tuple[Dict, Dict]:
+        """
+        Existing items addressed by id (one in_bulk) and, for upserts, by (company, sku)
+
+        The sku lookup covers every sku the batch sets, so renames can be
+        checked against the items that already hold them.
+        """
+        fields = {'sku', 'company'}
+        for _, values, _ in cleaned:
+            fields.update(name for name in values if name != 'company')
+
+        queryset = Item.objects.filter(tenant=tenant).only('id', *fields)
+        item_ids = [item_id for item_id, _, errors in cleaned if item_id is not None and not errors]
+        targets = queryset.in_bulk(item_ids) if item_ids else {}
+
+        by_sku = {}
+        if operation == 'upsert':
+            skus = {values['sku'] for _, values, errors in cleaned if not errors and values.get('sku')}
+            if skus:
+                for item in queryset.filter(sku__in=skus):
+                    by_sku[(item.company_id, item.sku)] = item
+        return targets, by_sku
+
+    @staticmethod
+    def _fetch_references(tenant, cleaned, default_company) -> Tuple[set, set]:
+        """Tenant-owned category and company ids referenced by the batch"""
+        from tenants.models import Company
+
+        category_ids = {values['category'] for _, values, _ in cleaned if values.get('category')}
+        company_ids = {values['company'] for _, values, _ in cleaned if values.get('company')}
+        if default_company is not None:
+            company_ids.add(default_company)
+
+        if category_ids:
+            category_ids = set(ItemCategory.objects.filter(
+                tenant=tenant, pk__in=category_ids
+            ).values_list('pk', flat=True))
+        if company_ids:
+            company_ids = set(Company.objects.filter(tenant=tenant, pk__in=company_ids).values_list('pk', flat=True))
+        return category_ids, company_ids
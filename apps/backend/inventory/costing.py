@@ -0,0 +1,365 @@
+"""
+Inventory Costing
+Perpetual cost-layer ledger for FIFO, LIFO and weighted-average valuation.
+
+Every InventoryMovement carries the item's running quantity and inventory
+value under each method after it was applied. Receipts open an
+InventoryCostLayer; issues consume open layers oldest-first (FIFO) and
+newest-first (LIFO) from the same layer rows. Valuing stock as of a date
+is then a lookup of each item's last running value, done in one query.
+
+The ledger is ordered by movement_date, the same order rebuild() replays.
+Movements normally arrive in date order and are appended; a movement dated
+before the item's last ledgered one (imported or back-dated history, clock
+skew between workers) makes record_movements replay that item's ledger so
+its sequence and running values stay in date order.
+"""
+from datetime import date, datetime, time, timezone as dt_timezone
+from decimal import Decimal
+from typing import Dict, List, Tuple
+from django.db import transaction
+from django.db.models import (
+    Case, Count, DecimalField, Exists, ExpressionWrapper, F, OuterRef, Subquery, Sum, Value, When,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal('0')
+
+INBOUND_MOVEMENTS = ('purchase', 'return', 'adjustment_in')
+OUTBOUND_MOVEMENTS = ('sale', 'damage', 'adjustment_out')
+
+# Valuation method -> InventoryMovement running value field
+VALUATION_FIELDS = {
+    'fifo': 'fifo_value',
+    'lifo': 'lifo_value',
+    'average_cost': 'average_value',
+    'weighted_average': 'average_value',
+}
+
+VALUE_FIELD = DecimalField(max_digits=20, decimal_places=4)
+
+
+class CostLayerState:
+    """
+    Running cost state for one item
+
+    Holds the item's open InventoryCostLayer instances (oldest first) and
+    the weighted-average quantity/value. Applying a movement mutates the
+    layer instances in place and records which ones changed.
+    """
+
+    def __init__(self, layers: List = None, quantity: Decimal = ZERO, average_value: Decimal = ZERO,
+                 sequence: int = 0, last_date=None):
+        self.layers = layers or []
+        self.quantity = quantity
+        self.average_value = average_value
+        self.sequence = sequence
+        # movement_date of the item's last ledgered movement
+        self.last_date = last_date
+        self.changed = {}
+
+    @property
+    def fifo_value(self) -> Decimal:
+        return sum((layer.fifo_remaining * layer.unit_cost for layer in self.layers), ZERO)
+
+    @property
+    def lifo_value(self) -> Decimal:
+        return sum((layer.lifo_remaining * layer.unit_cost for layer in self.layers), ZERO)
+
+    def receive(self, layer):
+        """Open a new layer (quantity/unit_cost set, remaining = quantity)"""
+        layer.fifo_remaining = layer.quantity
+        layer.lifo_remaining = layer.quantity
+        self.layers.append(layer)
+        self.quantity += layer.quantity
+        self.average_value += layer.quantity * layer.unit_cost
+
+    def issue(self, quantity: Decimal):
+        """Consume stock; issuing more than is on hand empties the item"""
+        quantity = min(quantity, self.quantity)
+        if quantity <= 0:
+            return
+
+        remaining = quantity
+        for layer in self.layers:
+            if remaining <= 0:
+                break
+            taken = min(layer.fifo_remaining, remaining)
+            if taken:
+                layer.fifo_remaining -= taken
+                self.changed[id(layer)] = layer
+                remaining -= taken
+
+        remaining = quantity
+        for layer in reversed(self.layers):
+            if remaining <= 0:
+                break
+            taken = min(layer.lifo_remaining, remaining)
+            if taken:
+                layer.lifo_remaining -= taken
+                self.changed[id(layer)] = layer
+                remaining -= taken
+
+        average_cost = self.average_value / self.quantity
+        self.quantity -= quantity
+        self.average_value = self.average_value - average_cost * quantity if self.quantity else ZERO
+        self.layers = [layer for layer in self.layers if layer.fifo_remaining or layer.lifo_remaining]
+
+    def apply(self, movement_type: str, quantity: Decimal, new_layer) -> bool:
+        """
+        Apply a movement
+
+        Returns:
+            True when new_layer was opened (receipts)
+        """
+        if movement_type in INBOUND_MOVEMENTS:
+            self.receive(new_layer)
+            return True
+        if movement_type in OUTBOUND_MOVEMENTS:
+            self.issue(quantity)
+        # Transfers move stock between warehouses, not in or out of the company
+        return False
+
+    def stamp(self, movement):
+        """Copy the running balances onto a movement"""
+        self.sequence += 1
+        movement.ledger_sequence = self.sequence
+        movement.balance_quantity = self.quantity
+        movement.fifo_value = self.fifo_value
+        movement.lifo_value = self.lifo_value
+        movement.average_value = self.average_value
+
+
+class CostLayerEngine:
+    """Maintains cost layers and values inventory from them"""
+
+    @staticmethod
+    def new_layer(movement, unit_cost: Decimal = None):
+        from .models import InventoryCostLayer
+
+        if unit_cost is None:
+            unit_cost = movement.unit_cost if movement.unit_cost is not None else (movement.item.cost_price or ZERO)
+        return InventoryCostLayer(
+            tenant_id=movement.tenant_id,
+            item_id=movement.item_id,
+            movement_id=movement.id,
+            received_at=movement.movement_date,
+            quantity=Decimal(str(movement.quantity)),
+            unit_cost=unit_cost,
+        )
+
+    @staticmethod
+    def load_states(item_ids) -> Dict:
+        """Load open layers and last ledger position for items (two queries)"""
+        from .models import InventoryCostLayer, Item, InventoryMovement
+
+        item_ids = list(item_ids)
+        states = {item_id: CostLayerState() for item_id in item_ids}
+
+        layers = InventoryCostLayer.objects.filter(item_id__in=item_ids).exclude(
+            fifo_remaining=0, lifo_remaining=0
+        ).order_by('received_at', 'id')
+        for layer in layers:
+            states[layer.item_id].layers.append(layer)
+
+        last = InventoryMovement.objects.filter(
+            item=OuterRef('pk'),
+            ledger_sequence__isnull=False,
+        ).order_by('-ledger_sequence')
+        balances = Item.objects.filter(pk__in=item_ids).annotate(
+            last_sequence=Subquery(last.values('ledger_sequence')[:1]),
+            last_quantity=Subquery(last.values('balance_quantity')[:1]),
+            last_average=Subquery(last.values('average_value')[:1]),
+            last_date=Subquery(last.values('movement_date')[:1]),
+        ).values_list('pk', 'last_sequence', 'last_quantity', 'last_average', 'last_date')
+        for item_id, sequence, quantity, average_value, last_date in balances:
+            if sequence is not None:
+                states[item_id].sequence = sequence
+                states[item_id].quantity = quantity
+                states[item_id].average_value = average_value or ZERO
+                states[item_id].last_date = last_date
+        return states
+
+    @staticmethod
+    def lock_items(item_ids):
+        """Lock item rows (in a stable order) so layering is serialized per item"""
+        from .models import Item
+
+        list(Item.objects.select_for_update().filter(pk__in=item_ids).order_by('pk').values_list('pk', flat=True))
+
+    @classmethod
+    def record_movements(cls, movements, save=None):
+        """
+        Apply new movements to their items' layers and save them
+
+        Movements are layered in list order. Items that receive a movement
+        dated before their last ledgered movement are replayed in date order
+        afterwards. Must run inside a transaction.
+
+        Args:
+            movements: Unsaved InventoryMovement instances
+            save: Callable that persists the movement rows
+                (defaults to one bulk_create)
+        """
+        from .models import InventoryCostLayer, InventoryMovement
+
+        item_ids = {movement.item_id for movement in movements}
+        cls.lock_items(item_ids)
+        states = cls.load_states(item_ids)
+
+        opened = []
+        for movement in movements:
+            if not isinstance(movement.quantity, Decimal):
+                movement.quantity = Decimal(str(movement.quantity))
+            state = states[movement.item_id]
+            layer = cls.new_layer(movement) if movement.movement_type in INBOUND_MOVEMENTS else None
+            if state.apply(movement.movement_type, movement.quantity, layer):
+                opened.append((layer, movement))
+            state.stamp(movement)
+
+        if save is not None:
+            save()
+        else:
+            InventoryMovement.objects.bulk_create(movements)
+
+        for layer, movement in opened:
+            layer.received_at = movement.movement_date
+        if opened:
+            InventoryCostLayer.objects.bulk_create([layer for layer, _ in opened])
+        changed = [
+            layer for state in states.values() for layer in state.changed.values()
+            if not layer._state.adding
+        ]
+        if changed:
+            InventoryCostLayer.objects.bulk_update(changed, ['fifo_remaining', 'lifo_remaining'])
+
+        # Dates are only final once saved (movement_date is auto_now_add)
+        backdated = set()
+        for movement in movements:
+            state = states[movement.item_id]
+            if state.last_date is not None and movement.movement_date < state.last_date:
+                backdated.add(movement.item_id)
+            else:
+                state.last_date = movement.movement_date
+        if backdated:
+            logger.info(f"Replaying cost ledger for {len(backdated)} items with back-dated movements")
+            for tenant_id in {movement.tenant_id for movement in movements if movement.item_id in backdated}:
+                cls.rebuild(tenant_id, item_ids=backdated)
+            for movement in movements:
+                if movement.item_id in backdated:
+                    movement.refresh_from_db(fields=[
+                        'ledger_sequence', 'balance_quantity', 'fifo_value', 'lifo_value', 'average_value',
+                    ])
+
+    @classmethod
+    def rebuild(cls, tenant, batch_size: int = 2000, item_ids=None) -> Dict[str, int]:
+        """
+        Rebuild layers and running balances from movement history
+
+        Movements are read once, ordered by item and date, and replayed per
+        item in memory; results are written with bulk_update/bulk_create.
+
+        Args:
+            tenant: Tenant instance or id
+            item_ids: Only replay these items (defaults to every item)
+
+        Returns:
+            dict with 'items', 'movements' and 'layers' counts
+        """
+        from .models import InventoryCostLayer, InventoryMovement
+
+        movements = InventoryMovement.objects.filter(tenant=tenant)
+        layers = InventoryCostLayer.objects.filter(tenant=tenant)
+        if item_ids is not None:
+            movements = movements.filter(item_id__in=item_ids)
+            layers = layers.filter(item_id__in=item_ids)
+        movements = movements.select_related('item').only(
+            'id', 'tenant_id', 'item_id', 'movement_type', 'quantity', 'unit_cost', 'movement_date',
+            'item__cost_price',
+        ).order_by('item_id', 'movement_date', 'ledger_sequence', 'created_at')
+        update_fields = ['ledger_sequence', 'balance_quantity', 'fifo_value', 'lifo_value', 'average_value']
+
+        counts = {'items': 0, 'movements': 0, 'layers': 0}
+        pending_movements = []
+        pending_layers = []
+
+        with transaction.atomic():
+            layers.delete()
+
+            current_item = None
+            state = None
+            for movement in movements.iterator(chunk_size=batch_size):
+                if movement.item_id != current_item:
+                    # Layers of finished items are final and can be written
+                    if len(pending_layers) >= batch_size:
+                        InventoryCostLayer.objects.bulk_create(pending_layers, batch_size=batch_size)
+                        counts['layers'] += len(pending_layers)
+                        pending_layers = []
+                    current_item = movement.item_id
+                    state = CostLayerState()
+                    counts['items'] += 1
+
+                layer = cls.new_layer(movement) if movement.movement_type in INBOUND_MOVEMENTS else None
+                if state.apply(movement.movement_type, movement.quantity, layer):
+                    pending_layers.append(layer)
+                state.stamp(movement)
+                pending_movements.append(movement)
+
+                if len(pending_movements) >= batch_size:
+                    InventoryMovement.objects.bulk_update(pending_movements, update_fields)
+                    counts['movements'] += len(pending_movements)
+                    pending_movements = []
+
+            if pending_movements:
+                InventoryMovement.objects.bulk_update(pending_movements, update_fields)
+                counts['movements'] += len(pending_movements)
+            if pending_layers:
+                InventoryCostLayer.objects.bulk_create(pending_layers, batch_size=batch_size)
+                counts['layers'] += len(pending_layers)
+
+        return counts
+
+    @staticmethod
+    def value_inventory(items, valuation_method: str, as_of=None) -> Tuple[Decimal, int]:
+        """
+        Value a queryset of items under a method as of a date, in one query
+
+        Items with ledgered movements use their last running value at
+        `as_of`; items that never had one fall back to current_stock * cost_price.
+
+        Args:
+            items: Item queryset
+            valuation_method: One of VALUATION_FIELDS
+            as_of: date or datetime (defaults to now; dates mean end of day)
+
+        Returns:
+            (total value, item count)
+        """
+        from .models import InventoryMovement
+
+        field = VALUATION_FIELDS.get(valuation_method)
+        if field is None:
+            raise ValueError(f"Unsupported valuation method: {valuation_method}")
+
+        if as_of is None:
+            as_of = timezone.now()
+        elif isinstance(as_of, datetime):
+            as_of = as_of if timezone.is_aware(as_of) else timezone.make_aware(as_of, dt_timezone.utc)
+        elif isinstance(as_of, date):
+            as_of = datetime.combine(as_of, time.max, tzinfo=dt_timezone.utc)
+
+        ledger = InventoryMovement.objects.filter(item=OuterRef('pk'), ledger_sequence__isnull=False)
+        last_value = ledger.filter(movement_date__lte=as_of).order_by('-ledger_sequence').values(field)[:1]
+
+        result = items.annotate(
+            valuation=Case(
+                When(Exists(ledger), then=Coalesce(Subquery(last_value, output_field=VALUE_FIELD), Value(ZERO))),
+                default=ExpressionWrapper(F('current_stock') * F('cost_price'), output_field=VALUE_FIELD),
+                output_field=VALUE_FIELD,
+            )
+        ).aggregate(total=Sum('valuation'), count=Count('pk'))
+        return (result['total'] or ZERO), result['count']
@@ -0,0 +1,81 @@
+"""
+Management command to benchmark bulk item updates
+Usage: python manage.py benchmark_item_bulk_updates --items 5000
+
+Creates a throwaway tenant with N items, refreshes every reorder point the
+old way (get + save() + serialize per row) and with ItemBulkService, then
+upserts the catalog, and rolls everything back.
+"""
+import time
+import uuid
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from inventory.bulk import ItemBulkService
+from inventory.models import Item
+from inventory.serializers import ItemSerializer
+from tenants.models import Company, Tenant
+
+
+class Command(BaseCommand):
+    help = 'Benchmark per-row vs bulk inventory item updates'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=5000, help='Items in the catalog')
+
+    def handle(self, *args, **options):
+        count = options['items']
+        with transaction.atomic():
+            suffix = uuid.uuid4().hex[:8]
+            tenant = Tenant.objects.create(name=f'Inventory benchmark {suffix}', slug=f'inv-bench-{suffix}')
+            company = Company.objects.create(tenant=tenant, name='Inventory benchmark', registration_number=suffix)
+            Item.objects.bulk_create([
+                Item(tenant=tenant, company=company, sku=f'BENCH-{index:06d}', name=f'Benchmark item {index}',
+                     cost_price=Decimal('10.00'), selling_price=Decimal('15.00'))
+                for index in range(count)
+            ], batch_size=1000)
+            item_ids = list(Item.objects.filter(tenant=tenant).order_by('sku').values_list('id', flat=True))
+            self.stdout.write(f"Updating {count:,} items")
+
+            def per_row():
+                for index, item_id in enumerate(item_ids):
+                    item = Item.objects.get(id=item_id, tenant=tenant)
+                    item.reorder_point = Decimal(index % 50)
+                    item.save()
+                    ItemSerializer(item).data
+
+            rows = [{'id': str(item_id), 'reorder_point': str(index % 50 + 1)} for index, item_id in enumerate(item_ids)]
+            self._report('reorder points, per row', per_row, count)
+            self._report(
+                'reorder points, bulk', lambda: ItemBulkService.apply(tenant, 'reorder_points', rows), count
+            )
+
+            upserts = [
+                {'sku': f'BENCH-{index:06d}', 'name': f'Benchmark item {index}', 'selling_price': '16.00'}
+                for index in range(0, count * 2, 2)
+            ]
+            self._report(
+                'upsert by sku (half new)',
+                lambda: ItemBulkService.apply(tenant, 'upsert', upserts, company=company.pk),
+                count,
+            )
+
+            transaction.set_rollback(True)
+
+    def _report(self, label, run, rows):
+        queries = [0]
+
+        def count_queries(execute, sql, params, many, context):
+            queries[0] += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count_queries):
+            started = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"{label:<28} {rows / elapsed if elapsed else 0:>10,.0f} rows/s "
+            f"({elapsed:.2f}s, {queries[0]:,} queries)"
+        )
@@ -0,0 +1,58 @@
+"""
+Management command to benchmark reorder planning
+Usage: python manage.py benchmark_reorder_planning --skus 100000 --days 730
+
+Generates synthetic sparse demand (a fraction of SKU-days with sales) and
+lead-time samples in memory and times ReorderPlanner.compute() over them.
+No database access.
+"""
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from inventory.planning import ReorderPlanner
+
+
+class Command(BaseCommand):
+    help = 'Benchmark vectorized reorder point computation over synthetic history'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--skus', type=int, default=100000, help='Number of SKUs')
+        parser.add_argument('--days', type=int, default=730, help='Days of history')
+        parser.add_argument('--density', type=float, default=0.1, help='Share of SKU-days with demand')
+        parser.add_argument('--receipts', type=int, default=12, help='Receipts per SKU in the window')
+        parser.add_argument('--seed', type=int, default=7)
+
+    def handle(self, *args, **options):
+        skus, days = options['skus'], options['days']
+        rng = np.random.default_rng(options['seed'])
+
+        rows = int(skus * days * options['density'])
+        item_index = rng.integers(0, skus, rows)
+        day_offsets = rng.integers(0, days, rows)
+        quantities = rng.gamma(2.0, 3.0, rows).round()
+        first_day = np.where(rng.random(skus) < 0.2, rng.integers(0, days, skus), 0)
+
+        samples = skus * options['receipts']
+        lead_index = rng.integers(0, skus, samples)
+        lead_days = rng.normal(14, 4, samples).clip(1).round()
+
+        self.stdout.write(
+            f"{skus:,} SKUs x {days:,} days, {rows:,} demand rows "
+            f"({rows * 24 / 1e6:,.0f} MB of input), {samples:,} lead-time samples"
+        )
+        for bucket_days in (1, 7):
+            started = time.perf_counter()
+            result = ReorderPlanner.compute(
+                item_index, day_offsets, quantities, first_day, days, lead_index, lead_days,
+                bucket_days=bucket_days,
+            )
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"bucket {bucket_days}d: {elapsed:.2f}s ({skus / elapsed:,.0f} SKUs/s), "
+                f"median reorder point {np.median(result['reorder_point']):.1f}"
+            )
+
+        dense_mb = skus * days * 8 / 1e6
+        self.stdout.write(f"(a dense SKU x day float64 matrix would need {dense_mb:,.0f} MB)")
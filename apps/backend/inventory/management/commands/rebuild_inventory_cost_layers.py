@@ -0,0 +1,34 @@
+"""
+Management command to rebuild inventory cost layers from movement history
+Usage: python manage.py rebuild_inventory_cost_layers [--tenant <slug>]
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.costing import CostLayerEngine
+from tenants.models import Tenant
+
+
+class Command(BaseCommand):
+    help = 'Replay InventoryMovement history into FIFO/LIFO/average cost layers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', type=str, help='Tenant slug (defaults to all tenants)')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rows per bulk write')
+
+    def handle(self, *args, **options):
+        tenants = Tenant.objects.all()
+        if options.get('tenant'):
+            tenants = tenants.filter(slug=options['tenant'])
+            if not tenants.exists():
+                raise CommandError(f"Tenant '{options['tenant']}' not found")
+
+        for tenant in tenants:
+            started = time.time()
+            counts = CostLayerEngine.rebuild(tenant, batch_size=options['batch_size'])
+            self.stdout.write(
+                f"{tenant.slug}: {counts['items']:,} items, {counts['movements']:,} movements, "
+                f"{counts['layers']:,} layers in {time.time() - started:.1f}s"
+            )
+        self.stdout.write(self.style.SUCCESS('Cost layers rebuilt'))
@@ -0,0 +1,76 @@
+# Generated by Django 4.2 on 2026-10-19 13:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0004_tenantonboardingprogress_preset_progress'),
+        ('inventory', '0003_inventoryvaluation_inventorysettings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventoryCostLayer',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('received_at', models.DateTimeField()),
+                ('quantity', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('unit_cost', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('fifo_remaining', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('lifo_remaining', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+            ],
+            options={
+                'verbose_name': 'Inventory Cost Layer',
+                'verbose_name_plural': 'Inventory Cost Layers',
+                'db_table': 'inventory_cost_layers',
+                'ordering': ['received_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='inventorymovement',
+            name='average_value',
+            field=models.DecimalField(blank=True, decimal_places=4, max_digits=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='inventorymovement',
+            name='balance_quantity',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True),
+        ),
+        migrations.AddField(
+            model_name='inventorymovement',
+            name='fifo_value',
+            field=models.DecimalField(blank=True, decimal_places=4, max_digits=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='inventorymovement',
+            name='lifo_value',
+            field=models.DecimalField(blank=True, decimal_places=4, max_digits=20, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='inventorymovement',
+            index=models.Index(fields=['item', 'movement_date'], name='inventory_m_item_id_0fd538_idx'),
+        ),
+        migrations.AddField(
+            model_name='inventorycostlayer',
+            name='item',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cost_layers', to='inventory.item'),
+        ),
+        migrations.AddField(
+            model_name='inventorycostlayer',
+            name='movement',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cost_layers', to='inventory.inventorymovement'),
+        ),
+        migrations.AddField(
+            model_name='inventorycostlayer',
+            name='tenant',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory_cost_layers', to='tenants.tenant'),
+        ),
+        migrations.AddIndex(
+            model_name='inventorycostlayer',
+            index=models.Index(fields=['item', 'received_at'], name='inventory_c_item_id_d3a712_idx'),
+        ),
+    ]
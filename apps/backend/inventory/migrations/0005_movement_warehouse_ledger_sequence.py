@@ -0,0 +1,28 @@
+# Generated by Django 4.2 on 2026-10-19 13:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0004_inventory_cost_layers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventorymovement',
+            name='ledger_sequence',
+            field=models.PositiveIntegerField(blank=True, help_text='Position in the item cost ledger', null=True),
+        ),
+        migrations.AddField(
+            model_name='inventorymovement',
+            name='warehouse',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='movements', to='inventory.warehouse'),
+        ),
+        migrations.AddIndex(
+            model_name='inventorymovement',
+            index=models.Index(fields=['item', 'ledger_sequence'], name='inventory_m_item_id_3012ff_idx'),
+        ),
+    ]
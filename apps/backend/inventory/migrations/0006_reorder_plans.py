@@ -0,0 +1,40 @@
+# Generated by Django 4.2 on 2026-10-19 13:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0004_tenantonboardingprogress_preset_progress'),
+        ('inventory', '0005_movement_warehouse_ledger_sequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReorderPlan',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('demand_per_day', models.DecimalField(decimal_places=4, default=0, max_digits=14)),
+                ('demand_std_per_day', models.DecimalField(decimal_places=4, default=0, max_digits=14)),
+                ('lead_time_days', models.DecimalField(decimal_places=2, default=0, max_digits=8)),
+                ('lead_time_std_days', models.DecimalField(decimal_places=2, default=0, max_digits=8)),
+                ('lead_time_samples', models.PositiveIntegerField(default=0)),
+                ('service_level', models.DecimalField(decimal_places=4, max_digits=5)),
+                ('safety_stock', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('reorder_point', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('history_start', models.DateField()),
+                ('history_end', models.DateField()),
+                ('computed_at', models.DateTimeField()),
+                ('item', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='reorder_plan', to='inventory.item')),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reorder_plans', to='tenants.tenant')),
+            ],
+            options={
+                'verbose_name': 'Reorder Plan',
+                'verbose_name_plural': 'Reorder Plans',
+                'db_table': 'inventory_reorder_plans',
+            },
+        ),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 import uuid
 from decimal import Decimal
 
@@ -92,16 +92,11 @@ class Item(models.Model):
         return self.current_stock <= self.reorder_point
 
     def update_stock(self, quantity, movement_type):
-        """Update stock level"""
-        if movement_type in ['purchase', 'return', 'adjustment_in']:
-            self.current_stock += quantity
-        elif movement_type in ['sale', 'damage', 'adjustment_out']:
-            self.current_stock -= quantity
+        """Update stock level with an atomic F() update"""
+        from .stock import adjust_item_stock, item_delta
         
-        if self.current_stock < 0:
-            self.current_stock = 0
-        
-        self.save()
+        if adjust_item_stock(self.pk, item_delta(movement_type, quantity)):
+            self.refresh_from_db(fields=['current_stock', 'updated_at'])
 
 
 class InventoryMovement(models.Model):
@@ -112,6 +107,7 @@ class InventoryMovement(models.Model):
     tenant = models.ForeignKey('tenants.Tenant', on_delete=models.CASCADE, related_name='inventory_movements')
     company = models.ForeignKey('tenants.Company', on_delete=models.CASCADE, related_name='inventory_movements')
     item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name='movements')
+    warehouse = models.ForeignKey('Warehouse', on_delete=models.SET_NULL, null=True, blank=True, related_name='movements')
     movement_type = models.CharField(max_length=20, choices=[
         ('purchase', 'Purchase'),
         ('sale', 'Sale'),
@@ -131,23 +127,101 @@ class InventoryMovement(models.Model):
     movement_date = models.DateTimeField(auto_now_add=True)
     created_by = models.ForeignKey('authentication.User', on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Running item balances after this movement (see inventory.costing)
+    ledger_sequence = models.PositiveIntegerField(null=True, blank=True, help_text='Position in the item cost ledger')
+    balance_quantity = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
+    fifo_value = models.DecimalField(max_digits=20, decimal_places=4, null=True, blank=True)
+    lifo_value = models.DecimalField(max_digits=20, decimal_places=4, null=True, blank=True)
+    average_value = models.DecimalField(max_digits=20, decimal_places=4, null=True, blank=True)
 
     class Meta:
         db_table = 'inventory_movements'
         verbose_name = 'Inventory Movement'
         verbose_name_plural = 'Inventory Movements'
         ordering = ['-movement_date']
+        indexes = [
+            models.Index(fields=['item', 'movement_date']),
+            models.Index(fields=['item', 'ledger_sequence']),
+        ]
 
     def __str__(self):
         return f"{self.movement_type} - {self.item.name} ({self.quantity})"
 
     def save(self, *args, **kwargs):
-        # Update item stock level
-        if not self.pk:  # Only on creation
-            self.item.update_stock(self.quantity, self.movement_type)
+        # Update cost layers and item/warehouse stock levels
+        if self._state.adding:  # Only on creation
+            from .costing import CostLayerEngine
+            from .stock import apply_stock_deltas
+            with transaction.atomic():
+                CostLayerEngine.record_movements([self], save=lambda: super(InventoryMovement, self).save(*args, **kwargs))
+                apply_stock_deltas([self])
+            if self._meta.get_field('item').is_cached(self):
+                self.item.refresh_from_db(fields=['current_stock', 'updated_at'])
+            return
         super().save(*args, **kwargs)
 
 
+class InventoryCostLayer(models.Model):
+    """
+    Inventory Cost Layer model for a receipt's quantity still on hand
+
+    FIFO and LIFO consume the same receipts in different orders, so each
+    layer tracks what remains under both methods.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tenant = models.ForeignKey('tenants.Tenant', on_delete=models.CASCADE, related_name='inventory_cost_layers')
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name='cost_layers')
+    movement = models.ForeignKey(InventoryMovement, on_delete=models.CASCADE, related_name='cost_layers')
+    received_at = models.DateTimeField()
+    quantity = models.DecimalField(max_digits=10, decimal_places=2)
+    unit_cost = models.DecimalField(max_digits=15, decimal_places=2)
+    fifo_remaining = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    lifo_remaining = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+
+    class Meta:
+        db_table = 'inventory_cost_layers'
+        verbose_name = 'Inventory Cost Layer'
+        verbose_name_plural = 'Inventory Cost Layers'
+        ordering = ['received_at']
+        indexes = [
+            models.Index(fields=['item', 'received_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.item_id} @ {self.unit_cost} ({self.fifo_remaining}/{self.quantity})"
+
+
+class ReorderPlan(models.Model):
+    """
+    Reorder Plan model for an item's demand-driven reorder point
+
+    Computed in batch by inventory.planning.ReorderPlanner from sales and
+    purchase receipt history; one row per item.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tenant = models.ForeignKey('tenants.Tenant', on_delete=models.CASCADE, related_name='reorder_plans')
+    item = models.OneToOneField(Item, on_delete=models.CASCADE, related_name='reorder_plan')
+    demand_per_day = models.DecimalField(max_digits=14, decimal_places=4, default=0)
+    demand_std_per_day = models.DecimalField(max_digits=14, decimal_places=4, default=0)
+    lead_time_days = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    lead_time_std_days = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    lead_time_samples = models.PositiveIntegerField(default=0)  # 0 = tenant/default lead time used
+    service_level = models.DecimalField(max_digits=5, decimal_places=4)
+    safety_stock = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    reorder_point = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    history_start = models.DateField()
+    history_end = models.DateField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'inventory_reorder_plans'
+        verbose_name = 'Reorder Plan'
+        verbose_name_plural = 'Reorder Plans'
+
+    def __str__(self):
+        return f"{self.item_id} reorder at {self.reorder_point}"
+
+
 class Warehouse(models.Model):
     """
     Warehouse model for managing multiple storage locations
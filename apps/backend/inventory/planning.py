@@ -0,0 +1,312 @@
+"""
+Inventory Reorder Planning
+Demand-driven reorder points and safety stock from movement history.
+
+Demand is bucketed per item and day by one grouped query and never
+expanded into a dense item x day matrix: per-item sums and sums of squares
+are accumulated with np.bincount over the non-empty buckets, and days
+without movements count as zero demand through each item's active bucket
+count. Lead times come from purchase receipts measured against their order
+dates. Results are stored on ReorderPlan so reads are a plain lookup.
+"""
+import math
+from datetime import timedelta
+from decimal import Decimal
+from statistics import NormalDist
+from typing import Dict, Optional
+
+import numpy as np
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Movement types that consume stock and count as demand
+DEMAND_MOVEMENTS = ('sale', 'damage')
+
+PLAN_FIELDS = [
+    'demand_per_day', 'demand_std_per_day', 'lead_time_days', 'lead_time_std_days', 'lead_time_samples',
+    'service_level', 'safety_stock', 'reorder_point', 'history_start', 'history_end', 'computed_at',
+]
+
+
+def planned_reorder_point():
+    """Item expression: the planned reorder point, or the static one for unplanned items"""
+    return Coalesce(F('reorder_plan__reorder_point'), F('reorder_point'))
+
+
+def planned_safety_stock():
+    """Item expression: the planned safety stock, or min_stock_level for unplanned items"""
+    return Coalesce(F('reorder_plan__safety_stock'), F('min_stock_level'))
+
+
+def _decimal(value: float, places: int) -> Decimal:
+    return Decimal(f"{value:.{places}f}")
+
+
+class ReorderPlanner:
+    """Computes and stores reorder plans for a tenant's items"""
+
+    DEFAULT_HISTORY_DAYS = 730
+    DEFAULT_SERVICE_LEVEL = 0.95
+    DEFAULT_LEAD_TIME_DAYS = 14
+    WRITE_BATCH_SIZE = 2000
+
+    @staticmethod
+    def service_factor(service_level: float) -> float:
+        """z-score for a cycle service level (0.95 -> 1.645)"""
+        if not 0 < service_level < 1:
+            raise ValueError('service_level must be between 0 and 1')
+        return NormalDist().inv_cdf(service_level)
+
+    @staticmethod
+    def bucket_statistics(item_index, bucket_index, quantities, first_bucket, n_buckets: int):
+        """
+        Per-item mean and sample variance of bucketed demand
+
+        Args:
+            item_index: int array, item position of each demand row
+            bucket_index: int array, bucket of each demand row
+            quantities: float array, quantity of each demand row
+            first_bucket: int array (one per item), first bucket the item
+                existed in; earlier buckets are not counted as zero demand
+            n_buckets: Buckets in the window
+
+        Returns:
+            (mean, variance) float arrays, one value per item
+        """
+        n_items = len(first_bucket)
+        first = np.clip(np.asarray(first_bucket, dtype=np.int64), 0, n_buckets - 1)
+
+        if len(item_index):
+            # Rows sharing an (item, bucket) are summed before squaring
+            keys = item_index.astype(np.int64) * n_buckets + bucket_index
+            keys, inverse = np.unique(keys, return_inverse=True)
+            totals = np.bincount(inverse, weights=quantities)
+            rows = keys // n_buckets
+            sums = np.bincount(rows, weights=totals, minlength=n_items)
+            squares = np.bincount(rows, weights=totals * totals, minlength=n_items)
+            # History recorded before the item's creation date still counts
+            np.minimum.at(first, rows, keys % n_buckets)
+        else:
+            sums = np.zeros(n_items)
+            squares = np.zeros(n_items)
+
+        counts = (n_buckets - first).astype(float)
+        mean = sums / counts
+        variance = np.where(
+            counts > 1, (squares - counts * mean * mean) / np.maximum(counts - 1, 1), 0.0
+        )
+        return mean, np.maximum(variance, 0.0)
+
+    @staticmethod
+    def sample_statistics(item_index, values, n_items: int):
+        """
+        Per-item sample count, mean and variance
+
+        Returns:
+            (count, mean, variance) arrays, one value per item
+        """
+        counts = np.bincount(item_index, minlength=n_items)
+        sums = np.bincount(item_index, weights=values, minlength=n_items)
+        squares = np.bincount(item_index, weights=values * values, minlength=n_items)
+        mean = np.divide(sums, counts, out=np.zeros(n_items), where=counts > 0)
+        variance = np.divide(
+            squares - counts * mean * mean, counts - 1, out=np.zeros(n_items), where=counts > 1
+        )
+        return counts, mean, np.maximum(variance, 0.0)
+
+    @classmethod
+    def compute(cls, item_index, day_offsets, quantities, first_day, n_days: int,
+                lead_index, lead_days, service_level: float = None, bucket_days: int = 1) -> Dict:
+        """
+        Reorder points for every item from demand rows and lead-time samples
+
+        Safety stock covers demand and lead-time variability:
+        z * sqrt(L * var(d) + d^2 * var(L)); the reorder point adds the
+        expected lead-time demand d * L. Demand is measured in buckets of
+        `bucket_days` and reported per day.
+
+        Args:
+            item_index, day_offsets, quantities: Demand rows (day offsets
+                from the start of the window)
+            first_day: Day offset each item was created (one per item)
+            n_days: Days in the window
+            lead_index, lead_days: Lead-time samples per item
+            service_level: Cycle service level (defaults to 95%)
+            bucket_days: Days per demand bucket
+
+        Returns:
+            dict of per-item arrays: demand_per_day, demand_std_per_day,
+            lead_time_days, lead_time_std_days, lead_time_samples,
+            safety_stock, reorder_point
+        """
+        z = cls.service_factor(service_level or cls.DEFAULT_SERVICE_LEVEL)
+        n_items = len(first_day)
+        n_buckets = max(math.ceil(n_days / bucket_days), 1)
+
+        mean, variance = cls.bucket_statistics(
+            item_index, day_offsets // bucket_days, quantities,
+            np.asarray(first_day, dtype=np.int64) // bucket_days, n_buckets,
+        )
+        demand = mean / bucket_days
+        demand_variance = variance / bucket_days
+
+        samples, lead_mean, lead_variance = cls.sample_statistics(lead_index, lead_days, n_items)
+        # Items never received use the tenant-wide lead time
+        if len(lead_days):
+            fallback_mean = float(np.mean(lead_days))
+            fallback_variance = float(np.var(lead_days, ddof=1)) if len(lead_days) > 1 else 0.0
+        else:
+            fallback_mean, fallback_variance = float(cls.DEFAULT_LEAD_TIME_DAYS), 0.0
+        lead_mean = np.where(samples > 0, lead_mean, fallback_mean)
+        lead_variance = np.where(samples > 0, lead_variance, fallback_variance)
+
+        safety_stock = z * np.sqrt(lead_mean * demand_variance + demand * demand * lead_variance)
+        return {
+            'demand_per_day': demand,
+            'demand_std_per_day': np.sqrt(demand_variance),
+            'lead_time_days': lead_mean,
+            'lead_time_std_days': np.sqrt(lead_variance),
+            'lead_time_samples': samples,
+            'safety_stock': safety_stock,
+            'reorder_point': demand * lead_mean + safety_stock,
+        }
+
+    @classmethod
+    def plan_tenant(cls, tenant, history_days: int = None, service_level: float = None, bucket_days: int = 1,
+                    as_of=None, apply_to_items: Optional[bool] = None) -> Dict:
+        """
+        Recompute reorder plans for all active tracked items of a tenant
+
+        Reads are one grouped demand query, one receipt query and one item
+        query; plans are upserted in batches and plans of items no longer
+        planned are removed.
+
+        Args:
+            tenant: Tenant instance
+            history_days: Days of history to use (default 730)
+            service_level: Cycle service level (default 0.95)
+            bucket_days: Days per demand bucket (1 = daily)
+            as_of: Last day of history (defaults to today)
+            apply_to_items: Copy reorder points onto Item.reorder_point
+                (defaults to InventorySettings.auto_calculate_reorder_points)
+
+        Returns:
+            dict with 'items', 'with_demand', 'with_lead_time' and 'applied'
+        """
+        from purchase.models import PurchaseReceiptLine
+        from .models import InventoryMovement, InventorySettings, Item, ReorderPlan
+
+        history_days = history_days or cls.DEFAULT_HISTORY_DAYS
+        service_level = service_level or cls.DEFAULT_SERVICE_LEVEL
+        end = as_of or timezone.localdate()
+        start = end - timedelta(days=history_days - 1)
+        origin = np.datetime64(start, 'D')
+
+        items = list(Item.objects.filter(tenant=tenant, is_active=True, is_tracked=True).values_list(
+            'id', 'created_at'
+        ))
+        item_ids = [item_id for item_id, _ in items]
+        positions = {item_id: position for position, item_id in enumerate(item_ids)}
+        first_day = (
+            np.array([timezone.localdate(created_at) for _, created_at in items], dtype='datetime64[D]') - origin
+        ).astype(np.int64) if items else np.zeros(0, dtype=np.int64)
+
+        demand_rows = InventoryMovement.objects.filter(
+            tenant=tenant,
+            movement_type__in=DEMAND_MOVEMENTS,
+            movement_date__date__range=(start, end),
+        ).annotate(day=TruncDate('movement_date')).values('item_id', 'day').annotate(
+            total=Sum('quantity')
+        ).values_list('item_id', 'day', 'total').order_by()
+        item_index, days, quantities = cls._collect(demand_rows, positions)
+
+        receipt_rows = PurchaseReceiptLine.objects.filter(
+            tenant=tenant,
+            purchase_receipt__receipt_date__range=(start, end),
+        ).values_list('item_id', 'purchase_receipt__receipt_date', 'purchase_receipt__purchase_order__order_date')
+        lead_index, receipt_days, order_days = cls._collect(receipt_rows, positions)
+        lead_days = (
+            np.array(receipt_days, dtype='datetime64[D]') - np.array(order_days, dtype='datetime64[D]')
+        ).astype(float)
+        valid = lead_days >= 0
+        lead_index, lead_days = lead_index[valid], lead_days[valid]
+
+        result = cls.compute(
+            item_index,
+            (np.array(days, dtype='datetime64[D]') - origin).astype(np.int64),
+            np.array(quantities, dtype=float),
+            first_day,
+            history_days,
+            lead_index,
+            lead_days,
+            service_level=service_level,
+            bucket_days=bucket_days,
+        )
+
+        if apply_to_items is None:
+            apply_to_items = InventorySettings.objects.filter(
+                tenant=tenant, auto_calculate_reorder_points=True
+            ).exists()
+
+        computed_at = timezone.now()
+        plans = [
+            ReorderPlan(
+                tenant=tenant,
+                item_id=item_id,
+                demand_per_day=_decimal(result['demand_per_day'][position], 4),
+                demand_std_per_day=_decimal(result['demand_std_per_day'][position], 4),
+                lead_time_days=_decimal(result['lead_time_days'][position], 2),
+                lead_time_std_days=_decimal(result['lead_time_std_days'][position], 2),
+                lead_time_samples=int(result['lead_time_samples'][position]),
+                service_level=_decimal(service_level, 4),
+                safety_stock=_decimal(result['safety_stock'][position], 2),
+                reorder_point=_decimal(result['reorder_point'][position], 2),
+                history_start=start,
+                history_end=end,
+                computed_at=computed_at,
+            )
+            for position, item_id in enumerate(item_ids)
+        ]
+
+        with transaction.atomic():
+            ReorderPlan.objects.bulk_create(
+                plans,
+                batch_size=cls.WRITE_BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=['item'],
+                update_fields=PLAN_FIELDS,
+            )
+            ReorderPlan.objects.filter(tenant=tenant, computed_at__lt=computed_at).delete()
+            if apply_to_items:
+                Item.objects.filter(tenant=tenant, reorder_plan__isnull=False).update(
+                    reorder_point=Subquery(
+                        ReorderPlan.objects.filter(item=OuterRef('pk')).values('reorder_point')[:1]
+                    ),
+                    updated_at=computed_at,
+                )
+
+        logger.info(f"Planned reorder points for {len(plans)} items of tenant {tenant.id}")
+        return {
+            'items': len(plans),
+            'with_demand': int(np.count_nonzero(result['demand_per_day'])),
+            'with_lead_time': int(np.count_nonzero(result['lead_time_samples'])),
+            'applied': bool(apply_to_items),
+        }
+
+    @staticmethod
+    def _collect(rows, positions):
+        """Split (item_id, a, b) rows into an item position array and two lists, dropping unknown items"""
+        item_index, first, second = [], [], []
+        for item_id, a, b in rows.iterator(chunk_size=10000):
+            position = positions.get(item_id)
+            if position is None:
+                continue
+            item_index.append(position)
+            first.append(a)
+            second.append(b)
+        return np.array(item_index, dtype=np.int64), first, second
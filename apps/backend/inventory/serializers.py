@@ -1,8 +1,12 @@
 from rest_framework import serializers
-from .models import Item, ItemCategory, InventoryMovement, Warehouse, WarehouseStock, InventoryValuation, InventorySettings
+from backend.fieldsets import SparseFieldsetMixin
+from .models import (
+    Item, ItemCategory, InventoryMovement, Warehouse, WarehouseStock, InventoryValuation, InventorySettings,
+    ReorderPlan,
+)
 
 
-class ItemCategorySerializer(serializers.ModelSerializer):
+class ItemCategorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Item Category"""
     children_count = serializers.SerializerMethodField()
     
@@ -26,7 +30,7 @@ class ItemCategoryDetailSerializer(ItemCategorySerializer):
         fields = ItemCategorySerializer.Meta.fields + ['children']
 
 
-class ItemSerializer(serializers.ModelSerializer):
+class ItemSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Item"""
     category_name = serializers.CharField(source='category.name', read_only=True)
     company_name = serializers.CharField(source='company.name', read_only=True)
@@ -76,7 +80,7 @@ class ItemDetailSerializer(ItemSerializer):
         return WarehouseStockSerializer(warehouse_stock, many=True).data
 
 
-class InventoryMovementSerializer(serializers.ModelSerializer):
+class InventoryMovementSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Inventory Movement"""
     item_name = serializers.CharField(source='item.name', read_only=True)
     item_sku = serializers.CharField(source='item.sku', read_only=True)
@@ -85,15 +89,36 @@ class InventoryMovementSerializer(serializers.ModelSerializer):
     class Meta:
         model = InventoryMovement
         fields = [
-            'id', 'item', 'item_name', 'item_sku', 'movement_type',
+            'id', 'item', 'item_name', 'item_sku', 'warehouse', 'movement_type',
             'quantity', 'unit_cost', 'reference', 'reference_type',
             'reference_id', 'notes', 'movement_date', 'created_by',
-            'created_by_name', 'created_at'
+            'created_by_name', 'created_at', 'balance_quantity',
+            'fifo_value', 'lifo_value', 'average_value'
         ]
-        read_only_fields = ['id', 'movement_date', 'created_at']
+        read_only_fields = [
+            'id', 'movement_date', 'created_at', 'balance_quantity',
+            'fifo_value', 'lifo_value', 'average_value'
+        ]
+
 
+class ReorderPlanSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """Serializer for Reorder Plan"""
+    item_sku = serializers.CharField(source='item.sku', read_only=True)
+    item_name = serializers.CharField(source='item.name', read_only=True)
+    current_stock = serializers.DecimalField(source='item.current_stock', max_digits=10, decimal_places=2, read_only=True)
 
-class WarehouseSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ReorderPlan
+        fields = [
+            'id', 'item', 'item_sku', 'item_name', 'current_stock',
+            'demand_per_day', 'demand_std_per_day', 'lead_time_days', 'lead_time_std_days',
+            'lead_time_samples', 'service_level', 'safety_stock', 'reorder_point',
+            'history_start', 'history_end', 'computed_at'
+        ]
+        read_only_fields = fields
+
+
+class WarehouseSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Warehouse"""
     manager_name = serializers.CharField(source='manager.get_full_name', read_only=True)
     company_name = serializers.CharField(source='company.name', read_only=True)
@@ -113,7 +138,7 @@ class WarehouseSerializer(serializers.ModelSerializer):
         return obj.stock_levels.count()
 
 
-class WarehouseStockSerializer(serializers.ModelSerializer):
+class WarehouseStockSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Warehouse Stock"""
     item_name = serializers.CharField(source='item.name', read_only=True)
     item_sku = serializers.CharField(source='item.sku', read_only=True)
@@ -152,6 +177,12 @@ class StockAdjustmentSerializer(serializers.Serializer):
         return value
 
 
+class ItemBulkOptionsSerializer(serializers.Serializer):
+    """Flags of a bulk item request (the rows themselves are validated by ItemBulkService)"""
+    partial = serializers.BooleanField(default=False)
+    dry_run = serializers.BooleanField(default=False)
+
+
 class InventorySummarySerializer(serializers.Serializer):
     """Serializer for inventory summary data"""
     total_items = serializers.IntegerField()
@@ -161,7 +192,7 @@ class InventorySummarySerializer(serializers.Serializer):
     total_inventory_value = serializers.DecimalField(max_digits=15, decimal_places=2)
 
 
-class InventoryValuationSerializer(serializers.ModelSerializer):
+class InventoryValuationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Inventory Valuation"""
     calculated_by_name = serializers.CharField(source='calculated_by.get_full_name', read_only=True)
     
@@ -176,7 +207,7 @@ class InventoryValuationSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at', 'calculated_at']
 
 
-class InventorySettingsSerializer(serializers.ModelSerializer):
+class InventorySettingsSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Inventory Settings"""
     default_warehouse_name = serializers.CharField(source='default_warehouse.name', read_only=True)
     
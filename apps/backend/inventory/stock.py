@@ -0,0 +1,129 @@
+"""
+Inventory Stock
+Atomic stock-level updates for Item and WarehouseStock.
+
+Stock is never read, modified and written back from Python. Each change
+is a single UPDATE with F() expressions, so concurrent movements of the
+same SKU cannot overwrite each other.
+"""
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+import logging
+
+from .costing import INBOUND_MOVEMENTS, OUTBOUND_MOVEMENTS, CostLayerEngine
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal('0')
+
+WAREHOUSE_INBOUND_MOVEMENTS = INBOUND_MOVEMENTS + ('transfer_in',)
+WAREHOUSE_OUTBOUND_MOVEMENTS = OUTBOUND_MOVEMENTS + ('transfer_out',)
+
+
+def item_delta(movement_type: str, quantity) -> Decimal:
+    """Signed change to Item.current_stock (transfers leave the total unchanged)"""
+    if movement_type in INBOUND_MOVEMENTS:
+        return quantity
+    if movement_type in OUTBOUND_MOVEMENTS:
+        return -quantity
+    return ZERO
+
+
+def warehouse_delta(movement_type: str, quantity) -> Decimal:
+    """Signed change to WarehouseStock.quantity"""
+    if movement_type in WAREHOUSE_INBOUND_MOVEMENTS:
+        return quantity
+    if movement_type in WAREHOUSE_OUTBOUND_MOVEMENTS:
+        return -quantity
+    return ZERO
+
+
+def adjust_item_stock(item_id, delta: Decimal) -> int:
+    """Atomically add delta to an item's stock, flooring at zero"""
+    from .models import Item
+
+    if not delta:
+        return 0
+    return Item.objects.filter(pk=item_id).update(
+        current_stock=Greatest(F('current_stock') + delta, Value(ZERO)),
+        updated_at=timezone.now(),
+    )
+
+
+def adjust_warehouse_stock(tenant_id, warehouse_id, item_id, delta: Decimal) -> int:
+    """Atomically add delta to an item's stock in a warehouse, creating the row if needed"""
+    from .models import WarehouseStock
+
+    if not delta:
+        return 0
+    WarehouseStock.objects.bulk_create(
+        [WarehouseStock(tenant_id=tenant_id, warehouse_id=warehouse_id, item_id=item_id)],
+        ignore_conflicts=True,
+    )
+    new_quantity = Greatest(F('quantity') + delta, Value(ZERO))
+    return WarehouseStock.objects.filter(warehouse_id=warehouse_id, item_id=item_id).update(
+        quantity=new_quantity,
+        available_quantity=new_quantity - F('reserved_quantity'),
+        last_updated=timezone.now(),
+    )
+
+
+def group_deltas(movements) -> Tuple[Dict, Dict]:
+    """
+    Net stock deltas per item and per (item, warehouse)
+
+    Returns:
+        (item deltas, {(tenant_id, warehouse_id, item_id): delta})
+    """
+    item_deltas: Dict = OrderedDict()
+    warehouse_deltas: Dict = OrderedDict()
+    for movement in movements:
+        delta = item_delta(movement.movement_type, movement.quantity)
+        if delta:
+            item_deltas[movement.item_id] = item_deltas.get(movement.item_id, ZERO) + delta
+        if movement.warehouse_id:
+            delta = warehouse_delta(movement.movement_type, movement.quantity)
+            if delta:
+                key = (movement.tenant_id, movement.warehouse_id, movement.item_id)
+                warehouse_deltas[key] = warehouse_deltas.get(key, ZERO) + delta
+    return item_deltas, warehouse_deltas
+
+
+def apply_stock_deltas(movements) -> None:
+    """Apply the net stock change of movements, one UPDATE per item and per (item, warehouse)"""
+    item_deltas, warehouse_deltas = group_deltas(movements)
+    # Stable order keeps concurrent batches from deadlocking on row locks
+    for item_id in sorted(item_deltas, key=str):
+        adjust_item_stock(item_id, item_deltas[item_id])
+    for tenant_id, warehouse_id, item_id in sorted(warehouse_deltas, key=lambda key: (str(key[2]), str(key[1]))):
+        adjust_warehouse_stock(tenant_id, warehouse_id, item_id, warehouse_deltas[(tenant_id, warehouse_id, item_id)])
+
+
+def apply_movements(movements: Iterable) -> List:
+    """
+    Record a batch of inventory movements
+
+    Movements are inserted with one bulk_create, layered for costing in
+    list order, and their stock deltas are netted per item and per
+    (item, warehouse) and applied as one F() update per group. Floors at
+    zero apply to the net change of the batch.
+
+    Args:
+        movements: Unsaved InventoryMovement instances
+
+    Returns:
+        The saved movements
+    """
+    movements = list(movements)
+    if not movements:
+        return movements
+
+    with transaction.atomic():
+        CostLayerEngine.record_movements(movements)
+        apply_stock_deltas(movements)
+    return movements
@@ -1,3 +1,552 @@
-from django.test import TestCase
+"""
+Unit tests for inventory app
+"""
+import threading
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
 
-# Create your tests here.
+import numpy as np
+
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from tenants.models import Tenant, Company
+from authentication.models import User
+from .models import Item, InventoryMovement, InventoryCostLayer, Warehouse, WarehouseStock, ReorderPlan, InventorySettings
+from .costing import CostLayerEngine
+from .stock import apply_movements
+from .bulk import ItemBulkService
+from .planning import ReorderPlanner
+
+
+class CostLayerEngineTest(TestCase):
+    """Test perpetual FIFO/LIFO/average cost layers"""
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(
+            name='Inventory Tenant',
+            slug='inventory_tenant',
+            is_active=True
+        )
+        self.company = Company.objects.create(
+            tenant=self.tenant,
+            name='Inventory Company',
+            registration_number='123456789'
+        )
+        self.user = User.objects.create_user(
+            username='inventory',
+            email='inventory@example.com',
+            password='testpass123',
+            tenant=self.tenant,
+            role='accountant'
+        )
+        self.item = Item.objects.create(
+            tenant=self.tenant,
+            company=self.company,
+            sku='SKU-1',
+            name='Widget',
+            cost_price=Decimal('10.00')
+        )
+
+    def _move(self, movement_type, quantity, unit_cost=None):
+        return InventoryMovement.objects.create(
+            tenant=self.tenant,
+            company=self.company,
+            item=self.item,
+            movement_type=movement_type,
+            quantity=Decimal(quantity),
+            unit_cost=Decimal(unit_cost) if unit_cost else None,
+            created_by=self.user
+        )
+
+    def _receive_and_sell(self):
+        self._move('purchase', '10', '10')
+        self._move('purchase', '10', '20')
+        return self._move('sale', '15')
+
+    def test_running_values_per_method(self):
+        """Test each movement is stamped with FIFO, LIFO and average values"""
+        sale = self._receive_and_sell()
+
+        self.assertEqual(sale.balance_quantity, Decimal('5'))
+        self.assertEqual(sale.fifo_value, Decimal('100'))  # 5 @ 20
+        self.assertEqual(sale.lifo_value, Decimal('50'))  # 5 @ 10
+        self.assertEqual(sale.average_value, Decimal('75'))  # 5 @ 15
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.current_stock, Decimal('5'))
+
+    def test_value_inventory_as_of(self):
+        """Test valuation reads the ledger as of a date in one query"""
+        self._receive_and_sell()
+        # Item without movements is valued from current stock
+        Item.objects.create(
+            tenant=self.tenant, company=self.company, sku='SKU-2', name='Gadget',
+            cost_price=Decimal('2.00'), current_stock=Decimal('3')
+        )
+        items = Item.objects.filter(tenant=self.tenant)
+
+        with self.assertNumQueries(1):
+            total, count = CostLayerEngine.value_inventory(items, 'lifo')
+        self.assertEqual((total, count), (Decimal('56'), 2))
+
+        # Before its first movement a ledgered item holds no value
+        yesterday = timezone.now() - timedelta(days=1)
+        total, _ = CostLayerEngine.value_inventory(items.filter(pk=self.item.pk), 'fifo', yesterday)
+        self.assertEqual(total, Decimal('0'))
+
+        with self.assertRaises(ValueError):
+            CostLayerEngine.value_inventory(items, 'specific_identification')
+
+    def test_rebuild_matches_incremental(self):
+        """Test replaying history reproduces the incremental ledger"""
+        self._receive_and_sell()
+        self._move('purchase', '4', '30')
+        self._move('damage', '6')
+        expected = list(InventoryMovement.objects.order_by('movement_date').values_list(
+            'balance_quantity', 'fifo_value', 'lifo_value', 'average_value'
+        ))
+        remaining = sorted(InventoryCostLayer.objects.values_list('fifo_remaining', 'lifo_remaining'))
+
+        InventoryMovement.objects.update(balance_quantity=None, fifo_value=None, lifo_value=None, average_value=None)
+        counts = CostLayerEngine.rebuild(self.tenant)
+
+        self.assertEqual(counts, {'items': 1, 'movements': 5, 'layers': 3})
+        self.assertEqual(list(InventoryMovement.objects.order_by('movement_date').values_list(
+            'balance_quantity', 'fifo_value', 'lifo_value', 'average_value'
+        )), expected)
+        self.assertEqual(sorted(InventoryCostLayer.objects.values_list('fifo_remaining', 'lifo_remaining')), remaining)
+
+    def test_backdated_movement_replays_ledger(self):
+        """Test a movement dated before the last ledgered one is sequenced by date"""
+        now = timezone.now()
+        first = self._move('purchase', '10', '10')
+        second = self._move('purchase', '10', '20')
+        InventoryMovement.objects.filter(pk=first.pk).update(movement_date=now - timedelta(hours=2))
+        InventoryMovement.objects.filter(pk=second.pk).update(movement_date=now - timedelta(hours=1))
+
+        sale = InventoryMovement(
+            tenant=self.tenant, company=self.company, item=self.item,
+            movement_type='sale', quantity=Decimal('5'), created_by=self.user
+        )
+
+        def import_row():
+            InventoryMovement.objects.bulk_create([sale])
+            sale.movement_date = now - timedelta(minutes=90)
+            InventoryMovement.objects.filter(pk=sale.pk).update(movement_date=sale.movement_date)
+
+        with transaction.atomic():
+            CostLayerEngine.record_movements([sale], save=import_row)
+
+        ledger = list(InventoryMovement.objects.order_by('ledger_sequence').values_list(
+            'pk', 'balance_quantity', 'fifo_value', 'lifo_value'
+        ))
+        self.assertEqual(ledger, [
+            (first.pk, Decimal('10'), Decimal('100'), Decimal('100')),
+            (sale.pk, Decimal('5'), Decimal('50'), Decimal('50')),
+            (second.pk, Decimal('15'), Decimal('250'), Decimal('250')),
+        ])
+        self.assertEqual((sale.ledger_sequence, sale.balance_quantity), (2, Decimal('5')))
+
+        items = Item.objects.filter(pk=self.item.pk)
+        total, _ = CostLayerEngine.value_inventory(items, 'fifo', now - timedelta(minutes=75))
+        self.assertEqual(total, Decimal('50'))
+
+    def test_adjust_stock_endpoint(self):
+        """Test adjust_stock records Decimal movements and rejects bad quantities"""
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        url = f'/api/v1/inventory/items/{self.item.pk}/adjust_stock/'
+
+        response = client.post(url, {'quantity': '2.5', 'movement_type': 'adjustment_in'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        response = client.post(url, {'quantity': 1, 'movement_type': 'adjustment_out'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        for quantity in ('abc', '0', 'NaN'):
+            response = client.post(url, {'quantity': quantity, 'movement_type': 'adjustment_in'}, format='json')
+            self.assertEqual(response.status_code, 400)
+
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.current_stock, Decimal('1.5'))
+        self.assertEqual(
+            InventoryMovement.objects.order_by('ledger_sequence').last().fifo_value, Decimal('15')
+        )
+
+
+class StockUpdateTest(TestCase):
+    """Test atomic stock updates and the bulk movement API"""
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(
+            name='Stock Tenant',
+            slug='stock_tenant',
+            is_active=True
+        )
+        self.company = Company.objects.create(
+            tenant=self.tenant,
+            name='Stock Company',
+            registration_number='123456789'
+        )
+        self.user = User.objects.create_user(
+            username='stock',
+            email='stock@example.com',
+            password='testpass123',
+            tenant=self.tenant,
+            role='accountant'
+        )
+        self.warehouse = Warehouse.objects.create(
+            tenant=self.tenant, company=self.company, name='Main', code='MAIN'
+        )
+        self.items = [
+            Item.objects.create(
+                tenant=self.tenant, company=self.company, sku=f'SKU-{index}', name=f'Item {index}',
+                cost_price=Decimal('5.00')
+            )
+            for index in range(3)
+        ]
+
+    def _movement(self, item, movement_type, quantity):
+        return InventoryMovement(
+            tenant=self.tenant,
+            company=self.company,
+            item=item,
+            warehouse=self.warehouse,
+            movement_type=movement_type,
+            quantity=Decimal(quantity),
+            created_by=self.user
+        )
+
+    def test_save_updates_item_and_warehouse_stock(self):
+        """Test a single movement updates both stock levels"""
+        item = self.items[0]
+        self._movement(item, 'purchase', '8').save()
+        self._movement(item, 'sale', '3').save()
+
+        self.assertEqual(item.current_stock, Decimal('5'))
+        stock = WarehouseStock.objects.get(warehouse=self.warehouse, item=item)
+        self.assertEqual((stock.quantity, stock.available_quantity), (Decimal('5'), Decimal('5')))
+
+    def test_apply_movements_groups_deltas(self):
+        """Test one stock update per item and per (item, warehouse)"""
+        movements = [
+            self._movement(item, movement_type, quantity)
+            for item in self.items
+            for movement_type, quantity in (('purchase', '10'), ('sale', '4'), ('purchase', '1'))
+        ]
+
+        apply_movements(movements)
+
+        self.assertEqual(
+            sorted(Item.objects.filter(tenant=self.tenant).values_list('current_stock', flat=True)),
+            [Decimal('7')] * 3
+        )
+        self.assertEqual(
+            list(WarehouseStock.objects.filter(item__in=self.items).values_list('quantity', flat=True).distinct()),
+            [Decimal('7')]
+        )
+        # Cost ledger follows list order
+        self.assertEqual(
+            list(InventoryMovement.objects.filter(item=self.items[0]).order_by('ledger_sequence').values_list(
+                'ledger_sequence', 'balance_quantity'
+            )),
+            [(1, Decimal('10')), (2, Decimal('6')), (3, Decimal('7'))]
+        )
+
+    def test_apply_movements_query_count_is_per_group(self):
+        """Test the number of statements does not grow with movements per item"""
+        def run(count):
+            movements = [self._movement(item, 'purchase', '1') for item in self.items for _ in range(count)]
+            with CaptureQueriesContext(connection) as queries:
+                apply_movements(movements)
+            return len(queries)
+
+        # Small batches so SQLite does not split the INSERT on its variable limit
+        self.assertEqual(run(2), run(10))
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class ConcurrentStockUpdateTest(TransactionTestCase):
+    """Stress test: concurrent sales of one SKU must not lose updates"""
+
+    threads = 8
+    sales_per_thread = 10
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name='Concurrent Tenant', slug='concurrent_tenant', is_active=True)
+        self.company = Company.objects.create(tenant=self.tenant, name='Concurrent', registration_number='1')
+        self.user = User.objects.create_user(
+            username='concurrent', email='concurrent@example.com', password='testpass123',
+            tenant=self.tenant, role='accountant'
+        )
+        self.warehouse = Warehouse.objects.create(tenant=self.tenant, company=self.company, name='Main', code='MAIN')
+        self.item = Item.objects.create(
+            tenant=self.tenant, company=self.company, sku='HOT-SKU', name='Hot item', cost_price=Decimal('1.00')
+        )
+        InventoryMovement.objects.create(
+            tenant=self.tenant, company=self.company, item=self.item, warehouse=self.warehouse,
+            movement_type='purchase', quantity=Decimal('1000'), created_by=self.user
+        )
+
+    def test_no_lost_updates(self):
+        barrier = threading.Barrier(self.threads)
+        errors = []
+
+        def sell():
+            try:
+                barrier.wait()
+                for _ in range(self.sales_per_thread):
+                    InventoryMovement.objects.create(
+                        tenant_id=self.tenant.id, company_id=self.company.id, item_id=self.item.id,
+                        warehouse_id=self.warehouse.id, movement_type='sale', quantity=Decimal('1'),
+                        created_by_id=self.user.id
+                    )
+            except Exception as e:  # pragma: no cover - surfaced below
+                errors.append(e)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=sell) for _ in range(self.threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual(errors, [])
+        sold = self.threads * self.sales_per_thread
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.current_stock, Decimal(1000 - sold))
+        stock = WarehouseStock.objects.get(warehouse=self.warehouse, item=self.item)
+        self.assertEqual(stock.quantity, Decimal(1000 - sold))
+        self.assertEqual(
+            InventoryMovement.objects.filter(item=self.item).order_by('-ledger_sequence').values_list(
+                'ledger_sequence', 'balance_quantity'
+            ).first(),
+            (sold + 1, Decimal(1000 - sold))
+        )
+
+
+class ItemBulkServiceTest(TestCase):
+    """Test batched item updates and upserts"""
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(
+            name='Bulk Tenant',
+            slug='bulk_tenant',
+            is_active=True
+        )
+        self.company = Company.objects.create(
+            tenant=self.tenant,
+            name='Bulk Company',
+            registration_number='123456789'
+        )
+        Item.objects.bulk_create([
+            Item(tenant=self.tenant, company=self.company, sku=f'SKU-{index}', name=f'Item {index}')
+            for index in range(30)
+        ])
+        self.items = list(Item.objects.filter(tenant=self.tenant).order_by('sku'))
+
+    def test_reorder_points_in_constant_queries(self):
+        """Test a batch is one fetch plus one bulk update"""
+        rows = [{'id': str(item.id), 'reorder_point': '12.5'} for item in self.items]
+        rows[0]['reorder_point'] = '0'  # unchanged
+
+        # Fetch, savepoint, bulk update, release
+        with self.assertNumQueries(4):
+            result = ItemBulkService.apply(self.tenant, 'reorder_points', rows)
+
+        self.assertTrue(result['ok'])
+        self.assertEqual(result['counts'], {'created': 0, 'updated': 29, 'unchanged': 1, 'error': 0})
+        self.assertEqual(result['results'][1], {'index': 1, 'id': str(self.items[1].id), 'status': 'updated'})
+        self.assertEqual(
+            Item.objects.filter(tenant=self.tenant, reorder_point=Decimal('12.5')).count(), 29
+        )
+
+    def test_upsert_by_sku(self):
+        """Test existing skus are updated and new ones created"""
+        result = ItemBulkService.apply(self.tenant, 'upsert', [
+            {'sku': 'SKU-1', 'name': 'Renamed', 'selling_price': '9.99'},
+            {'sku': 'NEW-1', 'name': 'New item', 'is_active': 'false'},
+        ], company=self.company.pk)
+
+        self.assertEqual([row['status'] for row in result['results']], ['updated', 'created'])
+        self.assertEqual(Item.objects.get(sku='SKU-1').selling_price, Decimal('9.99'))
+        self.assertFalse(Item.objects.get(sku='NEW-1').is_active)
+
+    def test_upsert_sku_collisions(self):
+        """Test skus taken by another item or twice in the batch are row errors, not IntegrityErrors"""
+        rows = [
+            {'id': str(self.items[0].id), 'sku': self.items[1].sku},
+            {'sku': 'NEW-1', 'name': 'First'},
+            {'id': str(self.items[2].id), 'sku': 'NEW-1'},
+            {'id': str(self.items[3].id), 'sku': 'RENAMED-3'},
+        ]
+        result = ItemBulkService.apply(self.tenant, 'upsert', rows, company=self.company.pk, partial=True)
+
+        self.assertEqual([row['status'] for row in result['results']], ['error', 'created', 'error', 'updated'])
+        self.assertIn('sku', result['results'][0]['errors'])
+        self.assertIn('sku', result['results'][2]['errors'])
+        self.assertEqual(Item.objects.get(pk=self.items[0].pk).sku, self.items[0].sku)
+        self.assertEqual(Item.objects.get(pk=self.items[3].pk).sku, 'RENAMED-3')
+        self.assertTrue(Item.objects.filter(sku='NEW-1', name='First').exists())
+
+    def test_bulk_endpoints(self):
+        """Test string flags are parsed as booleans and the reorder endpoint keeps its items list"""
+        user = User.objects.create_user(
+            username='bulkuser', email='bulk@example.com', password='testpass123',
+            tenant=self.tenant, role='accountant'
+        )
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        rows = [{'id': str(self.items[0].id), 'is_active': False}, {'id': 'not-a-uuid', 'is_active': False}]
+        response = client.post('/api/v1/inventory/items/bulk/', {
+            'operation': 'activation', 'items': rows, 'partial': 'false'
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(Item.objects.get(pk=self.items[0].pk).is_active)
+        response = client.post('/api/v1/inventory/items/bulk/', {
+            'operation': 'activation', 'items': rows, 'partial': 'maybe'
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('partial', response.data)
+
+        response = client.post('/api/v1/inventory/reorder-points/bulk-update/', {'updates': [
+            {'item_id': str(self.items[1].id), 'reorder_point': '7'},
+            {'item_id': str(self.items[2].id), 'reorder_point': '0'},
+            {'item_id': 'not-a-uuid', 'reorder_point': '7'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated_count'], 2)
+        self.assertEqual([item['id'] for item in response.data['items']], [str(self.items[1].id), str(self.items[2].id)])
+        self.assertEqual(response.data['items'][0]['reorder_point'], '7.00')
+
+    def test_invalid_row_rejects_batch(self):
+        """Test one bad row writes nothing unless partial"""
+        rows = [
+            {'id': str(self.items[0].id), 'is_active': False},
+            {'id': str(self.items[1].id), 'selling_price': '1'},
+            {'id': 'not-a-uuid', 'is_active': False},
+        ]
+
+        result = ItemBulkService.apply(self.tenant, 'activation', rows)
+        self.assertFalse(result['ok'])
+        self.assertEqual([row['status'] for row in result['results']], ['skipped', 'error', 'error'])
+        self.assertIn('selling_price', result['results'][1]['errors'])
+        self.assertTrue(Item.objects.get(pk=self.items[0].pk).is_active)
+
+        result = ItemBulkService.apply(self.tenant, 'activation', rows, partial=True)
+        self.assertEqual(result['results'][0]['status'], 'updated')
+        self.assertFalse(Item.objects.get(pk=self.items[0].pk).is_active)
+
+    def test_batch_size_limit(self):
+        """Test batches over the configured bound are refused"""
+        with self.settings(INVENTORY_BULK_MAX_ITEMS=10):
+            with self.assertRaises(ValueError):
+                ItemBulkService.apply(self.tenant, 'prices', [{'id': str(item.id)} for item in self.items])
+
+
+class ReorderPlannerTest(TestCase):
+    """Test demand-driven reorder point planning"""
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(
+            name='Planning Tenant',
+            slug='planning_tenant',
+            is_active=True
+        )
+        self.company = Company.objects.create(
+            tenant=self.tenant,
+            name='Planning Company',
+            registration_number='123456789'
+        )
+        self.user = User.objects.create_user(
+            username='planner',
+            email='planner@example.com',
+            password='testpass123',
+            tenant=self.tenant,
+            role='accountant'
+        )
+
+    def test_sparse_statistics_match_dense_series(self):
+        """Test bincount statistics equal mean/variance of the zero-filled daily series"""
+        rng = np.random.default_rng(1)
+        dense = rng.poisson(2, (40, 60)) * (rng.random((40, 60)) < 0.3)
+        first_day = rng.integers(0, 20, 40)
+        for row, first in enumerate(first_day):
+            dense[row, :first] = 0
+        item_index, day_offsets = np.nonzero(dense)
+
+        result = ReorderPlanner.compute(
+            item_index, day_offsets, dense[item_index, day_offsets].astype(float), first_day, 60,
+            np.array([0, 0, 1], dtype=np.int64), np.array([4.0, 6.0, 10.0]),
+        )
+
+        expected_mean = [dense[row, first:].mean() for row, first in enumerate(first_day)]
+        expected_std = [dense[row, first:].std(ddof=1) for row, first in enumerate(first_day)]
+        np.testing.assert_allclose(result['demand_per_day'], expected_mean)
+        np.testing.assert_allclose(result['demand_std_per_day'], expected_std)
+        self.assertEqual(list(result['lead_time_days'][:3]), [5.0, 10.0, 20 / 3])
+
+    def test_plan_tenant_stores_plans(self):
+        """Test plans come from sales and receipt lead times and can update items"""
+        from purchase.models import Supplier, PurchaseOrder, PurchaseOrderLine, PurchaseReceipt, PurchaseReceiptLine
+
+        warehouse = Warehouse.objects.create(tenant=self.tenant, company=self.company, name='Main', code='MAIN')
+        steady, idle = [
+            Item.objects.create(tenant=self.tenant, company=self.company, sku=sku, name=sku, reorder_point=Decimal('3'))
+            for sku in ('STEADY', 'IDLE')
+        ]
+        as_of = date(2024, 3, 31)
+        sales = apply_movements([
+            InventoryMovement(
+                tenant=self.tenant, company=self.company, item=steady, movement_type='sale',
+                quantity=Decimal('2'), created_by=self.user
+            )
+            for _ in range(30)
+        ])
+        # movement_date is auto_now_add; backdate one sale per day of March
+        for day, sale in enumerate(sales, start=1):
+            InventoryMovement.objects.filter(pk=sale.pk).update(
+                movement_date=datetime(2024, 3, day, 12, tzinfo=dt_timezone.utc)
+            )
+
+        supplier = Supplier.objects.create(
+            tenant=self.tenant, company=self.company, name='Supplier', created_by=self.user
+        )
+        for number, (ordered, received) in enumerate(((date(2024, 1, 1), date(2024, 1, 6)),
+                                                      (date(2024, 2, 1), date(2024, 2, 11)))):
+            order = PurchaseOrder.objects.create(
+                tenant=self.tenant, company=self.company, order_number=f'PO-{number}', supplier=supplier,
+                order_date=ordered, created_by=self.user
+            )
+            line = PurchaseOrderLine.objects.create(
+                tenant=self.tenant, purchase_order=order, item=steady, description='Stock',
+                quantity=Decimal('50'), unit_price=Decimal('1'), line_total=Decimal('50'),
+                tax_rate=Decimal('0'), discount_rate=Decimal('0')
+            )
+            receipt = PurchaseReceipt.objects.create(
+                tenant=self.tenant, company=self.company, receipt_number=f'GR-{number}', purchase_order=order,
+                receipt_date=received, warehouse=warehouse, supplier=supplier, created_by=self.user
+            )
+            PurchaseReceiptLine.objects.create(
+                tenant=self.tenant, purchase_receipt=receipt, purchase_order_line=line, item=steady,
+                quantity_received=Decimal('50'), unit_price=Decimal('1')
+            )
+        Item.objects.filter(pk__in=[steady.pk, idle.pk]).update(
+            created_at=datetime(2024, 3, 1, tzinfo=dt_timezone.utc)
+        )
+
+        counts = ReorderPlanner.plan_tenant(self.tenant, history_days=91, as_of=as_of, apply_to_items=True)
+
+        self.assertEqual(counts, {'items': 2, 'with_demand': 1, 'with_lead_time': 1, 'applied': True})
+        plan = ReorderPlan.objects.get(item=steady)
+        # 60 units over the 31 days since the item was created
+        self.assertEqual(plan.demand_per_day, Decimal('1.9355'))
+        self.assertEqual((plan.lead_time_days, plan.lead_time_samples), (Decimal('7.50'), 2))
+        self.assertGreater(plan.reorder_point, plan.safety_stock)
+        steady.refresh_from_db()
+        self.assertEqual(steady.reorder_point, plan.reorder_point)
+        # No demand: nothing to cover during the lead time
+        self.assertEqual(ReorderPlan.objects.get(item=idle).reorder_point, Decimal('0.00'))
@@ -11,6 +11,7 @@ router.register(r'categories', views.ItemCategoryViewSet)
 router.register(r'movements', views.InventoryMovementViewSet)
 router.register(r'warehouses', views.WarehouseViewSet)
 router.register(r'warehouse-stock', views.WarehouseStockViewSet)
+router.register(r'reorder-plans', views.ReorderPlanViewSet)
 
 urlpatterns = [
     # API endpoints
@@ -6,15 +6,25 @@ from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Q, Sum, F
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from decimal import Decimal
+from django.utils.dateparse import parse_date
+from decimal import Decimal, InvalidOperation
 
-from .models import Item, ItemCategory, InventoryMovement, Warehouse, WarehouseStock, InventoryValuation, InventorySettings
+from .models import (
+    Item, ItemCategory, InventoryMovement, Warehouse, WarehouseStock, InventoryValuation, InventorySettings,
+    ReorderPlan,
+)
 from .serializers import (
     ItemSerializer, ItemCategorySerializer, InventoryMovementSerializer,
     WarehouseSerializer, WarehouseStockSerializer, ItemDetailSerializer,
-    InventoryValuationSerializer, InventorySettingsSerializer, InventorySummarySerializer
+    InventoryValuationSerializer, InventorySettingsSerializer, InventorySummarySerializer, ReorderPlanSerializer,
+    ItemBulkOptionsSerializer
 )
 from authentication.permissions import IsTenantMember
+from backend.pagination import paginated_response
+from .costing import CostLayerEngine
+from .stock import apply_movements
+from .bulk import ItemBulkService
+from .planning import planned_reorder_point, planned_safety_stock
 
 
 class ItemCategoryViewSet(viewsets.ModelViewSet):
@@ -62,23 +72,27 @@ class ItemViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'])
     def low_stock(self, request):
-        """Get items with low stock levels"""
-        items = self.get_queryset().filter(
-            current_stock__lte=F('min_stock_level'),
+        """Get items at or below their safety stock (min_stock_level when unplanned)"""
+        items = self.get_queryset().annotate(
+            low_stock_level=planned_safety_stock()
+        ).filter(
+            current_stock__lte=F('low_stock_level'),
             is_tracked=True
         )
-        serializer = self.get_serializer(items, many=True)
-        return Response(serializer.data)
+        serializer = self.get_serializer(self.paginate_queryset(items), many=True)
+        return self.get_paginated_response(serializer.data)
 
     @action(detail=False, methods=['get'])
     def reorder_needed(self, request):
-        """Get items that need reordering"""
-        items = self.get_queryset().filter(
-            current_stock__lte=F('reorder_point'),
+        """Get items at or below their planned (or static) reorder point"""
+        items = self.get_queryset().annotate(
+            effective_reorder_point=planned_reorder_point()
+        ).filter(
+            current_stock__lte=F('effective_reorder_point'),
             is_tracked=True
         )
-        serializer = self.get_serializer(items, many=True)
-        return Response(serializer.data)
+        serializer = self.get_serializer(self.paginate_queryset(items), many=True)
+        return self.get_paginated_response(serializer.data)
 
     @action(detail=False, methods=['get'])
     def stock_summary(self, request):
@@ -109,6 +123,38 @@ class ItemViewSet(viewsets.ModelViewSet):
             'total_inventory_value': float(total_value)
         })
 
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Apply one operation to a batch of items
+
+        Body: {"operation": "upsert" | "reorder_points" | "prices" | "activation",
+               "items": [...], "company": <default company for upserts>,
+               "partial": false, "dry_run": false}
+
+        At most INVENTORY_BULK_MAX_ITEMS (default 5000) items per request.
+        The batch is validated as a whole; unless `partial` is set, any row
+        error rejects it with 400 and nothing is written.
+        """
+        options = ItemBulkOptionsSerializer(data=request.data)
+        options.is_valid(raise_exception=True)
+        partial = options.validated_data['partial']
+        try:
+            result = ItemBulkService.apply(
+                request.user.tenant,
+                request.data.get('operation'),
+                request.data.get('items'),
+                company=request.data.get('company'),
+                partial=partial,
+                dry_run=options.validated_data['dry_run'],
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not result['ok'] and not partial:
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
+
     @action(detail=True, methods=['post'])
     def adjust_stock(self, request, pk=None):
         """Adjust stock level for an item"""
@@ -122,6 +168,15 @@ class ItemViewSet(viewsets.ModelViewSet):
                 {'error': 'Quantity is required'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
+        try:
+            quantity = abs(Decimal(str(quantity)))
+        except InvalidOperation:
+            quantity = None
+        if not quantity or not quantity.is_finite():
+            return Response(
+                {'error': 'Quantity must be a non-zero number'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
         # Create inventory movement
         movement = InventoryMovement.objects.create(
@@ -129,7 +184,7 @@ class ItemViewSet(viewsets.ModelViewSet):
             company=item.company,
             item=item,
             movement_type=movement_type,
-            quantity=abs(float(quantity)),
+            quantity=quantity,
             notes=notes,
             created_by=request.user
         )
@@ -157,6 +212,38 @@ class InventoryMovementViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(tenant=self.request.user.tenant, created_by=self.request.user)
 
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Record many movements at once with grouped atomic stock updates"""
+        movements = request.data.get('movements', [])
+        if not isinstance(movements, list) or not movements:
+            return Response(
+                {'error': 'movements must be a non-empty list'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        serializer = self.get_serializer(data=movements, many=True)
+        serializer.is_valid(raise_exception=True)
+        
+        tenant = request.user.tenant
+        for data in serializer.validated_data:
+            if data['item'].tenant_id != tenant.id or (data.get('warehouse') and data['warehouse'].tenant_id != tenant.id):
+                return Response(
+                    {'error': 'Items and warehouses must belong to your tenant'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        saved = apply_movements(
+            InventoryMovement(**{
+                **data,
+                'tenant': tenant,
+                'company_id': data['item'].company_id,
+                'created_by': request.user,
+            })
+            for data in serializer.validated_data
+        )
+        return Response(self.get_serializer(saved, many=True).data, status=status.HTTP_201_CREATED)
+
     @action(detail=False, methods=['get'])
     def by_item(self, request):
         """Get movements for a specific item"""
@@ -168,8 +255,30 @@ class InventoryMovementViewSet(viewsets.ModelViewSet):
             )
         
         movements = self.get_queryset().filter(item_id=item_id)
-        serializer = self.get_serializer(movements, many=True)
-        return Response(serializer.data)
+        serializer = self.get_serializer(self.paginate_queryset(movements), many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class ReorderPlanViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    ViewSet for reading demand-driven reorder plans
+
+    Plans are recomputed in batch by the plan_reorder_points command.
+    """
+    queryset = ReorderPlan.objects.none()  # Placeholder queryset for router
+    serializer_class = ReorderPlanSerializer
+    permission_classes = [IsAuthenticated, IsTenantMember]
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filterset_fields = ['item']
+    search_fields = ['item__sku', 'item__name']
+    ordering_fields = ['reorder_point', 'safety_stock', 'demand_per_day', 'lead_time_days']
+    ordering = ['-demand_per_day']
+
+    def get_queryset(self):
+        queryset = ReorderPlan.objects.filter(tenant=self.request.user.tenant).select_related('item')
+        if self.request.query_params.get('below_reorder_point') == 'true':
+            queryset = queryset.filter(item__current_stock__lte=F('reorder_point'))
+        return queryset
 
 
 class WarehouseViewSet(viewsets.ModelViewSet):
@@ -196,8 +305,7 @@ class WarehouseViewSet(viewsets.ModelViewSet):
         """Get stock levels for a warehouse"""
         warehouse = self.get_object()
         stock_levels = WarehouseStock.objects.filter(warehouse=warehouse)
-        serializer = WarehouseStockSerializer(stock_levels, many=True)
-        return Response(serializer.data)
+        return paginated_response(request, stock_levels, WarehouseStockSerializer)
 
 
 class WarehouseStockViewSet(viewsets.ModelViewSet):
@@ -225,8 +333,8 @@ class WarehouseStockViewSet(viewsets.ModelViewSet):
             available_quantity__lte=F('item__min_stock_level'),
             item__is_tracked=True
         )
-        serializer = self.get_serializer(stock_levels, many=True)
-        return Response(serializer.data)
+        serializer = self.get_serializer(self.paginate_queryset(stock_levels), many=True)
+        return self.get_paginated_response(serializer.data)
 
 
 # Inventory Overview Stats
@@ -323,13 +431,17 @@ def calculate_valuation(request):
     if company_id:
         items = items.filter(company_id=company_id)
     
-    total_value = Decimal('0.00')
-    total_items = items.count()
+    if isinstance(valuation_date, str):
+        valuation_date = parse_date(valuation_date)
+        if valuation_date is None:
+            return Response({'error': 'Invalid valuation_date'}, status=status.HTTP_400_BAD_REQUEST)
     
-    # Calculate based on valuation method
-    for item in items:
-        # Simplified calculation - real implementation would use FIFO/LIFO/etc
-        total_value += item.get_total_value()
+    # Value from the precomputed cost-layer ledger
+    try:
+        total_value, total_items = CostLayerEngine.value_inventory(items, valuation_method, valuation_date)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    total_value = total_value.quantize(Decimal('0.01'))
     
     # Create valuation record
     valuation_data = {
@@ -354,45 +466,43 @@ def calculate_valuation(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsTenantMember])
 def reorder_points_list(request):
-    """Get items that need reordering"""
+    """Get items at or below their planned (or static) reorder point"""
     tenant = request.user.tenant
-    items = Item.objects.filter(
+    items = Item.objects.annotate(
+        effective_reorder_point=planned_reorder_point()
+    ).filter(
         tenant=tenant,
         is_tracked=True,
         is_active=True,
-        current_stock__lte=F('reorder_point')
+        current_stock__lte=F('effective_reorder_point')
     ).order_by('current_stock')
     
-    serializer = ItemSerializer(items, many=True)
-    return Response(serializer.data)
+    return paginated_response(request, items, ItemSerializer)
 
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated, IsTenantMember])
 def bulk_update_reorder_points(request):
-    """Bulk update reorder points for multiple items"""
-    tenant = request.user.tenant
+    """Bulk update reorder points for multiple items (rows that fail are skipped)"""
     updates = request.data.get('updates', [])  # List of {item_id, reorder_point}
-    
-    updated_items = []
-    for update in updates:
-        item_id = update.get('item_id')
-        reorder_point = update.get('reorder_point')
-        
-        if not item_id or reorder_point is None:
-            continue
-        
-        try:
-            item = Item.objects.get(id=item_id, tenant=tenant)
-            item.reorder_point = Decimal(str(reorder_point))
-            item.save()
-            updated_items.append(ItemSerializer(item).data)
-        except Item.DoesNotExist:
-            continue
-    
+
+    try:
+        result = ItemBulkService.apply(request.user.tenant, 'reorder_points', updates, partial=True)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Same contract as before the batched service: every applied row, serialized
+    applied = {
+        row['id']: position
+        for position, row in enumerate(row for row in result['results'] if row['status'] in ('updated', 'unchanged'))
+    }
+    items = Item.objects.filter(tenant=request.user.tenant, pk__in=applied).select_related('category', 'company')
+    items = sorted(items, key=lambda item: applied[str(item.pk)])
+
     return Response({
-        'updated_count': len(updated_items),
-        'items': updated_items
+        'updated_count': len(applied),
+        'items': ItemSerializer(items, many=True).data,
+        'results': result['results']
     })
 
 
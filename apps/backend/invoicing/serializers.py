@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from backend.fieldsets import SparseFieldsetMixin
 from decimal import Decimal
 from .models import (
     Invoice, InvoiceLine, InvoiceTemplate, InvoicePayment, EInvoiceSettings, EInvoiceSubmission,
@@ -7,7 +8,7 @@ from .models import (
 )
 
 
-class InvoiceLineSerializer(serializers.ModelSerializer):
+class InvoiceLineSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Invoice Line"""
     total_amount = serializers.SerializerMethodField()
     
@@ -29,7 +30,7 @@ class InvoiceLineSerializer(serializers.ModelSerializer):
         return subtotal - discount + tax
 
 
-class InvoiceSerializer(serializers.ModelSerializer):
+class InvoiceSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Invoice"""
     total_amount = serializers.SerializerMethodField()
     total_tax = serializers.SerializerMethodField()
@@ -39,6 +40,7 @@ class InvoiceSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Invoice
+        prefetch_related = ['lines']  # read by the method fields
         fields = [
             'id', 'tenant', 'company', 'customer', 'customer_name', 'invoice_number',
             'invoice_date', 'due_date', 'status', 'payment_terms', 'currency',
@@ -84,7 +86,7 @@ class InvoiceWithLinesSerializer(InvoiceSerializer):
         fields = InvoiceSerializer.Meta.fields + ['lines']
 
 
-class InvoiceTemplateSerializer(serializers.ModelSerializer):
+class InvoiceTemplateSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Invoice Template"""
     class Meta:
         model = InvoiceTemplate
@@ -96,7 +98,7 @@ class InvoiceTemplateSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class InvoicePaymentSerializer(serializers.ModelSerializer):
+class InvoicePaymentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Invoice Payment"""
     invoice_number = serializers.CharField(source='invoice.invoice_number', read_only=True)
     customer_name = serializers.CharField(source='invoice.customer.name', read_only=True)
@@ -111,7 +113,7 @@ class InvoicePaymentSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class EInvoiceSettingsSerializer(serializers.ModelSerializer):
+class EInvoiceSettingsSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for E-Invoice Settings"""
     class Meta:
         model = EInvoiceSettings
@@ -150,7 +152,7 @@ class InvoiceSummarySerializer(serializers.Serializer):
     outstanding_amount = serializers.DecimalField(max_digits=15, decimal_places=2)
 
 
-class InvoiceComplianceRuleSerializer(serializers.ModelSerializer):
+class InvoiceComplianceRuleSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Invoice Compliance Rule"""
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
     
@@ -164,7 +166,7 @@ class InvoiceComplianceRuleSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class ComplianceViolationSerializer(serializers.ModelSerializer):
+class ComplianceViolationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Compliance Violation"""
     rule_name = serializers.CharField(source='rule.name', read_only=True)
     invoice_number = serializers.CharField(source='invoice.invoice_number', read_only=True)
@@ -180,7 +182,7 @@ class ComplianceViolationSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
-class DigitalCertificateSerializer(serializers.ModelSerializer):
+class DigitalCertificateSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Digital Certificate"""
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
     is_valid = serializers.SerializerMethodField()
@@ -204,7 +206,7 @@ class DigitalCertificateSerializer(serializers.ModelSerializer):
         return obj.is_valid()
 
 
-class InvoiceSignatureSerializer(serializers.ModelSerializer):
+class InvoiceSignatureSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Invoice Signature"""
     invoice_number = serializers.CharField(source='invoice.invoice_number', read_only=True)
     certificate_name = serializers.CharField(source='certificate.name', read_only=True)
@@ -221,7 +223,7 @@ class InvoiceSignatureSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'signed_at', 'verified_at']
 
 
-class TaxRateSerializer(serializers.ModelSerializer):
+class TaxRateSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Tax Rate"""
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
     
@@ -236,7 +238,7 @@ class TaxRateSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class TaxCategorySerializer(serializers.ModelSerializer):
+class TaxCategorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Tax Category"""
     
     class Meta:
@@ -248,7 +250,7 @@ class TaxCategorySerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class InvoicingSettingsSerializer(serializers.ModelSerializer):
+class InvoicingSettingsSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Invoicing Settings"""
     default_template_name = serializers.CharField(source='default_template.name', read_only=True)
     
@@ -266,7 +268,7 @@ class InvoicingSettingsSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class EInvoiceSubmissionSerializer(serializers.ModelSerializer):
+class EInvoiceSubmissionSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for E-Invoice Submission"""
     invoice_number = serializers.CharField(source='invoice.invoice_number', read_only=True)
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
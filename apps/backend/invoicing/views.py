@@ -3,7 +3,8 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Sum
+from django.db.models import DecimalField, Sum, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from decimal import Decimal
 from datetime import datetime, date, timedelta
@@ -23,7 +24,10 @@ from .serializers import (
 from authentication.permissions import IsAccountant, IsTenantMember
 from sales.models import Customer
 from tenants.models import Company
+from backend.pagination import KeysetPagination, paginated_response
+from backend.query_planning import QueryPlanMixin
 from backend.tenant_utils import get_request_tenant
+from search.indexing import SearchIndexService
 from .myinvois_client import MyInvoisClient
 from .ubl_generator import UBL21Generator
 import logging
@@ -31,7 +35,7 @@ import logging
 logger = logging.getLogger(__name__)
 
 
-class InvoiceListView(generics.ListCreateAPIView):
+class InvoiceListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create invoices"""
     serializer_class = InvoiceSerializer
     permission_classes = [IsAccountant]
@@ -55,7 +59,7 @@ class InvoiceListView(generics.ListCreateAPIView):
         )
 
 
-class InvoiceDetailView(generics.RetrieveUpdateDestroyAPIView):
+class InvoiceDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete invoice"""
     serializer_class = InvoiceWithLinesSerializer
     permission_classes = [IsAccountant]
@@ -67,7 +71,7 @@ class InvoiceDetailView(generics.RetrieveUpdateDestroyAPIView):
         return Invoice.objects.filter(tenant=tenant)
 
 
-class InvoiceLineListView(generics.ListCreateAPIView):
+class InvoiceLineListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create invoice lines"""
     serializer_class = InvoiceLineSerializer
     permission_classes = [IsAccountant]
@@ -95,7 +99,7 @@ class InvoiceLineListView(generics.ListCreateAPIView):
         serializer.save(invoice=invoice, tenant=tenant)
 
 
-class InvoiceTemplateListView(generics.ListCreateAPIView):
+class InvoiceTemplateListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create invoice templates"""
     serializer_class = InvoiceTemplateSerializer
     permission_classes = [IsAccountant]
@@ -110,7 +114,7 @@ class InvoiceTemplateListView(generics.ListCreateAPIView):
         serializer.save(tenant=self.request.user.tenant)
 
 
-class InvoiceTemplateDetailView(generics.RetrieveUpdateDestroyAPIView):
+class InvoiceTemplateDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete invoice template"""
     serializer_class = InvoiceTemplateSerializer
     permission_classes = [IsAccountant]
@@ -119,7 +123,7 @@ class InvoiceTemplateDetailView(generics.RetrieveUpdateDestroyAPIView):
         return InvoiceTemplate.objects.filter(tenant=self.request.user.tenant)
 
 
-class InvoicePaymentListView(generics.ListCreateAPIView):
+class InvoicePaymentListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create invoice payments"""
     serializer_class = InvoicePaymentSerializer
     permission_classes = [IsAccountant]
@@ -130,7 +134,7 @@ class InvoicePaymentListView(generics.ListCreateAPIView):
         ).order_by('-payment_date')
 
 
-class InvoicePaymentDetailView(generics.RetrieveUpdateDestroyAPIView):
+class InvoicePaymentDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete invoice payment"""
     serializer_class = InvoicePaymentSerializer
     permission_classes = [IsAccountant]
@@ -269,14 +273,13 @@ def search_invoices(request):
             status=status.HTTP_401_UNAUTHORIZED
         )
     
-    query = request.query_params.get('q', '')
-    
-    invoices = Invoice.objects.filter(
-        Q(invoice_number__icontains=query) |
-        Q(customer__name__icontains=query) |
-        Q(notes__icontains=query),
-        tenant=tenant
-    ).order_by('-invoice_date')
+    invoices = SearchIndexService.find(
+        tenant,
+        request.query_params.get('q', ''),
+        'invoice',
+        Invoice.objects.filter(tenant=tenant).select_related('customer'),
+        request.query_params.get('limit')
+    )
     
     serializer = InvoiceSerializer(invoices, many=True)
     return Response(serializer.data)
@@ -295,10 +298,9 @@ def customer_invoices(request, customer_id):
     invoices = Invoice.objects.filter(
         customer=customer,
         tenant=request.user.tenant
-    ).order_by('-invoice_date')
+    ).select_related('customer', 'created_by').prefetch_related('lines').order_by('-invoice_date')
     
-    serializer = InvoiceSerializer(invoices, many=True)
-    return Response(serializer.data)
+    return paginated_response(request, invoices, InvoiceSerializer)
 
 
 @api_view(['GET'])
@@ -309,11 +311,18 @@ def overdue_invoices(request):
         tenant=request.user.tenant,
         status__in=['sent', 'approved'],
         due_date__lt=date.today()
+    ).select_related('customer').annotate(
+        paid_amount=Coalesce(
+            Sum('payments__amount'), Value(Decimal('0')),
+            output_field=DecimalField(max_digits=15, decimal_places=2)
+        )
     ).order_by('due_date')
     
+    paginator = KeysetPagination()
+    page = paginator.paginate_queryset(overdue_invoices, request)
     summary_data = []
-    for invoice in overdue_invoices:
-        paid_amount = sum(payment.amount for payment in invoice.payments.all())
+    for invoice in page:
+        paid_amount = invoice.paid_amount
         outstanding_amount = invoice.total_amount - paid_amount
         
         summary_data.append({
@@ -329,7 +338,7 @@ def overdue_invoices(request):
         })
     
     serializer = InvoiceSummarySerializer(summary_data, many=True)
-    return Response(serializer.data)
+    return paginator.get_paginated_response(serializer.data)
 
 
 @api_view(['POST'])
@@ -367,7 +376,7 @@ def record_payment(request, invoice_id):
 # E-Invoice (LHDN) Views
 # ============================================
 
-class EInvoiceSettingsListView(generics.ListCreateAPIView):
+class EInvoiceSettingsListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create e-invoice settings"""
     serializer_class = EInvoiceSettingsSerializer
     permission_classes = [IsAccountant]
@@ -381,7 +390,7 @@ class EInvoiceSettingsListView(generics.ListCreateAPIView):
         serializer.save(tenant=self.request.user.tenant)
 
 
-class EInvoiceSettingsDetailView(generics.RetrieveUpdateDestroyAPIView):
+class EInvoiceSettingsDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete e-invoice settings"""
     serializer_class = EInvoiceSettingsSerializer
     permission_classes = [IsAccountant]
@@ -870,7 +879,7 @@ def generate_ubl_format(request, pk):
 
 # Submission History Views
 
-class EInvoiceSubmissionListView(generics.ListAPIView):
+class EInvoiceSubmissionListView(QueryPlanMixin, generics.ListAPIView):
     """List e-invoice submissions for an invoice"""
     serializer_class = EInvoiceSubmissionSerializer
     permission_classes = [IsAccountant]
@@ -898,8 +907,7 @@ def get_e_invoice_submissions(request, pk):
         tenant=request.user.tenant
     ).order_by('-submitted_at')
     
-    serializer = EInvoiceSubmissionSerializer(submissions, many=True)
-    return Response(serializer.data)
+    return paginated_response(request, submissions, EInvoiceSubmissionSerializer)
 
 
 @api_view(['GET'])
@@ -917,7 +925,7 @@ def get_e_invoice_submission_detail(request, submission_id):
 
 
 # Compliance Rules Views
-class InvoiceComplianceRuleListView(generics.ListCreateAPIView):
+class InvoiceComplianceRuleListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create Invoice Compliance Rules"""
     serializer_class = InvoiceComplianceRuleSerializer
     permission_classes = [IsAccountant]
@@ -936,7 +944,7 @@ class InvoiceComplianceRuleListView(generics.ListCreateAPIView):
         serializer.save(tenant=tenant, created_by=self.request.user)
 
 
-class InvoiceComplianceRuleDetailView(generics.RetrieveUpdateDestroyAPIView):
+class InvoiceComplianceRuleDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete Invoice Compliance Rule"""
     serializer_class = InvoiceComplianceRuleSerializer
     permission_classes = [IsAccountant]
@@ -948,7 +956,7 @@ class InvoiceComplianceRuleDetailView(generics.RetrieveUpdateDestroyAPIView):
         return InvoiceComplianceRule.objects.filter(tenant=tenant)
 
 
-class ComplianceViolationListView(generics.ListCreateAPIView):
+class ComplianceViolationListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create Compliance Violations"""
     serializer_class = ComplianceViolationSerializer
     permission_classes = [IsAccountant]
@@ -1000,7 +1008,7 @@ def resolve_compliance_violation(request, pk):
 
 
 # Digital Certificate Views
-class DigitalCertificateListView(generics.ListCreateAPIView):
+class DigitalCertificateListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create Digital Certificates"""
     serializer_class = DigitalCertificateSerializer
     permission_classes = [IsAccountant]
@@ -1019,7 +1027,7 @@ class DigitalCertificateListView(generics.ListCreateAPIView):
         serializer.save(tenant=tenant, created_by=self.request.user)
 
 
-class DigitalCertificateDetailView(generics.RetrieveUpdateDestroyAPIView):
+class DigitalCertificateDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete Digital Certificate"""
     serializer_class = DigitalCertificateSerializer
     permission_classes = [IsAccountant]
@@ -1031,7 +1039,7 @@ class DigitalCertificateDetailView(generics.RetrieveUpdateDestroyAPIView):
         return DigitalCertificate.objects.filter(tenant=tenant)
 
 
-class InvoiceSignatureListView(generics.ListCreateAPIView):
+class InvoiceSignatureListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create Invoice Signatures"""
     serializer_class = InvoiceSignatureSerializer
     permission_classes = [IsAccountant]
@@ -1054,7 +1062,7 @@ class InvoiceSignatureListView(generics.ListCreateAPIView):
         serializer.save(tenant=tenant, signed_by=self.request.user)
 
 
-class InvoiceSignatureDetailView(generics.RetrieveUpdateDestroyAPIView):
+class InvoiceSignatureDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete Invoice Signature"""
     serializer_class = InvoiceSignatureSerializer
     permission_classes = [IsAccountant]
@@ -1067,7 +1075,7 @@ class InvoiceSignatureDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 
 # Tax Rate Views
-class TaxRateListView(generics.ListCreateAPIView):
+class TaxRateListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create Tax Rates"""
     serializer_class = TaxRateSerializer
     permission_classes = [IsAccountant]
@@ -1090,7 +1098,7 @@ class TaxRateListView(generics.ListCreateAPIView):
         serializer.save(tenant=tenant, created_by=self.request.user)
 
 
-class TaxRateDetailView(generics.RetrieveUpdateDestroyAPIView):
+class TaxRateDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete Tax Rate"""
     serializer_class = TaxRateSerializer
     permission_classes = [IsAccountant]
@@ -1102,7 +1110,7 @@ class TaxRateDetailView(generics.RetrieveUpdateDestroyAPIView):
         return TaxRate.objects.filter(tenant=tenant)
 
 
-class TaxCategoryListView(generics.ListCreateAPIView):
+class TaxCategoryListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create Tax Categories"""
     serializer_class = TaxCategorySerializer
     permission_classes = [IsAccountant]
@@ -1121,7 +1129,7 @@ class TaxCategoryListView(generics.ListCreateAPIView):
         serializer.save(tenant=tenant)
 
 
-class TaxCategoryDetailView(generics.RetrieveUpdateDestroyAPIView):
+class TaxCategoryDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete Tax Category"""
     serializer_class = TaxCategorySerializer
     permission_classes = [IsAccountant]
@@ -1134,7 +1142,7 @@ class TaxCategoryDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 
 # Invoicing Settings Views
-class InvoicingSettingsView(generics.RetrieveUpdateAPIView):
+class InvoicingSettingsView(QueryPlanMixin, generics.RetrieveUpdateAPIView):
     """Retrieve and update Invoicing Settings"""
     serializer_class = InvoicingSettingsSerializer
     permission_classes = [IsAccountant]
@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from backend.fieldsets import SparseFieldsetMixin
 from .models import BetaProgramApplication, EarlyAccessRequest, FounderFeedback
 
 
-class BetaProgramApplicationSerializer(serializers.ModelSerializer):
+class BetaProgramApplicationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Beta Program Applications"""
     
     class Meta:
@@ -14,7 +15,7 @@ class BetaProgramApplicationSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'status', 'created_at', 'updated_at']
 
 
-class BetaProgramApplicationCreateSerializer(serializers.ModelSerializer):
+class BetaProgramApplicationCreateSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for creating Beta Program Applications"""
     
     class Meta:
@@ -32,7 +33,7 @@ class BetaProgramApplicationCreateSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class EarlyAccessRequestSerializer(serializers.ModelSerializer):
+class EarlyAccessRequestSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Early Access Requests"""
     
     class Meta:
@@ -45,7 +46,7 @@ class EarlyAccessRequestSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'status', 'created_at', 'updated_at']
 
 
-class EarlyAccessRequestCreateSerializer(serializers.ModelSerializer):
+class EarlyAccessRequestCreateSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for creating Early Access Requests"""
     
     class Meta:
@@ -63,7 +64,7 @@ class EarlyAccessRequestCreateSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class FounderFeedbackSerializer(serializers.ModelSerializer):
+class FounderFeedbackSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Founder Feedback"""
     
     class Meta:
@@ -76,7 +77,7 @@ class FounderFeedbackSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'status', 'created_at', 'updated_at']
 
 
-class FounderFeedbackCreateSerializer(serializers.ModelSerializer):
+class FounderFeedbackCreateSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for creating Founder Feedback"""
     
     class Meta:
@@ -1,11 +1,12 @@
 from rest_framework import serializers
+from backend.fieldsets import SparseFieldsetMixin
 from .models import (
     SystemSettings, AuditLog, Backup, MaintenanceWindow,
     SystemHealth, SecurityEvent, SystemMetrics, APIKey, AdminSettings
 )
 
 
-class SystemSettingsSerializer(serializers.ModelSerializer):
+class SystemSettingsSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for System Settings"""
     setting_type_display = serializers.CharField(source='get_setting_type_display', read_only=True)
     
@@ -19,7 +20,7 @@ class SystemSettingsSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class AuditLogSerializer(serializers.ModelSerializer):
+class AuditLogSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Audit Log"""
     tenant_name = serializers.CharField(source='tenant.name', read_only=True)
     user_email = serializers.CharField(source='user.email', read_only=True)
@@ -38,7 +39,7 @@ class AuditLogSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
-class BackupSerializer(serializers.ModelSerializer):
+class BackupSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Backup"""
     backup_type_display = serializers.CharField(source='get_backup_type_display', read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
@@ -67,7 +68,7 @@ class BackupSerializer(serializers.ModelSerializer):
         return obj.is_expired()
 
 
-class MaintenanceWindowSerializer(serializers.ModelSerializer):
+class MaintenanceWindowSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Maintenance Window"""
     maintenance_type_display = serializers.CharField(source='get_maintenance_type_display', read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
@@ -94,7 +95,7 @@ class MaintenanceWindowSerializer(serializers.ModelSerializer):
         return obj.get_duration_hours()
 
 
-class SystemHealthSerializer(serializers.ModelSerializer):
+class SystemHealthSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for System Health"""
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     
@@ -108,7 +109,7 @@ class SystemHealthSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class SecurityEventSerializer(serializers.ModelSerializer):
+class SecurityEventSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Security Event"""
     tenant_name = serializers.CharField(source='tenant.name', read_only=True)
     user_email = serializers.CharField(source='user.email', read_only=True)
@@ -131,7 +132,7 @@ class SecurityEventSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
-class SystemMetricsSerializer(serializers.ModelSerializer):
+class SystemMetricsSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for System Metrics"""
     
     class Meta:
@@ -143,7 +144,7 @@ class SystemMetricsSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'timestamp']
 
 
-class APIKeySerializer(serializers.ModelSerializer):
+class APIKeySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for API Key"""
     tenant_name = serializers.CharField(source='tenant.name', read_only=True)
     user_email = serializers.CharField(source='user.email', read_only=True)
@@ -165,7 +166,7 @@ class APIKeySerializer(serializers.ModelSerializer):
         return obj.is_expired()
 
 
-class AdminSettingsSerializer(serializers.ModelSerializer):
+class AdminSettingsSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Admin Settings"""
     tenant_name = serializers.CharField(source='tenant.name', read_only=True)
     backup_frequency_display = serializers.CharField(source='get_backup_frequency_display', read_only=True)
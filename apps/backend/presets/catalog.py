@@ -0,0 +1,253 @@
+"""
+Preset Catalog
+Every preset and configuration JSON file, parsed and validated once per process.
+
+The catalog is an immutable snapshot: JSON objects become read-only
+mappings and arrays become tuples, so one copy can be shared by every
+request and thread. Files are indexed by path and, for the preset kinds,
+resolved by country and industry with the same fallbacks the loaders used:
+
+    chart_of_accounts: {industry}_{country} -> {industry} -> {country}
+    tax_rates:         {industry}_{country} -> {country}
+    currencies:        {industry}_{country} -> {country} -> SEA
+    country_settings:  {country}
+
+Files that fail to parse or validate are logged and left out, as if they
+did not exist. With PRESET_CATALOG_AUTORELOAD (on when DEBUG) the file
+mtimes are checked at most once per PRESET_CATALOG_RELOAD_INTERVAL seconds
+and a changed, added or removed file rebuilds the snapshot. Callers that
+modify or store what they read use thaw() (or presets.loader.load_json_file)
+to get a private copy.
+"""
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+from django.conf import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+PRESETS_DIR = Path(__file__).parent
+INDEX_FILE = 'PRESETS_INDEX.json'
+
+# Preset kind -> keys at least one of which a file of that kind must have
+PRESET_KINDS = {
+    'chart_of_accounts': ('accounts', 'chart_of_accounts'),
+    'tax_rates': ('tax_rates', 'tax_codes'),
+    'country_settings': (),
+    'currencies': ('currencies',),
+}
+NAVIGATION_SECTIONS = ('public_navigation', 'multi_tenant_navigation', 'tenant_navigation')
+
+
+def freeze(value):
+    """Read-only copy of parsed JSON (objects become mappings, arrays tuples)"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value):
+    """Plain dict/list copy of frozen JSON, safe to modify or store in a JSONField"""
+    if isinstance(value, Mapping):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+def _navigation_path() -> Path:
+    return Path(settings.BASE_DIR) / 'navigation_config.json'
+
+
+def _source_files() -> List[Path]:
+    files = [PRESETS_DIR / INDEX_FILE, _navigation_path()]
+    for kind in PRESET_KINDS:
+        files.extend(sorted((PRESETS_DIR / kind).glob('*.json')))
+    return files
+
+
+def _signature(files: Iterable[Path]) -> Tuple:
+    """(path, mtime) of every source file, None for missing ones"""
+    signature = []
+    for path in files:
+        try:
+            signature.append((str(path), path.stat().st_mtime_ns))
+        except OSError:
+            signature.append((str(path), None))
+    return tuple(signature)
+
+
+def _validate(kind: str, data) -> Optional[str]:
+    """Problem with a parsed file, or None"""
+    if not isinstance(data, dict):
+        return 'top level is not an object'
+    if kind == 'navigation':
+        missing = [section for section in NAVIGATION_SECTIONS if section not in data]
+        return f"missing sections {missing}" if missing else None
+    if kind == 'index':
+        return None if isinstance(data.get('countries', []), list) else "'countries' is not a list"
+    keys = PRESET_KINDS[kind]
+    if keys and not any(isinstance(data.get(key), list) for key in keys):
+        return f"needs a list under one of {list(keys)}"
+    if kind == 'chart_of_accounts':
+        rows = data.get('accounts') or data.get('chart_of_accounts') or []
+        if any(not isinstance(row, dict) or 'code' not in row for row in rows):
+            return 'every account needs a code'
+    return None
+
+
+class PresetCatalog:
+    """Immutable, indexed snapshot of the preset and configuration files"""
+
+    _current: Optional['PresetCatalog'] = None
+    _checked_at = 0.0
+    _lock = threading.Lock()
+
+    def __init__(self, files: Dict[str, Any], navigation, signature: Tuple = ()):
+        # Path relative to the presets directory -> frozen data
+        self.files = MappingProxyType(files)
+        self.navigation = navigation
+        self.signature = signature
+        index = files.get(INDEX_FILE) or {}
+        self.countries = MappingProxyType({
+            country['country_code'].upper(): country
+            for country in index.get('countries', ())
+            if isinstance(country, Mapping) and country.get('country_code')
+        })
+
+    @classmethod
+    def build(cls) -> 'PresetCatalog':
+        """Read, validate and freeze every source file"""
+        sources = _source_files()
+        signature = _signature(sources)
+        files = {}
+        navigation = MappingProxyType({})
+        for path in sources:
+            if not path.exists():
+                continue
+            if path == _navigation_path():
+                kind, key = 'navigation', None
+            elif path.name == INDEX_FILE and path.parent == PRESETS_DIR:
+                kind, key = 'index', INDEX_FILE
+            else:
+                kind, key = path.parent.name, f"{path.parent.name}/{path.name}"
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.error(f"Error loading JSON file {path}: {e}")
+                continue
+            problem = _validate(kind, data)
+            if problem:
+                logger.error(f"Ignoring invalid {kind} file {path}: {problem}")
+                continue
+            if key is None:
+                navigation = freeze(data)
+            else:
+                files[key] = freeze(data)
+
+        catalog = cls(files, navigation, signature)
+        missing = sorted(
+            country[kind]
+            for country in catalog.countries.values()
+            for kind in ('chart_of_accounts', 'tax_rates', 'country_settings')
+            if country.get(kind) and country[kind] not in catalog.files
+        )
+        if missing:
+            logger.warning(f"{INDEX_FILE} lists {len(missing)} missing presets (e.g. {', '.join(missing[:3])})")
+            logger.debug(f"Missing presets: {', '.join(missing)}")
+        logger.info(f"Preset catalog loaded {len(files)} files")
+        return catalog
+
+    @classmethod
+    def current(cls) -> 'PresetCatalog':
+        """
+        The shared catalog, built on first use
+
+        Returns:
+            PresetCatalog, rebuilt first if autoreload is on and a source
+            file changed since the last check
+        """
+        catalog = cls._current
+        if catalog is None:
+            with cls._lock:
+                if cls._current is None:
+                    cls._current = cls.build()
+                    cls._checked_at = time.monotonic()
+                return cls._current
+
+        if getattr(settings, 'PRESET_CATALOG_AUTORELOAD', False):
+            now = time.monotonic()
+            if now - cls._checked_at >= getattr(settings, 'PRESET_CATALOG_RELOAD_INTERVAL', 1.0):
+                cls._checked_at = now
+                if _signature(_source_files()) != catalog.signature:
+                    logger.info('Preset files changed; reloading the preset catalog')
+                    with cls._lock:
+                        cls._current = catalog = cls.build()
+        return catalog
+
+    @classmethod
+    def reload(cls) -> 'PresetCatalog':
+        """Rebuild the shared catalog now"""
+        with cls._lock:
+            cls._current = cls.build()
+            cls._checked_at = time.monotonic()
+            return cls._current
+
+    def get(self, path: str):
+        """Frozen contents of a file (path relative to the presets directory), or None"""
+        return self.files.get(path)
+
+    @staticmethod
+    def candidates(kind: str, country_code: str, industry_code: Optional[str] = None) -> List[str]:
+        """File paths tried for a kind, most specific first"""
+        stems = []
+        if industry_code and country_code:
+            stems.append(f"{industry_code}_{country_code}")
+        if industry_code and kind == 'chart_of_accounts':
+            stems.append(industry_code)
+        if country_code:
+            stems.append(country_code)
+        if kind == 'currencies':
+            stems.append('SEA')  # Regional fallback
+        if kind == 'country_settings':
+            stems = stems[-1:]
+        return [f"{kind}/{stem}.json" for stem in stems]
+
+    def find(self, kind: str, country_code: str, industry_code: Optional[str] = None) -> Tuple[Optional[str], Any]:
+        """
+        Most specific preset of a kind for a country and industry
+
+        Returns:
+            (path, frozen data), or (None, None) when no file matches
+        """
+        for path in self.candidates(kind, country_code, industry_code):
+            data = self.files.get(path)
+            if data is not None:
+                return path, data
+        return None, None
+
+    def fingerprint(self, country_code: str, industry_code: Optional[str] = None) -> str:
+        """
+        Digest of every preset file a country and industry resolve to
+
+        Changes whenever one of those files is edited, added or removed, so
+        anything built from them (such as a tenant template) can tell it is stale.
+        """
+        digest = hashlib.sha1()
+        for kind in PRESET_KINDS:
+            path, data = self.find(kind, country_code, industry_code)
+            digest.update(f"{path}:{json.dumps(thaw(data), sort_keys=True)}\n".encode('utf-8'))
+        return digest.hexdigest()
+
+
+def get_catalog() -> PresetCatalog:
+    """Shortcut for PresetCatalog.current"""
+    return PresetCatalog.current()
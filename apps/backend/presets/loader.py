@@ -2,24 +2,159 @@
 Preset Loader Utility
 Loads country-specific presets (Chart of Accounts, Tax Rates, Currency, Settings) when a tenant registers
 """
-import json
 import os
 from pathlib import Path
 from django.db import transaction
 from decimal import Decimal
 from datetime import date
+from .catalog import get_catalog, thaw
 
 # Get the presets directory path
 PRESETS_DIR = Path(__file__).parent
 
+# Standard GL account types every chart of accounts is filed under
+ACCOUNT_TYPES = {
+    'asset': {'name': 'Asset', 'normal_balance': 'debit', 'display_order': 1},
+    'liability': {'name': 'Liability', 'normal_balance': 'credit', 'display_order': 2},
+    'equity': {'name': 'Equity', 'normal_balance': 'credit', 'display_order': 3},
+    'revenue': {'name': 'Revenue', 'normal_balance': 'credit', 'display_order': 4},
+    'expense': {'name': 'Expense', 'normal_balance': 'debit', 'display_order': 5},
+}
+
 
 def load_json_file(file_path):
-    """Load JSON file from presets directory"""
-    full_path = PRESETS_DIR / file_path
-    if not full_path.exists():
-        return None
-    with open(full_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    """Load JSON file from presets directory (a private copy of the catalog's)"""
+    data = get_catalog().get(file_path)
+    return None if data is None else thaw(data)
+
+
+def flatten_account_tree(accounts, parent_code=None):
+    """
+    Flatten a nested account tree into rows carrying their parent's code
+
+    Args:
+        accounts: Account dicts, each with optional 'children'
+        parent_code: Code of the accounts' parent (None for roots)
+
+    Returns:
+        List of account dicts (without 'children') with a 'parent' code
+    """
+    rows = []
+    for account_data in accounts:
+        row = {key: value for key, value in account_data.items() if key != 'children'}
+        row['parent'] = parent_code
+        rows.append(row)
+        rows.extend(flatten_account_tree(account_data.get('children', []), account_data['code']))
+    return rows
+
+
+def account_levels(rows):
+    """
+    Group account rows into insert levels, parents before children
+
+    Args:
+        rows: Account dicts with 'code' and 'parent' (a code or None)
+
+    Returns:
+        List of levels; a row's parent is in an earlier level or not among the rows
+    """
+    by_code = {row['code']: row for row in rows}
+    depths = {}
+    for row in rows:
+        # Walk up to the first row of known depth (or a root), then fill in on the way back
+        chain = []
+        code = row['code']
+        while code in by_code and code not in depths and code not in chain:
+            chain.append(code)
+            code = by_code[code].get('parent')
+        depth = depths[code] + 1 if code in depths else 0
+        for code in reversed(chain):
+            depths[code] = depth
+            depth += 1
+
+    levels = []
+    for row in rows:
+        depth = depths[row['code']]
+        while len(levels) <= depth:
+            levels.append([])
+        levels[depth].append(row)
+    return levels
+
+
+def ensure_account_types(tenant):
+    """
+    Create the standard GLAccountType records a tenant is missing
+
+    Returns:
+        Dict of type code -> GLAccountType
+    """
+    from accounting.models import GLAccountType
+
+    type_map = {account_type.code: account_type for account_type in GLAccountType.objects.filter(tenant=tenant)}
+    missing = [
+        GLAccountType(
+            tenant=tenant,
+            code=type_code,
+            name=type_info['name'],
+            normal_balance=type_info['normal_balance'],
+            display_order=type_info['display_order'],
+            is_system=True,
+            is_active=True,
+        )
+        for type_code, type_info in ACCOUNT_TYPES.items()
+        if type_code not in type_map
+    ]
+    GLAccountType.objects.bulk_create(missing)
+    type_map.update((account_type.code, account_type) for account_type in missing)
+    return type_map
+
+
+def bulk_create_accounts(tenant, rows, type_map, user=None, parents=None):
+    """
+    Insert account rows with one bulk_create per level of the hierarchy
+
+    Primary keys are assigned in memory when each account is built, so a
+    child's parent_id is known before its parent is written.
+
+    Args:
+        tenant: Tenant instance
+        rows: Account dicts ('code', 'name', 'type', 'normal_balance', 'parent', ...)
+        type_map: Type code -> GLAccountType
+        user: User instance (for created_by field)
+        parents: Code -> existing ChartOfAccounts that rows may name as parent
+
+    Returns:
+        List of created ChartOfAccounts instances
+    """
+    from accounting.models import ChartOfAccounts
+    from search.indexing import SearchIndexService
+
+    account_ids = {code: account.pk for code, account in (parents or {}).items()}
+    accounts_created = []
+    for level in account_levels(rows):
+        batch = []
+        for account_data in level:
+            account = ChartOfAccounts(
+                tenant=tenant,
+                code=account_data['code'],
+                name=account_data['name'],
+                type=account_data['type'],  # Keep legacy field
+                account_type=type_map.get(account_data['type']),  # Set FK if available
+                parent_id=account_ids.get(account_data.get('parent')),
+                description=account_data.get('description', ''),
+                is_active=account_data.get('is_active', True),
+                is_system=account_data.get('is_system', False),
+                normal_balance=account_data['normal_balance'],
+                created_by=user,
+            )
+            account_ids[account.code] = account.pk
+            batch.append(account)
+        ChartOfAccounts.objects.bulk_create(batch)
+        accounts_created.extend(batch)
+
+    # bulk_create sends no post_save, so index the accounts here
+    SearchIndexService.index('account', accounts_created)
+    return accounts_created
 
 
 def load_chart_of_accounts(tenant, country_code, user=None):
@@ -34,73 +169,16 @@ def load_chart_of_accounts(tenant, country_code, user=None):
     Returns:
         List of created ChartOfAccounts instances
     """
-    from accounting.models import ChartOfAccounts, GLAccountType
-    
     file_path = f"chart_of_accounts/{country_code}.json"
     data = load_json_file(file_path)
     
     if not data:
         return []
     
-    # First, ensure GLAccountType records exist for this tenant
-    account_types = {
-        'asset': {'name': 'Asset', 'normal_balance': 'debit', 'display_order': 1},
-        'liability': {'name': 'Liability', 'normal_balance': 'credit', 'display_order': 2},
-        'equity': {'name': 'Equity', 'normal_balance': 'credit', 'display_order': 3},
-        'revenue': {'name': 'Revenue', 'normal_balance': 'credit', 'display_order': 4},
-        'expense': {'name': 'Expense', 'normal_balance': 'debit', 'display_order': 5},
-    }
-    
-    type_map = {}  # Map type code to GLAccountType instance
-    for type_code, type_info in account_types.items():
-        account_type, _ = GLAccountType.objects.get_or_create(
-            tenant=tenant,
-            code=type_code,
-            defaults={
-                'name': type_info['name'],
-                'normal_balance': type_info['normal_balance'],
-                'display_order': type_info['display_order'],
-                'is_system': True,
-                'is_active': True,
-            }
-        )
-        type_map[type_code] = account_type
-    
-    accounts_created = []
-    account_map = {}  # Map code to account instance for parent relationships
-    
-    def create_account(account_data, parent=None):
-        """Recursively create account and children"""
-        account_type_code = account_data.get('type')
-        account_type_obj = type_map.get(account_type_code) if account_type_code else None
-        
-        account = ChartOfAccounts.objects.create(
-            tenant=tenant,
-            code=account_data['code'],
-            name=account_data['name'],
-            type=account_data['type'],  # Keep legacy field
-            account_type=account_type_obj,  # Set FK if available
-            parent=parent,
-            description=account_data.get('description', ''),
-            is_active=account_data.get('is_active', True),
-            is_system=account_data.get('is_system', False),
-            normal_balance=account_data['normal_balance'],
-            created_by=user,
-        )
-        account_map[account_data['code']] = account
-        accounts_created.append(account)
-        
-        # Create children accounts
-        for child_data in account_data.get('children', []):
-            create_account(child_data, parent=account)
-        
-        return account
-    
     with transaction.atomic():
-        for account_data in data.get('accounts', []):
-            create_account(account_data)
-    
-    return accounts_created
+        type_map = ensure_account_types(tenant)
+        rows = flatten_account_tree(data.get('accounts', []))
+        return bulk_create_accounts(tenant, rows, type_map, user)
 
 
 def load_tax_rates(tenant, country_code, user=None):
@@ -123,41 +201,45 @@ def load_tax_rates(tenant, country_code, user=None):
     if not data:
         return []
     
-    tax_rates_created = []
-    tax_code_map = {}  # Map tax code string to TaxCode instance
-    
+    rates = data.get('tax_rates', [])
     with transaction.atomic():
         # First, create TaxCode records for all tax codes in the JSON
-        for rate_data in data.get('tax_rates', []):
+        tax_code_map = {
+            tax_code.code: tax_code
+            for tax_code in TaxCode.objects.filter(
+                tenant=tenant, code__in=[rate_data['code'] for rate_data in rates if rate_data.get('code')]
+            )
+        }
+        new_codes = []
+        for rate_data in rates:
             tax_code_str = rate_data.get('code')
             if tax_code_str and tax_code_str not in tax_code_map:
-                tax_code, _ = TaxCode.objects.get_or_create(
+                tax_code = TaxCode(
                     tenant=tenant,
                     code=tax_code_str,
-                    defaults={
-                        'name': rate_data.get('name', tax_code_str),
-                        'tax_type': rate_data.get('tax_type', 'custom'),
-                        'description': rate_data.get('description', ''),
-                        'is_system': True,
-                        'is_active': True,
-                    }
+                    name=rate_data.get('name', tax_code_str),
+                    tax_type=rate_data.get('tax_type', 'custom'),
+                    description=rate_data.get('description', ''),
+                    is_system=True,
+                    is_active=True,
                 )
                 tax_code_map[tax_code_str] = tax_code
+                new_codes.append(tax_code)
+        TaxCode.objects.bulk_create(new_codes)
         
         # Then create TaxRate records linked to TaxCode
-        for rate_data in data.get('tax_rates', []):
+        tax_rates_created = []
+        for rate_data in rates:
             effective_from = None
             if rate_data.get('effective_from'):
                 effective_from = date.fromisoformat(rate_data['effective_from'])
             
             tax_code_str = rate_data.get('code')
-            tax_code_obj = tax_code_map.get(tax_code_str) if tax_code_str else None
-            
-            tax_rate = TaxRate.objects.create(
+            tax_rates_created.append(TaxRate(
                 tenant=tenant,
                 name=rate_data['name'],
                 code=rate_data['code'],  # Keep legacy field
-                tax_code=tax_code_obj,  # Set FK if available
+                tax_code=tax_code_map.get(tax_code_str) if tax_code_str else None,  # Set FK if available
                 rate=Decimal(str(rate_data['rate'])),
                 tax_type=rate_data['tax_type'],
                 region=rate_data.get('region', ''),
@@ -168,8 +250,8 @@ def load_tax_rates(tenant, country_code, user=None):
                 effective_to=None,  # Can be set if provided
                 description=rate_data.get('description', ''),
                 created_by=user,
-            )
-            tax_rates_created.append(tax_rate)
+            ))
+        TaxRate.objects.bulk_create(tax_rates_created)
     
     return tax_rates_created
 
@@ -282,12 +364,7 @@ def get_available_countries():
     Returns:
         List of country dictionaries
     """
-    index_file = PRESETS_DIR / "PRESETS_INDEX.json"
-    if not index_file.exists():
-        return []
-    
-    data = load_json_file("PRESETS_INDEX.json")
-    return data.get('countries', [])
+    return thaw(tuple(get_catalog().countries.values()))
 
 
 def get_country_info(country_code):
@@ -300,9 +377,6 @@ def get_country_info(country_code):
     Returns:
         Dictionary with country information and available presets
     """
-    countries = get_available_countries()
-    for country in countries:
-        if country['country_code'] == country_code.upper():
-            return country
-    return None
+    country = get_catalog().countries.get(country_code.upper())
+    return None if country is None else thaw(country)
 
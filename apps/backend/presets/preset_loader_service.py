@@ -2,16 +2,19 @@
 PresetLoaderService - Sequenced database inserts with progress tracking
 Loads presets from JSON files in the correct order with tenant isolation
 """
-import json
 import os
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
+from datetime import date
 from decimal import Decimal
 from django.db import transaction
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 import logging
 
+from .catalog import get_catalog, thaw
+from .loader import bulk_create_accounts, ensure_account_types, flatten_account_tree
+
 logger = logging.getLogger(__name__)
 
 # Get the presets directory path
@@ -114,20 +117,23 @@ class PresetLoaderService:
             logger.error(f"Error loading presets for tenant {self.tenant.id}: {e}", exc_info=True)
             results['errors'].append(str(e))
             raise
+        finally:
+            # Progress is written once, with whatever steps completed
+            self.progress.save_preset_progress()
         
         return results
     
     def _load_json_file(self, file_path: str) -> Optional[dict]:
-        """Load JSON file from presets directory"""
-        full_path = self.presets_dir / file_path
-        if not full_path.exists():
-            return None
-        try:
-            with open(full_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error(f"Error loading JSON file {file_path}: {e}")
-            return None
+        """Load JSON file from presets directory (a private copy of the catalog's)"""
+        data = get_catalog().get(file_path)
+        return None if data is None else thaw(data)
+
+    def _find_preset(self, kind: str, country_code: str, industry_code: Optional[str] = None) -> Optional[dict]:
+        """Most specific preset file of a kind, as a private copy, or None"""
+        path, data = get_catalog().find(kind, country_code, industry_code)
+        if path:
+            logger.debug(f"Using {path} for {kind}")
+        return None if data is None else thaw(data)
     
     def _load_currencies(self, country_code: str, industry_code: Optional[str] = None) -> int:
         """
@@ -142,19 +148,8 @@ class PresetLoaderService:
         """
         from fx_conversion.models import Currency
         
-        # Try to load currency JSON file
-        # Priority: {industry_code}_{country_code}.json → {country_code}.json → default
-        currency_paths = []
-        if industry_code:
-            currency_paths.append(f"currencies/{industry_code}_{country_code}.json")
-        currency_paths.append(f"currencies/{country_code}.json")
-        currency_paths.append("currencies/SEA.json")  # Fallback
-        
-        currency_data = None
-        for path in currency_paths:
-            currency_data = self._load_json_file(path)
-            if currency_data:
-                break
+        # Priority: {industry_code}_{country_code}.json → {country_code}.json → SEA.json → default
+        currency_data = self._find_preset('currencies', country_code, industry_code)
         
         if not currency_data:
             # Create default currency based on country
@@ -190,43 +185,50 @@ class PresetLoaderService:
             if not base_currency_code and currency_data.get('currencies'):
                 base_currency_code = currency_data['currencies'][0]['code']
         
+        currencies = list({info['code']: info for info in currency_data.get('currencies', [])}.values())
+        
         with transaction.atomic():
-            for currency_info in currency_data.get('currencies', []):
-                currency_code = currency_info['code']
-                is_base = (currency_code == base_currency_code)
-                
-                # Ensure tenant_id is hardcoded
-                currency, created = Currency.objects.get_or_create(
+            existing = {
+                currency.code: currency
+                for currency in Currency.objects.filter(
+                    tenant=self.tenant, code__in=[info['code'] for info in currencies]
+                )
+            }
+            new_currencies = [
+                Currency(
                     tenant=self.tenant,  # Tenant isolation
-                    code=currency_code,
-                    defaults={
-                        'name': currency_info.get('name', currency_code),
-                        'symbol': currency_info.get('symbol', currency_code),
-                        'is_base_currency': is_base,
-                        'decimal_places': currency_info.get('decimal_places', 2),
-                        'is_active': True,
-                    }
+                    code=currency_info['code'],
+                    name=currency_info.get('name', currency_info['code']),
+                    symbol=currency_info.get('symbol', currency_info['code']),
+                    is_base_currency=(currency_info['code'] == base_currency_code),
+                    decimal_places=currency_info.get('decimal_places', 2),
+                    is_active=True,
                 )
-                
-                # Update base currency flag if needed
-                if is_base and not currency.is_base_currency:
-                    Currency.objects.filter(
-                        tenant=self.tenant,
-                        is_base_currency=True
-                    ).exclude(id=currency.id).update(is_base_currency=False)
-                    currency.is_base_currency = True
-                    currency.save()
-                
-                if created:
-                    currencies_created += 1
+                for currency_info in currencies
+                if currency_info['code'] not in existing
+            ]
+            
+            # Only one base currency per tenant (Currency.save() is bypassed by bulk_create)
+            base_currency = existing.get(base_currency_code)
+            if any(currency.is_base_currency for currency in new_currencies) or (
+                base_currency and not base_currency.is_base_currency
+            ):
+                Currency.objects.filter(
+                    tenant=self.tenant,
+                    is_base_currency=True
+                ).exclude(code=base_currency_code).update(is_base_currency=False)
+            if base_currency and not base_currency.is_base_currency:
+                Currency.objects.filter(id=base_currency.id).update(is_base_currency=True)
+            
+            Currency.objects.bulk_create(new_currencies)
+            currencies_created = len(new_currencies)
             
             # Create ExchangeRate records using default_rate_to_usd triangulation
             from fx_conversion.models import ExchangeRate
-            from django.utils import timezone
             
             base_rate_to_usd = None
             # Find base currency's rate to USD
-            for currency_info in currency_data.get('currencies', []):
+            for currency_info in currencies:
                 if currency_info['code'] == base_currency_code:
                     base_rate_to_usd = Decimal(str(currency_info.get('default_rate_to_usd', 1.0)))
                     break
@@ -238,7 +240,9 @@ class PresetLoaderService:
             # Formula: If base is MYR (4.72 to USD) and currency is USD (1.0 to USD)
             # To convert USD -> MYR: USD_amount * (MYR_rate_to_usd / USD_rate_to_usd) = USD_amount * (4.72 / 1.0) = USD_amount * 4.72
             # So rate from USD to MYR = base_rate_to_usd / currency_rate_to_usd
-            for currency_info in currency_data.get('currencies', []):
+            valid_from = timezone.now()
+            exchange_rates = []
+            for currency_info in currencies:
                 currency_code = currency_info['code']
                 if currency_code == base_currency_code:
                     continue  # Skip base currency
@@ -254,21 +258,19 @@ class PresetLoaderService:
                 else:
                     exchange_rate = Decimal('1.0')
                 
-                ExchangeRate.objects.get_or_create(
+                exchange_rates.append(ExchangeRate(
                     tenant=self.tenant,  # Tenant isolation
                     from_currency=currency_code,
                     to_currency=base_currency_code,
-                    valid_from=timezone.now(),
-                    defaults={
-                        'rate': exchange_rate,
-                        'source': 'preset',
-                        'provider': 'default',
-                        'is_active': True,
-                    }
-                )
+                    valid_from=valid_from,
+                    rate=exchange_rate,
+                    source='preset',
+                    provider='default',
+                    is_active=True,
+                ))
+            ExchangeRate.objects.bulk_create(exchange_rates, ignore_conflicts=True)
         
         return currencies_created
-    
     def _load_tax_data(self, country_code: str, industry_code: Optional[str] = None) -> Tuple[int, int]:
         """
         Step 2: Load tax categories then tax codes
@@ -282,17 +284,8 @@ class PresetLoaderService:
         """
         from invoicing.models import TaxCategory, TaxCode
         
-        # Try to load tax JSON file
-        tax_paths = []
-        if industry_code:
-            tax_paths.append(f"tax_rates/{industry_code}_{country_code}.json")
-        tax_paths.append(f"tax_rates/{country_code}.json")
-        
-        tax_data = None
-        for path in tax_paths:
-            tax_data = self._load_json_file(path)
-            if tax_data:
-                break
+        # Priority: {industry_code}_{country_code}.json → {country_code}.json → default
+        tax_data = self._find_preset('tax_rates', country_code, industry_code)
         
         if not tax_data:
             # Use default structure based on country
@@ -321,72 +314,102 @@ class PresetLoaderService:
                     ]
                 }
         
-        tax_categories_created = 0
-        tax_codes_created = 0
-        category_map = {}  # Map category code to TaxCategory instance
+        # Country presets list rates, each carrying its own code and tax type
+        if 'tax_codes' not in tax_data and 'tax_rates' in tax_data:
+            tax_data = {
+                'tax_categories': tax_data.get('tax_categories', []),
+                'tax_codes': tax_data['tax_rates'],
+            }
+        
+        # Resolve every code's category and tax type in memory first
+        tax_codes = {}
+        category_codes = {category_info['code'] for category_info in tax_data.get('tax_categories', [])}
+        for code_info in tax_data.get('tax_codes', []):
+            category_code = code_info.get('category')
+            tax_type = code_info.get('tax_type')
+            if not tax_type:
+                if category_code not in category_codes:
+                    logger.warning(f"Tax code {code_info.get('code')} references unknown category {category_code}")
+                    continue
+                # Determine tax_type from category or code
+                tax_type = 'gst' if 'GST' in category_code else 'sales' if 'SALES' in category_code else 'service'
+            tax_codes.setdefault(code_info['code'], (code_info, tax_type))
         
         with transaction.atomic():
             # First: Create Tax Categories
-            for category_info in tax_data.get('tax_categories', []):
-                category, created = TaxCategory.objects.get_or_create(
+            existing_categories = set(
+                TaxCategory.objects.filter(tenant=self.tenant, code__in=category_codes).values_list('code', flat=True)
+            )
+            new_categories = [
+                TaxCategory(
                     tenant=self.tenant,  # Tenant isolation
                     code=category_info['code'],
-                    defaults={
-                        'name': category_info.get('name', category_info['code']),
-                        'description': category_info.get('description', ''),
-                        'is_active': True,
-                    }
+                    name=category_info.get('name', category_info['code']),
+                    description=category_info.get('description', ''),
+                    is_active=True,
                 )
-                category_map[category_info['code']] = category
-                if created:
-                    tax_categories_created += 1
+                for category_info in {info['code']: info for info in tax_data.get('tax_categories', [])}.values()
+                if category_info['code'] not in existing_categories
+            ]
+            TaxCategory.objects.bulk_create(new_categories)
             
             # Second: Create Tax Codes (linked to categories)
-            for code_info in tax_data.get('tax_codes', []):
-                category_code = code_info.get('category')
-                category = category_map.get(category_code) if category_code else None
-                
-                if not category:
-                    logger.warning(f"Tax code {code_info.get('code')} references unknown category {category_code}")
+            tax_code_map = {
+                tax_code.code: tax_code
+                for tax_code in TaxCode.objects.filter(tenant=self.tenant, code__in=list(tax_codes))
+            }
+            new_codes = []
+            for code, (code_info, tax_type) in tax_codes.items():
+                if code in tax_code_map:
                     continue
-                
-                # Determine tax_type from category or code
-                tax_type = 'gst' if 'GST' in category_code else 'sales' if 'SALES' in category_code else 'service'
-                
-                tax_code, created = TaxCode.objects.get_or_create(
+                tax_code = TaxCode(
                     tenant=self.tenant,  # Tenant isolation
-                    code=code_info['code'],
-                    defaults={
-                        'name': code_info.get('name', code_info['code']),
-                        'tax_type': tax_type,
-                        'description': code_info.get('description', ''),
-                        'is_system': True,
-                        'is_active': True,
-                    }
+                    code=code,
+                    name=code_info.get('name', code),
+                    tax_type=tax_type,
+                    description=code_info.get('description', ''),
+                    is_system=True,
+                    is_active=True,
                 )
-                
-                if created:
-                    tax_codes_created += 1
-                
-                # Also create TaxRate record linked to TaxCode
-                from invoicing.models import TaxRate
-                TaxRate.objects.get_or_create(
+                tax_code_map[code] = tax_code
+                new_codes.append(tax_code)
+            TaxCode.objects.bulk_create(new_codes)
+            
+            # Also create a TaxRate record for each TaxCode that has none
+            from invoicing.models import TaxRate
+            rated = set(
+                TaxRate.objects.filter(
+                    tenant=self.tenant, tax_code__in=list(tax_code_map.values())
+                ).values_list('tax_code_id', flat=True)
+            )
+            new_rates = []
+            if self.user is None and tax_codes:
+                # TaxRate.created_by is required; rates are added once a user loads presets
+                logger.warning(f"No user to own tax rates for tenant {self.tenant.id}; creating tax codes only")
+                tax_codes = {}
+            for code, (code_info, tax_type) in tax_codes.items():
+                tax_code = tax_code_map[code]
+                if tax_code.pk in rated:
+                    continue
+                effective_from = code_info.get('effective_from')
+                new_rates.append(TaxRate(
                     tenant=self.tenant,  # Tenant isolation
                     tax_code=tax_code,
-                    defaults={
-                        'name': tax_code.name,
-                        'code': tax_code.code,  # Legacy field
-                        'rate': Decimal(str(code_info.get('rate', 0))),
-                        'tax_type': tax_type,
-                        'region': country_code,
-                        'is_default': code_info.get('is_default', False),
-                        'is_active': True,
-                        'description': tax_code.description,
-                        'created_by': self.user,
-                    }
-                )
-        
-        return tax_categories_created, tax_codes_created
+                    name=tax_code.name,
+                    code=tax_code.code,  # Legacy field
+                    rate=Decimal(str(code_info.get('rate', 0))),
+                    tax_type=tax_type,
+                    region=code_info.get('region', country_code),
+                    category=code_info.get('category', '') if code_info.get('tax_type') else '',
+                    is_default=code_info.get('is_default', False),
+                    is_active=True,
+                    effective_from=date.fromisoformat(effective_from) if effective_from else None,
+                    description=tax_code.description,
+                    created_by=self.user,
+                ))
+            TaxRate.objects.bulk_create(new_rates)
+        
+        return len(new_categories), len(new_codes)
     
     def _load_accounting_data(self, country_code: str, industry_code: Optional[str] = None) -> Tuple[int, int]:
         """
@@ -401,19 +424,8 @@ class PresetLoaderService:
         """
         from accounting.models import GLAccountType, ChartOfAccounts
         
-        # Try to load chart of accounts JSON file
-        coa_paths = []
-        if industry_code and country_code:
-            coa_paths.append(f"chart_of_accounts/{industry_code}_{country_code}.json")
-        if industry_code:
-            coa_paths.append(f"chart_of_accounts/{industry_code}.json")
-        coa_paths.append(f"chart_of_accounts/{country_code}.json")
-        
-        coa_data = None
-        for path in coa_paths:
-            coa_data = self._load_json_file(path)
-            if coa_data:
-                break
+        # Priority: {industry_code}_{country_code}.json → {industry_code}.json → {country_code}.json → default
+        coa_data = self._find_preset('chart_of_accounts', country_code, industry_code)
         
         if not coa_data:
             # Use default structure from user's example
@@ -435,118 +447,92 @@ class PresetLoaderService:
                 ]
             }
         
-        account_types_created = 0
-        chart_of_accounts_created = 0
-        account_type_map = {}  # Map account type code to GLAccountType instance
-        account_map = {}  # Map account code to ChartOfAccounts instance
+        # Map account type code (e.g. '1000') and account code prefix to type
+        type_code_map = {
+            '1000': 'asset',
+            '2000': 'liability',
+            '3000': 'equity',
+            '4000': 'revenue',
+            '5000': 'expense',
+        }
+        prefix_type_map = {code[0]: type_code for code, type_code in type_code_map.items()}
+        
+        # Determine normal balance
+        normal_balance_map = {
+            'asset': 'debit',
+            'expense': 'debit',
+            'liability': 'credit',
+            'equity': 'credit',
+            'revenue': 'credit',
+        }
+        
+        # Resolve every account's type and parent in memory first
+        if 'chart_of_accounts' not in coa_data and 'accounts' in coa_data:
+            # Country presets nest accounts under their parents and carry their own type
+            rows = flatten_account_tree(coa_data['accounts'])
+        else:
+            rows = []
+            for account_info in coa_data.get('chart_of_accounts', []):
+                parent_code = account_info.get('parent')
+                code_prefix = account_info['code'][0] if account_info['code'] else '1'
+                # Get type from parent's account type, else from the code prefix
+                account_type_code = type_code_map.get(parent_code) or prefix_type_map.get(code_prefix, 'asset')
+                rows.append({
+                    'code': account_info['code'],
+                    'name': account_info.get('name', account_info['code']),
+                    'type': account_type_code,
+                    'parent': parent_code,
+                    'description': account_info.get('description', ''),
+                    'is_active': account_info.get('is_active', True),
+                    'is_system': account_info.get('is_system', not account_info.get('is_selectable', True)),
+                    'normal_balance': 'debit' if account_type_code in ['asset', 'expense'] else 'credit',
+                })
         
         with transaction.atomic():
             # First: Create Account Types
+            account_type_map = {
+                account_type.code: account_type
+                for account_type in GLAccountType.objects.filter(tenant=self.tenant)
+            }
+            new_types = []
             for type_info in coa_data.get('account_types', []):
-                # Map report_type to account type code
-                type_code_map = {
-                    '1000': 'asset',
-                    '2000': 'liability',
-                    '3000': 'equity',
-                    '4000': 'revenue',
-                    '5000': 'expense',
-                }
                 type_code = type_code_map.get(type_info['code'], 'asset')
-                
-                # Determine normal balance
-                normal_balance_map = {
-                    'asset': 'debit',
-                    'expense': 'debit',
-                    'liability': 'credit',
-                    'equity': 'credit',
-                    'revenue': 'credit',
-                }
-                
-                account_type, created = GLAccountType.objects.get_or_create(
+                if type_code in account_type_map:
+                    continue
+                account_type = GLAccountType(
                     tenant=self.tenant,  # Tenant isolation
                     code=type_code,
-                    defaults={
-                        'name': type_info.get('name', type_code.title()),
-                        'normal_balance': normal_balance_map.get(type_code, 'debit'),
-                        'description': f"{type_info.get('name')} - {type_info.get('report_type', '')}",
-                        'is_system': True,
-                        'is_active': True,
-                        'display_order': int(type_info['code'][0]) if type_info['code'].isdigit() else 0,
-                    }
+                    name=type_info.get('name', type_code.title()),
+                    normal_balance=normal_balance_map.get(type_code, 'debit'),
+                    description=f"{type_info.get('name')} - {type_info.get('report_type', '')}",
+                    is_system=True,
+                    is_active=True,
+                    display_order=int(type_info['code'][0]) if type_info['code'].isdigit() else 0,
                 )
-                account_type_map[type_info['code']] = account_type
-                if created:
-                    account_types_created += 1
-            
-            # Second: Create Chart of Accounts (linked to account types)
-            # Sort by code to ensure parents are created before children
-            accounts_to_create = sorted(
-                coa_data.get('chart_of_accounts', []),
-                key=lambda x: x.get('code', '')
-            )
+                account_type_map[type_code] = account_type
+                new_types.append(account_type)
+            GLAccountType.objects.bulk_create(new_types)
+            account_types_created = len(new_types)
+            if not coa_data.get('account_types'):
+                # Nested presets name types only on their accounts
+                existing_types = len(account_type_map)
+                account_type_map = ensure_account_types(self.tenant)
+                account_types_created += len(account_type_map) - existing_types
             
-            for account_info in accounts_to_create:
-                parent_code = account_info.get('parent')
-                parent_account = account_map.get(parent_code) if parent_code else None
-                
-                # Get account type from parent or determine from code
-                account_type_code = None
-                if parent_code:
-                    # Get type from parent's account type
-                    if parent_code in account_type_map:
-                        account_type_code = account_type_map[parent_code].code
-                    else:
-                        # Determine from code prefix
-                        code_prefix = account_info['code'][0] if account_info['code'] else '1'
-                        type_code_map = {
-                            '1': 'asset',
-                            '2': 'liability',
-                            '3': 'equity',
-                            '4': 'revenue',
-                            '5': 'expense',
-                        }
-                        account_type_code = type_code_map.get(code_prefix, 'asset')
-                else:
-                    # Root account, use account type from code
-                    code_prefix = account_info['code'][0] if account_info['code'] else '1'
-                    type_code_map = {
-                        '1': 'asset',
-                        '2': 'liability',
-                        '3': 'equity',
-                        '4': 'revenue',
-                        '5': 'expense',
-                    }
-                    account_type_code = type_code_map.get(code_prefix, 'asset')
-                
-                account_type_obj = None
-                for type_code, gl_type in account_type_map.items():
-                    if gl_type.code == account_type_code:
-                        account_type_obj = gl_type
-                        break
-                
-                # Determine normal balance
-                normal_balance = 'debit' if account_type_code in ['asset', 'expense'] else 'credit'
-                
-                account, created = ChartOfAccounts.objects.get_or_create(
-                    tenant=self.tenant,  # Tenant isolation
-                    code=account_info['code'],
-                    defaults={
-                        'name': account_info.get('name', account_info['code']),
-                        'type': account_type_code,  # Legacy field
-                        'account_type': account_type_obj,  # FK
-                        'parent': parent_account,
-                        'description': account_info.get('description', ''),
-                        'is_active': account_info.get('is_active', True),
-                        'is_system': account_info.get('is_system', not account_info.get('is_selectable', True)),
-                        'normal_balance': normal_balance,
-                        'created_by': self.user,
-                    }
+            # Second: Create Chart of Accounts (linked to account types), one insert per level
+            existing = {
+                account.code: account
+                for account in ChartOfAccounts.objects.filter(
+                    tenant=self.tenant, code__in=[row['code'] for row in rows]
+                    + [row['parent'] for row in rows if row['parent']]
                 )
-                account_map[account_info['code']] = account
-                if created:
-                    chart_of_accounts_created += 1
+            }
+            rows = [row for row in {row['code']: row for row in rows}.values() if row['code'] not in existing]
+            accounts_created = bulk_create_accounts(
+                self.tenant, rows, account_type_map, user=self.user, parents=existing
+            )
         
-        return account_types_created, chart_of_accounts_created
+        return account_types_created, len(accounts_created)
     
     def _update_progress(
         self,
@@ -556,7 +542,7 @@ class PresetLoaderService:
         status: str
     ):
         """
-        Update TenantOnboardingProgress after each block of inserts
+        Record TenantOnboardingProgress for a block of inserts (written once by load_presets)
         
         Args:
             preset_type: Type of preset (currencies, tax_categories, etc.)
@@ -569,6 +555,7 @@ class PresetLoaderService:
                 preset_type=preset_type,
                 status=status,
                 records_created=records_created,
-                total_expected=total_expected
+                total_expected=total_expected,
+                save=False
             )
 
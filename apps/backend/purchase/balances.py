@@ -0,0 +1,238 @@
+"""
+Supplier Balances
+Maintained accounts-payable summaries per supplier.
+
+Each SupplierBalance row is recomputed from the supplier's purchase orders
+and payments: one grouped order query, one query over received orders with
+their paid totals and one payment query, for one supplier or a whole batch.
+purchase.signals refreshes the affected supplier inside the transaction
+that changed the order or payment, with the supplier row locked. A received
+order falls due its payment terms after it was received; rows whose next
+due date has passed are refreshed lazily (refresh_stale) or by the
+rebuild_supplier_balances command.
+"""
+from datetime import timedelta
+from decimal import Decimal
+from typing import Dict, Iterable
+from django.db import transaction
+from django.db.models import Count, Max, Sum
+from django.utils import timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal('0')
+
+# PurchaseOrder.payment_terms -> days until due
+PAYMENT_TERM_DAYS = {
+    'net_15': 15,
+    'net_30': 30,
+    'net_60': 60,
+    'net_90': 90,
+    'due_on_receipt': 0,
+}
+
+BALANCE_FIELDS = [
+    'total_orders', 'lifetime_purchases', 'outstanding_balance', 'open_orders', 'overdue_count',
+    'next_due_date', 'last_order_date', 'last_activity_date', 'refreshed_on',
+]
+
+# ?ordering= value -> SupplierBalance field
+SUMMARY_ORDERING = {
+    'outstanding_balance': 'outstanding_balance',
+    'total_spent': 'lifetime_purchases',
+    'overdue_count': 'overdue_count',
+    'last_order_date': 'last_order_date',
+    'last_activity_date': 'last_activity_date',
+    'supplier_name': 'supplier__name',
+}
+
+
+def order_due_date(payment_terms: str, received_at, delivery_date, order_date):
+    """Date a received purchase order falls due under its payment terms"""
+    if received_at is not None:
+        basis = timezone.localdate(received_at) if timezone.is_aware(received_at) else received_at.date()
+    else:
+        basis = delivery_date or order_date
+    return basis + timedelta(days=PAYMENT_TERM_DAYS.get(payment_terms, 30))
+
+
+class SupplierBalanceService:
+    """Computes and stores SupplierBalance rows"""
+
+    BATCH_SIZE = 1000
+
+    @staticmethod
+    def compute(tenant_id, supplier_ids: Iterable, today=None) -> Dict:
+        """
+        Balance values for suppliers from their orders and payments
+
+        Args:
+            tenant_id: Tenant the suppliers belong to
+            supplier_ids: Suppliers to compute
+            today: Date overdue status is measured against (defaults to today)
+
+        Returns:
+            dict of supplier id -> SupplierBalance field values
+        """
+        from .models import PurchaseOrder, PurchasePayment
+
+        supplier_ids = list(supplier_ids)
+        today = today or timezone.localdate()
+        values = {
+            supplier_id: {
+                'total_orders': 0, 'lifetime_purchases': ZERO, 'outstanding_balance': ZERO, 'open_orders': 0,
+                'overdue_count': 0, 'next_due_date': None, 'last_order_date': None, 'last_activity_date': None,
+                'refreshed_on': today,
+            }
+            for supplier_id in supplier_ids
+        }
+        if not supplier_ids:
+            return values
+
+        orders = PurchaseOrder.objects.filter(tenant_id=tenant_id, supplier_id__in=supplier_ids)
+        activity = {supplier_id: [] for supplier_id in supplier_ids}
+        for row in orders.values('supplier_id').annotate(
+            total_orders=Count('id'), last_order_date=Max('order_date')
+        ).order_by():
+            balance = values[row['supplier_id']]
+            balance['total_orders'] = row['total_orders']
+            balance['last_order_date'] = row['last_order_date']
+            activity[row['supplier_id']].append(row['last_order_date'])
+
+        received = orders.filter(status='received').values(
+            'supplier_id', 'total_amount', 'payment_terms', 'received_at', 'delivery_date', 'order_date'
+        ).annotate(paid=Sum('payments__amount')).order_by()
+        for row in received:
+            balance = values[row['supplier_id']]
+            unpaid = row['total_amount'] - (row['paid'] or ZERO)
+            balance['lifetime_purchases'] += row['total_amount']
+            balance['outstanding_balance'] += unpaid
+            if unpaid <= 0:
+                continue
+            balance['open_orders'] += 1
+            due = order_due_date(row['payment_terms'], row['received_at'], row['delivery_date'], row['order_date'])
+            if due < today:
+                balance['overdue_count'] += 1
+            elif balance['next_due_date'] is None or due < balance['next_due_date']:
+                balance['next_due_date'] = due
+
+        payments = PurchasePayment.objects.filter(tenant_id=tenant_id, supplier_id__in=supplier_ids).values(
+            'supplier_id'
+        ).annotate(last_payment_date=Max('payment_date')).order_by()
+        for row in payments:
+            activity[row['supplier_id']].append(row['last_payment_date'])
+
+        for supplier_id, dates in activity.items():
+            dates = [day for day in dates if day is not None]
+            values[supplier_id]['last_activity_date'] = max(dates) if dates else None
+        return values
+
+    @classmethod
+    def _store(cls, tenant_id, values: Dict):
+        from .models import SupplierBalance
+
+        SupplierBalance.objects.bulk_create(
+            [
+                SupplierBalance(tenant_id=tenant_id, supplier_id=supplier_id, **fields)
+                for supplier_id, fields in values.items()
+            ],
+            batch_size=cls.BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['supplier'],
+            update_fields=BALANCE_FIELDS + ['updated_at'],
+        )
+
+    @classmethod
+    def refresh(cls, tenant_id, supplier_ids: Iterable):
+        """
+        Recompute the balances of some suppliers
+
+        Locks the supplier rows so concurrent refreshes of the same supplier
+        apply in order; runs inside the caller's transaction when there is one.
+        """
+        from .models import Supplier
+
+        supplier_ids = {supplier_id for supplier_id in supplier_ids if supplier_id is not None}
+        if not supplier_ids:
+            return
+        with transaction.atomic():
+            existing = list(
+                Supplier.objects.select_for_update().filter(tenant_id=tenant_id, pk__in=supplier_ids)
+                .order_by('pk').values_list('pk', flat=True)
+            )
+            if existing:
+                cls._store(tenant_id, cls.compute(tenant_id, existing))
+
+    @classmethod
+    def refresh_stale(cls, tenant, today=None) -> int:
+        """
+        Refresh balances whose next open order has fallen due since they were computed
+
+        Returns:
+            Number of suppliers refreshed
+        """
+        from .models import SupplierBalance
+
+        today = today or timezone.localdate()
+        stale = list(SupplierBalance.objects.filter(tenant=tenant, next_due_date__lt=today).values_list(
+            'supplier_id', flat=True
+        ))
+        if stale:
+            cls.refresh(tenant.id, stale)
+        return len(stale)
+
+    @classmethod
+    def rebuild(cls, tenant, batch_size: int = None) -> int:
+        """
+        Recompute every supplier balance of a tenant
+
+        Suppliers are processed in batches; each batch is three queries and
+        one upsert.
+
+        Returns:
+            Number of suppliers rebuilt
+        """
+        from .models import Supplier
+
+        batch_size = batch_size or cls.BATCH_SIZE
+        supplier_ids = list(Supplier.objects.filter(tenant=tenant).order_by('pk').values_list('pk', flat=True))
+        with transaction.atomic():
+            for start in range(0, len(supplier_ids), batch_size):
+                cls._store(tenant.id, cls.compute(tenant.id, supplier_ids[start:start + batch_size]))
+
+        logger.info(f"Rebuilt balances for {len(supplier_ids)} suppliers of tenant {tenant.id}")
+        return len(supplier_ids)
+
+    @classmethod
+    def get_balance(cls, supplier):
+        """The supplier's balance row, computing it first if it does not exist yet"""
+        from .models import SupplierBalance
+
+        balance = SupplierBalance.objects.filter(supplier=supplier).first()
+        if balance is None:
+            cls.refresh(supplier.tenant_id, [supplier.pk])
+            balance = SupplierBalance.objects.get(supplier=supplier)
+        return balance
+
+    @staticmethod
+    def summary(tenant, ordering: str = '-outstanding_balance'):
+        """
+        Balances of a tenant's active suppliers, in one query
+
+        Args:
+            tenant: Tenant instance
+            ordering: One of SUMMARY_ORDERING, optionally prefixed with '-'
+
+        Raises:
+            ValueError: Unknown ordering
+        """
+        from .models import SupplierBalance
+
+        field = SUMMARY_ORDERING.get(ordering.lstrip('-'))
+        if field is None:
+            raise ValueError(f"ordering must be one of: {', '.join(sorted(SUMMARY_ORDERING))}")
+        prefix = '-' if ordering.startswith('-') else ''
+        return SupplierBalance.objects.filter(tenant=tenant, supplier__is_active=True).select_related(
+            'supplier'
+        ).order_by(f"{prefix}{field}", 'supplier__name')
@@ -0,0 +1,40 @@
+"""
+Management command to rebuild maintained supplier balances
+Usage: python manage.py rebuild_supplier_balances [--tenant <slug>] [--stale-only]
+
+Run after migrating, after bulk imports that bypass model signals, and
+daily with --stale-only so overdue counts follow the calendar.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from purchase.balances import SupplierBalanceService
+from tenants.models import Tenant
+
+
+class Command(BaseCommand):
+    help = 'Recompute supplier balance summaries (lifetime totals, open balance, overdue count)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', type=str, help='Tenant slug (defaults to all active tenants)')
+        parser.add_argument(
+            '--stale-only', action='store_true',
+            help='Only refresh suppliers whose next open document has fallen due'
+        )
+
+    def handle(self, *args, **options):
+        tenants = Tenant.objects.filter(is_active=True)
+        if options.get('tenant'):
+            tenants = Tenant.objects.filter(slug=options['tenant'])
+            if not tenants.exists():
+                raise CommandError(f"Tenant '{options['tenant']}' not found")
+
+        for tenant in tenants:
+            started = time.time()
+            if options['stale_only']:
+                count = SupplierBalanceService.refresh_stale(tenant)
+            else:
+                count = SupplierBalanceService.rebuild(tenant)
+            self.stdout.write(f"{tenant.slug}: {count:,} suppliers in {time.time() - started:.1f}s")
+        self.stdout.write(self.style.SUCCESS('Supplier balances updated'))
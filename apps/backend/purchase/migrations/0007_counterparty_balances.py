@@ -0,0 +1,47 @@
+# Generated by Django 4.2 on 2026-10-19 13:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0004_tenantonboardingprogress_preset_progress'),
+        ('purchase', '0006_purchaseorder_converted_amount_in_base_currency_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SupplierBalance',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('total_orders', models.PositiveIntegerField(default=0)),
+                ('lifetime_purchases', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('outstanding_balance', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('open_orders', models.PositiveIntegerField(default=0)),
+                ('overdue_count', models.PositiveIntegerField(default=0)),
+                ('next_due_date', models.DateField(blank=True, null=True)),
+                ('last_order_date', models.DateField(blank=True, null=True)),
+                ('last_activity_date', models.DateField(blank=True, null=True)),
+                ('refreshed_on', models.DateField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('supplier', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='balance', to='purchase.supplier')),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='supplier_balances', to='tenants.tenant')),
+            ],
+            options={
+                'verbose_name': 'Supplier Balance',
+                'verbose_name_plural': 'Supplier Balances',
+                'db_table': 'supplier_balances',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='supplierbalance',
+            index=models.Index(fields=['tenant', '-outstanding_balance'], name='supplier_ba_tenant__fae219_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='supplierbalance',
+            index=models.Index(fields=['tenant', 'next_due_date'], name='supplier_ba_tenant__5f7550_idx'),
+        ),
+    ]
@@ -1,8 +1,15 @@
 from django.db import models
 import uuid
 from decimal import Decimal
+from django.db.models import Sum, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
-from backend.enhanced_base_models import TenantScopedModel, FinancialModel, MultiCurrencyMixin
+import logging
+from backend.enhanced_base_models import (
+    TenantScopedModel, FinancialModel, MultiCurrencyMixin, EnhancedTenantManager, EnhancedTenantQuerySet
+)
+
+logger = logging.getLogger(__name__)
 
 
 class Supplier(models.Model):
@@ -60,17 +67,85 @@ class Supplier(models.Model):
         return self.name
 
     def get_total_purchases(self):
-        """Get total purchases from this supplier"""
-        return sum(
-            order.total_amount for order in self.purchase_orders.filter(status='received')
-        )
+        """Get total purchases from this supplier (received orders)"""
+        from .balances import SupplierBalanceService
+        return SupplierBalanceService.get_balance(self).lifetime_purchases
 
     def get_outstanding_balance(self):
-        """Get outstanding balance for this supplier"""
-        return sum(
-            order.total_amount - sum(payment.amount for payment in order.payments.all())
-            for order in self.purchase_orders.filter(status='received')
-        )
+        """Get outstanding balance for this supplier (received orders less payments)"""
+        from .balances import SupplierBalanceService
+        return SupplierBalanceService.get_balance(self).outstanding_balance
+
+
+class SupplierBalance(models.Model):
+    """
+    Supplier Balance model holding a supplier's maintained AP summary
+
+    Kept current by purchase.balances.SupplierBalanceService when purchase
+    orders and payments change; rebuilt in bulk by the
+    rebuild_supplier_balances command.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tenant = models.ForeignKey('tenants.Tenant', on_delete=models.CASCADE, related_name='supplier_balances')
+    supplier = models.OneToOneField(Supplier, on_delete=models.CASCADE, related_name='balance')
+    total_orders = models.PositiveIntegerField(default=0)
+    lifetime_purchases = models.DecimalField(max_digits=18, decimal_places=2, default=0)  # Received orders
+    outstanding_balance = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    open_orders = models.PositiveIntegerField(default=0)  # Received and not fully paid
+    overdue_count = models.PositiveIntegerField(default=0)
+    next_due_date = models.DateField(null=True, blank=True)  # Earliest open order not yet overdue
+    last_order_date = models.DateField(null=True, blank=True)
+    last_activity_date = models.DateField(null=True, blank=True)
+    refreshed_on = models.DateField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'supplier_balances'
+        verbose_name = 'Supplier Balance'
+        verbose_name_plural = 'Supplier Balances'
+        indexes = [
+            models.Index(fields=['tenant', '-outstanding_balance']),
+            models.Index(fields=['tenant', 'next_due_date']),
+        ]
+
+    def __str__(self):
+        return f"{self.supplier_id}: {self.outstanding_balance} outstanding"
+
+
+# Fields PurchaseOrder's base-currency conversion reads and writes
+FX_INPUT_FIELDS = ('total_amount', 'transaction_currency', 'order_date')
+FX_RESULT_FIELDS = ('converted_amount_in_base_currency', 'exchange_rate', 'exchange_rate_date')
+
+ORDER_AMOUNT_FIELD = models.DecimalField(max_digits=15, decimal_places=2)
+
+# Order-level line aggregate -> PurchaseOrderLine field
+LINE_TOTAL_FIELDS = {
+    'lines_subtotal': 'line_total',
+    'lines_quantity': 'quantity',
+    'lines_received_quantity': 'received_quantity',
+}
+
+
+def line_total_sums(prefix: str = ''):
+    """Sum expressions for LINE_TOTAL_FIELDS (prefix 'lines__' when aggregating from orders)"""
+    return {
+        name: Coalesce(Sum(f"{prefix}{field}"), Value(Decimal('0')), output_field=ORDER_AMOUNT_FIELD)
+        for name, field in LINE_TOTAL_FIELDS.items()
+    }
+
+
+class PurchaseOrderQuerySet(EnhancedTenantQuerySet):
+    def with_line_totals(self):
+        """Annotate lines_subtotal, lines_quantity and lines_received_quantity in the same query"""
+        return self.annotate(**line_total_sums('lines__'))
+
+
+class PurchaseOrderManager(EnhancedTenantManager):
+    def get_queryset(self):
+        return PurchaseOrderQuerySet(self.model, using=self._db)
+
+    def with_line_totals(self):
+        return self.get_queryset().with_line_totals()
 
 
 class PurchaseOrder(FinancialModel, MultiCurrencyMixin):
@@ -119,6 +194,8 @@ class PurchaseOrder(FinancialModel, MultiCurrencyMixin):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = PurchaseOrderManager()
+
     class Meta:
         db_table = 'purchase_orders'
         verbose_name = 'Purchase Order'
@@ -134,68 +211,91 @@ class PurchaseOrder(FinancialModel, MultiCurrencyMixin):
     def __str__(self):
         return f"PO {self.order_number} - {self.supplier.name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_fx_inputs = instance._fx_inputs()
+        return instance
+
+    def _fx_inputs(self):
+        """Loaded values the base-currency conversion depends on (deferred fields read as None)"""
+        return tuple(self.__dict__.get(name) for name in FX_INPUT_FIELDS)
+
+    def needs_conversion(self):
+        """Whether total_amount must be (re)converted: new, never converted, or amount/currency/date changed"""
+        if self._state.adding or 'converted_amount_in_base_currency' in self.__dict__ and (
+            self.converted_amount_in_base_currency is None
+        ):
+            return True
+        return self._fx_inputs() != getattr(self, '_loaded_fx_inputs', None)
+
     def save(self, *args, **kwargs):
-        """Override save to auto-convert to base currency"""
+        """Override save to convert to base currency when the amount, currency or order date changed"""
         # Set transaction_currency from currency field if not set
         if not self.transaction_currency and self.currency:
             self.transaction_currency = self.currency
-        
-        # Auto-convert total_amount to base currency if transaction_currency is set
-        if self.transaction_currency and self.total_amount:
+
+        # Convert total_amount at the order date's rate
+        if self.transaction_currency and self.total_amount and self.needs_conversion():
             from fx_conversion.utils import convert_to_base
             try:
                 converted, rate, base = convert_to_base(
                     self.total_amount,
                     self.transaction_currency,
-                    str(self.tenant.id),
-                    timezone.now() if hasattr(self, 'order_date') and self.order_date else None
+                    str(self.tenant_id),
+                    self.order_date
                 )
                 self.converted_amount_in_base_currency = converted
                 self.exchange_rate = rate
                 self.exchange_rate_date = timezone.now()
+                if kwargs.get('update_fields') is not None:
+                    kwargs['update_fields'] = set(kwargs['update_fields']) | set(FX_RESULT_FIELDS)
             except Exception as e:
-                import logging
-                logger = logging.getLogger(__name__)
                 logger.warning(f"Failed to convert currency for PurchaseOrder {self.id}: {e}")
-        
+
         super().save(*args, **kwargs)
-    
+        self._loaded_fx_inputs = self._fx_inputs()
+
     def calculate_totals(self):
-        """Calculate order totals"""
-        self.subtotal = sum(line.total_amount for line in self.lines.all())
+        """Recalculate order totals from the lines in one aggregate and save"""
+        self.subtotal = self.lines.aggregate(**line_total_sums())['lines_subtotal']
         self.total_amount = self.subtotal + self.tax_amount + self.shipping_amount - self.discount_amount
-        
-        # Auto-convert to base currency
-        if self.transaction_currency and self.total_amount:
-            from fx_conversion.utils import convert_to_base
-            try:
-                converted, rate, base = convert_to_base(
-                    self.total_amount,
-                    self.transaction_currency,
-                    str(self.tenant.id),
-                    timezone.now() if hasattr(self, 'order_date') and self.order_date else None
-                )
-                self.converted_amount_in_base_currency = converted
-                self.exchange_rate = rate
-                self.exchange_rate_date = timezone.now()
-            except Exception as e:
-                import logging
-                logger = logging.getLogger(__name__)
-                logger.warning(f"Failed to convert currency for PurchaseOrder {self.id}: {e}")
-        
         self.save()
 
+    def line_totals(self):
+        """
+        Line subtotal, ordered quantity and received quantity
+
+        Uses with_line_totals() annotations or prefetched lines when
+        present, otherwise one aggregate query.
+
+        Returns:
+            (subtotal, ordered quantity, received quantity)
+        """
+        if hasattr(self, 'lines_subtotal'):
+            return self.lines_subtotal, self.lines_quantity, self.lines_received_quantity
+        lines = getattr(self, '_prefetched_objects_cache', {}).get('lines')
+        if lines is not None:
+            return (
+                sum((line.line_total for line in lines), Decimal('0')),
+                sum((line.quantity for line in lines), Decimal('0')),
+                sum((line.received_quantity for line in lines), Decimal('0')),
+            )
+        totals = self.lines.aggregate(**line_total_sums())
+        return totals['lines_subtotal'], totals['lines_quantity'], totals['lines_received_quantity']
+
     def get_received_quantity(self):
         """Get total received quantity"""
-        return sum(line.received_quantity for line in self.lines.all())
+        return self.line_totals()[2]
 
     def get_total_quantity(self):
         """Get total ordered quantity"""
-        return sum(line.quantity for line in self.lines.all())
+        return self.line_totals()[1]
 
     def is_fully_received(self):
         """Check if order is fully received"""
-        return self.get_received_quantity() >= self.get_total_quantity()
+        _, ordered, received = self.line_totals()
+        return received >= ordered
 
 
 class PurchaseOrderLine(models.Model):
@@ -228,8 +328,8 @@ class PurchaseOrderLine(models.Model):
     def save(self, *args, **kwargs):
         # Calculate line total
         subtotal = self.quantity * self.unit_price
-        discount = subtotal * (self.discount_rate / 100)
-        tax = (subtotal - discount) * (self.tax_rate / 100)
+        discount = subtotal * (Decimal(str(self.discount_rate)) / Decimal('100'))
+        tax = (subtotal - discount) * (Decimal(str(self.tax_rate)) / Decimal('100'))
         self.line_total = subtotal - discount + tax
         super().save(*args, **kwargs)
 
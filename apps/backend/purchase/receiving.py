@@ -0,0 +1,161 @@
+"""
+Purchase Receiving
+Receive goods against a purchase order in one transaction.
+
+The order is locked, its lines are read once, and every receipt line is
+validated against the remaining quantity in memory. The receipt, its lines
+and the new received quantities are then written with one insert, one
+bulk_create and one bulk_update, and the order status is derived from the
+updated lines without re-reading them.
+"""
+import uuid
+from decimal import Decimal, InvalidOperation
+from typing import Dict, List, Optional
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal('0')
+
+# Order statuses goods can be received against
+RECEIVABLE_STATUSES = ('approved', 'sent', 'confirmed', 'partially_received')
+
+
+class PurchaseReceivingService:
+    """Bulk receipt of purchase order lines"""
+
+    @staticmethod
+    def _quantity(raw) -> Decimal:
+        try:
+            quantity = Decimal(str(raw))
+        except (InvalidOperation, ValueError):
+            raise ValueError('Must be a number.')
+        if not quantity.is_finite() or quantity <= 0:
+            raise ValueError('Must be greater than zero.')
+        return quantity
+
+    @classmethod
+    def receive(cls, purchase_order, warehouse, user, lines: Optional[List[Dict]] = None, receipt_date=None,
+                receipt_number: str = None, notes: str = '', status: str = 'received'):
+        """
+        Receive goods against a purchase order
+
+        Args:
+            purchase_order: PurchaseOrder (or its id) to receive against
+            warehouse: Warehouse the goods arrive in (must belong to the order's tenant)
+            user: User recording the receipt
+            lines: List of {'purchase_order_line': id, 'quantity': amount[,
+                'notes': str]}; None receives every line's remaining quantity
+            receipt_date: Defaults to today
+            receipt_number: Defaults to a generated PR- number
+            notes: Receipt notes
+            status: Status of the new receipt
+
+        Returns:
+            The saved PurchaseReceipt
+
+        Raises:
+            ValueError: The order cannot be received or nothing is left to receive
+            ValidationError: Per-line errors, keyed by line index
+        """
+        from .models import PurchaseOrder, PurchaseOrderLine, PurchaseReceipt, PurchaseReceiptLine
+
+        order_id = getattr(purchase_order, 'pk', purchase_order)
+        with transaction.atomic():
+            order = PurchaseOrder.objects.select_for_update().select_related('supplier').get(pk=order_id)
+            if order.status not in RECEIVABLE_STATUSES:
+                raise ValueError(f"Orders in status '{order.status}' cannot be received")
+            if warehouse.tenant_id != order.tenant_id:
+                raise ValueError('Warehouse not found')
+
+            order_lines = {line.pk: line for line in order.lines.all()}
+            if lines is None:
+                lines = [
+                    {'purchase_order_line': line.pk, 'quantity': line.get_remaining_quantity()}
+                    for line in order_lines.values() if line.get_remaining_quantity() > 0
+                ]
+            if not lines:
+                raise ValueError('Nothing left to receive on this order')
+
+            received = {}
+            accepted = []
+            errors = {}
+            for index, row in enumerate(lines):
+                row_errors = []
+                line = order_lines.get(cls._line_id(row.get('purchase_order_line')))
+                if line is None:
+                    row_errors.append('Purchase order line not found on this order.')
+                try:
+                    quantity = cls._quantity(row.get('quantity'))
+                except ValueError as e:
+                    row_errors.append(str(e))
+                    quantity = None
+                if line is not None and quantity is not None:
+                    remaining = line.get_remaining_quantity() - received.get(line.pk, ZERO)
+                    if quantity > remaining:
+                        row_errors.append(f"Only {remaining} left to receive.")
+                    else:
+                        received[line.pk] = received.get(line.pk, ZERO) + quantity
+                        accepted.append((line, quantity, row.get('notes', '')))
+                if row_errors:
+                    errors[str(index)] = row_errors
+            if errors:
+                raise ValidationError(errors)
+
+            now = timezone.now()
+            receipt = PurchaseReceipt.objects.create(
+                tenant_id=order.tenant_id,
+                company_id=order.company_id,
+                supplier=order.supplier,
+                supplier_name=order.supplier.name,
+                purchase_order=order,
+                warehouse=warehouse,
+                receipt_number=receipt_number or f"PR-{now.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6].upper()}",
+                receipt_date=receipt_date or timezone.localdate(),
+                notes=notes,
+                status=status,
+                created_by=user,
+            )
+            # bulk_create skips PurchaseReceiptLine.save, so received quantities are posted once below
+            PurchaseReceiptLine.objects.bulk_create([
+                PurchaseReceiptLine(
+                    tenant_id=order.tenant_id,
+                    purchase_receipt=receipt,
+                    purchase_order_line=line,
+                    item_id=line.item_id,
+                    description=line.description,
+                    quantity_received=quantity,
+                    unit_price=line.unit_price,
+                    notes=line_notes,
+                    created_by=user,
+                )
+                for line, quantity, line_notes in accepted
+            ])
+
+            for line_id, quantity in received.items():
+                order_lines[line_id].received_quantity += quantity
+                order_lines[line_id].updated_at = now
+            PurchaseOrderLine.objects.bulk_update(
+                [order_lines[line_id] for line_id in received], ['received_quantity', 'updated_at']
+            )
+
+            fully_received = all(line.received_quantity >= line.quantity for line in order_lines.values())
+            order.status = 'received' if fully_received else 'partially_received'
+            update_fields = ['status', 'updated_at']
+            if fully_received:
+                order.received_at = now
+                update_fields.append('received_at')
+            order.save(update_fields=update_fields)
+
+        logger.info(f"Received {len(lines)} lines against purchase order {order.order_number}")
+        return receipt
+
+    @staticmethod
+    def _line_id(raw):
+        try:
+            return int(raw)
+        except (TypeError, ValueError):
+            return None
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from backend.fieldsets import SparseFieldsetMixin
 from decimal import Decimal
 from .models import (
     Supplier, PurchaseOrder, PurchaseOrderLine, PurchaseReceipt, PurchaseReceiptLine, PurchasePayment,
@@ -6,13 +7,14 @@ from .models import (
 )
 
 
-class SupplierSerializer(serializers.ModelSerializer):
+class SupplierSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Supplier"""
     total_orders = serializers.SerializerMethodField()
     total_spent = serializers.SerializerMethodField()
     
     class Meta:
         model = Supplier
+        prefetch_related = ['purchase_orders']  # read by the method fields
         fields = [
             'id', 'tenant', 'company', 'name', 'email', 'phone', 'address',
             'city', 'state', 'country', 'postal_code', 'tax_id', 'currency',
@@ -28,7 +30,7 @@ class SupplierSerializer(serializers.ModelSerializer):
         return sum(order.total_amount for order in obj.purchase_orders.all())
 
 
-class PurchaseOrderLineSerializer(serializers.ModelSerializer):
+class PurchaseOrderLineSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Purchase Order Line"""
     total_amount = serializers.SerializerMethodField()
     
@@ -49,7 +51,7 @@ class PurchaseOrderLineSerializer(serializers.ModelSerializer):
         return subtotal - discount + tax
 
 
-class PurchaseOrderSerializer(serializers.ModelSerializer):
+class PurchaseOrderSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Purchase Order"""
     total_amount = serializers.SerializerMethodField()
     total_tax = serializers.SerializerMethodField()
@@ -59,6 +61,7 @@ class PurchaseOrderSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = PurchaseOrder
+        prefetch_related = ['lines']  # read by the method fields
         fields = [
             'id', 'tenant', 'company', 'supplier', 'supplier_name', 'order_number',
             'order_date', 'delivery_date', 'status', 'payment_terms', 'currency',
@@ -69,7 +72,7 @@ class PurchaseOrderSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at', 'approved_at', 'received_at']
     
     def get_total_amount(self, obj):
-        return sum(line.total_amount for line in obj.lines.all())
+        return obj.line_totals()[0]
     
     def get_total_tax(self, obj):
         total_tax = Decimal('0.00')
@@ -98,7 +101,7 @@ class PurchaseOrderWithLinesSerializer(PurchaseOrderSerializer):
         fields = PurchaseOrderSerializer.Meta.fields + ['lines']
 
 
-class PurchaseReceiptLineSerializer(serializers.ModelSerializer):
+class PurchaseReceiptLineSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Purchase Receipt Line"""
     total_amount = serializers.SerializerMethodField()
     
@@ -115,7 +118,7 @@ class PurchaseReceiptLineSerializer(serializers.ModelSerializer):
         return obj.quantity_received * obj.unit_price
 
 
-class PurchaseReceiptSerializer(serializers.ModelSerializer):
+class PurchaseReceiptSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Purchase Receipt"""
     total_amount = serializers.SerializerMethodField()
     supplier_name = serializers.CharField(source='supplier.name', read_only=True)
@@ -123,6 +126,7 @@ class PurchaseReceiptSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = PurchaseReceipt
+        prefetch_related = ['lines']  # read by the method fields
         fields = [
             'id', 'tenant', 'company', 'supplier', 'supplier_name', 'receipt_number',
             'receipt_date', 'purchase_order', 'status', 'total_amount',
@@ -132,7 +136,7 @@ class PurchaseReceiptSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at', 'approved_at']
     
     def get_total_amount(self, obj):
-        return sum(line.total_amount for line in obj.lines.all())
+        return sum((line.quantity_received * line.unit_price for line in obj.lines.all()), Decimal('0.00'))
 
 
 class PurchaseReceiptWithLinesSerializer(PurchaseReceiptSerializer):
@@ -143,7 +147,7 @@ class PurchaseReceiptWithLinesSerializer(PurchaseReceiptSerializer):
         fields = PurchaseReceiptSerializer.Meta.fields + ['lines']
 
 
-class PurchasePaymentSerializer(serializers.ModelSerializer):
+class PurchasePaymentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Purchase Payment"""
     supplier_name = serializers.CharField(source='supplier.name', read_only=True)
     
@@ -166,6 +170,10 @@ class SupplierSummarySerializer(serializers.Serializer):
     total_orders = serializers.IntegerField()
     total_spent = serializers.DecimalField(max_digits=15, decimal_places=2)
     last_order_date = serializers.DateField()
+    outstanding_balance = serializers.DecimalField(max_digits=18, decimal_places=2)
+    open_orders = serializers.IntegerField()
+    overdue_count = serializers.IntegerField()
+    last_activity_date = serializers.DateField()
     is_active = serializers.BooleanField()
 
 
@@ -195,7 +203,7 @@ class PurchaseOrderSummarySerializer(serializers.Serializer):
 # Vendor Verification Serializers
 # ============================================================================
 
-class VendorWalletAddressSerializer(serializers.ModelSerializer):
+class VendorWalletAddressSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Vendor Wallet Address"""
     supplier_name = serializers.CharField(source='supplier.name', read_only=True)
     network_display = serializers.CharField(source='get_network_display', read_only=True)
@@ -212,7 +220,7 @@ class VendorWalletAddressSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class VendorVerificationLogSerializer(serializers.ModelSerializer):
+class VendorVerificationLogSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Vendor Verification Log"""
     supplier_name = serializers.CharField(source='supplier.name', read_only=True)
     verification_type_display = serializers.CharField(source='get_verification_type_display', read_only=True)
@@ -232,7 +240,7 @@ class VendorVerificationLogSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
-class PurchaseApprovalRequestSerializer(serializers.ModelSerializer):
+class PurchaseApprovalRequestSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Purchase Approval Request"""
     purchase_order_number = serializers.CharField(source='purchase_order.order_number', read_only=True)
     requested_by_name = serializers.CharField(source='requested_by.get_full_name', read_only=True)
@@ -251,7 +259,7 @@ class PurchaseApprovalRequestSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at', 'approved_at']
 
 
-class PurchaseContractSerializer(serializers.ModelSerializer):
+class PurchaseContractSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Purchase Contract"""
     supplier_name = serializers.CharField(source='supplier.name', read_only=True)
     approved_by_name = serializers.CharField(source='approved_by.get_full_name', read_only=True)
@@ -280,7 +288,7 @@ class PurchaseContractSerializer(serializers.ModelSerializer):
         return obj.is_expiring_soon()
 
 
-class PurchaseSettingsSerializer(serializers.ModelSerializer):
+class PurchaseSettingsSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Purchase Settings"""
     default_warehouse_name = serializers.CharField(source='default_warehouse.name', read_only=True)
     
@@ -298,7 +306,7 @@ class PurchaseSettingsSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class PaymentBlockSerializer(serializers.ModelSerializer):
+class PaymentBlockSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Payment Block"""
     supplier_name = serializers.CharField(source='supplier.name', read_only=True)
     block_reason_display = serializers.CharField(source='get_block_reason_display', read_only=True)
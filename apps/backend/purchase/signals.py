@@ -0,0 +1,85 @@
+"""
+Purchase Signals
+Keep supplier balances current when purchase orders and payments change,
+and drop cached vendor verification verdicts when their inputs change
+"""
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+from web3_integration.models import CryptoTransaction, CryptoWallet
+from .balances import SupplierBalanceService
+from .models import PaymentBlock, PurchaseOrder, PurchasePayment, Supplier, VendorWalletAddress
+from .vendor_verification_service import VendorVerificationService
+
+# Deletions starting here change a supplier's balance; deleting the
+# supplier (or its tenant) removes the balance row with it.
+BALANCE_SOURCES = (PurchaseOrder, PurchasePayment)
+
+
+def _deleted_directly(kwargs) -> bool:
+    origin = kwargs.get('origin')
+    model = getattr(origin, 'model', None) or type(origin)
+    return origin is None or issubclass(model, BALANCE_SOURCES)
+
+
+@receiver(post_save, sender=Supplier)
+def create_supplier_balance(sender, instance, created, **kwargs):
+    """Give new suppliers an empty balance row so they appear in summaries"""
+    if created:
+        SupplierBalanceService.refresh(instance.tenant_id, [instance.pk])
+
+
+@receiver(pre_save, sender=PurchaseOrder)
+def remember_supplier(sender, instance, update_fields=None, **kwargs):
+    """Read the stored supplier before an order changes, so moving it refreshes both balances"""
+    instance._balance_supplier_before = None
+    if instance._state.adding:
+        return
+    if update_fields is not None and not {'supplier', 'supplier_id'} & set(update_fields):
+        return
+    instance._balance_supplier_before = sender._base_manager.filter(
+        pk=instance.pk
+    ).values_list('supplier_id', flat=True).first()
+
+
+@receiver(post_save, sender=PurchaseOrder)
+@receiver(post_delete, sender=PurchaseOrder)
+def refresh_supplier_balance(sender, instance, **kwargs):
+    """Recompute the supplier's balance (and the previous supplier's) within the changing transaction"""
+    if 'created' in kwargs or _deleted_directly(kwargs):
+        supplier_ids = {instance.supplier_id}
+        if 'created' in kwargs and getattr(instance, '_balance_supplier_before', None) is not None:
+            supplier_ids.add(instance._balance_supplier_before)  # Moved from another supplier
+        SupplierBalanceService.refresh(instance.tenant_id, supplier_ids)
+
+
+@receiver(post_save, sender=PurchasePayment)
+@receiver(post_delete, sender=PurchasePayment)
+def refresh_supplier_balance_for_payment(sender, instance, **kwargs):
+    """Recompute the balance of the paid order's supplier (and the payment's, if different)"""
+    if 'created' in kwargs or _deleted_directly(kwargs):
+        supplier_ids = set(
+            PurchaseOrder.objects.filter(pk=instance.purchase_order_id).values_list('supplier_id', flat=True)
+        )
+        supplier_ids.add(instance.supplier_id)
+        SupplierBalanceService.refresh(instance.tenant_id, supplier_ids)
+
+
+@receiver(post_save, sender=VendorWalletAddress)
+@receiver(post_delete, sender=VendorWalletAddress)
+@receiver(post_save, sender=PaymentBlock)
+@receiver(post_delete, sender=PaymentBlock)
+@receiver(post_save, sender=Supplier)
+@receiver(post_save, sender=CryptoWallet)
+@receiver(post_delete, sender=CryptoWallet)
+def invalidate_vendor_verification(sender, instance, **kwargs):
+    """Rescore the tenant's vendor wallets on next check"""
+    VendorVerificationService.invalidate(instance.tenant_id)
+
+
+@receiver(post_save, sender=CryptoTransaction)
+@receiver(post_delete, sender=CryptoTransaction)
+def invalidate_vendor_verification_for_transaction(sender, instance, **kwargs):
+    """Transaction history counts toward an address's risk score"""
+    # Deleting the wallet (or its tenant) invalidates once for all its transactions
+    if 'created' in kwargs or kwargs.get('origin') is None or isinstance(kwargs.get('origin'), CryptoTransaction):
+        VendorVerificationService.invalidate(instance.wallet.tenant_id)
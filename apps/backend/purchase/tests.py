@@ -1,3 +1,299 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from authentication.models import User
+from tenants.models import Company, Tenant
+from inventory.models import Item, Warehouse
+from web3_integration.models import CryptoTransaction, CryptoWallet
+from .balances import SupplierBalanceService
+from .models import (
+    PaymentBlock, PurchaseOrder, PurchaseOrderLine, PurchasePayment, PurchaseReceiptLine, Supplier, SupplierBalance,
+    VendorVerificationLog, VendorWalletAddress
+)
+from .receiving import PurchaseReceivingService
+from .vendor_verification_service import VendorVerificationService
+
+
+class SupplierBalanceTest(TestCase):
+    """Test maintained supplier balance summaries"""
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(
+            name='Supplier Balance Tenant',
+            slug='supplier_balance_tenant',
+            is_active=True
+        )
+        self.company = Company.objects.create(
+            tenant=self.tenant,
+            name='Supplier Balance Company',
+            registration_number='123456789'
+        )
+        self.user = User.objects.create_user(
+            username='payables',
+            email='payables@example.com',
+            password='testpass123',
+            tenant=self.tenant,
+            role='accountant'
+        )
+        self.supplier = Supplier.objects.create(
+            tenant=self.tenant, company=self.company, name='Initech', created_by=self.user
+        )
+        self.today = timezone.localdate()
+
+    def _order(self, number, amount, status, days_ago, payment_terms='net_30'):
+        return PurchaseOrder.objects.create(
+            tenant=self.tenant, company=self.company, order_number=number, supplier=self.supplier,
+            order_date=self.today - timedelta(days=days_ago), delivery_date=self.today - timedelta(days=days_ago),
+            status=status, total_amount=Decimal(amount), payment_terms=payment_terms, created_by=self.user
+        )
+
+    def test_balance_follows_orders_and_payments(self):
+        """Test open AP, overdue count and due dates after orders and payments change"""
+        self.assertEqual(self.supplier.balance.total_orders, 0)
+
+        overdue = self._order('PO-1', '400.00', 'received', 45)
+        self._order('PO-2', '100.00', 'received', 5, payment_terms='net_15')
+        self._order('PO-3', '999.00', 'draft', 1)
+        PurchasePayment.objects.create(
+            tenant=self.tenant, purchase_order=overdue, supplier=self.supplier, company=self.company,
+            payment_date=self.today, amount=Decimal('150.00'), payment_method='bank_transfer', created_by=self.user
+        )
+
+        balance = SupplierBalance.objects.get(supplier=self.supplier)
+        self.assertEqual(balance.total_orders, 3)
+        self.assertEqual(balance.lifetime_purchases, Decimal('500.00'))
+        self.assertEqual(balance.outstanding_balance, Decimal('350.00'))
+        self.assertEqual((balance.open_orders, balance.overdue_count), (2, 1))
+        self.assertEqual(balance.next_due_date, self.today + timedelta(days=10))
+        self.assertEqual(balance.last_activity_date, self.today)
+        self.assertEqual(self.supplier.get_total_purchases(), Decimal('500.00'))
+
+        overdue.status = 'cancelled'
+        overdue.save()
+        balance = SupplierBalance.objects.get(supplier=self.supplier)
+        self.assertEqual((balance.outstanding_balance, balance.overdue_count), (Decimal('100.00'), 0))
+
+        SupplierBalance.objects.all().delete()
+        self.assertEqual(SupplierBalanceService.rebuild(self.tenant), 1)
+        self.assertEqual(SupplierBalance.objects.get().outstanding_balance, Decimal('100.00'))
+
+    def test_moving_order_refreshes_both_suppliers(self):
+        """Test reassigning an order moves its amount off the previous supplier's balance"""
+        order = self._order('PO-1', '400.00', 'received', 5)
+        other = Supplier.objects.create(tenant=self.tenant, company=self.company, name='Globex', created_by=self.user)
+
+        order.supplier = other
+        order.save()
+        self.assertEqual(SupplierBalance.objects.get(supplier=self.supplier).outstanding_balance, Decimal('0'))
+        self.assertEqual(SupplierBalance.objects.get(supplier=other).outstanding_balance, Decimal('400.00'))
+
+
+class PurchaseOrderReceivingTest(TestCase):
+    """Test order line totals, conditional FX conversion and bulk receiving"""
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(
+            name='Receiving Tenant',
+            slug='receiving_tenant',
+            is_active=True
+        )
+        self.company = Company.objects.create(
+            tenant=self.tenant,
+            name='Receiving Company',
+            registration_number='123456789'
+        )
+        self.user = User.objects.create_user(
+            username='receiver',
+            email='receiver@example.com',
+            password='testpass123',
+            tenant=self.tenant,
+            role='accountant'
+        )
+        self.supplier = Supplier.objects.create(
+            tenant=self.tenant, company=self.company, name='Globex', created_by=self.user
+        )
+        self.warehouse = Warehouse.objects.create(
+            tenant=self.tenant, company=self.company, name='Main', code='MAIN'
+        )
+
+    def _order(self, number, line_count, quantity='10'):
+        order = PurchaseOrder.objects.create(
+            tenant=self.tenant, company=self.company, order_number=number, supplier=self.supplier,
+            order_date=date(2024, 3, 1), status='approved', created_by=self.user
+        )
+        for index in range(line_count):
+            item = Item.objects.create(
+                tenant=self.tenant, company=self.company, sku=f'{number}-{index}', name=f'Part {index}'
+            )
+            PurchaseOrderLine.objects.create(
+                tenant=self.tenant, purchase_order=order, item=item, description=item.name,
+                quantity=Decimal(quantity), unit_price=Decimal('2.50')
+            )
+        return order
+
+    def test_line_totals_from_annotation_prefetch_or_one_query(self):
+        """Test order totals come from one aggregate and need no queries when annotated or prefetched"""
+        order = self._order('PO-1', 3)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(order.line_totals(), (Decimal('75.00'), Decimal('30'), Decimal('0')))
+
+        annotated = PurchaseOrder.objects.with_line_totals().get(pk=order.pk)
+        prefetched = PurchaseOrder.objects.prefetch_related('lines').get(pk=order.pk)
+        with self.assertNumQueries(0):
+            self.assertFalse(annotated.is_fully_received())
+            self.assertEqual(prefetched.get_total_quantity(), Decimal('30'))
+
+        order.calculate_totals()
+        order.refresh_from_db()
+        self.assertEqual((order.subtotal, order.total_amount), (Decimal('75.00'), Decimal('75.00')))
+
+    def test_fx_conversion_only_when_amount_currency_or_date_change(self):
+        """Test saves that leave the converted inputs alone skip the FX lookup"""
+        from fx_conversion import utils
+
+        order = self._order('PO-1', 1)
+        with mock.patch.object(utils, 'convert_to_base', wraps=utils.convert_to_base) as convert:
+            order.calculate_totals()
+            self.assertEqual(convert.call_count, 1)
+            self.assertEqual(convert.call_args.args[3], date(2024, 3, 1))
+
+            order = PurchaseOrder.objects.get(pk=order.pk)
+            order.status = 'sent'
+            order.save()
+            order.notes = 'Call before delivery'
+            order.save()
+            self.assertEqual(convert.call_count, 1)
+
+            order.order_date = date(2024, 3, 5)
+            order.save()
+            self.assertEqual(convert.call_count, 2)
+
+    def test_bulk_receive_validates_and_posts_in_one_transaction(self):
+        """Test receiving many lines takes a constant number of queries and updates the order"""
+        def receive(line_count):
+            order = self._order(f'PO-{line_count}', line_count)
+            lines = [
+                {'purchase_order_line': line_id, 'quantity': '4'}
+                for line_id in order.lines.values_list('pk', flat=True)
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                PurchaseReceivingService.receive(order, self.warehouse, self.user, lines=lines)
+            return order, len(queries)
+
+        order, small = receive(2)
+        _, large = receive(12)
+        self.assertEqual(small, large)
+
+        order.refresh_from_db()
+        self.assertEqual(order.status, 'partially_received')
+        self.assertEqual(order.get_received_quantity(), Decimal('8'))
+        self.assertEqual(PurchaseReceiptLine.objects.filter(purchase_receipt__purchase_order=order).count(), 2)
+
+        line = order.lines.first()
+        with self.assertRaises(ValidationError) as raised:
+            PurchaseReceivingService.receive(order, self.warehouse, self.user, lines=[
+                {'purchase_order_line': line.pk, 'quantity': '5'},
+                {'purchase_order_line': line.pk, 'quantity': '2'},
+                {'purchase_order_line': 0, 'quantity': '-1'},
+            ])
+        self.assertEqual(sorted(raised.exception.message_dict), ['1', '2'])
+        self.assertEqual(order.lines.get(pk=line.pk).received_quantity, Decimal('4'))
+
+        PurchaseReceivingService.receive(order, self.warehouse, self.user)
+        order.refresh_from_db()
+        self.assertEqual(order.status, 'received')
+        self.assertTrue(order.is_fully_received())
+        with self.assertRaises(ValueError):
+            PurchaseReceivingService.receive(order, self.warehouse, self.user)
+
+
+class VendorVerificationTest(TestCase):
+    """Test batch vendor wallet verification and its verdict cache"""
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name='Verification Tenant', slug='verification_tenant', is_active=True)
+        self.company = Company.objects.create(
+            tenant=self.tenant, name='Verification Company', registration_number='123456789'
+        )
+        self.user = User.objects.create_user(
+            username='verifier', email='verifier@example.com', password='testpass123',
+            tenant=self.tenant, role='accountant'
+        )
+        self.supplier = Supplier.objects.create(
+            tenant=self.tenant, company=self.company, name='Globex', created_by=self.user
+        )
+        VendorWalletAddress.objects.create(
+            tenant=self.tenant, supplier=self.supplier, wallet_address='0xverified', network='ethereum',
+            is_verified=True, transaction_count=7
+        )
+        VendorWalletAddress.objects.create(
+            tenant=self.tenant, supplier=self.supplier, wallet_address='0xprimary', network='ethereum',
+            is_primary=True
+        )
+        wallet = CryptoWallet.objects.create(
+            tenant=self.tenant, user=self.user, name='Payables', address='0xKnown', network='ethereum',
+            wallet_type='metamask'
+        )
+        for index in range(3):
+            CryptoTransaction.objects.create(
+                wallet=wallet, tx_hash=f'0xtx{index}', from_address='0xknown', to_address='0xother',
+                amount=Decimal('1'), token_symbol='ETH'
+            )
+        self.checks = [
+            (self.supplier, '0xVerified', 'ethereum'),
+            (self.supplier, '0xPrimary', 'ethereum'),
+            (self.supplier, '0xknown', 'ethereum'),
+            (self.supplier, '0xunknown', 'ethereum'),
+        ]
+
+    def test_batch_scores_in_grouped_queries_and_caches_verdicts(self):
+        """Test a batch is scored from three queries plus one log insert, then served from cache"""
+        with self.assertNumQueries(4):
+            results = VendorVerificationService.verify_wallets(self.tenant, self.checks)
+        self.assertEqual(
+            [(result['recommendation'], result['risk_score']) for result in results],
+            [('approve', 0.0), ('approve', 10.0), ('approve', 5.0), ('review', 65.0)]
+        )
+        self.assertEqual(results[2]['transaction_count_found'], 3)
+        self.assertNotIn('verification_id', results[0])
+        self.assertEqual(VendorVerificationLog.objects.filter(tenant=self.tenant).count(), 3)
+
+        with self.assertNumQueries(1):  # Log insert only
+            cached = VendorVerificationService.verify_wallets(self.tenant, self.checks)
+        self.assertEqual([result['risk_score'] for result in cached], [result['risk_score'] for result in results])
+
+        PaymentBlock.objects.create(
+            tenant=self.tenant, supplier=self.supplier, wallet_address='0xknown', network='ethereum',
+            amount=Decimal('10'), block_reason='manual_block'
+        )
+        result = VendorVerificationService.verify_wallet_address(self.tenant, self.supplier, '0xKnown', 'ethereum')
+        self.assertEqual(result['risk_factors'][-1], 'Address has 1 recent payment blocks')
+
+    def test_payment_run_blocks_risky_lines(self):
+        """Test a payment run creates blocks for risky lines and the single-payment check agrees"""
+        PaymentBlock.objects.create(
+            tenant=self.tenant, supplier=self.supplier, wallet_address='0xunknown', network='ethereum',
+            amount=Decimal('10'), block_reason='manual_block'
+        )
+        payments = [
+            {'supplier': self.supplier, 'wallet_address': address, 'network': network, 'amount': Decimal('100')}
+            for _, address, network in self.checks
+        ]
+        results = VendorVerificationService.check_payments_before_processing(self.tenant, payments, user=self.user)
+        self.assertEqual([result['blocked'] for result in results], [False, False, False, True])
+        block = PaymentBlock.objects.get(id=results[3]['block_id'])
+        self.assertEqual((block.wallet_address, block.block_reason), ('0xunknown', 'risk_score_threshold'))
 
-# Create your tests here.
+        result = VendorVerificationService.check_payment_before_processing(
+            self.tenant, self.supplier, '0xunknown', 'ethereum', Decimal('100')
+        )
+        self.assertTrue(result['blocked'])
+        self.assertIn('Address has 2 recent payment blocks', result['risk_factors'])
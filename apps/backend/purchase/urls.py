@@ -56,6 +56,7 @@ urlpatterns = [
     path('vendor-wallets/<uuid:pk>/', views.VendorWalletAddressDetailView.as_view(), name='vendor_wallet_detail'),
     path('vendor-wallets/<uuid:wallet_id>/verify/', views.verify_vendor_wallet_manual, name='verify_vendor_wallet_manual'),
     path('payments/check-before-processing/', views.check_payment_before_processing, name='check_payment_before_processing'),
+    path('payments/check-before-processing/batch/', views.check_payments_before_processing, name='check_payments_before_processing'),
     path('verification-logs/', views.VendorVerificationLogListView.as_view(), name='verification_log_list'),
     path('payment-blocks/', views.PaymentBlockListView.as_view(), name='payment_block_list'),
     path('payment-blocks/<uuid:pk>/', views.PaymentBlockDetailView.as_view(), name='payment_block_detail'),
@@ -1,12 +1,22 @@
 """
 Vendor Identity Verification Service
 Core business logic for wallet verification, risk scoring, and payment blocking
+
+Checks are verified in batches: one payment run loads the vendor wallets,
+transaction counts and payment blocks of all its addresses in three grouped
+queries. Verdicts are cached per tenant under a version that
+purchase.signals bumps whenever vendor wallets, payment blocks, suppliers
+or crypto transactions change.
 """
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.db.models.functions import Lower
 from django.utils import timezone
 from decimal import Decimal
 from datetime import timedelta
 import logging
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 from .models import Supplier, VendorWalletAddress, VendorVerificationLog, PaymentBlock
 
@@ -23,7 +33,33 @@ class VendorVerificationService:
     # Transaction history thresholds
     MIN_TRANSACTION_COUNT = 3
     MIN_TRANSACTION_AGE_DAYS = 30
+
+    # Payments accepted by one batch pre-payment check
+    MAX_BATCH_PAYMENTS = 1000
     
+    @staticmethod
+    def get_cache_ttl() -> int:
+        """Seconds a verdict is reused before rescoring (VENDOR_VERIFICATION_CACHE_TTL_SECONDS)"""
+        return getattr(settings, 'VENDOR_VERIFICATION_CACHE_TTL_SECONDS', 300)
+
+    @staticmethod
+    def _version_key(tenant_id) -> str:
+        return f"vendor_verification:version:{tenant_id}"
+
+    @classmethod
+    def _cache_key(cls, tenant_id, version, key: Tuple) -> str:
+        supplier_id, wallet_address, network = key
+        return f"vendor_verification:{tenant_id}:{version}:{supplier_id}:{network}:{wallet_address}"
+
+    @classmethod
+    def invalidate(cls, tenant_id):
+        """Drop cached verdicts for a tenant"""
+        key = cls._version_key(tenant_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
     @staticmethod
     def verify_wallet_address(
         tenant,
@@ -47,38 +83,173 @@ class VendorVerificationService:
                 'transaction_count_found': int
             }
         """
-        risk_factors = []
-        risk_score = Decimal('0')
-        transaction_count = 0
-        address_found = False
-        history_match = False
-        
-        # Check if address is already verified for this supplier
-        existing_wallet = VendorWalletAddress.objects.filter(
-            tenant=tenant,
-            supplier=supplier,
-            wallet_address=wallet_address.lower(),
-            network=network
-        ).first()
+        return VendorVerificationService.verify_wallets(
+            tenant, [(supplier, wallet_address, network)], verification_type=verification_type, user=user
+        )[0]
+
+    @classmethod
+    def verify_wallets(
+        cls,
+        tenant,
+        checks: Iterable[Tuple[Supplier, str, str]],
+        verification_type: str = 'auto',
+        user=None
+    ) -> List[Dict]:
+        """
+        Verify several (supplier, wallet_address, network) tuples together
         
-        if existing_wallet and existing_wallet.is_verified:
-            return {
-                'status': 'passed',
-                'risk_score': float(existing_wallet.risk_score),
-                'risk_factors': [],
-                'recommendation': 'approve',
-                'transaction_history_match': True,
-                'address_found_in_history': True,
-                'transaction_count_found': existing_wallet.transaction_count
-            }
+        Cached verdicts are reused; the rest are scored from three grouped
+        queries (vendor wallets, crypto transaction counts, payment blocks)
+        and every scored (not pre-verified) check is logged in one insert.
         
-        # Check transaction history from Web3 integration
-        transaction_count, address_found = VendorVerificationService._check_transaction_history(
-            tenant, wallet_address, network, supplier
+        Returns:
+            list: One verify_wallet_address() result per check, in order
+        """
+        checks = [(supplier, wallet_address.lower(), network) for supplier, wallet_address, network in checks]
+        keys = [(supplier.id, wallet_address, network) for supplier, wallet_address, network in checks]
+
+        version = cache.get(cls._version_key(tenant.id), 0)
+        cache_keys = {key: cls._cache_key(tenant.id, version, key) for key in keys}
+        cached = cache.get_many(list(set(cache_keys.values())))
+        verdicts = {key: cached[cache_key] for key, cache_key in cache_keys.items() if cache_key in cached}
+
+        missing = {key: check for key, check in zip(keys, checks) if key not in verdicts}
+        if missing:
+            scored = cls._score_checks(tenant, missing)
+            verdicts.update(scored)
+            cache.set_many({cache_keys[key]: verdict for key, verdict in scored.items()}, cls.get_cache_ttl())
+
+        logs = []
+        results = []
+        for key, (supplier, wallet_address, network) in zip(keys, checks):
+            result = dict(verdicts[key])
+            if not result.pop('pre_verified', False):
+                log = VendorVerificationLog(
+                    tenant=tenant,
+                    supplier=supplier,
+                    wallet_address=wallet_address,
+                    network=network,
+                    verification_type=verification_type,
+                    verification_status=result['status'],
+                    risk_factors=result['risk_factors'],
+                    transaction_history_match=result['transaction_history_match'],
+                    address_found_in_history=result['address_found_in_history'],
+                    transaction_count_found=result['transaction_count_found'],
+                    recommendation=result['recommendation'],
+                    verified_by=user
+                )
+                logs.append(log)
+                result['verification_id'] = str(log.id)
+            results.append(result)
+
+        if logs:
+            VendorVerificationLog.objects.bulk_create(logs)
+        return results
+
+    @classmethod
+    def _score_checks(cls, tenant, checks: Dict[Tuple, Tuple]) -> Dict[Tuple, Dict]:
+        """Verdicts for uncached checks, keyed by (supplier_id, wallet_address, network)"""
+        addresses = {wallet_address for _, wallet_address, _ in checks.values()}
+        networks = {network for _, _, network in checks.values()}
+
+        # The checked addresses' wallets and each supplier's primary wallet
+        wallets = {}
+        primary_addresses = {}
+        for wallet in VendorWalletAddress.objects.filter(
+            Q(wallet_address__in=addresses, network__in=networks)
+            | Q(supplier_id__in={supplier.id for supplier, _, _ in checks.values()}, is_primary=True),
+            tenant=tenant
+        ):
+            wallets[(wallet.supplier_id, wallet.wallet_address, wallet.network)] = wallet
+            if wallet.is_primary:
+                primary_addresses[wallet.supplier_id] = wallet.wallet_address
+
+        verdicts = {}
+        pending = {}
+        for key, check in checks.items():
+            wallet = wallets.get(key)
+            if wallet and wallet.is_verified:
+                # Check if address is already verified for this supplier
+                verdicts[key] = {
+                    'status': 'passed',
+                    'risk_score': float(wallet.risk_score),
+                    'risk_factors': [],
+                    'recommendation': 'approve',
+                    'transaction_history_match': True,
+                    'address_found_in_history': True,
+                    'transaction_count_found': wallet.transaction_count,
+                    'pre_verified': True
+                }
+            else:
+                pending[key] = check
+        if not pending:
+            return verdicts
+
+        history, recent_blocks = cls._load_history(
+            tenant,
+            {wallet_address for _, wallet_address, _ in pending.values()},
+            {network for _, _, network in pending.values()}
         )
+        for key, (supplier, wallet_address, network) in pending.items():
+            verdicts[key] = cls._score(
+                wallet_address,
+                primary_addresses.get(supplier.id) or getattr(supplier, 'primary_wallet_address', ''),
+                history['transactions'].get((wallet_address, network), 0) + history['payments'].get(key, 0),
+                recent_blocks.get((wallet_address, network), 0)
+            )
+        return verdicts
+
+    @staticmethod
+    def _load_history(tenant, addresses: Set[str], networks: Set[str]) -> Tuple[Dict, Dict]:
+        """
+        Transaction history and recent blocks for a set of addresses
+        
+        Returns:
+            tuple: ({'transactions': {(address, network): count},
+                     'payments': {(supplier_id, address, network): count}},
+                    {(address, network): recent blocked payments})
+        """
+        history = {'transactions': {}, 'payments': {}}
+        recent_blocks: Dict[Tuple, int] = {}
+        try:
+            from web3_integration.models import CryptoTransaction
+
+            # Transactions to/from our own wallets at these addresses
+            rows = CryptoTransaction.objects.filter(
+                wallet__tenant=tenant, wallet__network__in=networks
+            ).annotate(address=Lower('wallet__address')).filter(address__in=addresses).values(
+                'address', 'wallet__network'
+            ).annotate(count=Count('id')).order_by()
+            for row in rows:
+                history['transactions'][(row['address'], row['wallet__network'])] = row['count']
+
+            # Past payments to each supplier at these addresses, and recent blocks of any supplier
+            rows = PaymentBlock.objects.filter(
+                tenant=tenant, network__in=networks
+            ).annotate(address=Lower('wallet_address')).filter(address__in=addresses).values(
+                'supplier_id', 'address', 'network'
+            ).annotate(
+                paid=Count('id', filter=Q(status__in=['approved', 'resolved'])),
+                blocked=Count('id', filter=Q(
+                    status='blocked', created_at__gte=timezone.now() - timedelta(days=90)
+                )),
+            ).order_by()
+            for row in rows:
+                history['payments'][(row['supplier_id'], row['address'], row['network'])] = row['paid']
+                address_key = (row['address'], row['network'])
+                recent_blocks[address_key] = recent_blocks.get(address_key, 0) + row['blocked']
+        except Exception as e:
+            logger.error(f"Error checking transaction history: {e}")
+        return history, recent_blocks
+
+    @staticmethod
+    def _score(wallet_address: str, primary_address: str, transaction_count: int, recent_blocks: int) -> Dict:
+        """Risk verdict for an unverified address from its supplier's primary wallet and its history"""
+        risk_factors = []
+        risk_score = Decimal('0')
+        address_found = transaction_count > 0
         
         if address_found:
-            history_match = True
             if transaction_count >= VendorVerificationService.MIN_TRANSACTION_COUNT:
                 risk_score -= Decimal('20')  # Reduce risk for known address
             else:
@@ -89,22 +260,13 @@ class VendorVerificationService:
             risk_score += Decimal('40')
         
         # Check if address matches supplier's primary wallet
-        if supplier.primary_wallet_address and supplier.primary_wallet_address.lower() == wallet_address.lower():
+        if primary_address and primary_address.lower() == wallet_address:
             risk_score -= Decimal('30')  # Significant reduction for primary wallet
         else:
-            if supplier.primary_wallet_address:
+            if primary_address:
                 risk_factors.append('Wallet address does not match supplier primary wallet')
                 risk_score += Decimal('25')
         
-        # Check recent payment blocks for this address
-        recent_blocks = PaymentBlock.objects.filter(
-            tenant=tenant,
-            wallet_address=wallet_address.lower(),
-            network=network,
-            status='blocked',
-            created_at__gte=timezone.now() - timedelta(days=90)
-        ).count()
-        
         if recent_blocks > 0:
             risk_factors.append(f'Address has {recent_blocks} recent payment blocks')
             risk_score += Decimal('50')
@@ -123,71 +285,16 @@ class VendorVerificationService:
             status = 'passed'
             recommendation = 'approve'
         
-        # Log verification
-        log = VendorVerificationLog.objects.create(
-            tenant=tenant,
-            supplier=supplier,
-            wallet_address=wallet_address.lower(),
-            network=network,
-            verification_type=verification_type,
-            verification_status=status,
-            risk_factors=risk_factors,
-            transaction_history_match=history_match,
-            address_found_in_history=address_found,
-            transaction_count_found=transaction_count,
-            recommendation=recommendation,
-            verified_by=user
-        )
-        
         return {
             'status': status,
             'risk_score': float(risk_score),
             'risk_factors': risk_factors,
             'recommendation': recommendation,
-            'transaction_history_match': history_match,
+            'transaction_history_match': address_found,
             'address_found_in_history': address_found,
-            'transaction_count_found': transaction_count,
-            'verification_id': str(log.id)
+            'transaction_count_found': transaction_count
         }
     
-    @staticmethod
-    def _check_transaction_history(
-        tenant,
-        wallet_address: str,
-        network: str,
-        supplier: Supplier
-    ) -> Tuple[int, bool]:
-        """
-        Check transaction history for wallet address
-        
-        Returns:
-            tuple: (transaction_count, address_found)
-        """
-        try:
-            from web3_integration.models import CryptoTransaction
-            
-            # Check transactions to/from this wallet
-            transactions = CryptoTransaction.objects.filter(
-                wallet__tenant=tenant,
-                wallet__address__iexact=wallet_address.lower(),
-                wallet__network=network
-            ).count()
-            
-            # Also check if we've paid this supplier before with this address
-            past_payments = PaymentBlock.objects.filter(
-                tenant=tenant,
-                supplier=supplier,
-                wallet_address__iexact=wallet_address.lower(),
-                network=network,
-                status__in=['approved', 'resolved']
-            ).count()
-            
-            total_count = transactions + past_payments
-            return total_count, total_count > 0
-        except Exception as e:
-            logger.error(f"Error checking transaction history: {e}")
-            return 0, False
-    
     @staticmethod
     def check_payment_before_processing(
         tenant,
@@ -213,59 +320,92 @@ class VendorVerificationService:
                 'block_id': str (if blocked)
             }
         """
-        # Verify wallet first
-        verification_result = VendorVerificationService.verify_wallet_address(
-            tenant=tenant,
-            supplier=supplier,
-            wallet_address=wallet_address,
-            network=network,
-            verification_type='payment_check',
-            user=user
-        )
+        return VendorVerificationService.check_payments_before_processing(tenant, [{
+            'supplier': supplier,
+            'wallet_address': wallet_address,
+            'network': network,
+            'amount': amount,
+            'currency': currency,
+            'purchase_order': purchase_order,
+            'invoice': invoice,
+        }], user=user)[0]
+
+    @classmethod
+    def check_payments_before_processing(cls, tenant, payments: Iterable[Dict], user=None) -> List[Dict]:
+        """
+        Check a payment run before processing
         
-        if verification_result['recommendation'] == 'block':
-            # Create payment block
-            block = PaymentBlock.objects.create(
-                tenant=tenant,
-                supplier=supplier,
-                purchase_order=purchase_order,
-                invoice=invoice,
-                wallet_address=wallet_address.lower(),
-                network=network,
-                amount=amount,
-                currency=currency,
-                block_reason='risk_score_threshold',
-                risk_factors=verification_result['risk_factors'],
-                status='blocked',
-                blocked_by=user
-            )
-            
-            return {
-                'allowed': False,
-                'blocked': True,
-                'risk_score': verification_result['risk_score'],
-                'block_reason': 'High risk score - payment blocked',
-                'risk_factors': verification_result['risk_factors'],
-                'block_id': str(block.id)
-            }
+        Every payment is scored against the state before the run, so a block
+        raised for one line does not raise the score of another supplier's
+        line to the same address within the same run.
         
-        if verification_result['recommendation'] == 'review':
-            return {
-                'allowed': True,
-                'blocked': False,
-                'risk_score': verification_result['risk_score'],
-                'block_reason': None,
-                'risk_factors': verification_result['risk_factors'],
-                'requires_review': True
-            }
+        Args:
+            tenant: Tenant the payments belong to
+            payments: Dicts with supplier, wallet_address, network, amount and
+                optionally currency, purchase_order and invoice
+            user: User running the check
         
-        return {
-            'allowed': True,
-            'blocked': False,
-            'risk_score': verification_result['risk_score'],
-            'block_reason': None,
-            'risk_factors': []
-        }
+        Returns:
+            list: One check_payment_before_processing() result per payment, in order
+        """
+        payments = list(payments)
+        verifications = cls.verify_wallets(
+            tenant,
+            [(payment['supplier'], payment['wallet_address'], payment['network']) for payment in payments],
+            verification_type='payment_check',
+            user=user
+        )
+
+        blocks = []
+        results = []
+        for payment, verification_result in zip(payments, verifications):
+            if verification_result['recommendation'] == 'block':
+                # Create payment block
+                block = PaymentBlock(
+                    tenant=tenant,
+                    supplier=payment['supplier'],
+                    purchase_order=payment.get('purchase_order'),
+                    invoice=payment.get('invoice'),
+                    wallet_address=payment['wallet_address'].lower(),
+                    network=payment['network'],
+                    amount=payment['amount'],
+                    currency=payment.get('currency', 'USD'),
+                    block_reason='risk_score_threshold',
+                    risk_factors=verification_result['risk_factors'],
+                    status='blocked',
+                    blocked_by=user
+                )
+                blocks.append(block)
+                results.append({
+                    'allowed': False,
+                    'blocked': True,
+                    'risk_score': verification_result['risk_score'],
+                    'block_reason': 'High risk score - payment blocked',
+                    'risk_factors': verification_result['risk_factors'],
+                    'block_id': str(block.id)
+                })
+            elif verification_result['recommendation'] == 'review':
+                results.append({
+                    'allowed': True,
+                    'blocked': False,
+                    'risk_score': verification_result['risk_score'],
+                    'block_reason': None,
+                    'risk_factors': verification_result['risk_factors'],
+                    'requires_review': True
+                })
+            else:
+                results.append({
+                    'allowed': True,
+                    'blocked': False,
+                    'risk_score': verification_result['risk_score'],
+                    'block_reason': None,
+                    'risk_factors': []
+                })
+
+        if blocks:
+            PaymentBlock.objects.bulk_create(blocks)
+            cls.invalidate(tenant.id)  # bulk_create sends no post_save
+        return results
     
     @staticmethod
     def register_vendor_wallet(
@@ -3,7 +3,8 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Sum
+from django.core.exceptions import ValidationError
+from django.db.models import Sum
 from django.utils import timezone
 from decimal import Decimal
 from datetime import datetime, date, timedelta
@@ -20,12 +21,19 @@ from .serializers import (
     VendorWalletAddressSerializer, VendorVerificationLogSerializer, PaymentBlockSerializer,
     PurchaseApprovalRequestSerializer, PurchaseContractSerializer, PurchaseSettingsSerializer
 )
+from backend.pagination import KeysetPagination, paginated_response
+from backend.query_planning import QueryPlanMixin
 from backend.tenant_utils import get_request_tenant
+from reporting.analytics import AnalyticsQueryService
+from .balances import SupplierBalanceService
+from .receiving import PurchaseReceivingService
+from search.indexing import SearchIndexService
+from inventory.models import Warehouse
 from .vendor_verification_service import VendorVerificationService
 from authentication.permissions import IsAccountant, IsTenantMember
 
 
-class SupplierListView(generics.ListCreateAPIView):
+class SupplierListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create suppliers"""
     serializer_class = SupplierSerializer
     permission_classes = [IsAccountant]
@@ -40,7 +48,7 @@ class SupplierListView(generics.ListCreateAPIView):
         serializer.save(tenant=self.request.user.tenant)
 
 
-class SupplierDetailView(generics.RetrieveUpdateDestroyAPIView):
+class SupplierDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete supplier"""
     serializer_class = SupplierSerializer
     permission_classes = [IsAccountant]
@@ -49,7 +57,7 @@ class SupplierDetailView(generics.RetrieveUpdateDestroyAPIView):
         return Supplier.objects.filter(tenant=self.request.user.tenant)
 
 
-class PurchaseOrderListView(generics.ListCreateAPIView):
+class PurchaseOrderListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create purchase orders"""
     serializer_class = PurchaseOrderSerializer
     permission_classes = [IsAccountant]
@@ -57,7 +65,7 @@ class PurchaseOrderListView(generics.ListCreateAPIView):
     def get_queryset(self):
         return PurchaseOrder.objects.filter(
             tenant=self.request.user.tenant
-        ).order_by('-order_date', '-created_at')
+        ).select_related('supplier', 'created_by').prefetch_related('lines').order_by('-order_date', '-created_at')
     
     def perform_create(self, serializer):
         serializer.save(
@@ -66,16 +74,18 @@ class PurchaseOrderListView(generics.ListCreateAPIView):
         )
 
 
-class PurchaseOrderDetailView(generics.RetrieveUpdateDestroyAPIView):
+class PurchaseOrderDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete purchase order"""
     serializer_class = PurchaseOrderWithLinesSerializer
     permission_classes = [IsAccountant]
     
     def get_queryset(self):
-        return PurchaseOrder.objects.filter(tenant=self.request.user.tenant)
+        return PurchaseOrder.objects.filter(
+            tenant=self.request.user.tenant
+        ).select_related('supplier', 'created_by').prefetch_related('lines')
 
 
-class PurchaseOrderLineListView(generics.ListCreateAPIView):
+class PurchaseOrderLineListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create purchase order lines"""
     serializer_class = PurchaseOrderLineSerializer
     permission_classes = [IsAccountant]
@@ -96,7 +106,7 @@ class PurchaseOrderLineListView(generics.ListCreateAPIView):
         serializer.save(purchase_order=purchase_order)
 
 
-class PurchaseReceiptListView(generics.ListCreateAPIView):
+class PurchaseReceiptListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create purchase receipts"""
     serializer_class = PurchaseReceiptSerializer
     permission_classes = [IsAccountant]
@@ -104,7 +114,7 @@ class PurchaseReceiptListView(generics.ListCreateAPIView):
     def get_queryset(self):
         return PurchaseReceipt.objects.filter(
             tenant=self.request.user.tenant
-        ).order_by('-receipt_date', '-created_at')
+        ).select_related('supplier', 'created_by').prefetch_related('lines').order_by('-receipt_date', '-created_at')
     
     def perform_create(self, serializer):
         serializer.save(
@@ -113,7 +123,7 @@ class PurchaseReceiptListView(generics.ListCreateAPIView):
         )
 
 
-class PurchaseReceiptDetailView(generics.RetrieveUpdateDestroyAPIView):
+class PurchaseReceiptDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete purchase receipt"""
     serializer_class = PurchaseReceiptWithLinesSerializer
     permission_classes = [IsAccountant]
@@ -122,7 +132,7 @@ class PurchaseReceiptDetailView(generics.RetrieveUpdateDestroyAPIView):
         return PurchaseReceipt.objects.filter(tenant=self.request.user.tenant)
 
 
-class PurchaseReceiptLineListView(generics.ListCreateAPIView):
+class PurchaseReceiptLineListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create purchase receipt lines"""
     serializer_class = PurchaseReceiptLineSerializer
     permission_classes = [IsAccountant]
@@ -143,7 +153,7 @@ class PurchaseReceiptLineListView(generics.ListCreateAPIView):
         serializer.save(purchase_receipt=purchase_receipt)
 
 
-class PurchasePaymentListView(generics.ListCreateAPIView):
+class PurchasePaymentListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create purchase payments"""
     serializer_class = PurchasePaymentSerializer
     permission_classes = [IsAccountant]
@@ -157,7 +167,7 @@ class PurchasePaymentListView(generics.ListCreateAPIView):
         serializer.save(tenant=self.request.user.tenant)
 
 
-class PurchasePaymentDetailView(generics.RetrieveUpdateDestroyAPIView):
+class PurchasePaymentDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete purchase payment"""
     serializer_class = PurchasePaymentSerializer
     permission_classes = [IsAccountant]
@@ -211,7 +221,7 @@ def receive_purchase_order(request, pk):
     
     purchase_order.status = 'received'
     purchase_order.received_at = timezone.now()
-    purchase_order.save()
+    purchase_order.save(update_fields=['status', 'received_at', 'updated_at'])
     
     return Response({
         'message': 'Purchase order received successfully',
@@ -239,13 +249,7 @@ def approve_purchase_receipt(request, pk):
     purchase_receipt.approved_by = request.user
     purchase_receipt.approved_at = timezone.now()
     purchase_receipt.save()
-    
-    # Update received quantities in purchase order lines
-    for receipt_line in purchase_receipt.lines.all():
-        if receipt_line.purchase_order_line:
-            order_line = receipt_line.purchase_order_line
-            order_line.received_quantity += receipt_line.quantity_received
-            order_line.save()
+    # Received quantities were posted to the order lines when the receipt lines were created
     
     return Response({
         'message': 'Purchase receipt approved successfully',
@@ -256,47 +260,62 @@ def approve_purchase_receipt(request, pk):
 @api_view(['POST'])
 @permission_classes([IsAccountant])
 def create_receipt_from_order(request, purchase_order_id):
-    """Create a purchase receipt from a purchase order"""
+    """
+    Create a purchase receipt from a purchase order
+
+    Receives `lines` ([{purchase_order_line, quantity[, notes]}], default:
+    everything still open) into `warehouse` in one transaction. `status`
+    is 'draft' (default) or 'received'.
+    """
     purchase_order = get_object_or_404(
         PurchaseOrder,
         id=purchase_order_id,
         tenant=request.user.tenant
     )
-    
-    if purchase_order.status != 'approved':
+    warehouse = Warehouse.objects.filter(
+        id=request.data.get('warehouse'),
+        tenant=request.user.tenant
+    ).first() if request.data.get('warehouse') else None
+    if warehouse is None:
         return Response(
-            {'error': 'Only approved orders can have receipts created'},
+            {'error': 'A valid warehouse is required'},
             status=status.HTTP_400_BAD_REQUEST
         )
-    
-    # Create purchase receipt
-    purchase_receipt = PurchaseReceipt.objects.create(
-        tenant=purchase_order.tenant,
-        company=purchase_order.company,
-        supplier=purchase_order.supplier,
-        receipt_number=f"PR-{timezone.now().strftime('%Y%m%d%H%M%S')}",
-        receipt_date=timezone.now().date(),
-        purchase_order=purchase_order,
-        status='draft',
-        created_by=request.user
-    )
-    
-    # Create receipt lines from order lines
-    for order_line in purchase_order.lines.all():
-        remaining_quantity = order_line.quantity - order_line.received_quantity
-        if remaining_quantity > 0:
-            PurchaseReceiptLine.objects.create(
-                purchase_receipt=purchase_receipt,
-                purchase_order_line=order_line,
-                item=order_line.item,
-                description=order_line.description,
-                quantity_received=remaining_quantity,
-                unit_price=order_line.unit_price
+
+    lines = request.data.get('lines')
+    if lines is not None and not isinstance(lines, list):
+        return Response({'error': 'lines must be a list'}, status=status.HTTP_400_BAD_REQUEST)
+    receipt_status = request.data.get('status', 'draft')
+    if receipt_status not in ('draft', 'received'):
+        return Response({'error': "status must be 'draft' or 'received'"}, status=status.HTTP_400_BAD_REQUEST)
+    receipt_date = None
+    if request.data.get('receipt_date'):
+        try:
+            receipt_date = datetime.strptime(request.data['receipt_date'], '%Y-%m-%d').date()
+        except ValueError:
+            return Response(
+                {'error': 'Invalid date format. Use YYYY-MM-DD'},
+                status=status.HTTP_400_BAD_REQUEST
             )
-    
+
+    try:
+        purchase_receipt = PurchaseReceivingService.receive(
+            purchase_order,
+            warehouse,
+            request.user,
+            lines=lines,
+            receipt_date=receipt_date,
+            notes=request.data.get('notes', ''),
+            status=receipt_status,
+        )
+    except ValidationError as e:
+        return Response({'error': 'Invalid receipt lines', 'lines': e.message_dict}, status=status.HTTP_400_BAD_REQUEST)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
     return Response({
         'message': 'Purchase receipt created successfully',
-        'purchase_receipt': PurchaseReceiptSerializer(purchase_receipt).data
+        'purchase_receipt': PurchaseReceiptWithLinesSerializer(purchase_receipt).data
     })
 
 
@@ -357,15 +376,13 @@ def purchase_stats(request):
 @permission_classes([IsAccountant])
 def search_suppliers(request):
     """Search suppliers"""
-    query = request.query_params.get('q', '')
-    
-    suppliers = Supplier.objects.filter(
-        Q(name__icontains=query) |
-        Q(email__icontains=query) |
-        Q(phone__icontains=query),
-        tenant=request.user.tenant,
-        is_active=True
-    ).order_by('name')
+    suppliers = SearchIndexService.find(
+        request.user.tenant,
+        request.query_params.get('q', ''),
+        'supplier',
+        Supplier.objects.filter(tenant=request.user.tenant, is_active=True),
+        request.query_params.get('limit')
+    )
     
     serializer = SupplierSerializer(suppliers, many=True)
     return Response(serializer.data)
@@ -384,41 +401,48 @@ def supplier_orders(request, supplier_id):
     orders = PurchaseOrder.objects.filter(
         supplier=supplier,
         tenant=request.user.tenant
-    ).order_by('-order_date')
+    ).select_related('supplier', 'created_by').prefetch_related('lines').order_by('-order_date')
     
-    serializer = PurchaseOrderSerializer(orders, many=True)
-    return Response(serializer.data)
+    return paginated_response(request, orders, PurchaseOrderSerializer)
 
 
 @api_view(['GET'])
 @permission_classes([IsAccountant])
 def supplier_summary(request):
-    """Get summary of all suppliers"""
-    suppliers = Supplier.objects.filter(
-        tenant=request.user.tenant,
-        is_active=True
-    )
-    
+    """
+    Get summary of all suppliers
+
+    Reads the maintained SupplierBalance rows in one query; sort with
+    ?ordering= (default -outstanding_balance).
+    """
+    tenant = request.user.tenant
+    SupplierBalanceService.refresh_stale(tenant)
+    try:
+        balances = SupplierBalanceService.summary(tenant, request.query_params.get('ordering', '-outstanding_balance'))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    paginator = KeysetPagination()
     summary_data = []
-    for supplier in suppliers:
-        # Get last order date
-        last_order = PurchaseOrder.objects.filter(
-            supplier=supplier
-        ).order_by('-order_date').first()
-        
+    for balance in paginator.paginate_queryset(balances, request):
+        supplier = balance.supplier
         summary_data.append({
             'supplier_id': supplier.id,
             'supplier_name': supplier.name,
             'email': supplier.email,
             'phone': supplier.phone,
-            'total_orders': supplier.total_orders,
-            'total_spent': supplier.total_spent,
-            'last_order_date': last_order.order_date if last_order else None,
+            'total_orders': balance.total_orders,
+            'total_spent': balance.lifetime_purchases,
+            'last_order_date': balance.last_order_date,
+            'outstanding_balance': balance.outstanding_balance,
+            'open_orders': balance.open_orders,
+            'overdue_count': balance.overdue_count,
+            'last_activity_date': balance.last_activity_date,
             'is_active': supplier.is_active
         })
-    
+
     serializer = SupplierSummarySerializer(summary_data, many=True)
-    return Response(serializer.data)
+    return paginator.get_paginated_response(serializer.data)
 
 
 @api_view(['POST'])
@@ -530,7 +554,67 @@ def check_payment_before_processing(request):
     return Response(result)
 
 
-class VendorWalletAddressListView(generics.ListCreateAPIView):
+@api_view(['POST'])
+@permission_classes([IsAccountant])
+def check_payments_before_processing(request):
+    """Check a payment run before processing, scoring all lines together"""
+    tenant = request.user.tenant
+    lines = request.data.get('payments')
+    if not isinstance(lines, list) or not lines:
+        return Response({'error': 'payments must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(lines) > VendorVerificationService.MAX_BATCH_PAYMENTS:
+        return Response(
+            {'error': f'At most {VendorVerificationService.MAX_BATCH_PAYMENTS} payments per request'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    required = ('supplier_id', 'wallet_address', 'network', 'amount')
+    for index, line in enumerate(lines):
+        if not isinstance(line, dict) or not all(line.get(field) for field in required):
+            return Response(
+                {'error': f'payments[{index}]: supplier_id, wallet_address, network, and amount are required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+    from invoicing.models import Invoice
+    try:
+        suppliers = Supplier.objects.filter(tenant=tenant).in_bulk({str(line['supplier_id']) for line in lines})
+        orders = PurchaseOrder.objects.filter(tenant=tenant).in_bulk(
+            {str(line['purchase_order_id']) for line in lines if line.get('purchase_order_id')}
+        )
+        invoices = Invoice.objects.filter(tenant=tenant).in_bulk(
+            {str(line['invoice_id']) for line in lines if line.get('invoice_id')}
+        )
+    except ValidationError:
+        return Response({'error': 'Invalid supplier, purchase order or invoice id'}, status=status.HTTP_400_BAD_REQUEST)
+    suppliers, orders, invoices = (
+        {str(pk): obj for pk, obj in objects.items()} for objects in (suppliers, orders, invoices)
+    )
+
+    payments = []
+    for index, line in enumerate(lines):
+        references = (
+            (suppliers, line['supplier_id']),
+            (orders, line.get('purchase_order_id')),
+            (invoices, line.get('invoice_id')),
+        )
+        if any(pk and str(pk) not in objects for objects, pk in references):
+            return Response({'error': f'payments[{index}]: not found'}, status=status.HTTP_404_NOT_FOUND)
+        payments.append({
+            'supplier': suppliers[str(line['supplier_id'])],
+            'wallet_address': line['wallet_address'],
+            'network': line['network'],
+            'amount': Decimal(str(line['amount'])),
+            'currency': line.get('currency', 'USD'),
+            'purchase_order': orders.get(str(line.get('purchase_order_id'))),
+            'invoice': invoices.get(str(line.get('invoice_id'))),
+        })
+
+    results = VendorVerificationService.check_payments_before_processing(tenant, payments, user=request.user)
+    return Response({'results': results, 'blocked': sum(result['blocked'] for result in results)})
+
+
+class VendorWalletAddressListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create vendor wallet addresses"""
     serializer_class = VendorWalletAddressSerializer
     permission_classes = [IsAccountant]
@@ -548,7 +632,7 @@ class VendorWalletAddressListView(generics.ListCreateAPIView):
         serializer.save(tenant=self.request.user.tenant)
 
 
-class VendorWalletAddressDetailView(generics.RetrieveUpdateDestroyAPIView):
+class VendorWalletAddressDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete vendor wallet address"""
     serializer_class = VendorWalletAddressSerializer
     permission_classes = [IsAccountant]
@@ -600,7 +684,7 @@ def verify_vendor_wallet_manual(request, wallet_id):
     return Response(serializer.data)
 
 
-class VendorVerificationLogListView(generics.ListAPIView):
+class VendorVerificationLogListView(QueryPlanMixin, generics.ListAPIView):
     """List vendor verification logs"""
     serializer_class = VendorVerificationLogSerializer
     permission_classes = [IsAccountant]
@@ -619,7 +703,7 @@ class VendorVerificationLogListView(generics.ListAPIView):
         return queryset.order_by('-created_at')
 
 
-class PaymentBlockListView(generics.ListAPIView):
+class PaymentBlockListView(QueryPlanMixin, generics.ListAPIView):
     """List payment blocks"""
     serializer_class = PaymentBlockSerializer
     permission_classes = [IsAccountant]
@@ -638,7 +722,7 @@ class PaymentBlockListView(generics.ListAPIView):
         return queryset.order_by('-created_at')
 
 
-class PaymentBlockDetailView(generics.RetrieveUpdateAPIView):
+class PaymentBlockDetailView(QueryPlanMixin, generics.RetrieveUpdateAPIView):
     """Retrieve and update payment block"""
     serializer_class = PaymentBlockSerializer
     permission_classes = [IsAccountant]
@@ -733,43 +817,31 @@ def purchase_analytics(request):
         today = date.today()
         start_date = today.replace(day=1)
         end_date = today
+    else:
+        try:
+            start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
+            end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
+        except ValueError:
+            return Response(
+                {'error': 'Invalid date format. Use YYYY-MM-DD'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
     
-    orders = PurchaseOrder.objects.filter(
-        tenant=tenant,
-        order_date__range=[start_date, end_date]
-    )
-    
-    # Spend by supplier
-    spend_by_supplier = {}
-    for order in orders.filter(status='received'):
-        supplier_name = order.supplier.name
-        spend_by_supplier[supplier_name] = spend_by_supplier.get(supplier_name, 0) + float(order.total_amount)
-    
-    # Spend by month
-    spend_by_month = {}
-    for order in orders.filter(status='received'):
-        month_key = order.order_date.strftime('%Y-%m')
-        spend_by_month[month_key] = spend_by_month.get(month_key, 0) + float(order.total_amount)
-    
-    # Top suppliers
-    top_suppliers = sorted(spend_by_supplier.items(), key=lambda x: x[1], reverse=True)[:10]
-    
-    total_spend = sum(order.total_amount for order in orders.filter(status='received'))
-    avg_order_value = total_spend / orders.filter(status='received').count() if orders.filter(status='received').count() > 0 else 0
+    summary = AnalyticsQueryService.purchase_summary(tenant, start_date, end_date)
     
     return Response({
-        'total_spend': float(total_spend),
-        'total_orders': orders.count(),
-        'avg_order_value': float(avg_order_value),
-        'spend_by_supplier': dict(top_suppliers),
-        'spend_by_month': spend_by_month,
+        'total_spend': float(summary['total_spend']),
+        'total_orders': summary['total_orders'],
+        'avg_order_value': float(summary['avg_order_value']),
+        'spend_by_supplier': {name: float(amount) for name, amount in summary['spend_by_supplier'].items()},
+        'spend_by_month': {month: float(amount) for month, amount in summary['spend_by_month'].items()},
         'period_start': start_date,
         'period_end': end_date
     })
 
 
 # Purchase Approval Views
-class PurchaseApprovalRequestListView(generics.ListCreateAPIView):
+class PurchaseApprovalRequestListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create Purchase Approval Requests"""
     serializer_class = PurchaseApprovalRequestSerializer
     permission_classes = [IsAccountant]
@@ -792,7 +864,7 @@ class PurchaseApprovalRequestListView(generics.ListCreateAPIView):
         serializer.save(tenant=tenant, requested_by=self.request.user)
 
 
-class PurchaseApprovalRequestDetailView(generics.RetrieveUpdateDestroyAPIView):
+class PurchaseApprovalRequestDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete Purchase Approval Request"""
     serializer_class = PurchaseApprovalRequestSerializer
     permission_classes = [IsAccountant]
@@ -841,7 +913,7 @@ def approve_purchase_request(request, pk):
 
 
 # Purchase Contract Views
-class PurchaseContractListView(generics.ListCreateAPIView):
+class PurchaseContractListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create Purchase Contracts"""
     serializer_class = PurchaseContractSerializer
     permission_classes = [IsAccountant]
@@ -864,7 +936,7 @@ class PurchaseContractListView(generics.ListCreateAPIView):
         serializer.save(tenant=tenant, created_by=self.request.user)
 
 
-class PurchaseContractDetailView(generics.RetrieveUpdateDestroyAPIView):
+class PurchaseContractDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete Purchase Contract"""
     serializer_class = PurchaseContractSerializer
     permission_classes = [IsAccountant]
@@ -877,7 +949,7 @@ class PurchaseContractDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 
 # Purchase Settings Views
-class PurchaseSettingsView(generics.RetrieveUpdateAPIView):
+class PurchaseSettingsView(QueryPlanMixin, generics.RetrieveUpdateAPIView):
     """Retrieve and update Purchase Settings"""
     serializer_class = PurchaseSettingsSerializer
     permission_classes = [IsAccountant]
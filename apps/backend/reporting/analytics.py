@@ -0,0 +1,220 @@
+"""
+Analytics Query Layer
+Grouped SQL aggregates for sales, purchase and pipeline analytics.
+
+Each summary is built from one or two `values().annotate()` queries that
+group by customer/supplier, month (TruncMonth) or stage in the database;
+only the grouped rows are rolled up in Python. Results are cached per
+tenant and date range under a per-tenant version that reporting.signals
+bumps whenever orders, quotes or opportunities change.
+"""
+from datetime import date
+from decimal import Decimal
+from typing import Callable, Dict
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth
+import logging
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal('0')
+AMOUNT_FIELD = DecimalField(max_digits=20, decimal_places=2)
+
+# Sales order statuses that count toward commission
+COMMISSIONABLE_ORDER_STATUSES = ('confirmed', 'processing', 'shipped', 'delivered')
+
+
+class AnalyticsQueryService:
+    """Grouped aggregates behind the analytics endpoints, cached per tenant"""
+
+    @staticmethod
+    def get_cache_ttl() -> int:
+        """Seconds a summary is reused before rebuilding (ANALYTICS_CACHE_TTL_SECONDS)"""
+        return getattr(settings, 'ANALYTICS_CACHE_TTL_SECONDS', 300)
+
+    @staticmethod
+    def _version_key(tenant_id) -> str:
+        return f"analytics:version:{tenant_id}"
+
+    @classmethod
+    def _cache_key(cls, kind: str, tenant, *parts) -> str:
+        version = cache.get(cls._version_key(tenant.id), 0)
+        suffix = ':'.join(str(part) for part in parts)
+        return f"analytics:{kind}:{tenant.id}:{version}:{suffix}"
+
+    @classmethod
+    def invalidate(cls, tenant_id):
+        """Drop cached summaries for a tenant"""
+        key = cls._version_key(tenant_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+    @classmethod
+    def _cached(cls, kind: str, tenant, parts, build: Callable[[], Dict]) -> Dict:
+        key = cls._cache_key(kind, tenant, *parts)
+        summary = cache.get(key)
+        if summary is None:
+            summary = build()
+            cache.set(key, summary, cls.get_cache_ttl())
+        return summary
+
+    @staticmethod
+    def _rollup(rows, name_field: str, amount_field: str) -> Dict:
+        """Totals by name and by month from (name, month) grouped rows"""
+        by_name: Dict[str, Decimal] = {}
+        by_month: Dict[str, Decimal] = {}
+        for row in rows:
+            amount = row[amount_field] or ZERO
+            if not amount:
+                continue
+            by_name[row[name_field]] = by_name.get(row[name_field], ZERO) + amount
+            month = row['month'].strftime('%Y-%m')
+            by_month[month] = by_month.get(month, ZERO) + amount
+        return {'by_name': by_name, 'by_month': dict(sorted(by_month.items()))}
+
+    # Sales
+
+    @classmethod
+    def sales_summary(cls, tenant, start: date, end: date) -> Dict:
+        """
+        Revenue by customer and month for orders dated in [start, end]
+
+        Cancelled orders count as orders but not as revenue.
+
+        Returns:
+            dict with total_revenue, total_orders, total_quotes,
+            converted_quotes, revenue_by_customer and revenue_by_month
+            (Decimal amounts)
+        """
+        return cls._cached('sales', tenant, (start, end), lambda: cls._build_sales_summary(tenant, start, end))
+
+    @classmethod
+    def _build_sales_summary(cls, tenant, start: date, end: date) -> Dict:
+        from sales.models import SalesOrder, SalesQuote
+
+        rows = list(
+            SalesOrder.objects.filter(tenant=tenant, order_date__range=(start, end))
+            .values('customer_id', 'customer__name', month=TruncMonth('order_date'))
+            .annotate(
+                revenue=Sum('total_amount', filter=~Q(status='cancelled')),
+                orders=Count('id'),
+            )
+            .order_by()
+        )
+        quotes = SalesQuote.objects.filter(tenant=tenant, quote_date__range=(start, end)).aggregate(
+            total=Count('id'),
+            converted=Count('id', filter=Q(status='converted')),
+        )
+
+        rollup = cls._rollup(rows, 'customer__name', 'revenue')
+        return {
+            'total_revenue': sum(rollup['by_name'].values(), ZERO),
+            'total_orders': sum(row['orders'] for row in rows),
+            'total_quotes': quotes['total'],
+            'converted_quotes': quotes['converted'],
+            'revenue_by_customer': rollup['by_name'],
+            'revenue_by_month': rollup['by_month'],
+        }
+
+    @classmethod
+    def pipeline_summary(cls, tenant) -> Dict:
+        """
+        Open opportunities grouped by stage
+
+        Returns:
+            dict with by_stage ({stage: {count, total_value, weighted_value}}),
+            total_opportunities, total_value and total_weighted_value
+        """
+        return cls._cached('pipeline', tenant, (), lambda: cls._build_pipeline_summary(tenant))
+
+    @staticmethod
+    def _build_pipeline_summary(tenant) -> Dict:
+        from sales.models import SalesOpportunity
+
+        weighted = ExpressionWrapper(F('value') * F('probability') / Value(Decimal('100')), output_field=AMOUNT_FIELD)
+        rows = (
+            SalesOpportunity.objects.filter(tenant=tenant, status='open')
+            .values('stage')
+            .annotate(
+                count=Count('id'),
+                total_value=Coalesce(Sum('value'), Value(ZERO), output_field=AMOUNT_FIELD),
+                weighted_value=Coalesce(Sum(weighted), Value(ZERO), output_field=AMOUNT_FIELD),
+            )
+            .order_by('stage')
+        )
+        by_stage = {
+            row['stage']: {
+                'count': row['count'],
+                'total_value': row['total_value'],
+                'weighted_value': row['weighted_value'],
+            }
+            for row in rows
+        }
+        return {
+            'by_stage': by_stage,
+            'total_opportunities': sum(stage['count'] for stage in by_stage.values()),
+            'total_value': sum((stage['total_value'] for stage in by_stage.values()), ZERO),
+            'total_weighted_value': sum((stage['weighted_value'] for stage in by_stage.values()), ZERO),
+        }
+
+    @staticmethod
+    def commission_base(tenant, sales_person_id, start, end) -> Decimal:
+        """Total of a sales person's commissionable orders in [start, end], in one aggregate"""
+        from sales.models import SalesOrder
+
+        return SalesOrder.objects.filter(
+            tenant=tenant,
+            created_by_id=sales_person_id,
+            order_date__range=(start, end),
+            status__in=COMMISSIONABLE_ORDER_STATUSES,
+        ).aggregate(total=Coalesce(Sum('total_amount'), Value(ZERO), output_field=AMOUNT_FIELD))['total']
+
+    # Purchasing
+
+    @classmethod
+    def purchase_summary(cls, tenant, start: date, end: date, top_suppliers: int = 10) -> Dict:
+        """
+        Received spend by supplier and month for orders dated in [start, end]
+
+        Returns:
+            dict with total_spend, total_orders, received_orders,
+            avg_order_value, spend_by_supplier (top suppliers, largest
+            first) and spend_by_month (Decimal amounts)
+        """
+        return cls._cached(
+            'purchase', tenant, (start, end, top_suppliers),
+            lambda: cls._build_purchase_summary(tenant, start, end, top_suppliers),
+        )
+
+    @classmethod
+    def _build_purchase_summary(cls, tenant, start: date, end: date, top_suppliers: int) -> Dict:
+        from purchase.models import PurchaseOrder
+
+        received = Q(status='received')
+        rows = list(
+            PurchaseOrder.objects.filter(tenant=tenant, order_date__range=(start, end))
+            .values('supplier_id', 'supplier__name', month=TruncMonth('order_date'))
+            .annotate(
+                spend=Sum('total_amount', filter=received),
+                received_orders=Count('id', filter=received),
+                orders=Count('id'),
+            )
+            .order_by()
+        )
+
+        rollup = cls._rollup(rows, 'supplier__name', 'spend')
+        total_spend = sum(rollup['by_name'].values(), ZERO)
+        received_orders = sum(row['received_orders'] for row in rows)
+        top = sorted(rollup['by_name'].items(), key=lambda item: item[1], reverse=True)[:top_suppliers]
+        return {
+            'total_spend': total_spend,
+            'total_orders': sum(row['orders'] for row in rows),
+            'received_orders': received_orders,
+            'avg_order_value': total_spend / received_orders if received_orders else ZERO,
+            'spend_by_supplier': dict(top),
+            'spend_by_month': rollup['by_month'],
+        }
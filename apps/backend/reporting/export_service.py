@@ -0,0 +1,191 @@
+"""
+Report Export Service
+Renders report results to CSV/XLSX/PDF and stores them in object storage
+"""
+import os
+import tempfile
+import time
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+import logging
+
+from .models import ReportExport, ReportExecution
+from .renderers import get_renderer
+from .storage import get_report_storage
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched per database round trip when streaming ledger data
+LEDGER_CHUNK_SIZE = 2000
+
+LEDGER_COLUMNS = [
+    'Date', 'Entry Reference', 'Account Code', 'Account Name',
+    'Description', 'Debit', 'Credit', 'Line Reference',
+]
+
+
+class ReportExportService:
+    """Service for producing report export files"""
+
+    def __init__(self, storage=None):
+        self.storage = storage or get_report_storage()
+
+    def run_export(self, export: ReportExport) -> ReportExport:
+        """
+        Render an export and upload it to storage
+
+        The file is rendered into a temporary file on disk and uploaded from
+        there, so memory use stays flat regardless of the number of rows.
+        """
+        source = export.report or export.tax_report or export.compliance_report
+        if source is None:
+            return self._fail(export, 'Export has no report attached')
+
+        started = time.time()
+        export.status = 'processing'
+        export.error_message = ''
+        export.save(update_fields=['status', 'error_message'])
+
+        try:
+            title = getattr(source, 'name', None) or getattr(source, 'report_name', '')
+            renderer = get_renderer(export.export_format, title=title)
+            columns, rows = self.get_report_rows(source)
+            object_key = self.build_object_key(export, renderer.extension)
+
+            with tempfile.NamedTemporaryFile(suffix=f'.{renderer.extension}', delete=False) as handle:
+                temp_path = handle.name
+                row_count = renderer.render(columns, rows, handle)
+
+            try:
+                file_size = os.path.getsize(temp_path)
+                if not self.storage.save(temp_path, object_key, content_type=renderer.content_type):
+                    return self._fail(export, 'Failed to upload export file')
+            finally:
+                os.remove(temp_path)
+        except Exception as e:
+            logger.error(f"Error rendering export {export.id}: {e}")
+            return self._fail(export, str(e))
+
+        export.file_path = object_key
+        export.file_size = file_size
+        export.status = 'completed'
+        export.completed_at = timezone.now()
+        export.save(update_fields=['file_path', 'file_size', 'status', 'completed_at'])
+
+        if export.report_id:
+            ReportExecution.objects.create(
+                tenant=export.tenant,
+                report=export.report,
+                status='completed',
+                completed_at=export.completed_at,
+                execution_time=time.time() - started,
+                file_size=file_size,
+            )
+
+        logger.info(f"Rendered export {export.id}: {row_count} rows, {file_size} bytes")
+        return export
+
+    def get_download_url(self, export: ReportExport, expiration: int = 3600) -> Optional[str]:
+        """Get a download URL for a completed export"""
+        if export.status != 'completed' or not export.file_path:
+            return None
+        return self.storage.get_download_url(export.file_path, expiration=expiration)
+
+    @staticmethod
+    def build_object_key(export: ReportExport, extension: str) -> str:
+        """Build the storage key: tenant_id/reports/exports/export_id.ext"""
+        return f"{export.tenant_id}/reports/exports/{export.id}.{extension}"
+
+    def get_report_rows(self, source) -> Tuple[List[str], Iterable[Sequence]]:
+        """
+        Resolve the columns and a lazy row iterator for a report
+
+        General ledger reports are streamed straight from journal lines;
+        other reports use the rows stored on the report's data field.
+        """
+        if getattr(source, 'report_type', None) == 'general_ledger':
+            return LEDGER_COLUMNS, self.iter_ledger_rows(source)
+        return self.rows_from_data(source.data)
+
+    def count_report_rows(self, source) -> int:
+        """Number of rows an export of the report would render"""
+        if getattr(source, 'report_type', None) == 'general_ledger':
+            return self.ledger_queryset(source).count()
+        _, rows = self.rows_from_data(source.data)
+        return len(rows) if hasattr(rows, '__len__') else sum(1 for _ in rows)
+
+    @staticmethod
+    def ledger_queryset(report):
+        """Journal lines selected by a general ledger report's parameters"""
+        from accounting.models import JournalEntryLine
+
+        parameters = report.parameters or {}
+        queryset = JournalEntryLine.objects.filter(
+            tenant_id=report.tenant_id,
+            journal_entry__company_id=report.company_id,
+        )
+
+        start_date = parse_date(parameters['start_date']) if parameters.get('start_date') else None
+        end_date = parse_date(parameters['end_date']) if parameters.get('end_date') else None
+        if start_date:
+            queryset = queryset.filter(journal_entry__date__gte=start_date)
+        if end_date:
+            queryset = queryset.filter(journal_entry__date__lte=end_date)
+        if parameters.get('status'):
+            queryset = queryset.filter(journal_entry__status=parameters['status'])
+        if parameters.get('account_code'):
+            queryset = queryset.filter(account__code=parameters['account_code'])
+        return queryset
+
+    @classmethod
+    def iter_ledger_rows(cls, report) -> Iterator[tuple]:
+        """Stream general ledger lines for a report with a server-side cursor"""
+        return cls.ledger_queryset(report).order_by('journal_entry__date', 'journal_entry_id', 'id').values_list(
+            'journal_entry__date',
+            'journal_entry__reference',
+            'account__code',
+            'account__name',
+            'description',
+            'debit_amount',
+            'credit_amount',
+            'reference',
+        ).iterator(chunk_size=LEDGER_CHUNK_SIZE)
+
+    @staticmethod
+    def rows_from_data(data) -> Tuple[List[str], Iterable[Sequence]]:
+        """
+        Extract columns and rows from stored report data
+
+        Supports {'columns': [...], 'rows': [[...], ...]}, a list of dicts,
+        or a flat dict of label/value pairs.
+        """
+        if not data:
+            return [], []
+
+        if isinstance(data, dict) and 'rows' in data:
+            rows = data.get('rows') or []
+            columns = data.get('columns')
+            if columns is None and rows and isinstance(rows[0], dict):
+                columns = list(rows[0].keys())
+            if rows and isinstance(rows[0], dict):
+                return columns, ([row.get(column) for column in columns] for row in rows)
+            return columns or [], rows
+
+        if isinstance(data, list):
+            if data and isinstance(data[0], dict):
+                columns = list(data[0].keys())
+                return columns, ([row.get(column) for column in columns] for row in data)
+            return [], data
+
+        if isinstance(data, dict):
+            return ['Item', 'Value'], list(data.items())
+
+        return [], []
+
+    @staticmethod
+    def _fail(export: ReportExport, message: str) -> ReportExport:
+        export.status = 'failed'
+        export.error_message = message
+        export.save(update_fields=['status', 'error_message'])
+        return export
@@ -0,0 +1,251 @@
+"""
+Report Renderers
+Streaming CSV, XLSX and PDF writers for report exports.
+
+Every renderer consumes an iterator of rows and writes straight to a binary
+file object, so the size of the output never has to fit in memory.
+"""
+import codecs
+import csv
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterable, List, Sequence
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _cell_to_text(value) -> str:
+    """Render a single cell as display text"""
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ', timespec='seconds')
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+class BaseReportRenderer:
+    """Base class for streaming report renderers"""
+
+    export_format = None
+    extension = None
+    content_type = 'application/octet-stream'
+
+    def __init__(self, title: str = ''):
+        self.title = title
+
+    def render(self, columns: Sequence[str], rows: Iterable[Sequence], stream) -> int:
+        """
+        Write columns and rows to a binary stream
+
+        Args:
+            columns: Column headings
+            rows: Iterable of row sequences (consumed once, lazily)
+            stream: Writable binary file object
+
+        Returns:
+            Number of data rows written
+        """
+        raise NotImplementedError
+
+
+class CSVReportRenderer(BaseReportRenderer):
+    """CSV renderer writing rows through an incremental UTF-8 encoder"""
+
+    export_format = 'csv'
+    extension = 'csv'
+    content_type = 'text/csv'
+
+    def render(self, columns, rows, stream) -> int:
+        writer_stream = codecs.getwriter('utf-8')(stream)
+        writer = csv.writer(writer_stream)
+        writer.writerow(columns)
+
+        row_count = 0
+        for row in rows:
+            writer.writerow([_cell_to_text(value) for value in row])
+            row_count += 1
+        return row_count
+
+
+class XLSXReportRenderer(BaseReportRenderer):
+    """XLSX renderer using openpyxl's write-only (constant memory) workbook"""
+
+    export_format = 'excel'
+    extension = 'xlsx'
+    content_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+    # Excel's hard limit including the header row
+    max_rows_per_sheet = 1048576
+
+    def render(self, columns, rows, stream) -> int:
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            raise RuntimeError("openpyxl is required for Excel exports")
+
+        workbook = Workbook(write_only=True)
+        sheet = None
+        sheet_rows = 0
+        row_count = 0
+
+        for row in rows:
+            if sheet is None or sheet_rows >= self.max_rows_per_sheet - 1:
+                sheet = workbook.create_sheet(title=f"Report {len(workbook.worksheets) + 1}")
+                sheet.append(list(columns))
+                sheet_rows = 0
+            sheet.append([self._to_cell(value) for value in row])
+            sheet_rows += 1
+            row_count += 1
+
+        if sheet is None:
+            sheet = workbook.create_sheet(title='Report 1')
+            sheet.append(list(columns))
+
+        workbook.save(stream)
+        return row_count
+
+    @staticmethod
+    def _to_cell(value):
+        """Keep numbers and dates native, stringify everything else"""
+        if value is None or isinstance(value, (int, float, Decimal, date, datetime)):
+            if isinstance(value, datetime) and value.tzinfo is not None:
+                return value.replace(tzinfo=None)
+            return value
+        return str(value)
+
+
+class PDFReportRenderer(BaseReportRenderer):
+    """
+    Minimal tabular PDF writer.
+
+    Pages are written to the stream as soon as they are full, and only the
+    byte offset of each object is retained for the cross-reference table.
+    """
+
+    export_format = 'pdf'
+    extension = 'pdf'
+    content_type = 'application/pdf'
+
+    page_width = 842   # A4 landscape, points
+    page_height = 595
+    margin = 36
+    font_size = 7
+    line_height = 10
+    max_cell_chars = 40
+
+    def render(self, columns, rows, stream) -> int:
+        self._stream = stream
+        self._offset = 0
+        self._offsets = {}
+        self._page_ids: List[int] = []
+        # Object ids 1-3 are reserved for the catalog, page tree and font
+        self._next_id = 4
+
+        self._write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        self._write_object(3, b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>')
+
+        columns = [_cell_to_text(column) for column in columns]
+        column_width = (self.page_width - 2 * self.margin) / max(len(columns), 1)
+        usable_height = self.page_height - 2 * self.margin - 2 * self.line_height
+        rows_per_page = max(int(usable_height // self.line_height), 1)
+
+        page_lines = []
+        row_count = 0
+        for row in rows:
+            page_lines.append([_cell_to_text(value) for value in row])
+            row_count += 1
+            if len(page_lines) >= rows_per_page:
+                self._write_page(columns, page_lines, column_width)
+                page_lines = []
+
+        if page_lines or not self._page_ids:
+            self._write_page(columns, page_lines, column_width)
+
+        kids = b' '.join(b'%d 0 R' % page_id for page_id in self._page_ids)
+        self._write_object(2, b'<< /Type /Pages /Kids [' + kids + b'] /Count %d >>' % len(self._page_ids))
+        self._write_object(1, b'<< /Type /Catalog /Pages 2 0 R >>')
+        self._write_trailer()
+        return row_count
+
+    def _write(self, data: bytes):
+        self._stream.write(data)
+        self._offset += len(data)
+
+    def _allocate_id(self) -> int:
+        object_id = self._next_id
+        self._next_id += 1
+        return object_id
+
+    def _write_object(self, object_id: int, body: bytes):
+        self._offsets[object_id] = self._offset
+        self._write(b'%d 0 obj\n' % object_id + body + b'\nendobj\n')
+
+    def _write_page(self, columns, lines, column_width):
+        commands = [b'BT', b'/F1 %d Tf' % self.font_size]
+        y = self.page_height - self.margin
+
+        if self.title:
+            commands.append(self._text_command(self.margin, y, self.title))
+            y -= self.line_height
+        for position, heading in enumerate(columns):
+            commands.append(self._text_command(self.margin + position * column_width, y, heading))
+        y -= self.line_height * 1.5
+
+        for line in lines:
+            for position, value in enumerate(line[:len(columns)]):
+                commands.append(self._text_command(self.margin + position * column_width, y, value))
+            y -= self.line_height
+        commands.append(b'ET')
+
+        content = zlib.compress(b'\n'.join(commands))
+        content_id = self._allocate_id()
+        self._write_object(
+            content_id,
+            b'<< /Length %d /Filter /FlateDecode >>\nstream\n' % len(content) + content + b'\nendstream'
+        )
+
+        page_id = self._allocate_id()
+        self._write_object(
+            page_id,
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] '
+            b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>'
+            % (self.page_width, self.page_height, content_id)
+        )
+        self._page_ids.append(page_id)
+
+    def _text_command(self, x, y, text: str) -> bytes:
+        if len(text) > self.max_cell_chars:
+            text = text[:self.max_cell_chars - 1] + '~'
+        escaped = text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+        encoded = escaped.encode('cp1252', errors='replace')
+        return b'1 0 0 1 %.2f %.2f Tm (' % (x, y) + encoded + b') Tj'
+
+    def _write_trailer(self):
+        xref_offset = self._offset
+        object_count = self._next_id
+        lines = [b'xref', b'0 %d' % object_count, b'0000000000 65535 f ']
+        for object_id in range(1, object_count):
+            lines.append(b'%010d 00000 n ' % self._offsets[object_id])
+        self._write(b'\n'.join(lines) + b'\n')
+        self._write(
+            b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (object_count, xref_offset)
+        )
+
+
+RENDERERS = {
+    'csv': CSVReportRenderer,
+    'excel': XLSXReportRenderer,
+    'pdf': PDFReportRenderer,
+}
+
+
+def get_renderer(export_format: str, **kwargs) -> BaseReportRenderer:
+    """Get a renderer instance for an export format"""
+    renderer_class = RENDERERS.get(export_format)
+    if renderer_class is None:
+        raise ValueError(f"Unsupported export format: {export_format}")
+    return renderer_class(**kwargs)
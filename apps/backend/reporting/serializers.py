@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from backend.fieldsets import SparseFieldsetMixin
 from decimal import Decimal
 from .models import (
     Report, ReportTemplate, ScheduledReport, ReportExecution,
@@ -6,7 +7,7 @@ from .models import (
 )
 
 
-class ReportSerializer(serializers.ModelSerializer):
+class ReportSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Report"""
     report_type_display = serializers.CharField(source='get_report_type_display', read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
@@ -22,7 +23,7 @@ class ReportSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at', 'generated_at']
 
 
-class ReportTemplateSerializer(serializers.ModelSerializer):
+class ReportTemplateSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Report Template"""
     report_type_display = serializers.CharField(source='get_report_type_display', read_only=True)
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
@@ -37,7 +38,7 @@ class ReportTemplateSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class ScheduledReportSerializer(serializers.ModelSerializer):
+class ScheduledReportSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Scheduled Report"""
     report_type_display = serializers.CharField(source='get_report_type_display', read_only=True)
     frequency_display = serializers.CharField(source='get_frequency_display', read_only=True)
@@ -54,7 +55,7 @@ class ScheduledReportSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at', 'last_run', 'next_run']
 
 
-class ReportExecutionSerializer(serializers.ModelSerializer):
+class ReportExecutionSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Report Execution"""
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     scheduled_report_name = serializers.CharField(source='scheduled_report.name', read_only=True)
@@ -69,7 +70,7 @@ class ReportExecutionSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'started_at', 'completed_at']
 
 
-class DashboardSerializer(serializers.ModelSerializer):
+class DashboardSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Dashboard"""
     user_email = serializers.CharField(source='user.email', read_only=True)
     
@@ -83,7 +84,7 @@ class DashboardSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class WidgetSerializer(serializers.ModelSerializer):
+class WidgetSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Widget"""
     widget_type_display = serializers.CharField(source='get_widget_type_display', read_only=True)
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
@@ -98,7 +99,7 @@ class WidgetSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class TaxReportSerializer(serializers.ModelSerializer):
+class TaxReportSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Tax Report"""
     tax_type_display = serializers.CharField(source='get_tax_type_display', read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
@@ -117,7 +118,7 @@ class TaxReportSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at', 'generated_at', 'filed_at']
 
 
-class ComplianceReportSerializer(serializers.ModelSerializer):
+class ComplianceReportSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Compliance Report"""
     compliance_type_display = serializers.CharField(source='get_compliance_type_display', read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
@@ -136,7 +137,7 @@ class ComplianceReportSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at', 'generated_at', 'reviewed_at']
 
 
-class ReportExportSerializer(serializers.ModelSerializer):
+class ReportExportSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Report Export"""
     export_format_display = serializers.CharField(source='get_export_format_display', read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
@@ -153,7 +154,7 @@ class ReportExportSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'completed_at']
 
 
-class ReportingSettingsSerializer(serializers.ModelSerializer):
+class ReportingSettingsSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Reporting Settings"""
     
     class Meta:
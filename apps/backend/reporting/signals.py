@@ -0,0 +1,24 @@
+"""
+Reporting Signals
+Invalidate cached analytics summaries when the underlying rows change
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from purchase.models import PurchaseOrder, Supplier
+from sales.models import Customer, SalesOpportunity, SalesOrder, SalesQuote
+from .analytics import AnalyticsQueryService
+
+
+@receiver(post_save, sender=SalesOrder)
+@receiver(post_delete, sender=SalesOrder)
+@receiver(post_save, sender=SalesQuote)
+@receiver(post_delete, sender=SalesQuote)
+@receiver(post_save, sender=SalesOpportunity)
+@receiver(post_delete, sender=SalesOpportunity)
+@receiver(post_save, sender=PurchaseOrder)
+@receiver(post_delete, sender=PurchaseOrder)
+@receiver(post_save, sender=Customer)
+@receiver(post_save, sender=Supplier)
+def invalidate_analytics(sender, instance, **kwargs):
+    """Rebuild the tenant's analytics summaries on next request"""
+    AnalyticsQueryService.invalidate(instance.tenant_id)
@@ -0,0 +1,92 @@
+"""
+Report Export Storage
+Storage backends for rendered report files: Cloudflare R2 in production and
+the local filesystem for development and tests.
+"""
+import os
+import shutil
+from pathlib import Path
+from typing import Optional
+from django.conf import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ReportStorageBackend:
+    """Base class for report export storage backends"""
+
+    def save(self, local_path: str, object_key: str, content_type: str = None) -> bool:
+        """Persist a rendered file under object_key"""
+        raise NotImplementedError
+
+    def get_download_url(self, object_key: str, expiration: int = 3600) -> Optional[str]:
+        """Return a (time-limited where supported) download URL"""
+        raise NotImplementedError
+
+    def delete(self, object_key: str) -> bool:
+        """Remove a stored export"""
+        raise NotImplementedError
+
+
+class R2ReportStorage(ReportStorageBackend):
+    """Report storage on Cloudflare R2 with presigned download URLs"""
+
+    def __init__(self, r2=None):
+        if r2 is None:
+            from backend.cloudflare_storage import get_cloudflare_r2
+            r2 = get_cloudflare_r2()
+        self.r2 = r2
+
+    def save(self, local_path, object_key, content_type=None) -> bool:
+        # upload_file on a path uses boto3's multipart transfer, so large
+        # exports are sent in chunks instead of being read into memory
+        result = self.r2.upload_file(local_path, object_key, content_type=content_type)
+        return result is not None
+
+    def get_download_url(self, object_key, expiration=3600):
+        return self.r2.generate_presigned_url(object_key, expiration=expiration, method='GET')
+
+    def delete(self, object_key) -> bool:
+        return self.r2.delete_file(object_key)
+
+
+class LocalReportStorage(ReportStorageBackend):
+    """Report storage on the local filesystem"""
+
+    def __init__(self, root=None, base_url=None):
+        self.root = Path(root or getattr(settings, 'REPORT_EXPORT_LOCAL_ROOT', Path(settings.MEDIA_ROOT) / 'report_exports'))
+        self.base_url = base_url if base_url is not None else f"{settings.MEDIA_URL.rstrip('/')}/report_exports"
+
+    def path(self, object_key: str) -> Path:
+        return self.root / object_key
+
+    def save(self, local_path, object_key, content_type=None) -> bool:
+        target = self.path(object_key)
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(local_path, target)
+            return True
+        except OSError as e:
+            logger.error(f"Error saving report export {object_key}: {e}")
+            return False
+
+    def get_download_url(self, object_key, expiration=3600):
+        if not self.path(object_key).exists():
+            return None
+        return f"{self.base_url}/{object_key}"
+
+    def delete(self, object_key) -> bool:
+        try:
+            os.remove(self.path(object_key))
+            return True
+        except FileNotFoundError:
+            return False
+
+
+def get_report_storage() -> ReportStorageBackend:
+    """Get the configured report export storage backend"""
+    backend = getattr(settings, 'REPORT_EXPORT_STORAGE', 'local')
+    if backend == 'r2':
+        return R2ReportStorage()
+    return LocalReportStorage()
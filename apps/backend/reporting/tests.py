@@ -1,3 +1,329 @@
-from django.test import TestCase
+"""
+Unit tests for reporting app
+"""
+import csv
+import io
+import shutil
+import tempfile
+from datetime import date
+from decimal import Decimal
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from tenants.models import Tenant, Company
+from authentication.models import User
+from accounting.models import ChartOfAccounts, GLAccountType, JournalEntry, JournalEntryLine
+from .models import Report, ReportExport
+from .renderers import CSVReportRenderer, PDFReportRenderer, XLSXReportRenderer, get_renderer
+from .export_service import ReportExportService, LEDGER_COLUMNS
+from .storage import LocalReportStorage
+from .analytics import AnalyticsQueryService
+
+
+class ReportRendererTest(TestCase):
+    """Test streaming report renderers"""
+
+    def setUp(self):
+        self.columns = ['Date', 'Description', 'Amount']
+        self.rows = [
+            (date(2024, 1, 31), 'Opening (balance)', Decimal('100.50')),
+            (date(2024, 2, 29), 'Payment, "late"', Decimal('-20.00')),
+        ]
+
+    def test_csv_renderer(self):
+        """Test CSV output and row count"""
+        stream = io.BytesIO()
+        row_count = CSVReportRenderer().render(self.columns, iter(self.rows), stream)
+
+        self.assertEqual(row_count, 2)
+        parsed = list(csv.reader(io.StringIO(stream.getvalue().decode('utf-8'))))
+        self.assertEqual(parsed[0], self.columns)
+        self.assertEqual(parsed[2], ['2024-02-29', 'Payment, "late"', '-20.00'])
+
+    def test_xlsx_renderer(self):
+        """Test XLSX output keeps native cell types"""
+        from openpyxl import load_workbook
+
+        stream = io.BytesIO()
+        row_count = XLSXReportRenderer().render(self.columns, iter(self.rows), stream)
+
+        self.assertEqual(row_count, 2)
+        sheet = load_workbook(io.BytesIO(stream.getvalue())).active
+        values = list(sheet.values)
+        self.assertEqual(list(values[0]), self.columns)
+        self.assertEqual(values[1][2], 100.5)
+
+    def test_pdf_renderer_paginates(self):
+        """Test PDF output is split into pages with a valid trailer"""
+        renderer = PDFReportRenderer(title='Ledger')
+        rows = ((date(2024, 1, 1), f'Line {index}', Decimal(index)) for index in range(200))
+        stream = io.BytesIO()
+        row_count = renderer.render(self.columns, rows, stream)
+
+        output = stream.getvalue()
+        self.assertEqual(row_count, 200)
+        self.assertTrue(output.startswith(b'%PDF-1.4'))
+        self.assertTrue(output.rstrip().endswith(b'%%EOF'))
+        self.assertGreater(len(renderer._page_ids), 1)
+        self.assertIn(b'/Count %d' % len(renderer._page_ids), output)
+
+    def test_pdf_renderer_empty(self):
+        """Test PDF output for a report without rows"""
+        stream = io.BytesIO()
+        self.assertEqual(PDFReportRenderer().render(self.columns, [], stream), 0)
+        self.assertIn(b'/Count 1', stream.getvalue())
+
+    def test_unsupported_format(self):
+        """Test unsupported export formats are rejected"""
+        with self.assertRaises(ValueError):
+            get_renderer('xml')
+
+
+class ReportExportServiceTest(TestCase):
+    """Test rendering exports into storage"""
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(
+            name='Test Tenant',
+            slug='test_tenant_reporting',
+            is_active=True
+        )
+        self.company = Company.objects.create(
+            tenant=self.tenant,
+            name='Test Company',
+            registration_number='123456789'
+        )
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123',
+            tenant=self.tenant,
+            role='accountant'
+        )
+        asset_type = GLAccountType.objects.create(
+            tenant=self.tenant,
+            code='asset',
+            name='Asset',
+            normal_balance='debit'
+        )
+        self.cash_account = ChartOfAccounts.objects.create(
+            tenant=self.tenant,
+            code='1000',
+            name='Cash',
+            account_type=asset_type,
+            type='asset',
+            created_by=self.user,
+            normal_balance='debit'
+        )
+        for index in range(3):
+            entry = JournalEntry.objects.create(
+                tenant=self.tenant,
+                company=self.company,
+                date=date(2024, 1, index + 1),
+                reference=f'JE-{index}',
+                description='Test entry',
+                status='posted',
+                created_by=self.user
+            )
+            JournalEntryLine.objects.create(
+                tenant=self.tenant,
+                journal_entry=entry,
+                account=self.cash_account,
+                description=f'Line {index}',
+                debit_amount=Decimal('10.00'),
+                credit_amount=Decimal('0.00')
+            )
+
+        self.report = Report.objects.create(
+            tenant=self.tenant,
+            company=self.company,
+            name='General Ledger',
+            report_type='general_ledger',
+            parameters={'start_date': '2024-01-02'},
+            created_by=self.user
+        )
+        self.storage_root = tempfile.mkdtemp()
+        self.storage = LocalReportStorage(root=self.storage_root, base_url='/exports')
+
+    def tearDown(self):
+        shutil.rmtree(self.storage_root, ignore_errors=True)
+
+    def _create_export(self, export_format, report=None):
+        return ReportExport.objects.create(
+            tenant=self.tenant,
+            report=report or self.report,
+            export_format=export_format,
+            created_by=self.user
+        )
+
+    def test_ledger_export_to_local_storage(self):
+        """Test a ledger export is streamed, stored and downloadable"""
+        service = ReportExportService(storage=self.storage)
+        export = service.run_export(self._create_export('csv'))
+
+        self.assertEqual(export.status, 'completed')
+        self.assertEqual(export.file_path, f'{self.tenant.id}/reports/exports/{export.id}.csv')
+        self.assertEqual(service.get_download_url(export), f'/exports/{export.file_path}')
+
+        with open(self.storage.path(export.file_path), encoding='utf-8') as handle:
+            rows = list(csv.reader(handle))
+        self.assertEqual(rows[0], LEDGER_COLUMNS)
+        # start_date parameter excludes the first entry
+        self.assertEqual([row[1] for row in rows[1:]], ['JE-1', 'JE-2'])
+        self.assertEqual(export.file_size, self.storage.path(export.file_path).stat().st_size)
+        self.assertEqual(self.report.executions.filter(status='completed').count(), 1)
+
+    def test_export_from_report_data(self):
+        """Test exports of reports that carry stored rows"""
+        report = Report.objects.create(
+            tenant=self.tenant,
+            company=self.company,
+            name='Custom',
+            report_type='custom',
+            data=[{'name': 'Revenue', 'amount': '10.00'}, {'name': 'Expenses', 'amount': '4.00'}],
+            created_by=self.user
+        )
+        export = ReportExportService(storage=self.storage).run_export(self._create_export('pdf', report))
+
+        self.assertEqual(export.status, 'completed')
+        self.assertTrue(self.storage.path(export.file_path).read_bytes().startswith(b'%PDF'))
+
+    def test_unsupported_format_marks_failed(self):
+        """Test render errors are recorded on the export"""
+        export = ReportExportService(storage=self.storage).run_export(self._create_export('xml'))
+
+        self.assertEqual(export.status, 'failed')
+        self.assertIn('Unsupported export format', export.error_message)
+        self.assertIsNone(ReportExportService(storage=self.storage).get_download_url(export))
+
+    def test_export_endpoint_limits(self):
+        """Test the export row limit and download URL expiration validation"""
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        export_url = f'/api/v1/reporting/reports/{self.report.id}/export/'
+
+        with override_settings(REPORT_EXPORT_STORAGE='local', REPORT_EXPORT_LOCAL_ROOT=self.storage_root):
+            with override_settings(REPORT_EXPORT_MAX_ROWS=1):
+                response = client.post(export_url, {'export_format': 'csv'}, format='json')
+            self.assertEqual(response.status_code, 400)
+            self.assertFalse(ReportExport.objects.exists())
+
+            response = client.post(export_url, {'export_format': 'csv'}, format='json')
+            self.assertEqual(response.status_code, 200)
+            download_url = f"/api/v1/reporting/exports/{response.data['export']['id']}/download/"
+
+            for expiration in ('soon', '-5', '0'):
+                self.assertEqual(client.get(download_url, {'expiration': expiration}).status_code, 400)
+            with override_settings(REPORT_EXPORT_MAX_URL_EXPIRATION=600):
+                response = client.get(download_url, {'expiration': '999999'})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data['expires_in'], 600)
+
+
+class AnalyticsQueryServiceTest(TestCase):
+    """Test grouped analytics aggregates and their cache"""
+
+    def setUp(self):
+        cache.clear()
+        self.tenant = Tenant.objects.create(
+            name='Analytics Tenant',
+            slug='analytics_tenant',
+            is_active=True
+        )
+        self.company = Company.objects.create(
+            tenant=self.tenant,
+            name='Analytics Company',
+            registration_number='123456789'
+        )
+        self.user = User.objects.create_user(
+            username='analyst',
+            email='analyst@example.com',
+            password='testpass123',
+            tenant=self.tenant,
+            role='accountant'
+        )
+        self.period = (date(2024, 1, 1), date(2024, 2, 29))
+
+    def _order(self, customer, number, order_date, amount, status='confirmed'):
+        from sales.models import SalesOrder
+        return SalesOrder.objects.create(
+            tenant=self.tenant, company=self.company, order_number=number, customer=customer,
+            order_date=order_date, status=status, total_amount=Decimal(amount), created_by=self.user
+        )
+
+    def test_sales_summary_grouped_and_cached(self):
+        """Test revenue by customer/month in two queries, cached until orders change"""
+        from sales.models import Customer, SalesQuote
+
+        acme, globex = [
+            Customer.objects.create(tenant=self.tenant, company=self.company, name=name, created_by=self.user)
+            for name in ('Acme', 'Globex')
+        ]
+        self._order(acme, 'SO-1', date(2024, 1, 5), '100.00')
+        self._order(acme, 'SO-2', date(2024, 2, 5), '50.00')
+        self._order(globex, 'SO-3', date(2024, 2, 9), '30.00')
+        self._order(globex, 'SO-4', date(2024, 2, 10), '999.00', status='cancelled')
+        SalesQuote.objects.create(
+            tenant=self.tenant, company=self.company, quote_number='Q-1', customer=acme,
+            quote_date=date(2024, 1, 2), expiry_date=date(2024, 2, 2), status='converted', created_by=self.user
+        )
+
+        with self.assertNumQueries(2):
+            summary = AnalyticsQueryService.sales_summary(self.tenant, *self.period)
+
+        self.assertEqual(summary['total_revenue'], Decimal('180.00'))
+        self.assertEqual((summary['total_orders'], summary['total_quotes'], summary['converted_quotes']), (4, 1, 1))
+        self.assertEqual(summary['revenue_by_customer'], {'Acme': Decimal('150.00'), 'Globex': Decimal('30.00')})
+        self.assertEqual(summary['revenue_by_month'], {'2024-01': Decimal('100.00'), '2024-02': Decimal('80.00')})
+
+        with self.assertNumQueries(0):
+            AnalyticsQueryService.sales_summary(self.tenant, *self.period)
+
+        self._order(acme, 'SO-5', date(2024, 2, 20), '20.00')
+        summary = AnalyticsQueryService.sales_summary(self.tenant, *self.period)
+        self.assertEqual(summary['total_revenue'], Decimal('200.00'))
+
+    def test_pipeline_and_purchase_summaries(self):
+        """Test stage and supplier groupings are single queries"""
+        from sales.models import Customer, SalesOpportunity
+        from purchase.models import Supplier, PurchaseOrder
+
+        customer = Customer.objects.create(tenant=self.tenant, company=self.company, name='Acme', created_by=self.user)
+        for stage, value, probability, status in (
+            ('qualification', '1000.00', 20, 'open'),
+            ('qualification', '500.00', 50, 'open'),
+            ('quotation', '200.00', 75, 'open'),
+            ('won', '900.00', 100, 'won'),
+        ):
+            SalesOpportunity.objects.create(
+                tenant=self.tenant, company=self.company, customer=customer, title=stage, stage=stage,
+                value=Decimal(value), probability=probability, status=status, sales_person=self.user
+            )
+        supplier = Supplier.objects.create(
+            tenant=self.tenant, company=self.company, name='Initech', created_by=self.user
+        )
+        for number, (order_date, amount, status) in enumerate((
+            (date(2024, 1, 3), '40.00', 'received'),
+            (date(2024, 2, 3), '60.00', 'received'),
+            (date(2024, 2, 4), '70.00', 'draft'),
+        )):
+            PurchaseOrder.objects.create(
+                tenant=self.tenant, company=self.company, order_number=f'PO-{number}', supplier=supplier,
+                order_date=order_date, total_amount=Decimal(amount), status=status, created_by=self.user
+            )
+
+        with self.assertNumQueries(1):
+            pipeline = AnalyticsQueryService._build_pipeline_summary(self.tenant)
+        self.assertEqual(pipeline['total_opportunities'], 3)
+        self.assertEqual(pipeline['by_stage']['qualification']['count'], 2)
+        self.assertEqual(pipeline['by_stage']['qualification']['weighted_value'], Decimal('450'))
+        self.assertEqual(pipeline['total_value'], Decimal('1700'))
+
+        with self.assertNumQueries(1):
+            purchases = AnalyticsQueryService._build_purchase_summary(self.tenant, *self.period, 10)
+        self.assertEqual(purchases['total_spend'], Decimal('100.00'))
+        self.assertEqual((purchases['total_orders'], purchases['received_orders']), (3, 2))
+        self.assertEqual(purchases['avg_order_value'], Decimal('50.00'))
+        self.assertEqual(purchases['spend_by_month'], {'2024-01': Decimal('40.00'), '2024-02': Decimal('60.00')})
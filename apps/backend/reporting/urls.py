@@ -38,6 +38,7 @@ urlpatterns = [
     # Report Exports
     path('exports/', views.ReportExportListView.as_view(), name='report_exports_list'),
     path('exports/<uuid:pk>/', views.ReportExportDetailView.as_view(), name='report_exports_detail'),
+    path('exports/<uuid:pk>/download/', views.download_export, name='report_export_download'),
     path('reports/<uuid:pk>/export/', views.export_report, name='export_report'),
     
     # Report Templates
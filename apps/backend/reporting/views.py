@@ -2,6 +2,7 @@ from rest_framework import status, generics, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from django.conf import settings
 from django.shortcuts import get_object_or_404
 from django.db.models import Q, Count
 from django.utils import timezone
@@ -18,6 +19,7 @@ from .serializers import (
     TaxReportSerializer, ComplianceReportSerializer, ReportExportSerializer,
     ReportingSettingsSerializer, ReportSummarySerializer
 )
+from .export_service import ReportExportService
 from authentication.permissions import IsTenantMember
 from backend.tenant_utils import get_request_tenant
 
@@ -317,7 +319,13 @@ class ReportExportDetailView(generics.RetrieveDestroyAPIView):
 @api_view(['POST'])
 @permission_classes([IsTenantMember])
 def export_report(request, pk):
-    """Export a report in specified format"""
+    """
+    Export a report in specified format
+
+    The file is rendered inside the request, so reports with more than
+    REPORT_EXPORT_MAX_ROWS rows are rejected; narrow the report's date range
+    or filters and export it in parts.
+    """
     tenant = get_request_tenant(request)
     if not tenant:
         return Response(
@@ -328,24 +336,85 @@ def export_report(request, pk):
     report = get_object_or_404(Report, id=pk, tenant=tenant)
     export_format = request.data.get('export_format', 'pdf')
     
+    if export_format not in dict(ReportExport._meta.get_field('export_format').choices):
+        return Response(
+            {'error': f'Unsupported export format: {export_format}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    service = ReportExportService()
+    row_count = service.count_report_rows(report)
+    if row_count > settings.REPORT_EXPORT_MAX_ROWS:
+        return Response(
+            {'error': f'Report has {row_count} rows; exports are limited to {settings.REPORT_EXPORT_MAX_ROWS}. '
+                      f'Narrow the date range or filters and export it in parts.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
     # Create export record
     export = ReportExport.objects.create(
         tenant=tenant,
         report=report,
         export_format=export_format,
-        status='processing',
+        status='pending',
         created_by=request.user
     )
     
-    # Here you would implement actual export logic
-    # For now, just mark as completed
-    export.status = 'completed'
-    export.completed_at = timezone.now()
-    export.save()
+    export = service.run_export(export)
+    
+    if export.status == 'failed':
+        return Response({
+            'error': 'Report export failed',
+            'export': ReportExportSerializer(export).data
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    return Response({
+        'message': 'Report exported successfully',
+        'export': ReportExportSerializer(export).data,
+        'download_url': service.get_download_url(export)
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsTenantMember])
+def download_export(request, pk):
+    """Get a time-limited download URL for a completed export"""
+    tenant = get_request_tenant(request)
+    if not tenant:
+        return Response(
+            {'error': 'Tenant context required'},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+    
+    export = get_object_or_404(ReportExport, id=pk, tenant=tenant)
+    if export.status != 'completed':
+        return Response(
+            {'error': f'Export is not ready (status: {export.status})'},
+            status=status.HTTP_409_CONFLICT
+        )
+    
+    try:
+        expiration = int(request.query_params.get('expiration', 3600))
+    except (TypeError, ValueError):
+        expiration = 0
+    if expiration <= 0:
+        return Response(
+            {'error': 'expiration must be a positive number of seconds'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    expiration = min(expiration, settings.REPORT_EXPORT_MAX_URL_EXPIRATION)
+    download_url = ReportExportService().get_download_url(export, expiration=expiration)
+    if not download_url:
+        return Response(
+            {'error': 'Export file is not available'},
+            status=status.HTTP_404_NOT_FOUND
+        )
     
     return Response({
-        'message': 'Report export initiated successfully',
-        'export': ReportExportSerializer(export).data
+        'download_url': download_url,
+        'file_size': export.file_size,
+        'export_format': export.export_format,
+        'expires_in': expiration
     })
 
 
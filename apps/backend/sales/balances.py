@@ -0,0 +1,239 @@
+"""
+Customer Balances
+Maintained accounts-receivable summaries per customer.
+
+Each CustomerBalance row is recomputed from grouped aggregates over the
+customer's sales orders, invoices and invoice payments: three queries for
+one customer or for a whole batch of them. sales.signals refreshes the
+affected customer inside the transaction that changed the document, with
+the customer row locked so concurrent changes are applied one at a time.
+Overdue counts depend on the date, so rows whose next open invoice has
+fallen due are refreshed lazily (refresh_stale) or by the
+rebuild_customer_balances command.
+"""
+from decimal import Decimal
+from typing import Dict, Iterable
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q, Sum
+from django.utils import timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal('0')
+
+# Invoice statuses that leave an amount receivable
+OPEN_INVOICE_STATUSES = ('sent', 'viewed', 'overdue')
+
+BALANCE_FIELDS = [
+    'total_orders', 'order_revenue', 'lifetime_sales', 'outstanding_balance', 'open_invoices',
+    'overdue_count', 'next_due_date', 'last_order_date', 'last_activity_date', 'refreshed_on',
+]
+
+# ?ordering= value -> CustomerBalance field
+SUMMARY_ORDERING = {
+    'outstanding_balance': 'outstanding_balance',
+    'total_revenue': 'order_revenue',
+    'lifetime_sales': 'lifetime_sales',
+    'overdue_count': 'overdue_count',
+    'last_order_date': 'last_order_date',
+    'last_activity_date': 'last_activity_date',
+    'customer_name': 'customer__name',
+}
+
+
+class CustomerBalanceService:
+    """Computes and stores CustomerBalance rows"""
+
+    BATCH_SIZE = 1000
+
+    @staticmethod
+    def compute(tenant_id, customer_ids: Iterable, today=None) -> Dict:
+        """
+        Balance values for customers from grouped aggregates
+
+        Args:
+            tenant_id: Tenant the customers belong to
+            customer_ids: Customers to compute
+            today: Date overdue status is measured against (defaults to today)
+
+        Returns:
+            dict of customer id -> CustomerBalance field values
+        """
+        from invoicing.models import Invoice, InvoicePayment
+        from .models import SalesOrder
+
+        customer_ids = list(customer_ids)
+        today = today or timezone.localdate()
+        values = {
+            customer_id: {
+                'total_orders': 0, 'order_revenue': ZERO, 'lifetime_sales': ZERO, 'outstanding_balance': ZERO,
+                'open_invoices': 0, 'overdue_count': 0, 'next_due_date': None, 'last_order_date': None,
+                'last_activity_date': None, 'refreshed_on': today,
+            }
+            for customer_id in customer_ids
+        }
+        if not customer_ids:
+            return values
+
+        orders = SalesOrder.objects.filter(tenant_id=tenant_id, customer_id__in=customer_ids).values(
+            'customer_id'
+        ).annotate(
+            total_orders=Count('id'),
+            order_revenue=Sum('total_amount', filter=~Q(status='cancelled')),
+            last_order_date=Max('order_date'),
+        ).order_by()
+
+        is_open = Q(status__in=OPEN_INVOICE_STATUSES)
+        is_overdue = is_open & (Q(status='overdue') | Q(due_date__lt=today))
+        invoices = Invoice.objects.filter(tenant_id=tenant_id, customer_id__in=customer_ids).values(
+            'customer_id'
+        ).annotate(
+            lifetime_sales=Sum('total_amount', filter=Q(status='paid')),
+            open_total=Sum('total_amount', filter=is_open),
+            open_invoices=Count('id', filter=is_open),
+            overdue_count=Count('id', filter=is_overdue),
+            next_due_date=Min('due_date', filter=is_open & ~is_overdue),
+            last_invoice_date=Max('invoice_date'),
+        ).order_by()
+
+        payments = InvoicePayment.objects.filter(
+            invoice__tenant_id=tenant_id, invoice__customer_id__in=customer_ids
+        ).values('invoice__customer_id').annotate(
+            open_paid=Sum('amount', filter=Q(invoice__status__in=OPEN_INVOICE_STATUSES)),
+            last_payment_date=Max('payment_date'),
+        ).order_by()
+
+        activity = {customer_id: [] for customer_id in customer_ids}
+        for row in orders:
+            balance = values[row['customer_id']]
+            balance['total_orders'] = row['total_orders']
+            balance['order_revenue'] = row['order_revenue'] or ZERO
+            balance['last_order_date'] = row['last_order_date']
+            activity[row['customer_id']].append(row['last_order_date'])
+        for row in invoices:
+            balance = values[row['customer_id']]
+            balance['lifetime_sales'] = row['lifetime_sales'] or ZERO
+            balance['outstanding_balance'] = row['open_total'] or ZERO
+            balance['open_invoices'] = row['open_invoices']
+            balance['overdue_count'] = row['overdue_count']
+            balance['next_due_date'] = row['next_due_date']
+            activity[row['customer_id']].append(row['last_invoice_date'])
+        for row in payments:
+            balance = values[row['invoice__customer_id']]
+            balance['outstanding_balance'] -= row['open_paid'] or ZERO
+            activity[row['invoice__customer_id']].append(row['last_payment_date'])
+
+        for customer_id, dates in activity.items():
+            dates = [day for day in dates if day is not None]
+            values[customer_id]['last_activity_date'] = max(dates) if dates else None
+        return values
+
+    @classmethod
+    def _store(cls, tenant_id, values: Dict):
+        from .models import CustomerBalance
+
+        CustomerBalance.objects.bulk_create(
+            [
+                CustomerBalance(tenant_id=tenant_id, customer_id=customer_id, **fields)
+                for customer_id, fields in values.items()
+            ],
+            batch_size=cls.BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['customer'],
+            update_fields=BALANCE_FIELDS + ['updated_at'],
+        )
+
+    @classmethod
+    def refresh(cls, tenant_id, customer_ids: Iterable):
+        """
+        Recompute the balances of some customers
+
+        Locks the customer rows so concurrent refreshes of the same customer
+        apply in order; runs inside the caller's transaction when there is one.
+        """
+        from .models import Customer
+
+        customer_ids = {customer_id for customer_id in customer_ids if customer_id is not None}
+        if not customer_ids:
+            return
+        with transaction.atomic():
+            existing = list(
+                Customer.objects.select_for_update().filter(tenant_id=tenant_id, pk__in=customer_ids)
+                .order_by('pk').values_list('pk', flat=True)
+            )
+            if existing:
+                cls._store(tenant_id, cls.compute(tenant_id, existing))
+
+    @classmethod
+    def refresh_stale(cls, tenant, today=None) -> int:
+        """
+        Refresh balances whose next open invoice has fallen due since they were computed
+
+        Returns:
+            Number of customers refreshed
+        """
+        from .models import CustomerBalance
+
+        today = today or timezone.localdate()
+        stale = list(CustomerBalance.objects.filter(tenant=tenant, next_due_date__lt=today).values_list(
+            'customer_id', flat=True
+        ))
+        if stale:
+            cls.refresh(tenant.id, stale)
+        return len(stale)
+
+    @classmethod
+    def rebuild(cls, tenant, batch_size: int = None) -> int:
+        """
+        Recompute every customer balance of a tenant
+
+        Customers are processed in batches; each batch is three aggregate
+        queries and one upsert.
+
+        Returns:
+            Number of customers rebuilt
+        """
+        from .models import Customer
+
+        batch_size = batch_size or cls.BATCH_SIZE
+        customer_ids = list(Customer.objects.filter(tenant=tenant).order_by('pk').values_list('pk', flat=True))
+        with transaction.atomic():
+            for start in range(0, len(customer_ids), batch_size):
+                cls._store(tenant.id, cls.compute(tenant.id, customer_ids[start:start + batch_size]))
+
+        logger.info(f"Rebuilt balances for {len(customer_ids)} customers of tenant {tenant.id}")
+        return len(customer_ids)
+
+    @classmethod
+    def get_balance(cls, customer):
+        """The customer's balance row, computing it first if it does not exist yet"""
+        from .models import CustomerBalance
+
+        balance = CustomerBalance.objects.filter(customer=customer).first()
+        if balance is None:
+            cls.refresh(customer.tenant_id, [customer.pk])
+            balance = CustomerBalance.objects.get(customer=customer)
+        return balance
+
+    @staticmethod
+    def summary(tenant, ordering: str = '-outstanding_balance'):
+        """
+        Balances of a tenant's active customers, in one query
+
+        Args:
+            tenant: Tenant instance
+            ordering: One of SUMMARY_ORDERING, optionally prefixed with '-'
+
+        Raises:
+            ValueError: Unknown ordering
+        """
+        from .models import CustomerBalance
+
+        field = SUMMARY_ORDERING.get(ordering.lstrip('-'))
+        if field is None:
+            raise ValueError(f"ordering must be one of: {', '.join(sorted(SUMMARY_ORDERING))}")
+        prefix = '-' if ordering.startswith('-') else ''
+        return CustomerBalance.objects.filter(tenant=tenant, customer__is_active=True).select_related(
+            'customer'
+        ).order_by(f"{prefix}{field}", 'customer__name')
@@ -0,0 +1,40 @@
+"""
+Management command to rebuild maintained customer balances
+Usage: python manage.py rebuild_customer_balances [--tenant <slug>] [--stale-only]
+
+Run after migrating, after bulk imports that bypass model signals, and
+daily with --stale-only so overdue counts follow the calendar.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from sales.balances import CustomerBalanceService
+from tenants.models import Tenant
+
+
+class Command(BaseCommand):
+    help = 'Recompute customer balance summaries (lifetime totals, open balance, overdue count)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', type=str, help='Tenant slug (defaults to all active tenants)')
+        parser.add_argument(
+            '--stale-only', action='store_true',
+            help='Only refresh customers whose next open document has fallen due'
+        )
+
+    def handle(self, *args, **options):
+        tenants = Tenant.objects.filter(is_active=True)
+        if options.get('tenant'):
+            tenants = Tenant.objects.filter(slug=options['tenant'])
+            if not tenants.exists():
+                raise CommandError(f"Tenant '{options['tenant']}' not found")
+
+        for tenant in tenants:
+            started = time.time()
+            if options['stale_only']:
+                count = CustomerBalanceService.refresh_stale(tenant)
+            else:
+                count = CustomerBalanceService.rebuild(tenant)
+            self.stdout.write(f"{tenant.slug}: {count:,} customers in {time.time() - started:.1f}s")
+        self.stdout.write(self.style.SUCCESS('Customer balances updated'))
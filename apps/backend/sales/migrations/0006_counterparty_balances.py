@@ -0,0 +1,48 @@
+# Generated by Django 4.2 on 2026-10-19 13:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0004_tenantonboardingprogress_preset_progress'),
+        ('sales', '0005_customer_converted_amount_in_base_currency_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerBalance',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('total_orders', models.PositiveIntegerField(default=0)),
+                ('order_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('lifetime_sales', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('outstanding_balance', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('open_invoices', models.PositiveIntegerField(default=0)),
+                ('overdue_count', models.PositiveIntegerField(default=0)),
+                ('next_due_date', models.DateField(blank=True, null=True)),
+                ('last_order_date', models.DateField(blank=True, null=True)),
+                ('last_activity_date', models.DateField(blank=True, null=True)),
+                ('refreshed_on', models.DateField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('customer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='balance', to='sales.customer')),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='customer_balances', to='tenants.tenant')),
+            ],
+            options={
+                'verbose_name': 'Customer Balance',
+                'verbose_name_plural': 'Customer Balances',
+                'db_table': 'customer_balances',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='customerbalance',
+            index=models.Index(fields=['tenant', '-outstanding_balance'], name='customer_ba_tenant__c202e7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customerbalance',
+            index=models.Index(fields=['tenant', 'next_due_date'], name='customer_ba_tenant__df4855_idx'),
+        ),
+    ]
@@ -51,15 +51,50 @@ class Customer(FinancialModel):
         return self.name
 
     def get_total_sales(self):
-        """Get total sales for this customer"""
-        return sum(invoice.total_amount for invoice in self.invoices.filter(status='paid'))
+        """Get total sales for this customer (paid invoices)"""
+        from .balances import CustomerBalanceService
+        return CustomerBalanceService.get_balance(self).lifetime_sales
 
     def get_outstanding_balance(self):
-        """Get outstanding balance for this customer"""
-        return sum(
-            invoice.total_amount - sum(payment.amount for payment in invoice.payments.all())
-            for invoice in self.invoices.filter(status__in=['sent', 'viewed', 'overdue'])
-        )
+        """Get outstanding balance for this customer (open invoices less payments)"""
+        from .balances import CustomerBalanceService
+        return CustomerBalanceService.get_balance(self).outstanding_balance
+
+
+class CustomerBalance(models.Model):
+    """
+    Customer Balance model holding a customer's maintained AR summary
+
+    Kept current by sales.balances.CustomerBalanceService when orders,
+    invoices and invoice payments change; rebuilt in bulk by the
+    rebuild_customer_balances command.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tenant = models.ForeignKey('tenants.Tenant', on_delete=models.CASCADE, related_name='customer_balances')
+    customer = models.OneToOneField(Customer, on_delete=models.CASCADE, related_name='balance')
+    total_orders = models.PositiveIntegerField(default=0)
+    order_revenue = models.DecimalField(max_digits=18, decimal_places=2, default=0)  # Non-cancelled orders
+    lifetime_sales = models.DecimalField(max_digits=18, decimal_places=2, default=0)  # Paid invoices
+    outstanding_balance = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    open_invoices = models.PositiveIntegerField(default=0)
+    overdue_count = models.PositiveIntegerField(default=0)
+    next_due_date = models.DateField(null=True, blank=True)  # Earliest open invoice not yet overdue
+    last_order_date = models.DateField(null=True, blank=True)
+    last_activity_date = models.DateField(null=True, blank=True)
+    refreshed_on = models.DateField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'customer_balances'
+        verbose_name = 'Customer Balance'
+        verbose_name_plural = 'Customer Balances'
+        indexes = [
+            models.Index(fields=['tenant', '-outstanding_balance']),
+            models.Index(fields=['tenant', 'next_due_date']),
+        ]
+
+    def __str__(self):
+        return f"{self.customer_id}: {self.outstanding_balance} outstanding"
 
 
 class SalesOrder(FinancialModel):
@@ -1,15 +1,17 @@
 from rest_framework import serializers
+from backend.fieldsets import SparseFieldsetMixin
 from decimal import Decimal
 from .models import Customer, SalesOrder, SalesOrderLine, SalesQuote, SalesQuoteLine, SalesOpportunity, SalesCommission, SalesSettings
 
 
-class CustomerSerializer(serializers.ModelSerializer):
+class CustomerSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Customer"""
     total_orders = serializers.SerializerMethodField()
     total_revenue = serializers.SerializerMethodField()
     
     class Meta:
         model = Customer
+        prefetch_related = ['sales_orders']  # read by the method fields
         fields = [
             'id', 'tenant', 'company', 'name', 'email', 'phone', 'address',
             'city', 'state', 'country', 'postal_code', 'tax_id', 'currency',
@@ -25,7 +27,7 @@ class CustomerSerializer(serializers.ModelSerializer):
         return sum(order.total_amount for order in obj.sales_orders.all())
 
 
-class SalesOrderLineSerializer(serializers.ModelSerializer):
+class SalesOrderLineSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Sales Order Line"""
     total_amount = serializers.SerializerMethodField()
     
@@ -45,7 +47,7 @@ class SalesOrderLineSerializer(serializers.ModelSerializer):
         return subtotal - discount + tax
 
 
-class SalesOrderSerializer(serializers.ModelSerializer):
+class SalesOrderSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Sales Order"""
     total_amount = serializers.SerializerMethodField()
     total_tax = serializers.SerializerMethodField()
@@ -55,6 +57,7 @@ class SalesOrderSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = SalesOrder
+        prefetch_related = ['lines']  # read by the method fields
         fields = [
             'id', 'tenant', 'company', 'customer', 'customer_name', 'order_number',
             'order_date', 'delivery_date', 'status', 'payment_terms', 'currency',
@@ -65,7 +68,7 @@ class SalesOrderSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at', 'approved_at', 'shipped_at']
     
     def get_total_amount(self, obj):
-        return sum(line.total_amount for line in obj.lines.all())
+        return sum(line.line_total for line in obj.lines.all())
     
     def get_total_tax(self, obj):
         total_tax = Decimal('0.00')
@@ -94,7 +97,7 @@ class SalesOrderWithLinesSerializer(SalesOrderSerializer):
         fields = SalesOrderSerializer.Meta.fields + ['lines']
 
 
-class SalesQuoteLineSerializer(serializers.ModelSerializer):
+class SalesQuoteLineSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Sales Quote Line"""
     total_amount = serializers.SerializerMethodField()
     
@@ -114,7 +117,7 @@ class SalesQuoteLineSerializer(serializers.ModelSerializer):
         return subtotal - discount + tax
 
 
-class SalesQuoteSerializer(serializers.ModelSerializer):
+class SalesQuoteSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Sales Quote"""
     total_amount = serializers.SerializerMethodField()
     customer_name = serializers.CharField(source='customer.name', read_only=True)
@@ -122,6 +125,7 @@ class SalesQuoteSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = SalesQuote
+        prefetch_related = ['lines']  # read by the method fields
         fields = [
             'id', 'tenant', 'company', 'customer', 'customer_name', 'quote_number',
             'quote_date', 'valid_until', 'status', 'currency', 'exchange_rate',
@@ -131,7 +135,7 @@ class SalesQuoteSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at', 'approved_at']
     
     def get_total_amount(self, obj):
-        return sum(line.total_amount for line in obj.lines.all())
+        return sum(line.line_total for line in obj.lines.all())
 
 
 class SalesQuoteWithLinesSerializer(SalesQuoteSerializer):
@@ -151,6 +155,11 @@ class CustomerSummarySerializer(serializers.Serializer):
     total_orders = serializers.IntegerField()
     total_revenue = serializers.DecimalField(max_digits=15, decimal_places=2)
     last_order_date = serializers.DateField()
+    lifetime_sales = serializers.DecimalField(max_digits=18, decimal_places=2)
+    outstanding_balance = serializers.DecimalField(max_digits=18, decimal_places=2)
+    open_invoices = serializers.IntegerField()
+    overdue_count = serializers.IntegerField()
+    last_activity_date = serializers.DateField()
     is_active = serializers.BooleanField()
 
 
@@ -177,7 +186,7 @@ class SalesOrderSummarySerializer(serializers.Serializer):
     currency = serializers.CharField()
 
 
-class SalesOpportunitySerializer(serializers.ModelSerializer):
+class SalesOpportunitySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Sales Opportunity"""
     customer_name = serializers.CharField(source='customer.name', read_only=True)
     sales_person_name = serializers.CharField(source='sales_person.get_full_name', read_only=True)
@@ -200,7 +209,7 @@ class SalesOpportunitySerializer(serializers.ModelSerializer):
         return float(obj.get_weighted_value())
 
 
-class SalesCommissionSerializer(serializers.ModelSerializer):
+class SalesCommissionSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Sales Commission"""
     sales_person_name = serializers.CharField(source='sales_person.get_full_name', read_only=True)
     approved_by_name = serializers.CharField(source='approved_by.get_full_name', read_only=True)
@@ -217,7 +226,7 @@ class SalesCommissionSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at', 'approved_at']
 
 
-class SalesSettingsSerializer(serializers.ModelSerializer):
+class SalesSettingsSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Sales Settings"""
     
     class Meta:
@@ -0,0 +1,62 @@
+"""
+Sales Signals
+Keep customer balances current when orders, invoices and payments change
+"""
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+from invoicing.models import Invoice, InvoicePayment
+from .balances import CustomerBalanceService
+from .models import Customer, SalesOrder
+
+# Deletions starting here change a customer's balance; deleting the
+# customer (or its tenant) removes the balance row with it.
+BALANCE_SOURCES = (SalesOrder, Invoice, InvoicePayment)
+
+
+def _deleted_directly(kwargs) -> bool:
+    origin = kwargs.get('origin')
+    model = getattr(origin, 'model', None) or type(origin)
+    return origin is None or issubclass(model, BALANCE_SOURCES)
+
+
+@receiver(post_save, sender=Customer)
+def create_customer_balance(sender, instance, created, **kwargs):
+    """Give new customers an empty balance row so they appear in summaries"""
+    if created:
+        CustomerBalanceService.refresh(instance.tenant_id, [instance.pk])
+
+
+@receiver(pre_save, sender=SalesOrder)
+@receiver(pre_save, sender=Invoice)
+def remember_customer(sender, instance, update_fields=None, **kwargs):
+    """Read the stored customer before an order or invoice changes, so moving it refreshes both balances"""
+    instance._balance_customer_before = None
+    if instance._state.adding:
+        return
+    if update_fields is not None and not {'customer', 'customer_id'} & set(update_fields):
+        return
+    instance._balance_customer_before = sender._base_manager.filter(
+        pk=instance.pk
+    ).values_list('customer_id', flat=True).first()
+
+
+@receiver(post_save, sender=SalesOrder)
+@receiver(post_delete, sender=SalesOrder)
+@receiver(post_save, sender=Invoice)
+@receiver(post_delete, sender=Invoice)
+def refresh_customer_balance(sender, instance, **kwargs):
+    """Recompute the customer's balance (and the previous customer's) within the changing transaction"""
+    if 'created' in kwargs or _deleted_directly(kwargs):
+        customer_ids = {instance.customer_id}
+        if 'created' in kwargs and getattr(instance, '_balance_customer_before', None) is not None:
+            customer_ids.add(instance._balance_customer_before)  # Moved from another customer
+        CustomerBalanceService.refresh(instance.tenant_id, customer_ids)
+
+
+@receiver(post_save, sender=InvoicePayment)
+@receiver(post_delete, sender=InvoicePayment)
+def refresh_customer_balance_for_payment(sender, instance, **kwargs):
+    """Recompute the paid invoice's customer balance"""
+    if 'created' in kwargs or _deleted_directly(kwargs):
+        customer_ids = Invoice.objects.filter(pk=instance.invoice_id).values_list('customer_id', flat=True)
+        CustomerBalanceService.refresh(instance.tenant_id, customer_ids)
@@ -1,3 +1,129 @@
+from datetime import timedelta
+from decimal import Decimal
+
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from authentication.models import User
+from invoicing.models import Invoice, InvoicePayment
+from tenants.models import Company, Tenant
+from .balances import CustomerBalanceService
+from .models import Customer, CustomerBalance, SalesOrder
+
+
+class CustomerBalanceTest(TestCase):
+    """Test maintained customer balance summaries"""
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(
+            name='Balance Tenant',
+            slug='balance_tenant',
+            is_active=True
+        )
+        self.company = Company.objects.create(
+            tenant=self.tenant,
+            name='Balance Company',
+            registration_number='123456789'
+        )
+        self.user = User.objects.create_user(
+            username='balances',
+            email='balances@example.com',
+            password='testpass123',
+            tenant=self.tenant,
+            role='accountant'
+        )
+        self.today = timezone.localdate()
+
+    def _customer(self, name):
+        return Customer.objects.create(tenant=self.tenant, company=self.company, name=name, created_by=self.user)
+
+    def _invoice(self, customer, number, amount, status, due_in_days):
+        return Invoice.objects.create(
+            tenant=self.tenant, company=self.company, invoice_number=number, customer=customer,
+            invoice_date=self.today - timedelta(days=40), due_date=self.today + timedelta(days=due_in_days),
+            status=status, total_amount=Decimal(amount), created_by=self.user
+        )
+
+    def test_balance_follows_orders_invoices_and_payments(self):
+        """Test the summary row tracks document changes and matches a rebuild"""
+        customer = self._customer('Acme')
+        self.assertEqual(customer.balance.outstanding_balance, Decimal('0'))
+
+        SalesOrder.objects.create(
+            tenant=self.tenant, company=self.company, order_number='SO-1', customer=customer,
+            order_date=self.today - timedelta(days=45), status='confirmed', total_amount=Decimal('350.00'),
+            created_by=self.user
+        )
+        self._invoice(customer, 'INV-1', '100.00', 'paid', -20)
+        overdue = self._invoice(customer, 'INV-2', '200.00', 'sent', -5)
+        self._invoice(customer, 'INV-3', '50.00', 'viewed', 10)
+        payment = InvoicePayment.objects.create(
+            tenant=self.tenant, invoice=overdue, payment_date=self.today, amount=Decimal('30.00'),
+            payment_method='bank_transfer', created_by=self.user
+        )
+
+        balance = CustomerBalance.objects.get(customer=customer)
+        self.assertEqual(balance.total_orders, 1)
+        self.assertEqual(balance.order_revenue, Decimal('350.00'))
+        self.assertEqual(balance.lifetime_sales, Decimal('100.00'))
+        self.assertEqual(balance.outstanding_balance, Decimal('220.00'))
+        self.assertEqual((balance.open_invoices, balance.overdue_count), (2, 1))
+        self.assertEqual(balance.next_due_date, self.today + timedelta(days=10))
+        self.assertEqual(balance.last_activity_date, self.today)
+        self.assertEqual(customer.get_outstanding_balance(), Decimal('220.00'))
+
+        payment.delete()
+        self.assertEqual(CustomerBalance.objects.get(customer=customer).outstanding_balance, Decimal('250.00'))
+
+        CustomerBalance.objects.filter(customer=customer).update(outstanding_balance=0, overdue_count=0)
+        self.assertEqual(CustomerBalanceService.rebuild(self.tenant), 1)
+        balance = CustomerBalance.objects.get(customer=customer)
+        self.assertEqual((balance.outstanding_balance, balance.overdue_count), (Decimal('250.00'), 1))
+
+        # Due dates passing make rows stale until refreshed
+        later = self.today + timedelta(days=11)
+        self.assertEqual(CustomerBalanceService.refresh_stale(self.tenant, today=later), 1)
+
+        customer.delete()
+        self.assertFalse(CustomerBalance.objects.exists())
+
+    def test_moving_invoice_refreshes_both_customers(self):
+        """Test reassigning a document moves its amount off the previous customer's balance"""
+        acme, globex = self._customer('Acme'), self._customer('Globex')
+        invoice = self._invoice(acme, 'INV-1', '120.00', 'sent', 5)
+
+        invoice.customer = globex
+        invoice.save()
+        self.assertEqual(CustomerBalance.objects.get(customer=acme).outstanding_balance, Decimal('0'))
+        self.assertEqual(CustomerBalance.objects.get(customer=globex).outstanding_balance, Decimal('120.00'))
+
+        order = SalesOrder.objects.create(
+            tenant=self.tenant, company=self.company, order_number='SO-1', customer=globex,
+            order_date=self.today, status='confirmed', total_amount=Decimal('80.00'), created_by=self.user
+        )
+        order.customer = acme
+        order.save(update_fields=['customer'])
+        self.assertEqual(CustomerBalance.objects.get(customer=globex).total_orders, 0)
+        self.assertEqual(CustomerBalance.objects.get(customer=acme).order_revenue, Decimal('80.00'))
+
+    def test_summary_is_one_query_sorted_by_balance(self):
+        """Test the summary endpoint reads balances in one query and sorts them"""
+        small, large, idle = self._customer('Small'), self._customer('Large'), self._customer('Idle')
+        self._invoice(small, 'INV-1', '10.00', 'sent', 5)
+        self._invoice(large, 'INV-2', '900.00', 'sent', 5)
+
+        with self.assertNumQueries(1):
+            balances = list(CustomerBalanceService.summary(self.tenant))
+        self.assertEqual([balance.customer.name for balance in balances], ['Large', 'Small', 'Idle'])
+
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.get('/api/v1/sales/customers/summary/', {'ordering': 'outstanding_balance'})
+        self.assertEqual(response.status_code, 200)
+        rows = response.data['results']
+        self.assertEqual([row['customer_name'] for row in rows], ['Idle', 'Small', 'Large'])
+        self.assertEqual(rows[2]['outstanding_balance'], '900.00')
 
-# Create your tests here.
+        response = client.get('/api/v1/sales/customers/summary/', {'ordering': 'email'})
+        self.assertEqual(response.status_code, 400)
@@ -3,7 +3,7 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Sum
+from django.db.models import Sum
 from django.utils import timezone
 from decimal import Decimal
 from datetime import datetime, date, timedelta
@@ -20,10 +20,15 @@ from .serializers import (
     SalesSettingsSerializer
 )
 from authentication.permissions import IsAccountant, IsTenantMember
+from backend.pagination import KeysetPagination, paginated_response
+from backend.query_planning import QueryPlanMixin
 from backend.tenant_utils import get_request_tenant
+from reporting.analytics import AnalyticsQueryService
+from .balances import CustomerBalanceService
+from search.indexing import SearchIndexService
 
 
-class CustomerListView(generics.ListCreateAPIView):
+class CustomerListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create customers"""
     serializer_class = CustomerSerializer
     permission_classes = [IsAccountant]
@@ -45,7 +50,7 @@ class CustomerListView(generics.ListCreateAPIView):
         serializer.save(tenant=tenant)
 
 
-class CustomerDetailView(generics.RetrieveUpdateDestroyAPIView):
+class CustomerDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete customer"""
     serializer_class = CustomerSerializer
     permission_classes = [IsAccountant]
@@ -57,7 +62,7 @@ class CustomerDetailView(generics.RetrieveUpdateDestroyAPIView):
         return Customer.objects.filter(tenant=tenant)
 
 
-class SalesOrderListView(generics.ListCreateAPIView):
+class SalesOrderListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create sales orders"""
     serializer_class = SalesOrderSerializer
     permission_classes = [IsAccountant]
@@ -74,7 +79,7 @@ class SalesOrderListView(generics.ListCreateAPIView):
         )
 
 
-class SalesOrderDetailView(generics.RetrieveUpdateDestroyAPIView):
+class SalesOrderDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete sales order"""
     serializer_class = SalesOrderWithLinesSerializer
     permission_classes = [IsAccountant]
@@ -83,7 +88,7 @@ class SalesOrderDetailView(generics.RetrieveUpdateDestroyAPIView):
         return SalesOrder.objects.filter(tenant=self.request.user.tenant)
 
 
-class SalesOrderLineListView(generics.ListCreateAPIView):
+class SalesOrderLineListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create sales order lines"""
     serializer_class = SalesOrderLineSerializer
     permission_classes = [IsAccountant]
@@ -104,7 +109,7 @@ class SalesOrderLineListView(generics.ListCreateAPIView):
         serializer.save(sales_order=sales_order)
 
 
-class SalesQuoteListView(generics.ListCreateAPIView):
+class SalesQuoteListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create sales quotes"""
     serializer_class = SalesQuoteSerializer
     permission_classes = [IsAccountant]
@@ -121,7 +126,7 @@ class SalesQuoteListView(generics.ListCreateAPIView):
         )
 
 
-class SalesQuoteDetailView(generics.RetrieveUpdateDestroyAPIView):
+class SalesQuoteDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete sales quote"""
     serializer_class = SalesQuoteWithLinesSerializer
     permission_classes = [IsAccountant]
@@ -130,7 +135,7 @@ class SalesQuoteDetailView(generics.RetrieveUpdateDestroyAPIView):
         return SalesQuote.objects.filter(tenant=self.request.user.tenant)
 
 
-class SalesQuoteLineListView(generics.ListCreateAPIView):
+class SalesQuoteLineListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create sales quote lines"""
     serializer_class = SalesQuoteLineSerializer
     permission_classes = [IsAccountant]
@@ -349,15 +354,13 @@ def sales_stats(request):
 @permission_classes([IsAccountant])
 def search_customers(request):
     """Search customers"""
-    query = request.query_params.get('q', '')
-    
-    customers = Customer.objects.filter(
-        Q(name__icontains=query) |
-        Q(email__icontains=query) |
-        Q(phone__icontains=query),
-        tenant=request.user.tenant,
-        is_active=True
-    ).order_by('name')
+    customers = SearchIndexService.find(
+        request.user.tenant,
+        request.query_params.get('q', ''),
+        'customer',
+        Customer.objects.filter(tenant=request.user.tenant, is_active=True),
+        request.query_params.get('limit')
+    )
     
     serializer = CustomerSerializer(customers, many=True)
     return Response(serializer.data)
@@ -378,39 +381,47 @@ def customer_orders(request, customer_id):
         tenant=request.user.tenant
     ).order_by('-order_date')
     
-    serializer = SalesOrderSerializer(orders, many=True)
-    return Response(serializer.data)
+    return paginated_response(request, orders, SalesOrderSerializer)
 
 
 @api_view(['GET'])
 @permission_classes([IsAccountant])
 def customer_summary(request):
-    """Get summary of all customers"""
-    customers = Customer.objects.filter(
-        tenant=request.user.tenant,
-        is_active=True
-    )
-    
+    """
+    Get summary of all customers
+
+    Reads the maintained CustomerBalance rows in one query; sort with
+    ?ordering= (default -outstanding_balance).
+    """
+    tenant = request.user.tenant
+    CustomerBalanceService.refresh_stale(tenant)
+    try:
+        balances = CustomerBalanceService.summary(tenant, request.query_params.get('ordering', '-outstanding_balance'))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    paginator = KeysetPagination()
     summary_data = []
-    for customer in customers:
-        # Get last order date
-        last_order = SalesOrder.objects.filter(
-            customer=customer
-        ).order_by('-order_date').first()
-        
+    for balance in paginator.paginate_queryset(balances, request):
+        customer = balance.customer
         summary_data.append({
             'customer_id': customer.id,
             'customer_name': customer.name,
             'email': customer.email,
             'phone': customer.phone,
-            'total_orders': customer.total_orders,
-            'total_revenue': customer.total_revenue,
-            'last_order_date': last_order.order_date if last_order else None,
+            'total_orders': balance.total_orders,
+            'total_revenue': balance.order_revenue,
+            'last_order_date': balance.last_order_date,
+            'lifetime_sales': balance.lifetime_sales,
+            'outstanding_balance': balance.outstanding_balance,
+            'open_invoices': balance.open_invoices,
+            'overdue_count': balance.overdue_count,
+            'last_activity_date': balance.last_activity_date,
             'is_active': customer.is_active
         })
-    
+
     serializer = CustomerSummarySerializer(summary_data, many=True)
-    return Response(serializer.data)
+    return paginator.get_paginated_response(serializer.data)
 
 
 # Sales Analytics
@@ -432,49 +443,35 @@ def sales_analytics(request):
         today = date.today()
         start_date = today.replace(day=1)
         end_date = today
+    else:
+        try:
+            start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
+            end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
+        except ValueError:
+            return Response(
+                {'error': 'Invalid date format. Use YYYY-MM-DD'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
     
-    # Get orders and quotes for period
-    orders = SalesOrder.objects.filter(
-        tenant=tenant,
-        order_date__range=[start_date, end_date]
-    )
-    quotes = SalesQuote.objects.filter(
-        tenant=tenant,
-        quote_date__range=[start_date, end_date]
-    )
-    
-    # Calculate metrics
-    total_revenue = sum(order.total_amount for order in orders if order.status != 'cancelled')
-    total_quotes = quotes.count()
-    total_orders = orders.count()
+    summary = AnalyticsQueryService.sales_summary(tenant, start_date, end_date)
+    total_orders = summary['total_orders']
+    total_quotes = summary['total_quotes']
     conversion_rate = (total_orders / total_quotes * 100) if total_quotes > 0 else 0
     
-    # Revenue by customer
-    revenue_by_customer = {}
-    for order in orders:
-        customer_name = order.customer.name
-        revenue_by_customer[customer_name] = revenue_by_customer.get(customer_name, 0) + float(order.total_amount)
-    
-    # Revenue by month
-    revenue_by_month = {}
-    for order in orders:
-        month_key = order.order_date.strftime('%Y-%m')
-        revenue_by_month[month_key] = revenue_by_month.get(month_key, 0) + float(order.total_amount)
-    
     return Response({
-        'total_revenue': total_revenue,
+        'total_revenue': summary['total_revenue'],
         'total_orders': total_orders,
         'total_quotes': total_quotes,
         'conversion_rate': conversion_rate,
-        'revenue_by_customer': revenue_by_customer,
-        'revenue_by_month': revenue_by_month,
+        'revenue_by_customer': {name: float(amount) for name, amount in summary['revenue_by_customer'].items()},
+        'revenue_by_month': {month: float(amount) for month, amount in summary['revenue_by_month'].items()},
         'period_start': start_date,
         'period_end': end_date
     })
 
 
 # Sales Opportunity/Pipeline Views
-class SalesOpportunityListView(generics.ListCreateAPIView):
+class SalesOpportunityListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create Sales Opportunities"""
     serializer_class = SalesOpportunitySerializer
     permission_classes = [IsAccountant]
@@ -500,7 +497,7 @@ class SalesOpportunityListView(generics.ListCreateAPIView):
         serializer.save(tenant=tenant, sales_person=self.request.user)
 
 
-class SalesOpportunityDetailView(generics.RetrieveUpdateDestroyAPIView):
+class SalesOpportunityDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete Sales Opportunity"""
     serializer_class = SalesOpportunitySerializer
     permission_classes = [IsAccountant]
@@ -523,39 +520,27 @@ def sales_pipeline_summary(request):
             status=status.HTTP_401_UNAUTHORIZED
         )
     
-    opportunities = SalesOpportunity.objects.filter(
-        tenant=tenant,
-        status='open'
-    )
-    
-    pipeline_summary = {}
-    total_value = 0
-    total_weighted_value = 0
-    
-    for opp in opportunities:
-        stage = opp.get_stage_display()
-        if stage not in pipeline_summary:
-            pipeline_summary[stage] = {
-                'count': 0,
-                'total_value': 0,
-                'weighted_value': 0
-            }
-        pipeline_summary[stage]['count'] += 1
-        pipeline_summary[stage]['total_value'] += float(opp.value)
-        pipeline_summary[stage]['weighted_value'] += float(opp.get_weighted_value())
-        total_value += float(opp.value)
-        total_weighted_value += float(opp.get_weighted_value())
+    summary = AnalyticsQueryService.pipeline_summary(tenant)
+    stage_labels = dict(SalesOpportunity._meta.get_field('stage').choices)
+    pipeline_summary = {
+        stage_labels.get(stage, stage): {
+            'count': values['count'],
+            'total_value': float(values['total_value']),
+            'weighted_value': float(values['weighted_value'])
+        }
+        for stage, values in summary['by_stage'].items()
+    }
     
     return Response({
         'pipeline_by_stage': pipeline_summary,
-        'total_opportunities': opportunities.count(),
-        'total_value': total_value,
-        'total_weighted_value': total_weighted_value
+        'total_opportunities': summary['total_opportunities'],
+        'total_value': float(summary['total_value']),
+        'total_weighted_value': float(summary['total_weighted_value'])
     })
 
 
 # Sales Commission Views
-class SalesCommissionListView(generics.ListCreateAPIView):
+class SalesCommissionListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create Sales Commissions"""
     serializer_class = SalesCommissionSerializer
     permission_classes = [IsAccountant]
@@ -578,7 +563,7 @@ class SalesCommissionListView(generics.ListCreateAPIView):
         serializer.save(tenant=tenant)
 
 
-class SalesCommissionDetailView(generics.RetrieveUpdateDestroyAPIView):
+class SalesCommissionDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete Sales Commission"""
     serializer_class = SalesCommissionSerializer
     permission_classes = [IsAccountant]
@@ -619,13 +604,7 @@ def calculate_commission(request):
     # Calculate base amount based on commission type
     base_amount = Decimal('0.00')
     if commission_type == 'sales_order':
-        orders = SalesOrder.objects.filter(
-            tenant=tenant,
-            created_by_id=sales_person_id,
-            order_date__range=[period_start, period_end],
-            status__in=['confirmed', 'processing', 'shipped', 'delivered']
-        )
-        base_amount = sum(order.total_amount for order in orders)
+        base_amount = AnalyticsQueryService.commission_base(tenant, sales_person_id, period_start, period_end)
     
     commission_amount = base_amount * (commission_rate / 100)
     
@@ -640,7 +619,7 @@ def calculate_commission(request):
 
 
 # Sales Settings Views
-class SalesSettingsView(generics.RetrieveUpdateAPIView):
+class SalesSettingsView(QueryPlanMixin, generics.RetrieveUpdateAPIView):
     """Retrieve and update Sales Settings"""
     serializer_class = SalesSettingsSerializer
     permission_classes = [IsAccountant]
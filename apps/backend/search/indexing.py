@@ -0,0 +1,280 @@
+"""
+Search Index
+Tenant-scoped full-text index over invoices, bank transactions, customers,
+suppliers, accounts and documents.
+
+Every searchable object has one SearchEntry row, written when the object
+is saved and removed when it is deleted or stops being searchable (e.g. an
+inactive account). Queries hit only search_entries: on PostgreSQL a
+tsquery over the trigger-maintained search_vector, ranked with ts_rank and
+served by a GIN index on (tenant, search_vector); every term is matched as
+a prefix so partial words work for typeahead. The trigger splits text into
+the same \w+ words as search_terms() before to_tsvector, so 'INV-1001'
+is indexed as 'inv' and '1001' and an email as its name and domain parts.
+Other databases fall back to matching each term against the lowercased
+search_text.
+"""
+import re
+from typing import Dict, Iterable, List, Optional
+from django.apps import apps
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections, transaction
+from django.db.models import F, FloatField, Value
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Terms beyond this many are ignored
+MAX_TERMS = 8
+
+# Objects returned by SearchIndexService.find (per-module search endpoints)
+DEFAULT_FIND_LIMIT = 50
+MAX_FIND_LIMIT = 200
+
+TERM_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+ENTRY_FIELDS = ['tenant_id', 'title', 'subtitle', 'body', 'search_text', 'date', 'amount']
+
+
+def _join(*parts) -> str:
+    return ' '.join(str(part) for part in parts if part not in (None, ''))
+
+
+def _invoice(invoice) -> Optional[Dict]:
+    return {
+        'title': invoice.invoice_number,
+        'subtitle': invoice.customer.name,
+        'body': invoice.notes,
+        'date': invoice.invoice_date,
+        'amount': invoice.total_amount,
+    }
+
+
+def _bank_transaction(transaction_) -> Optional[Dict]:
+    return {
+        'title': transaction_.description,
+        'subtitle': transaction_.reference,
+        'body': _join(transaction_.category, transaction_.notes),
+        'date': transaction_.transaction_date or transaction_.date,
+        'amount': transaction_.amount,
+    }
+
+
+def _counterparty(counterparty) -> Optional[Dict]:
+    if not counterparty.is_active:
+        return None
+    return {
+        'title': counterparty.name,
+        'subtitle': counterparty.email,
+        'body': _join(counterparty.phone, counterparty.city, counterparty.tax_id),
+        'date': None,
+        'amount': None,
+    }
+
+
+def _account(account) -> Optional[Dict]:
+    if not account.is_active:
+        return None
+    return {
+        'title': _join(account.code, account.name),
+        'subtitle': account.type,
+        'body': account.description,
+        'date': None,
+        'amount': None,
+    }
+
+
+def _document(document) -> Optional[Dict]:
+    if document.status != 'completed':
+        return None
+    return {
+        'title': document.original_filename or document.filename,
+        'subtitle': document.document_type,
+        'body': document.filename,
+        'date': document.created_at.date() if document.created_at else None,
+        'amount': None,
+    }
+
+
+# Entry type -> source model, related objects the builder reads, and builder
+SEARCH_SOURCES = {
+    'invoice': {'model': 'invoicing.Invoice', 'select_related': ('customer',), 'build': _invoice},
+    'bank_transaction': {'model': 'banking.BankTransaction', 'select_related': (), 'build': _bank_transaction},
+    'customer': {'model': 'sales.Customer', 'select_related': (), 'build': _counterparty},
+    'supplier': {'model': 'purchase.Supplier', 'select_related': (), 'build': _counterparty},
+    'account': {'model': 'accounting.ChartOfAccounts', 'select_related': (), 'build': _account},
+    'document': {'model': 'ai_processing.Document', 'select_related': (), 'build': _document},
+}
+
+
+def search_terms(query: str) -> List[str]:
+    """Lowercased word terms of a query (operators and punctuation dropped)"""
+    return TERM_PATTERN.findall((query or '').lower())[:MAX_TERMS]
+
+
+class SearchIndexService:
+    """Writes and queries SearchEntry rows"""
+
+    BATCH_SIZE = 1000
+
+    @staticmethod
+    def entry_type_for(model) -> Optional[str]:
+        """Entry type indexing a model, or None"""
+        label = model._meta.label
+        for entry_type, source in SEARCH_SOURCES.items():
+            if source['model'] == label:
+                return entry_type
+        return None
+
+    @staticmethod
+    def source_model(entry_type: str):
+        return apps.get_model(SEARCH_SOURCES[entry_type]['model'])
+
+    @classmethod
+    def index(cls, entry_type: str, objects: Iterable) -> Dict[str, int]:
+        """
+        Write the entries of objects of one type
+
+        Objects that are no longer searchable lose their entry.
+
+        Returns:
+            dict with 'indexed' and 'removed' counts
+        """
+        from .models import SearchEntry
+
+        build = SEARCH_SOURCES[entry_type]['build']
+        entries = []
+        removed = []
+        for obj in objects:
+            values = build(obj)
+            if values is None:
+                removed.append(str(obj.pk))
+                continue
+            for name in ('title', 'subtitle', 'body'):
+                values[name] = str(values[name] or '')
+            values['title'] = values['title'][:255]
+            values['subtitle'] = values['subtitle'][:255]
+            values['search_text'] = _join(values['title'], values['subtitle'], values['body']).lower()
+            entries.append(SearchEntry(
+                tenant_id=obj.tenant_id, entry_type=entry_type, object_id=str(obj.pk), **values
+            ))
+
+        with transaction.atomic():
+            if entries:
+                SearchEntry.objects.bulk_create(
+                    entries,
+                    batch_size=cls.BATCH_SIZE,
+                    update_conflicts=True,
+                    unique_fields=['entry_type', 'object_id'],
+                    update_fields=ENTRY_FIELDS + ['updated_at'],
+                )
+            if removed:
+                cls.remove(entry_type, removed)
+        return {'indexed': len(entries), 'removed': len(removed)}
+
+    @staticmethod
+    def remove(entry_type: str, object_ids: Iterable) -> int:
+        """Delete the entries of objects"""
+        from .models import SearchEntry
+
+        return SearchEntry.objects.filter(
+            entry_type=entry_type, object_id__in=[str(object_id) for object_id in object_ids]
+        ).delete()[0]
+
+    @classmethod
+    def reindex_queryset(cls, entry_type: str, queryset) -> Dict[str, int]:
+        """Index every object of a queryset in batches"""
+        related = SEARCH_SOURCES[entry_type]['select_related']
+        if related:
+            queryset = queryset.select_related(*related)
+        counts = {'indexed': 0, 'removed': 0}
+        batch = []
+        for obj in queryset.order_by('pk').iterator(chunk_size=cls.BATCH_SIZE):
+            batch.append(obj)
+            if len(batch) >= cls.BATCH_SIZE:
+                for key, value in cls.index(entry_type, batch).items():
+                    counts[key] += value
+                batch = []
+        if batch:
+            for key, value in cls.index(entry_type, batch).items():
+                counts[key] += value
+        return counts
+
+    @classmethod
+    def rebuild(cls, tenant, entry_types: Iterable[str] = None) -> Dict[str, int]:
+        """
+        Rebuild a tenant's entries from the source tables
+
+        Returns:
+            dict of entry type -> entries indexed
+        """
+        from .models import SearchEntry
+
+        counts = {}
+        for entry_type in entry_types or SEARCH_SOURCES:
+            with transaction.atomic():
+                SearchEntry.objects.filter(tenant=tenant, entry_type=entry_type).delete()
+                model = cls.source_model(entry_type)
+                counts[entry_type] = cls.reindex_queryset(entry_type, model.objects.filter(tenant=tenant))['indexed']
+        logger.info(f"Rebuilt search index for tenant {tenant.id}: {counts}")
+        return counts
+
+    @staticmethod
+    def search(tenant, query: str, entry_types: Iterable[str] = None):
+        """
+        Entries of a tenant matching every term of a query, best first
+
+        Terms match word prefixes, so 'inv 10' finds 'INV-1001'. Results
+        carry a `rank` annotation (1.0 on databases without full-text search).
+
+        Args:
+            tenant: Tenant instance
+            query: Free text
+            entry_types: Restrict to these entry types
+
+        Returns:
+            SearchEntry queryset (empty when the query has no terms)
+        """
+        from .models import SearchEntry
+
+        entries = SearchEntry.objects.filter(tenant=tenant)
+        if entry_types:
+            entries = entries.filter(entry_type__in=list(entry_types))
+        terms = search_terms(query)
+        if not terms:
+            return entries.none()
+
+        if connections[entries.db].vendor == 'postgresql':
+            # Terms are \w+ only, so the raw tsquery cannot contain operators
+            tsquery = SearchQuery(' & '.join(f"{term}:*" for term in terms), search_type='raw', config='simple')
+            return entries.filter(search_vector=tsquery).annotate(
+                rank=SearchRank(F('search_vector'), tsquery)
+            ).order_by('-rank', '-date', 'pk')
+
+        for term in terms:
+            entries = entries.filter(search_text__contains=term)
+        return entries.annotate(rank=Value(1.0, output_field=FloatField())).order_by('-date', 'pk')
+
+    @classmethod
+    def find(cls, tenant, query: str, entry_type: str, queryset, limit=None) -> List:
+        """
+        Source objects of one type matching a query, best first
+
+        Args:
+            queryset: Source queryset the results must also belong to
+                (carries the caller's filters and select_related)
+            limit: Maximum objects returned (e.g. a raw ?limit= value;
+                defaults to 50, capped at 200)
+
+        Returns:
+            List of model instances
+        """
+        try:
+            limit = min(max(int(limit), 1), MAX_FIND_LIMIT) if limit not in (None, '') else DEFAULT_FIND_LIMIT
+        except (TypeError, ValueError):
+            limit = DEFAULT_FIND_LIMIT
+        object_ids = list(cls.search(tenant, query, [entry_type]).values_list('object_id', flat=True)[:limit])
+        if not object_ids:
+            return []
+        objects = {str(obj.pk): obj for obj in queryset.filter(pk__in=object_ids)}
+        return [objects[object_id] for object_id in object_ids if object_id in objects]
@@ -0,0 +1,37 @@
+"""
+Management command to rebuild the search index
+Usage: python manage.py rebuild_search_index [--tenant <slug>] [--type invoice --type customer]
+
+Run after migrating and after imports that bypass model signals.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from search.indexing import SEARCH_SOURCES, SearchIndexService
+from tenants.models import Tenant
+
+
+class Command(BaseCommand):
+    help = 'Rebuild search entries from invoices, transactions, customers, suppliers, accounts and documents'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', type=str, help='Tenant slug (defaults to all active tenants)')
+        parser.add_argument(
+            '--type', action='append', choices=list(SEARCH_SOURCES), dest='types',
+            help='Entry type to rebuild (repeatable; defaults to all)'
+        )
+
+    def handle(self, *args, **options):
+        tenants = Tenant.objects.filter(is_active=True)
+        if options.get('tenant'):
+            tenants = Tenant.objects.filter(slug=options['tenant'])
+            if not tenants.exists():
+                raise CommandError(f"Tenant '{options['tenant']}' not found")
+
+        for tenant in tenants:
+            started = time.time()
+            counts = SearchIndexService.rebuild(tenant, options.get('types'))
+            summary = ', '.join(f"{count:,} {entry_type}" for entry_type, count in counts.items())
+            self.stdout.write(f"{tenant.slug}: {summary} in {time.time() - started:.1f}s")
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt'))
@@ -0,0 +1,54 @@
+from django.db import migrations, transaction
+
+VECTOR_FUNCTION = """
+CREATE OR REPLACE FUNCTION search_entries_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(NEW.subtitle, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(NEW.body, '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS search_entries_vector_update ON search_entries;
+CREATE TRIGGER search_entries_vector_update
+    BEFORE INSERT OR UPDATE OF title, subtitle, body ON search_entries
+    FOR EACH ROW EXECUTE FUNCTION search_entries_vector();
+"""
+
+
+def create_search_vector(apps, schema_editor):
+    """Maintain search_vector with a trigger and index it (PostgreSQL only)"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(VECTOR_FUNCTION)
+    # btree_gin lets one GIN index serve the tenant filter and the tsquery
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            schema_editor.execute('CREATE EXTENSION IF NOT EXISTS btree_gin')
+        index_columns = 'tenant_id, search_vector'
+    except Exception:
+        index_columns = 'search_vector'
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS search_entries_vector_gin ON search_entries USING gin ({index_columns})'
+    )
+
+
+def drop_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS search_entries_vector_gin')
+    schema_editor.execute('DROP TRIGGER IF EXISTS search_entries_vector_update ON search_entries')
+    schema_editor.execute('DROP FUNCTION IF EXISTS search_entries_vector()')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_vector, drop_search_vector),
+    ]
@@ -0,0 +1,56 @@
+from django.db import migrations
+
+# Index the same \w+ words search_terms() queries. The 'simple' parser keeps
+# 'INV-1001' as 'inv' and '-1001', and an email as one token, so prefix
+# terms like 'inv 1001' or 'example' would not match them.
+WORD_TOKENS_FUNCTION = r"""
+CREATE OR REPLACE FUNCTION search_entries_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', regexp_replace(lower(coalesce(NEW.title, '')), '\W+', ' ', 'g')), 'A') ||
+        setweight(to_tsvector('simple', regexp_replace(lower(coalesce(NEW.subtitle, '')), '\W+', ' ', 'g')), 'B') ||
+        setweight(to_tsvector('simple', regexp_replace(lower(coalesce(NEW.body, '')), '\W+', ' ', 'g')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+PARSER_TOKENS_FUNCTION = """
+CREATE OR REPLACE FUNCTION search_entries_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(NEW.subtitle, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(NEW.body, '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+# Setting title fires the trigger (UPDATE OF title, subtitle, body) on every row
+REVECTORIZE = 'UPDATE search_entries SET title = title'
+
+
+def use_word_tokens(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(WORD_TOKENS_FUNCTION)
+    schema_editor.execute(REVECTORIZE)
+
+
+def use_parser_tokens(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(PARSER_TOKENS_FUNCTION)
+    schema_editor.execute(REVECTORIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0002_search_vector_trigger'),
+    ]
+
+    operations = [
+        migrations.RunPython(use_word_tokens, use_parser_tokens),
+    ]
@@ -0,0 +1,39 @@
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models
+
+
+class SearchEntry(models.Model):
+    """
+    Search Entry model holding one searchable record of another model
+
+    Rows are written by search.indexing.SearchIndexService whenever the
+    source object changes. On PostgreSQL a trigger fills search_vector from
+    title (weight A), subtitle (B) and body (C), and a GIN index on
+    (tenant, search_vector) serves ranked and prefix queries; other
+    databases match terms against search_text.
+    """
+    tenant = models.ForeignKey('tenants.Tenant', on_delete=models.CASCADE, related_name='search_entries')
+    entry_type = models.CharField(max_length=30)  # Key of search.indexing.SEARCH_SOURCES
+    object_id = models.CharField(max_length=64)
+    title = models.CharField(max_length=255)
+    subtitle = models.CharField(max_length=255, blank=True)
+    body = models.TextField(blank=True)
+    search_text = models.TextField(blank=True)  # Lowercased title, subtitle and body
+    search_vector = SearchVectorField(null=True, editable=False)
+    date = models.DateField(null=True, blank=True)
+    amount = models.DecimalField(max_digits=18, decimal_places=2, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'search_entries'
+        verbose_name = 'Search Entry'
+        verbose_name_plural = 'Search Entries'
+        constraints = [
+            models.UniqueConstraint(fields=['entry_type', 'object_id'], name='uniq_search_entry_object'),
+        ]
+        indexes = [
+            models.Index(fields=['tenant', 'entry_type', '-date']),
+        ]
+
+    def __str__(self):
+        return f"{self.entry_type}: {self.title}"
@@ -0,0 +1,25 @@
+from rest_framework import serializers
+from .models import SearchEntry
+
+
+class SearchEntrySerializer(serializers.ModelSerializer):
+    """Serializer for Search Entry results"""
+    type = serializers.CharField(source='entry_type', read_only=True)
+    id = serializers.CharField(source='object_id', read_only=True)
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = SearchEntry
+        fields = ['type', 'id', 'title', 'subtitle', 'date', 'amount', 'rank']
+        read_only_fields = fields
+
+
+class SearchSuggestionSerializer(serializers.ModelSerializer):
+    """Serializer for typeahead suggestions"""
+    type = serializers.CharField(source='entry_type', read_only=True)
+    id = serializers.CharField(source='object_id', read_only=True)
+
+    class Meta:
+        model = SearchEntry
+        fields = ['type', 'id', 'title', 'subtitle']
+        read_only_fields = fields
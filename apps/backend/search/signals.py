@@ -0,0 +1,43 @@
+"""
+Search Signals
+Keep search entries in step with the objects they index
+"""
+from django.apps import apps
+from django.db.models.signals import post_save, post_delete, pre_save
+from .indexing import SEARCH_SOURCES, SearchIndexService
+
+
+def remember_customer_name(sender, instance, update_fields=None, **kwargs):
+    """Read the stored name before a customer changes (invoice entries carry it)"""
+    instance._indexed_name_before = None
+    if update_fields is not None and 'name' not in update_fields:
+        instance._indexed_name_before = instance.name
+    elif not instance._state.adding:
+        instance._indexed_name_before = sender.objects.filter(pk=instance.pk).values_list('name', flat=True).first()
+
+
+def index_instance(sender, instance, created=False, **kwargs):
+    """Write (or drop) the saved object's entry"""
+    entry_type = SearchIndexService.entry_type_for(sender)
+    SearchIndexService.index(entry_type, [instance])
+    if entry_type == 'customer' and not created and getattr(instance, '_indexed_name_before', None) != instance.name:
+        # Invoice entries carry the customer name
+        Invoice = SearchIndexService.source_model('invoice')
+        SearchIndexService.reindex_queryset('invoice', Invoice.objects.filter(customer_id=instance.pk))
+
+
+def remove_instance(sender, instance, **kwargs):
+    """Drop the deleted object's entry"""
+    SearchIndexService.remove(SearchIndexService.entry_type_for(sender), [instance.pk])
+
+
+for source in SEARCH_SOURCES.values():
+    model = apps.get_model(source['model'])
+    post_save.connect(index_instance, sender=model, dispatch_uid=f"search_index_{model._meta.label_lower}")
+    post_delete.connect(remove_instance, sender=model, dispatch_uid=f"search_remove_{model._meta.label_lower}")
+
+pre_save.connect(
+    remember_customer_name,
+    sender=SearchIndexService.source_model('customer'),
+    dispatch_uid='search_remember_customer_name',
+)
@@ -0,0 +1,125 @@
+from datetime import date
+from decimal import Decimal
+
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from authentication.models import User
+from invoicing.models import Invoice
+from sales.models import Customer
+from tenants.models import Company, Tenant
+from .indexing import SearchIndexService
+from .models import SearchEntry
+
+
+class SearchIndexTest(TestCase):
+    """Test the tenant-scoped search index and endpoints"""
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(
+            name='Search Tenant',
+            slug='search_tenant',
+            is_active=True
+        )
+        self.other_tenant = Tenant.objects.create(
+            name='Other Tenant',
+            slug='other_search_tenant',
+            is_active=True
+        )
+        self.company = Company.objects.create(
+            tenant=self.tenant,
+            name='Search Company',
+            registration_number='123456789'
+        )
+        self.user = User.objects.create_user(
+            username='searcher',
+            email='searcher@example.com',
+            password='testpass123',
+            tenant=self.tenant,
+            role='accountant'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _customer(self, name, tenant=None):
+        tenant = tenant or self.tenant
+        company = self.company if tenant == self.tenant else Company.objects.create(
+            tenant=tenant, name='Other Company', registration_number='987654321'
+        )
+        return Customer.objects.create(
+            tenant=tenant, company=company, name=name, email=f"{name.split()[0].lower()}@example.com",
+            created_by=self.user
+        )
+
+    def test_entries_follow_saves_and_search_is_tenant_scoped(self):
+        """Test signals keep entries current and /search/ matches word prefixes"""
+        acme = self._customer('Acme Hosting')
+        self._customer('Acme Elsewhere', tenant=self.other_tenant)
+        Invoice.objects.create(
+            tenant=self.tenant, company=self.company, invoice_number='INV-1001', customer=acme,
+            invoice_date=date(2024, 3, 1), due_date=date(2024, 3, 31), total_amount=Decimal('120.00'),
+            created_by=self.user
+        )
+
+        response = self.client.get('/api/v1/search/', {'q': 'acm'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual({row['type'] for row in response.data['results']}, {'customer', 'invoice'})
+
+        response = self.client.get('/api/v1/search/', {'q': 'inv 1001', 'type': 'invoice'})
+        self.assertEqual([row['title'] for row in response.data['results']], ['INV-1001'])
+
+        # Renaming the customer re-indexes its invoices; deactivating drops its entry
+        acme.name = 'Globex Hosting'
+        acme.save()
+        self.assertEqual(SearchEntry.objects.get(entry_type='invoice').subtitle, 'Globex Hosting')
+        # Saves that keep the name leave invoice entries alone
+        SearchEntry.objects.filter(entry_type='invoice').update(subtitle='untouched')
+        acme.email = 'billing@globex.example.com'
+        acme.save()
+        self.assertEqual(SearchEntry.objects.get(entry_type='invoice').subtitle, 'untouched')
+        acme.is_active = False
+        acme.save()
+        self.assertFalse(SearchEntry.objects.filter(entry_type='customer', object_id=str(acme.pk)).exists())
+
+        self.assertEqual(self.client.get('/api/v1/search/', {'q': ' '}).status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/search/', {'q': 'x', 'type': 'nope'}).status_code, 400)
+
+    def test_module_search_and_suggestions_read_the_index(self):
+        """Test per-module search and typeahead are served from search entries"""
+        for name in ('Wayne Freight', 'Wayne Travel', 'Stark Supplies'):
+            self._customer(name)
+        SearchEntry.objects.filter(tenant=self.tenant, title='Wayne Travel').delete()
+
+        response = self.client.get('/api/v1/sales/customers/search/', {'q': 'wayne'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['name'] for row in response.data], ['Wayne Freight'])
+
+        response = self.client.get('/api/v1/search/suggest/', {'q': 'sta', 'limit': 5})
+        self.assertEqual([row['title'] for row in response.data], ['Stark Supplies'])
+
+        counts = SearchIndexService.rebuild(self.tenant, ['customer'])
+        self.assertEqual(counts, {'customer': 3})
+        self.assertEqual(len(SearchIndexService.find(self.tenant, 'wayne', 'customer', Customer.objects.all())), 2)
+
+    @skipUnless(connection.vendor == 'postgresql', 'search_vector is maintained on PostgreSQL only')
+    def test_postgres_vector_matches_word_prefixes(self):
+        """Test invoice numbers and emails are found through the tsvector index"""
+        acme = self._customer('Acme Hosting')
+        Invoice.objects.create(
+            tenant=self.tenant, company=self.company, invoice_number='INV-1001', customer=acme,
+            invoice_date=date(2024, 3, 1), due_date=date(2024, 3, 31), total_amount=Decimal('120.00'),
+            created_by=self.user
+        )
+
+        def titles(query, entry_type):
+            return [entry.title for entry in SearchIndexService.search(self.tenant, query, [entry_type])]
+
+        for query in ('inv 10', 'INV-1001', '1001'):
+            self.assertEqual(titles(query, 'invoice'), ['INV-1001'], query)
+        for query in ('acme@example.com', 'example', 'acme exam'):
+            self.assertEqual(titles(query, 'customer'), ['Acme Hosting'], query)
+        self.assertEqual(titles('inv 2002', 'invoice'), [])
@@ -0,0 +1,95 @@
+from django.conf import settings
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+
+from authentication.permissions import IsAccountant
+from backend.tenant_utils import get_request_tenant
+from .indexing import SEARCH_SOURCES, SearchIndexService
+from .serializers import SearchEntrySerializer, SearchSuggestionSerializer
+
+# Most suggestions returned by /search/suggest/
+MAX_SUGGESTIONS = 20
+
+
+class SearchPagination(PageNumberPagination):
+    page_size_query_param = 'page_size'
+
+    def __init__(self):
+        self.page_size = getattr(settings, 'SEARCH_PAGE_SIZE', 20)
+        self.max_page_size = getattr(settings, 'SEARCH_MAX_PAGE_SIZE', 100)
+
+
+def _entry_types(request):
+    """Entry types from ?type=invoice,customer (all when absent)"""
+    raw = request.query_params.get('type', '')
+    entry_types = [value.strip() for value in raw.split(',') if value.strip()]
+    unknown = [value for value in entry_types if value not in SEARCH_SOURCES]
+    if unknown:
+        raise ValueError(f"Unknown type: {', '.join(unknown)}. Use one of: {', '.join(SEARCH_SOURCES)}")
+    return entry_types
+
+
+@api_view(['GET'])
+@permission_classes([IsAccountant])
+def search(request):
+    """
+    Ranked search across invoices, bank transactions, customers, suppliers,
+    accounts and documents
+
+    Query params: q (required), type (comma separated), page, page_size
+    """
+    tenant = get_request_tenant(request)
+    if not tenant:
+        return Response(
+            {'error': 'Tenant context required'},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+
+    query = request.query_params.get('q', '')
+    if not query.strip():
+        return Response(
+            {'error': 'Search query is required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    try:
+        entry_types = _entry_types(request)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    entries = SearchIndexService.search(tenant, query, entry_types)
+    paginator = SearchPagination()
+    page = paginator.paginate_queryset(entries, request)
+    serializer = SearchEntrySerializer(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAccountant])
+def suggest(request):
+    """
+    Typeahead suggestions: best matches for a partial query
+
+    Query params: q, type (comma separated), limit (default 8, max 20)
+    """
+    tenant = get_request_tenant(request)
+    if not tenant:
+        return Response(
+            {'error': 'Tenant context required'},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+
+    try:
+        entry_types = _entry_types(request)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        limit = min(max(int(request.query_params.get('limit', 8)), 1), MAX_SUGGESTIONS)
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+    entries = SearchIndexService.search(tenant, request.query_params.get('q', ''), entry_types).only(
+        'entry_type', 'object_id', 'title', 'subtitle'
+    )[:limit]
+    return Response(SearchSuggestionSerializer(entries, many=True).data)
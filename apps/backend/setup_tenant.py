@@ -14,6 +14,7 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 django.setup()
 
 from tenants.models import Tenant, Domain
+from tenants.template_cloning import TenantTemplateService
 
 def setup_tenant():
     """Set up the initial tenant and domain"""
@@ -88,5 +89,12 @@ def setup_tenant():
     print("   - http://localhost:8000/ (public schema)")
     print("   - http://tenant.localhost:8000/ (tenant schema)")
 
+def setup_tenant_templates(countries=('MY', 'SG')):
+    """Build the template tenants new tenants' presets are cloned from"""
+    for country_code in countries:
+        template, counts = TenantTemplateService.build_template(country_code)
+        print(f"✅ Built tenant template {template.slug} ({counts['chart_of_accounts']} accounts)")
+
 if __name__ == '__main__':
     setup_tenant()
+    setup_tenant_templates()
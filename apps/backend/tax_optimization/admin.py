@@ -3,7 +3,7 @@ Tax Optimization Admin Configuration
 """
 from django.contrib import admin
 from .models import (
-    TaxEvent, TaxOptimizationStrategy, TaxYearSummary,
+    TaxEvent, TaxEventAggregate, TaxOptimizationStrategy, TaxYearSummary,
     TaxAlert, TaxSettings
 )
 
@@ -17,6 +17,13 @@ class TaxEventAdmin(admin.ModelAdmin):
     date_hierarchy = 'event_date'
 
 
+@admin.register(TaxEventAggregate)
+class TaxEventAggregateAdmin(admin.ModelAdmin):
+    list_display = ['tenant', 'tax_year', 'event_type', 'realized', 'event_count', 'positive_amount', 'negative_amount']
+    list_filter = ['tax_year', 'event_type', 'realized']
+    readonly_fields = [field.name for field in TaxEventAggregate._meta.fields]
+
+
 @admin.register(TaxOptimizationStrategy)
 class TaxOptimizationStrategyAdmin(admin.ModelAdmin):
     list_display = ['title', 'strategy_type', 'priority', 'status', 'tax_year', 'potential_savings', 'created_by']
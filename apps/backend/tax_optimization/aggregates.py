@@ -0,0 +1,237 @@
+"""
+Tax Event Aggregates
+Running totals of tax events per (tenant, tax year, event type, realized).
+
+Every event contributes a count, its amount (as a positive or negative
+part), its applied offset and, for losses, its remaining offset. Signals
+apply the difference between an event's contribution before and after each
+save or delete as F() increments, so concurrent writers never lose an
+update; bulk inserts apply one increment per touched aggregate row. Year
+summaries, offset alerts and stats then read the handful of rows for a
+year instead of scanning its events. reconcile() recomputes the totals from
+the raw events with one grouped query and reports (or repairs) drift.
+"""
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, DecimalField, F, Q, Sum, Value, When
+from django.db.models.functions import Abs
+from django.utils import timezone
+import logging
+
+from .models import TaxEvent, TaxEventAggregate
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal('0')
+CENT = Decimal('0.01')
+AMOUNT_FIELD = DecimalField(max_digits=20, decimal_places=2)
+
+EVENT_TYPES = tuple(value for value, _ in TaxEvent._meta.get_field('event_type').choices)
+GAIN_TYPES = tuple(value for value in EVENT_TYPES if 'gain' in value)
+LOSS_TYPES = tuple(value for value in EVENT_TYPES if 'loss' in value)
+PROFIT_TYPES = ('profit', 'capital_gain', 'crypto_gain', 'fiat_gain', 'dividend', 'interest')
+
+# Event columns a contribution is computed from
+EVENT_FIELDS = ('tenant_id', 'tax_year', 'event_type', 'realized', 'amount', 'offset_applied', 'offset_amount')
+TOTAL_FIELDS = ('event_count', 'positive_amount', 'negative_amount', 'offset_amount', 'remaining_offset')
+
+
+def _key(values: Dict) -> Tuple:
+    return (values['tenant_id'], values['tax_year'], values['event_type'], bool(values['realized']))
+
+
+def _contribution(values: Dict) -> Dict:
+    """What one event adds to its aggregate row"""
+    # As stored: unsaved values may be floats or carry more than two places
+    amount = Decimal(str(values['amount'] or 0)).quantize(CENT)
+    offset = Decimal(str(values['offset_amount'] or 0)).quantize(CENT)
+    remaining = ZERO
+    if values['event_type'] in LOSS_TYPES and (not values['offset_applied'] or offset < abs(amount)):
+        remaining = abs(amount) - offset  # TaxEvent.remaining_offset_amount()
+    return {
+        'event_count': 1,
+        'positive_amount': amount if amount > 0 else ZERO,
+        'negative_amount': amount if amount < 0 else ZERO,
+        'offset_amount': offset if values['offset_applied'] else ZERO,
+        'remaining_offset': remaining,
+    }
+
+
+def event_values(event: TaxEvent) -> Dict:
+    """The columns of an event a contribution is computed from"""
+    return {field: getattr(event, field) for field in EVENT_FIELDS}
+
+
+class TaxYearTotals:
+    """A tenant's aggregate rows for one tax year"""
+
+    def __init__(self, rows: Iterable[Dict]):
+        self.rows = list(rows)
+
+    def sum(self, field: str, types: Optional[Iterable[str]] = None, realized: Optional[bool] = None):
+        """
+        Total of one aggregate column
+
+        Args:
+            field: One of TOTAL_FIELDS
+            types: Event types to include (default: all)
+            realized: Only realized (True) or unrealized (False) events
+        """
+        types = set(types) if types is not None else None
+        return sum(
+            (row[field] for row in self.rows
+             if (types is None or row['event_type'] in types) and (realized is None or row['realized'] == realized)),
+            0 if field == 'event_count' else ZERO
+        )
+
+    @property
+    def event_count(self) -> int:
+        return self.sum('event_count')
+
+    @property
+    def gains(self) -> Decimal:
+        """Net amount of gain events"""
+        return self.sum('positive_amount', GAIN_TYPES) + self.sum('negative_amount', GAIN_TYPES)
+
+    @property
+    def losses(self) -> Decimal:
+        """Net amount of loss events, as a positive number"""
+        return abs(self.sum('positive_amount', LOSS_TYPES) + self.sum('negative_amount', LOSS_TYPES))
+
+    @property
+    def offset_available(self) -> Decimal:
+        """Loss still available to offset gains"""
+        return self.sum('remaining_offset', LOSS_TYPES)
+
+
+class TaxAggregateService:
+    """Maintains and reads TaxEventAggregate rows"""
+
+    @staticmethod
+    def totals(tenant_id, tax_year: int) -> TaxYearTotals:
+        """A tax year's totals, in one query over at most two rows per event type"""
+        return TaxYearTotals(TaxEventAggregate.objects.filter(tenant_id=tenant_id, tax_year=tax_year).values(
+            'event_type', 'realized', *TOTAL_FIELDS
+        ))
+
+    @classmethod
+    def apply_change(cls, before: Optional[Dict], after: Optional[Dict]):
+        """
+        Move one event's contribution
+
+        Args:
+            before: The event's EVENT_FIELDS values before the change (None when created)
+            after: Its values after the change (None when deleted)
+        """
+        deltas: Dict[Tuple, Dict] = {}
+        for values, sign in ((before, -1), (after, 1)):
+            if values is not None:
+                cls._accumulate(deltas, _key(values), _contribution(values), sign)
+        cls._apply(deltas)
+
+    @classmethod
+    def add_events(cls, events: Iterable[TaxEvent]):
+        """Add the contributions of bulk-inserted events, one increment per aggregate row"""
+        deltas: Dict[Tuple, Dict] = {}
+        for event in events:
+            values = event_values(event)
+            cls._accumulate(deltas, _key(values), _contribution(values), 1)
+        cls._apply(deltas)
+
+    @staticmethod
+    def _accumulate(deltas: Dict, key: Tuple, contribution: Dict, sign: int):
+        delta = deltas.setdefault(key, dict.fromkeys(TOTAL_FIELDS, 0))
+        for field, value in contribution.items():
+            delta[field] += sign * value
+
+    @staticmethod
+    def _apply(deltas: Dict[Tuple, Dict]):
+        with transaction.atomic():
+            for (tenant_id, tax_year, event_type, realized), delta in deltas.items():
+                if not any(delta.values()):
+                    continue
+                rows = TaxEventAggregate.objects.filter(
+                    tenant_id=tenant_id, tax_year=tax_year, event_type=event_type, realized=realized
+                )
+                increments = {field: F(field) + value for field, value in delta.items()}
+                if rows.update(updated_at=timezone.now(), **increments):
+                    continue
+                try:
+                    with transaction.atomic():
+                        TaxEventAggregate.objects.create(
+                            tenant_id=tenant_id, tax_year=tax_year, event_type=event_type, realized=realized, **delta
+                        )
+                except IntegrityError:
+                    # Created concurrently since the update
+                    rows.update(updated_at=timezone.now(), **increments)
+
+    @staticmethod
+    def compute(tenant_id) -> Dict[Tuple, Dict]:
+        """A tenant's aggregates recomputed from its raw events, in one grouped query"""
+        remaining = Case(
+            When(Q(offset_applied=True) & Q(offset_amount__gte=Abs('amount')), then=Value(ZERO)),
+            default=Abs('amount') - F('offset_amount'),
+            output_field=AMOUNT_FIELD,
+        )
+        rows = TaxEvent.objects.filter(tenant_id=tenant_id).values(
+            'tenant_id', 'tax_year', 'event_type', 'realized'
+        ).annotate(
+            event_count=Count('id'),
+            positive_amount=Sum('amount', filter=Q(amount__gt=0)),
+            negative_amount=Sum('amount', filter=Q(amount__lt=0)),
+            offset_sum=Sum('offset_amount', filter=Q(offset_applied=True)),
+            remaining_offset=Sum(remaining, filter=Q(event_type__in=LOSS_TYPES)),
+        ).order_by()
+        return {
+            _key(row): {
+                'event_count': row['event_count'],
+                'positive_amount': row['positive_amount'] or ZERO,
+                'negative_amount': row['negative_amount'] or ZERO,
+                'offset_amount': row['offset_sum'] or ZERO,
+                'remaining_offset': row['remaining_offset'] or ZERO,
+            }
+            for row in rows
+        }
+
+    @classmethod
+    def reconcile(cls, tenant, fix: bool = False) -> List[Dict]:
+        """
+        Compare a tenant's aggregates with its raw events
+
+        Args:
+            tenant: Tenant to verify
+            fix: Replace the tenant's aggregates with the recomputed ones
+
+        Returns:
+            list: One dict per (tax_year, event_type, realized) that differs,
+            with the stored and expected totals
+        """
+        with transaction.atomic():
+            expected = cls.compute(tenant.id)
+            stored = {
+                _key(row): {field: row[field] for field in TOTAL_FIELDS}
+                for row in TaxEventAggregate.objects.select_for_update().filter(tenant=tenant).values(
+                    'tenant_id', 'tax_year', 'event_type', 'realized', *TOTAL_FIELDS
+                )
+            }
+            empty = dict.fromkeys(TOTAL_FIELDS, 0)
+            mismatches = []
+            for key in sorted(set(expected) | set(stored), key=lambda key: (key[1], key[2], key[3])):
+                want, have = expected.get(key, empty), stored.get(key, empty)
+                if any(want[field] != have[field] for field in TOTAL_FIELDS):
+                    mismatches.append({
+                        'tax_year': key[1], 'event_type': key[2], 'realized': key[3],
+                        'stored': have, 'expected': want,
+                    })
+
+            if fix and mismatches:
+                TaxEventAggregate.objects.filter(tenant=tenant).delete()
+                TaxEventAggregate.objects.bulk_create([
+                    TaxEventAggregate(
+                        tenant_id=tenant_id, tax_year=tax_year, event_type=event_type, realized=realized, **values
+                    )
+                    for (tenant_id, tax_year, event_type, realized), values in expected.items()
+                ])
+                logger.warning(f"Repaired {len(mismatches)} tax event aggregates of tenant {tenant.id}")
+        return mismatches
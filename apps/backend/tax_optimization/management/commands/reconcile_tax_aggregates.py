@@ -0,0 +1,43 @@
+"""
+Management command to verify maintained tax event aggregates against the raw events
+Usage: python manage.py reconcile_tax_aggregates [--tenant <slug>] [--fix]
+
+Run after bulk imports or direct SQL that bypass model signals. Exits with
+an error when drift is found and --fix was not given.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from tax_optimization.aggregates import TaxAggregateService
+from tenants.models import Tenant
+
+
+class Command(BaseCommand):
+    help = 'Compare per-year tax event aggregates with the events they summarize (and optionally repair them)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', type=str, help='Tenant slug (defaults to all active tenants)')
+        parser.add_argument('--fix', action='store_true', help='Rebuild the aggregates of tenants that drifted')
+
+    def handle(self, *args, **options):
+        tenants = Tenant.objects.filter(is_active=True)
+        if options.get('tenant'):
+            tenants = Tenant.objects.filter(slug=options['tenant'])
+            if not tenants.exists():
+                raise CommandError(f"Tenant '{options['tenant']}' not found")
+
+        drifted = 0
+        for tenant in tenants:
+            mismatches = TaxAggregateService.reconcile(tenant, fix=options['fix'])
+            for mismatch in mismatches:
+                self.stdout.write(
+                    f"{tenant.slug} {mismatch['tax_year']} {mismatch['event_type']} "
+                    f"({'realized' if mismatch['realized'] else 'unrealized'}): "
+                    f"stored {mismatch['stored']}, expected {mismatch['expected']}"
+                )
+            drifted += bool(mismatches)
+
+        if drifted and not options['fix']:
+            raise CommandError(f"{drifted} tenant(s) have drifted tax event aggregates (re-run with --fix)")
+        self.stdout.write(self.style.SUCCESS(
+            f"Tax event aggregates {'repaired' if drifted else 'match'} ({drifted} tenant(s) drifted)"
+        ))
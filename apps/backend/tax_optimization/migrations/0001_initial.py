@@ -0,0 +1,184 @@
+# Generated by Django 4.2 on 2026-10-19 15:29
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('tenants', '0004_tenantonboardingprogress_preset_progress'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaxEvent',
+            fields=[
+                ('transaction_currency', models.CharField(blank=True, help_text='Currency code for this transaction (e.g., USD, MYR)', max_length=3, null=True)),
+                ('exchange_rate', models.DecimalField(blank=True, decimal_places=8, help_text='Exchange rate used for conversion (from transaction_currency to base_currency)', max_digits=18, null=True)),
+                ('converted_amount_in_base_currency', models.DecimalField(blank=True, decimal_places=2, help_text='Amount converted to tenant base currency', max_digits=18, null=True)),
+                ('exchange_rate_date', models.DateTimeField(blank=True, help_text='Date/time when exchange rate was applied', null=True)),
+                ('data_classification', models.CharField(choices=[('public', 'Public'), ('internal', 'Internal'), ('confidential', 'Confidential'), ('restricted', 'Restricted'), ('top_secret', 'Top Secret')], default='confidential', help_text='Data classification level', max_length=20)),
+                ('requires_audit', models.BooleanField(default=True)),
+                ('retention_period_days', models.PositiveIntegerField(default=2555)),
+                ('is_sensitive', models.BooleanField(default=True)),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('event_type', models.CharField(choices=[('profit', 'Profit'), ('loss', 'Loss'), ('capital_gain', 'Capital Gain'), ('capital_loss', 'Capital Loss'), ('dividend', 'Dividend'), ('interest', 'Interest Income'), ('crypto_gain', 'Crypto Gain'), ('crypto_loss', 'Crypto Loss'), ('fiat_gain', 'Fiat Gain'), ('fiat_loss', 'Fiat Loss')], max_length=50)),
+                ('source_type', models.CharField(choices=[('fiat', 'Fiat Transaction'), ('crypto', 'Crypto Transaction'), ('investment', 'Investment'), ('sale', 'Sale'), ('purchase', 'Purchase'), ('income', 'Income'), ('expense', 'Expense')], max_length=50)),
+                ('source_id', models.UUIDField(blank=True, help_text='ID of the source transaction/document', null=True)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=20)),
+                ('currency', models.CharField(default='USD', max_length=3)),
+                ('tax_year', models.IntegerField(help_text='Tax year this event applies to')),
+                ('event_date', models.DateField()),
+                ('realized', models.BooleanField(default=False, help_text='Whether the gain/loss is realized')),
+                ('offset_applied', models.BooleanField(default=False, help_text='Whether this has been used to offset other gains')),
+                ('offset_amount', models.DecimalField(decimal_places=2, default=0, help_text='Amount used for offsetting', max_digits=20)),
+                ('description', models.TextField(blank=True)),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(blank=True, help_text='User who created this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(class)s_set', to=settings.AUTH_USER_MODEL)),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tax_events', to='tenants.tenant')),
+                ('updated_by', models.ForeignKey(blank=True, help_text='User who last updated this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updated_%(class)s_set', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Tax Event',
+                'verbose_name_plural': 'Tax Events',
+                'db_table': 'tax_events',
+                'ordering': ['-event_date', '-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TaxSettings',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('tax_jurisdiction', models.CharField(default='US', help_text='Primary tax jurisdiction', max_length=100)),
+                ('tax_year_end', models.DateField(blank=True, help_text='Tax year end date', null=True)),
+                ('default_tax_rate', models.DecimalField(decimal_places=2, default=0, help_text='Default tax rate percentage', max_digits=5)),
+                ('enable_loss_harvesting', models.BooleanField(default=True)),
+                ('enable_auto_alerts', models.BooleanField(default=True)),
+                ('year_end_alert_days', models.IntegerField(default=30, help_text='Days before year-end to send alerts')),
+                ('loss_carryforward_years', models.IntegerField(default=3, help_text='Years to carry forward losses')),
+                ('settings', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('tenant', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='tax_settings', to='tenants.tenant')),
+            ],
+            options={
+                'verbose_name': 'Tax Settings',
+                'verbose_name_plural': 'Tax Settings',
+                'db_table': 'tax_settings',
+            },
+        ),
+        migrations.CreateModel(
+            name='TaxOptimizationStrategy',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('strategy_type', models.CharField(choices=[('loss_harvesting', 'Loss Harvesting'), ('gain_realization', 'Gain Realization'), ('year_end_planning', 'Year-End Planning'), ('offset_opportunity', 'Offset Opportunity'), ('tax_deferral', 'Tax Deferral'), ('deduction_maximization', 'Deduction Maximization')], max_length=50)),
+                ('title', models.CharField(max_length=255)),
+                ('description', models.TextField()),
+                ('priority', models.CharField(choices=[('high', 'High'), ('medium', 'Medium'), ('low', 'Low')], default='medium', max_length=20)),
+                ('potential_savings', models.DecimalField(blank=True, decimal_places=2, max_digits=20, null=True)),
+                ('tax_year', models.IntegerField()),
+                ('status', models.CharField(choices=[('pending', 'Pending Review'), ('approved', 'Approved'), ('implemented', 'Implemented'), ('rejected', 'Rejected'), ('expired', 'Expired')], default='pending', max_length=20)),
+                ('implementation_date', models.DateField(blank=True, null=True)),
+                ('actual_savings', models.DecimalField(blank=True, decimal_places=2, max_digits=20, null=True)),
+                ('approved_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('applicable_events', models.ManyToManyField(blank=True, related_name='strategies', to='tax_optimization.taxevent')),
+                ('approved_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='approved_strategies', to=settings.AUTH_USER_MODEL)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tax_strategies', to='tenants.tenant')),
+            ],
+            options={
+                'verbose_name': 'Tax Optimization Strategy',
+                'verbose_name_plural': 'Tax Optimization Strategies',
+                'db_table': 'tax_optimization_strategies',
+                'ordering': ['-priority', '-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TaxAlert',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('alert_type', models.CharField(choices=[('year_end_approaching', 'Year-End Approaching'), ('offset_opportunity', 'Offset Opportunity Available'), ('loss_harvesting', 'Loss Harvesting Opportunity'), ('realization_deadline', 'Realization Deadline'), ('tax_threshold', 'Tax Threshold Warning'), ('deduction_opportunity', 'Deduction Opportunity')], max_length=50)),
+                ('severity', models.CharField(choices=[('critical', 'Critical'), ('high', 'High'), ('medium', 'Medium'), ('low', 'Low')], default='medium', max_length=20)),
+                ('title', models.CharField(max_length=255)),
+                ('message', models.TextField()),
+                ('actionable', models.BooleanField(default=True)),
+                ('action_url', models.CharField(blank=True, max_length=500)),
+                ('tax_year', models.IntegerField()),
+                ('deadline_date', models.DateField(blank=True, null=True)),
+                ('read', models.BooleanField(default=False)),
+                ('dismissed', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('related_event', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='tax_optimization.taxevent')),
+                ('related_strategy', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='tax_optimization.taxoptimizationstrategy')),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tax_alerts', to='tenants.tenant')),
+            ],
+            options={
+                'verbose_name': 'Tax Alert',
+                'verbose_name_plural': 'Tax Alerts',
+                'db_table': 'tax_alerts',
+                'ordering': ['-severity', '-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TaxYearSummary',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('tax_year', models.IntegerField()),
+                ('total_profit', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('total_loss', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('total_gains', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('total_losses', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('net_taxable_income', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('realized_gains', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('realized_losses', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('unrealized_gains', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('unrealized_losses', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('offset_applied', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('estimated_tax_liability', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('estimated_tax_rate', models.DecimalField(decimal_places=2, default=0, help_text='Percentage', max_digits=5)),
+                ('currency', models.CharField(default='USD', max_length=3)),
+                ('status', models.CharField(choices=[('draft', 'Draft'), ('calculated', 'Calculated'), ('reviewed', 'Reviewed'), ('finalized', 'Finalized')], default='draft', max_length=20)),
+                ('notes', models.TextField(blank=True)),
+                ('calculated_at', models.DateTimeField(blank=True, null=True)),
+                ('finalized_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tax_year_summaries', to='tenants.tenant')),
+            ],
+            options={
+                'verbose_name': 'Tax Year Summary',
+                'verbose_name_plural': 'Tax Year Summaries',
+                'db_table': 'tax_year_summaries',
+                'ordering': ['-tax_year'],
+                'unique_together': {('tenant', 'tax_year')},
+            },
+        ),
+        migrations.AddIndex(
+            model_name='taxevent',
+            index=models.Index(fields=['tenant', 'tax_year', 'event_type'], name='tax_events_tenant__d87422_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taxevent',
+            index=models.Index(fields=['tenant', 'realized', 'offset_applied'], name='tax_events_tenant__031390_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taxalert',
+            index=models.Index(fields=['tenant', 'dismissed', 'read'], name='tax_alerts_tenant__95a0cc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taxalert',
+            index=models.Index(fields=['tenant', 'deadline_date'], name='tax_alerts_tenant__27b01c_idx'),
+        ),
+    ]
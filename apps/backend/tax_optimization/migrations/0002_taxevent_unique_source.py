@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-19 15:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tax_optimization', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='taxevent',
+            constraint=models.UniqueConstraint(fields=('tenant', 'source_type', 'source_id'), name='tax_events_unique_source'),
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 4.2 on 2026-10-19 15:29
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Case, Count, F, Q, Sum, Value, When
+from django.db.models.functions import Abs
+import django.db.models.deletion
+import uuid
+
+
+def backfill_aggregates(apps, schema_editor):
+    """Build aggregates for events that predate them (as TaxAggregateService.compute does)"""
+    TaxEvent = apps.get_model('tax_optimization', 'TaxEvent')
+    TaxEventAggregate = apps.get_model('tax_optimization', 'TaxEventAggregate')
+    zero = Decimal('0')
+    loss_types = [value for value, _ in TaxEvent._meta.get_field('event_type').choices if 'loss' in value]
+    remaining = Case(
+        When(Q(offset_applied=True) & Q(offset_amount__gte=Abs('amount')), then=Value(zero)),
+        default=Abs('amount') - F('offset_amount'),
+        output_field=models.DecimalField(max_digits=20, decimal_places=2),
+    )
+    rows = TaxEvent.objects.values('tenant_id', 'tax_year', 'event_type', 'realized').annotate(
+        event_count=Count('id'),
+        positive_sum=Sum('amount', filter=Q(amount__gt=0)),
+        negative_sum=Sum('amount', filter=Q(amount__lt=0)),
+        offset_sum=Sum('offset_amount', filter=Q(offset_applied=True)),
+        remaining_sum=Sum(remaining, filter=Q(event_type__in=loss_types)),
+    ).order_by()
+    TaxEventAggregate.objects.bulk_create([
+        TaxEventAggregate(
+            tenant_id=row['tenant_id'],
+            tax_year=row['tax_year'],
+            event_type=row['event_type'],
+            realized=bool(row['realized']),
+            event_count=row['event_count'],
+            positive_amount=row['positive_sum'] or zero,
+            negative_amount=row['negative_sum'] or zero,
+            offset_amount=row['offset_sum'] or zero,
+            remaining_offset=row['remaining_sum'] or zero,
+        )
+        for row in rows.iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0004_tenantonboardingprogress_preset_progress'),
+        ('tax_optimization', '0002_taxevent_unique_source'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaxEventAggregate',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('tax_year', models.IntegerField()),
+                ('event_type', models.CharField(max_length=50)),
+                ('realized', models.BooleanField(default=False)),
+                ('event_count', models.IntegerField(default=0)),
+                ('positive_amount', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('negative_amount', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('offset_amount', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('remaining_offset', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tax_event_aggregates', to='tenants.tenant')),
+            ],
+            options={
+                'verbose_name': 'Tax Event Aggregate',
+                'verbose_name_plural': 'Tax Event Aggregates',
+                'db_table': 'tax_event_aggregates',
+                'unique_together': {('tenant', 'tax_year', 'event_type', 'realized')},
+            },
+        ),
+        migrations.RunPython(backfill_aggregates, migrations.RunPython.noop),
+    ]
@@ -59,6 +59,10 @@ class TaxEvent(FinancialModel):
             models.Index(fields=['tenant', 'tax_year', 'event_type']),
             models.Index(fields=['tenant', 'realized', 'offset_applied']),
         ]
+        constraints = [
+            # One detected event per source transaction (detection re-runs skip existing ones)
+            models.UniqueConstraint(fields=['tenant', 'source_type', 'source_id'], name='tax_events_unique_source'),
+        ]
 
     def __str__(self):
         return f"{self.get_event_type_display()} - {self.amount} ({self.tax_year})"
@@ -76,6 +80,36 @@ class TaxEvent(FinancialModel):
         return abs(self.amount) - self.offset_amount
 
 
+class TaxEventAggregate(models.Model):
+    """
+    Running totals of a tenant's tax events per tax year, event type and realization
+
+    Kept current by tax_optimization.aggregates.TaxAggregateService as events
+    are created, updated and deleted; verified (and repaired) against the raw
+    events by the reconcile_tax_aggregates command.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tenant = models.ForeignKey('tenants.Tenant', on_delete=models.CASCADE, related_name='tax_event_aggregates')
+    tax_year = models.IntegerField()
+    event_type = models.CharField(max_length=50)
+    realized = models.BooleanField(default=False)
+    event_count = models.IntegerField(default=0)
+    positive_amount = models.DecimalField(max_digits=20, decimal_places=2, default=0)  # Sum of amounts above 0
+    negative_amount = models.DecimalField(max_digits=20, decimal_places=2, default=0)  # Sum of amounts below 0
+    offset_amount = models.DecimalField(max_digits=20, decimal_places=2, default=0)  # Of events with offset applied
+    remaining_offset = models.DecimalField(max_digits=20, decimal_places=2, default=0)  # Loss events' remaining_offset_amount()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'tax_event_aggregates'
+        verbose_name = 'Tax Event Aggregate'
+        verbose_name_plural = 'Tax Event Aggregates'
+        unique_together = ['tenant', 'tax_year', 'event_type', 'realized']
+
+    def __str__(self):
+        return f"{self.event_type} {self.tax_year} ({self.event_count} events)"
+
+
 class TaxOptimizationStrategy(models.Model):
     """
     Tax Optimization Strategy model for storing optimization recommendations
@@ -169,26 +203,25 @@ class TaxYearSummary(models.Model):
         return f"Tax Year {self.tax_year} - {self.tenant.name}"
 
     def calculate_summary(self):
-        """Calculate tax year summary from events"""
-        events = TaxEvent.objects.filter(
-            tenant=self.tenant,
-            tax_year=self.tax_year
-        )
+        """Calculate tax year summary from the maintained event aggregates"""
+        from .aggregates import GAIN_TYPES, LOSS_TYPES, PROFIT_TYPES, TaxAggregateService
+
+        totals = TaxAggregateService.totals(self.tenant_id, self.tax_year)
 
         # Calculate totals
-        self.total_profit = sum(e.amount for e in events if e.event_type in ['profit', 'capital_gain', 'crypto_gain', 'fiat_gain', 'dividend', 'interest'] and e.amount > 0)
-        self.total_loss = abs(sum(e.amount for e in events if e.event_type in ['loss', 'capital_loss', 'crypto_loss', 'fiat_loss'] and e.amount < 0))
-        self.total_gains = sum(e.amount for e in events if 'gain' in e.event_type and e.amount > 0)
-        self.total_losses = abs(sum(e.amount for e in events if 'loss' in e.event_type and e.amount < 0))
+        self.total_profit = totals.sum('positive_amount', PROFIT_TYPES)
+        self.total_loss = abs(totals.sum('negative_amount', LOSS_TYPES))
+        self.total_gains = totals.sum('positive_amount', GAIN_TYPES)
+        self.total_losses = abs(totals.sum('negative_amount', LOSS_TYPES))
 
         # Separate realized vs unrealized
-        self.realized_gains = sum(e.amount for e in events if 'gain' in e.event_type and e.realized and e.amount > 0)
-        self.realized_losses = abs(sum(e.amount for e in events if 'loss' in e.event_type and e.realized and e.amount < 0))
-        self.unrealized_gains = sum(e.amount for e in events if 'gain' in e.event_type and not e.realized and e.amount > 0)
-        self.unrealized_losses = abs(sum(e.amount for e in events if 'loss' in e.event_type and not e.realized and e.amount < 0))
+        self.realized_gains = totals.sum('positive_amount', GAIN_TYPES, realized=True)
+        self.realized_losses = abs(totals.sum('negative_amount', LOSS_TYPES, realized=True))
+        self.unrealized_gains = totals.sum('positive_amount', GAIN_TYPES, realized=False)
+        self.unrealized_losses = abs(totals.sum('negative_amount', LOSS_TYPES, realized=False))
 
         # Calculate offset
-        self.offset_applied = sum(e.offset_amount for e in events if e.offset_applied)
+        self.offset_applied = totals.sum('offset_amount')
 
         # Calculate net taxable income (gains - losses after offset)
         self.net_taxable_income = max(Decimal('0'), self.total_gains - self.total_losses - self.offset_applied)
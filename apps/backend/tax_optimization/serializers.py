@@ -2,6 +2,7 @@
 Tax Optimization Serializers
 """
 from rest_framework import serializers
+from backend.fieldsets import SparseFieldsetMixin
 from decimal import Decimal
 from .models import (
     TaxEvent, TaxOptimizationStrategy, TaxYearSummary,
@@ -9,7 +10,7 @@ from .models import (
 )
 
 
-class TaxEventSerializer(serializers.ModelSerializer):
+class TaxEventSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Tax Event"""
     event_type_display = serializers.CharField(source='get_event_type_display', read_only=True)
     source_type_display = serializers.CharField(source='get_source_type_display', read_only=True)
@@ -29,7 +30,7 @@ class TaxEventSerializer(serializers.ModelSerializer):
         return obj.remaining_offset_amount()
 
 
-class TaxOptimizationStrategySerializer(serializers.ModelSerializer):
+class TaxOptimizationStrategySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Tax Optimization Strategy"""
     strategy_type_display = serializers.CharField(source='get_strategy_type_display', read_only=True)
     priority_display = serializers.CharField(source='get_priority_display', read_only=True)
@@ -52,7 +53,7 @@ class TaxOptimizationStrategySerializer(serializers.ModelSerializer):
         ]
 
 
-class TaxYearSummarySerializer(serializers.ModelSerializer):
+class TaxYearSummarySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Tax Year Summary"""
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
@@ -77,7 +78,7 @@ class TaxYearSummarySerializer(serializers.ModelSerializer):
         return max(Decimal('0'), obj.total_gains - obj.total_losses - obj.offset_applied)
 
 
-class TaxAlertSerializer(serializers.ModelSerializer):
+class TaxAlertSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Tax Alert"""
     alert_type_display = serializers.CharField(source='get_alert_type_display', read_only=True)
     severity_display = serializers.CharField(source='get_severity_display', read_only=True)
@@ -102,7 +103,7 @@ class TaxAlertSerializer(serializers.ModelSerializer):
         return None
 
 
-class TaxSettingsSerializer(serializers.ModelSerializer):
+class TaxSettingsSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Tax Settings"""
     
     class Meta:
@@ -1,12 +1,37 @@
 """
 Tax Optimization Signals
-Auto-generate alerts and strategies based on tax events
+Maintain event aggregates and auto-generate alerts and strategies based on tax events
 """
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 from datetime import date
+from .aggregates import EVENT_FIELDS, TaxAggregateService, event_values
 from .models import TaxEvent, TaxAlert, TaxSettings
+from .tax_event_engine import TaxEventEngine
+
+
+@receiver(pre_save, sender=TaxEvent)
+def remember_tax_event_contribution(sender, instance, **kwargs):
+    """Read what an existing event contributes to its aggregates before it changes"""
+    instance._aggregate_before = None
+    if not instance._state.adding:
+        instance._aggregate_before = TaxEvent.objects.filter(pk=instance.pk).values(*EVENT_FIELDS).first()
+
+
+@receiver(post_save, sender=TaxEvent)
+def update_tax_event_aggregates(sender, instance, **kwargs):
+    """Move the event's contribution to its aggregates (registered before the alert check reads them)"""
+    TaxAggregateService.apply_change(getattr(instance, '_aggregate_before', None), event_values(instance))
+
+
+@receiver(post_delete, sender=TaxEvent)
+def remove_tax_event_from_aggregates(sender, instance, **kwargs):
+    """Subtract a deleted event; deleting its tenant removes the aggregates with it"""
+    origin = kwargs.get('origin')
+    model = getattr(origin, 'model', None) or type(origin)
+    if origin is None or issubclass(model, TaxEvent):
+        TaxAggregateService.apply_change(event_values(instance), None)
 
 
 @receiver(post_save, sender=TaxEvent)
@@ -15,40 +40,13 @@ def check_tax_opportunities(sender, instance, created, **kwargs):
     if not created:
         return
     
-    tenant = instance.tenant
-    tax_year = instance.tax_year
-    
     # Get tax settings
-    settings = TaxSettings.objects.filter(tenant=tenant).first()
+    settings = TaxSettings.objects.filter(tenant_id=instance.tenant_id).first()
     if not settings or not settings.enable_auto_alerts:
         return
     
-    # Check for offset opportunities
-    events = TaxEvent.objects.filter(
-        tenant=tenant,
-        tax_year=tax_year
-    )
-    
-    total_gains = sum(e.amount for e in events if 'gain' in e.event_type)
-    total_losses = abs(sum(e.amount for e in events if 'loss' in e.event_type))
-    
-    if total_losses > 0 and total_gains > 0:
-        offset_available = min(total_losses, total_gains)
-        
-        # Create or update offset opportunity alert
-        TaxAlert.objects.update_or_create(
-            tenant=tenant,
-            alert_type='offset_opportunity',
-            tax_year=tax_year,
-            dismissed=False,
-            defaults={
-                'severity': 'high',
-                'title': f'Tax Offset Opportunity - ${offset_available:,.2f}',
-                'message': f'You have ${offset_available:,.2f} in losses that can offset your gains, reducing your tax liability.',
-                'actionable': True,
-                'action_url': '/tax-optimization/strategies'
-            }
-        )
+    # Check for offset opportunities (bulk detection refreshes this once per run)
+    TaxEventEngine.refresh_offset_alert(instance.tenant, instance.tax_year)
 
 
 @receiver(post_save, sender=TaxSettings)
@@ -0,0 +1,352 @@
+"""
+Tax Event Engine
+Detects a tax year's events from bank and crypto transactions in bulk.
+
+Crypto gains and losses come from lot tracking: every confirmed transfer
+or swap of a tenant's wallets is replayed once, in chronological order, into
+one LotPool per asset. Inbound transfers open lots at their USD value when
+received; outbound transfers consume lots (FIFO, HIFO or specific-ID) and
+realize proceeds less the consumed cost basis. Transfers between the
+tenant's own wallets move nothing, since lots are pooled per asset.
+
+Detected events are inserted in one transaction that locks the tenant row,
+skips sources that already have an event and bulk_creates the rest, so
+re-running a year keeps existing events and concurrent runs for a tenant
+take turns. Only the inserted events' contributions are added to the
+maintained TaxEventAggregate rows, in the same transaction; the
+(tenant, source_type, source_id) constraint backs this up. The
+offset-opportunity alert is then refreshed once from those totals.
+"""
+import heapq
+from collections import deque
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+from django.db import transaction
+from django.db.models.functions import Coalesce
+import logging
+
+from tenants.models import Tenant
+from .aggregates import TaxAggregateService
+from .models import TaxAlert, TaxEvent, TaxSettings
+
+logger = logging.getLogger(__name__)
+
+FIFO = 'fifo'
+HIFO = 'hifo'
+SPECIFIC_ID = 'specific_id'
+COST_BASIS_METHODS = (FIFO, HIFO, SPECIFIC_ID)
+
+# Crypto transaction types that move an asset in or out of the tenant's wallets
+LOT_TRANSACTION_TYPES = ('transfer', 'swap')
+
+ZERO = Decimal('0')
+CENT = Decimal('0.01')
+
+
+def _quantity(value: Decimal) -> str:
+    """Token quantity without trailing zeros or exponent"""
+    return format(value.normalize(), 'f')
+
+
+class Lot:
+    """Quantity of an asset acquired together, at one unit cost"""
+
+    __slots__ = ('lot_id', 'acquired_at', 'quantity', 'unit_cost')
+
+    def __init__(self, lot_id: str, acquired_at: datetime, quantity: Decimal, unit_cost: Decimal):
+        self.lot_id = lot_id
+        self.acquired_at = acquired_at
+        self.quantity = quantity
+        self.unit_cost = unit_cost
+
+
+class LotPool:
+    """
+    Open lots of one asset
+
+    FIFO consumes the oldest lot first and HIFO the highest unit cost first.
+    Specific-ID consumes the named lots, then falls back to FIFO. Exhausted
+    lots are skipped lazily when they reach the head of the queue.
+    """
+
+    def __init__(self, method: str = FIFO):
+        self.method = method
+        self.lots: Dict[str, Lot] = {}
+        self._queue = [] if method == HIFO else deque()
+        self._sequence = 0
+
+    def add(self, lot: Lot):
+        self.lots[lot.lot_id] = lot
+        if self.method == HIFO:
+            heapq.heappush(self._queue, (-lot.unit_cost, self._sequence, lot))
+            self._sequence += 1
+        else:
+            self._queue.append(lot)
+
+    def _head(self) -> Optional[Lot]:
+        while self._queue:
+            lot = self._queue[0][2] if self.method == HIFO else self._queue[0]
+            if lot.quantity > 0:
+                return lot
+            if self.method == HIFO:
+                heapq.heappop(self._queue)
+            else:
+                self._queue.popleft()
+        return None
+
+    def dispose(self, quantity: Decimal, lot_ids: Iterable[str] = ()) -> Tuple[List[Tuple[Lot, Decimal]], Decimal]:
+        """
+        Consume lots for a disposal
+
+        Args:
+            quantity: Quantity disposed of
+            lot_ids: Lots to consume first (specific-ID only)
+
+        Returns:
+            tuple: ([(lot, quantity taken)], quantity no open lot covered)
+        """
+        taken = []
+        remaining = quantity
+        chosen = [self.lots.get(lot_id) for lot_id in lot_ids] if self.method == SPECIFIC_ID else []
+        for lot in chosen:
+            if remaining <= 0:
+                break
+            if lot is not None and lot.quantity > 0:
+                remaining = self._take(lot, remaining, taken)
+        while remaining > 0:
+            lot = self._head()
+            if lot is None:
+                break
+            remaining = self._take(lot, remaining, taken)
+        return taken, remaining
+
+    def _take(self, lot: Lot, remaining: Decimal, taken: List) -> Decimal:
+        quantity = min(lot.quantity, remaining)
+        lot.quantity -= quantity
+        taken.append((lot, quantity))
+        if lot.quantity <= 0:
+            self.lots.pop(lot.lot_id, None)
+        return remaining - quantity
+
+
+class CostBasisEngine:
+    """Realized crypto gains from one chronological pass per asset"""
+
+    def __init__(self, method: str = FIFO, lot_selections: Optional[Dict[str, List[str]]] = None):
+        if method not in COST_BASIS_METHODS:
+            raise ValueError(f"Unknown cost basis method: {method}")
+        self.method = method
+        self.lot_selections = {str(key): [str(lot) for lot in value] for key, value in (lot_selections or {}).items()}
+        self.pools: Dict[str, LotPool] = {}
+
+    def run(self, transactions: Iterable, own_addresses: Iterable[str], tax_year: int) -> List[Dict]:
+        """
+        Replay transactions and collect the tax year's disposals
+
+        Args:
+            transactions: CryptoTransactions enriched with amount_usd, oldest first
+            own_addresses: The tenant's wallet addresses
+            tax_year: Year whose disposals are returned
+
+        Returns:
+            list: One dict per disposal: transaction, asset, quantity, proceeds,
+            cost_basis, gain, uncovered quantity and the lots consumed
+        """
+        own = {address.lower() for address in own_addresses}
+        disposals = []
+        for tx in transactions:
+            inbound = (tx.to_address or '').lower() in own
+            outbound = (tx.from_address or '').lower() in own
+            if inbound == outbound or not tx.amount:
+                continue  # Between own wallets (or unrelated): no change in holdings
+            asset = (tx.token_symbol or '').upper()
+            pool = self.pools.setdefault(asset, LotPool(self.method))
+            quantity = abs(tx.amount)
+            value = abs(tx.amount_usd) if tx.amount_usd is not None else None
+            if inbound:
+                # Unpriced acquisitions carry no cost basis
+                pool.add(Lot(str(tx.id), tx.valued_at, quantity, (value or ZERO) / quantity))
+                continue
+
+            taken, uncovered = pool.dispose(quantity, self.lot_selections.get(str(tx.id), ()))
+            if tx.valued_at.year != tax_year:
+                continue
+            cost_basis = sum((lot.unit_cost * amount for lot, amount in taken), ZERO)
+            disposals.append({
+                'transaction': tx,
+                'asset': asset,
+                'quantity': quantity,
+                'proceeds': value,
+                'cost_basis': cost_basis,
+                'gain': value - cost_basis if value is not None else None,
+                'uncovered': uncovered,
+                'lots': [
+                    {
+                        'lot': lot.lot_id,
+                        'acquired_at': lot.acquired_at.isoformat(),
+                        'quantity': _quantity(amount),
+                        'cost': str((lot.unit_cost * amount).quantize(CENT)),
+                    }
+                    for lot, amount in taken
+                ],
+            })
+        return disposals
+
+
+class TaxEventEngine:
+    """Bulk tax event detection and aggregate-based alerts"""
+
+    @classmethod
+    def detect(cls, tenant, tax_year: int, method: Optional[str] = None,
+               lot_selections: Optional[Dict[str, List[str]]] = None) -> Dict:
+        """
+        Detect and store a tax year's fiat and crypto events
+
+        Args:
+            tenant: Tenant to detect for
+            tax_year: Year to detect
+            method: Cost basis method (default: TaxSettings.settings['cost_basis_method'] or FIFO)
+            lot_selections: Specific-ID lots per disposal: {disposal tx id: [acquisition tx ids]}
+
+        Returns:
+            dict: events_created, crypto_disposals, unpriced_crypto_transactions, cost_basis_method
+        """
+        tax_settings = TaxSettings.objects.filter(tenant=tenant).first()
+        if method is None:
+            method = (tax_settings.settings.get('cost_basis_method') if tax_settings else None) or FIFO
+        engine = CostBasisEngine(method, lot_selections)
+
+        events = cls._fiat_events(tenant, tax_year)
+        disposals = cls._crypto_disposals(tenant, tax_year, engine)
+        unpriced = 0
+        for disposal in disposals:
+            if disposal['gain'] is None:
+                unpriced += 1  # No price recorded by then: nothing to value the proceeds at
+                continue
+            events.append(cls._crypto_event(tenant, tax_year, method, disposal))
+
+        created = cls._insert(tenant, events)
+        if tax_settings is not None and tax_settings.enable_auto_alerts:
+            cls.refresh_offset_alert(tenant, tax_year)
+        return {
+            'events_created': created,
+            'crypto_disposals': len(disposals),
+            'unpriced_crypto_transactions': unpriced,
+            'cost_basis_method': method,
+        }
+
+    @staticmethod
+    def _fiat_events(tenant, tax_year: int) -> List[TaxEvent]:
+        from banking.models import BankTransaction
+
+        rows = BankTransaction.objects.filter(
+            tenant=tenant,
+            date__year=tax_year,
+            is_reconciled=True,
+            type__in=['deposit', 'interest'],
+        ).values_list('id', 'amount', 'currency', 'date', 'description')
+        return [
+            TaxEvent(
+                tenant=tenant,
+                source_type='fiat',
+                source_id=tx_id,
+                event_type='fiat_gain' if amount > 0 else 'fiat_loss',
+                amount=abs(amount),
+                currency=currency,
+                tax_year=tax_year,
+                event_date=tx_date,
+                realized=True,
+                description=f"Bank transaction: {description}",
+            )
+            for tx_id, amount, currency, tx_date, description in rows
+        ]
+
+    @staticmethod
+    def _crypto_disposals(tenant, tax_year: int, engine: CostBasisEngine) -> List[Dict]:
+        from web3_integration.models import CryptoTransaction, CryptoWallet
+        from web3_integration.valuation import CryptoValuationService
+
+        year_end = datetime(tax_year + 1, 1, 1, tzinfo=dt_timezone.utc)
+        transactions = CryptoValuationService.enrich_transactions(
+            CryptoTransaction.objects.filter(
+                wallet__tenant=tenant,
+                status='confirmed',
+                transaction_type__in=LOT_TRANSACTION_TYPES,
+            ).annotate(
+                valued=Coalesce('block_timestamp', 'created_at')
+            ).filter(valued__lt=year_end).order_by('valued', 'tx_hash')
+        )
+        addresses = CryptoWallet.objects.filter(tenant=tenant).values_list('address', flat=True)
+        return engine.run(transactions, addresses, tax_year)
+
+    @staticmethod
+    def _crypto_event(tenant, tax_year: int, method: str, disposal: Dict) -> TaxEvent:
+        tx = disposal['transaction']
+        gain = disposal['gain'].quantize(CENT)
+        return TaxEvent(
+            tenant=tenant,
+            source_type='crypto',
+            source_id=tx.id,
+            event_type='crypto_gain' if gain >= 0 else 'crypto_loss',
+            amount=gain,
+            currency='USD',
+            tax_year=tax_year,
+            event_date=tx.valued_at.date(),
+            realized=True,
+            description=f"Crypto disposal of {_quantity(disposal['quantity'])} {disposal['asset']}: {tx.tx_hash[:10]}...",
+            metadata={
+                'cost_basis_method': method,
+                'asset': disposal['asset'],
+                'quantity': _quantity(disposal['quantity']),
+                'proceeds': str(disposal['proceeds'].quantize(CENT)),
+                'cost_basis': str(disposal['cost_basis'].quantize(CENT)),
+                'uncovered_quantity': _quantity(disposal['uncovered']),
+                'lots': disposal['lots'],
+            },
+        )
+
+    @staticmethod
+    def _insert(tenant, events: List[TaxEvent]) -> int:
+        """
+        Insert events whose source has none yet; returns how many were new
+
+        The tenant row is locked for the check and the insert, so concurrent
+        detection runs for one tenant take turns: each sees the events the
+        other committed, and only rows actually inserted reach the aggregates.
+        """
+        if not events:
+            return 0
+        with transaction.atomic():
+            list(Tenant.objects.select_for_update().filter(pk=tenant.pk).values_list('pk', flat=True))
+            existing = set(TaxEvent.objects.filter(
+                tenant=tenant, source_id__in=[event.source_id for event in events]
+            ).values_list('source_type', 'source_id'))
+            new = [event for event in events if (event.source_type, event.source_id) not in existing]
+            TaxEvent.objects.bulk_create(new, batch_size=500)
+            TaxAggregateService.add_events(new)
+        return len(new)
+
+    @staticmethod
+    def refresh_offset_alert(tenant, tax_year: int):
+        """Create or update the offset-opportunity alert from the year's maintained gain and loss totals"""
+        totals = TaxAggregateService.totals(tenant.id, tax_year)
+        total_gains, total_losses = totals.gains, totals.losses
+        if total_losses <= 0 or total_gains <= 0:
+            return None
+
+        offset_available = min(total_losses, total_gains)
+        alert, _ = TaxAlert.objects.update_or_create(
+            tenant=tenant,
+            alert_type='offset_opportunity',
+            tax_year=tax_year,
+            dismissed=False,
+            defaults={
+                'severity': 'high',
+                'title': f'Tax Offset Opportunity - ${offset_available:,.2f}',
+                'message': f'You have ${offset_available:,.2f} in losses that can offset your gains, reducing your tax liability.',
+                'actionable': True,
+                'action_url': '/tax-optimization/strategies'
+            }
+        )
+        return alert
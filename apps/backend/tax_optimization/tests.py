@@ -0,0 +1,207 @@
+"""
+Unit tests for tax_optimization app
+"""
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+
+from authentication.models import User
+from tenants.models import Tenant
+from web3_integration.models import CryptoTransaction, CryptoWallet, TokenPrice
+from .aggregates import TaxAggregateService
+from .models import TaxAlert, TaxEvent, TaxSettings, TaxYearSummary
+from .tax_event_engine import FIFO, HIFO, SPECIFIC_ID, Lot, LotPool, TaxEventEngine
+
+T0 = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class LotPoolTest(TestCase):
+    """Test lot consumption order per cost basis method"""
+
+    def _pool(self, method):
+        pool = LotPool(method)
+        for lot_id, day, cost in (('a', 0, '100'), ('b', 1, '300'), ('c', 2, '200')):
+            pool.add(Lot(lot_id, T0 + timedelta(days=day), Decimal('1'), Decimal(cost)))
+        return pool
+
+    def _consumed(self, pool, quantity, lot_ids=()):
+        taken, uncovered = pool.dispose(Decimal(quantity), lot_ids)
+        return [(lot.lot_id, amount) for lot, amount in taken], uncovered
+
+    def test_fifo_hifo_and_specific_id(self):
+        """Test FIFO takes the oldest lots, HIFO the costliest and specific-ID the named ones"""
+        self.assertEqual(self._consumed(self._pool(FIFO), '1.5'), ([('a', 1), ('b', Decimal('0.5'))], 0))
+        self.assertEqual(self._consumed(self._pool(HIFO), '1.5'), ([('b', 1), ('c', Decimal('0.5'))], 0))
+        self.assertEqual(self._consumed(self._pool(SPECIFIC_ID), '1.5', ['c']), ([('c', 1), ('a', Decimal('0.5'))], 0))
+
+    def test_exhausted_lots_are_skipped_and_shortfall_reported(self):
+        """Test later disposals continue after used lots and report what no lot covered"""
+        pool = self._pool(FIFO)
+        self._consumed(pool, '1')
+        self.assertEqual(self._consumed(pool, '2.5'), ([('b', 1), ('c', 1)], Decimal('0.5')))
+
+
+class TaxEventDetectionTest(TestCase):
+    """Test bulk tax event detection from crypto lots"""
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name='Tax Tenant', slug='tax_tenant', is_active=True)
+        self.user = User.objects.create_user(
+            username='tax', email='tax@example.com', password='testpass123', tenant=self.tenant, role='accountant'
+        )
+        TaxSettings.objects.create(tenant=self.tenant, year_end_alert_days=0)
+        self.wallet = CryptoWallet.objects.create(
+            tenant=self.tenant, user=self.user, name='Ops', address='0xOps', network='ethereum', wallet_type='metamask'
+        )
+        self.cold = CryptoWallet.objects.create(
+            tenant=self.tenant, user=self.user, name='Cold', address='0xCold', network='ethereum', wallet_type='hardware'
+        )
+        for day, price in ((0, '100'), (10, '300'), (20, '200'), (30, '150')):
+            TokenPrice.objects.create(
+                token_address='', token_symbol='ETH', network='ethereum', price_usd=Decimal(price),
+                timestamp=T0 + timedelta(days=day)
+            )
+        self.buys = [
+            self._transfer('0xbuy1', '0xexchange', '0xops', '1', 0),  # Cost 100
+            self._transfer('0xbuy2', '0xexchange', '0xops', '1', 10),  # Cost 300
+        ]
+        self._transfer('0xmove', '0xops', '0xcold', '1', 15)  # Between own wallets
+        self._transfer('0xsell', '0xops', '0xexchange', '1', 30)  # Proceeds 150
+
+    def _transfer(self, tx_hash, from_address, to_address, amount, day):
+        return CryptoTransaction.objects.create(
+            wallet=self.wallet, tx_hash=tx_hash, from_address=from_address, to_address=to_address,
+            amount=Decimal(amount), token_symbol='ETH', status='confirmed',
+            block_timestamp=T0 + timedelta(days=day)
+        )
+
+    def test_detect_realizes_gains_by_method(self):
+        """Test FIFO realizes a gain, HIFO a loss, and a re-run inserts nothing twice"""
+        result = TaxEventEngine.detect(self.tenant, 2024)
+        self.assertEqual((result['events_created'], result['crypto_disposals']), (1, 1))
+        event = TaxEvent.objects.get(tenant=self.tenant, source_type='crypto')
+        self.assertEqual((event.event_type, event.amount), ('crypto_gain', Decimal('50.00')))
+        self.assertEqual(event.metadata['lots'][0]['lot'], str(self.buys[0].id))
+
+        self.assertEqual(TaxEventEngine.detect(self.tenant, 2024)['events_created'], 0)
+
+        event.delete()
+        TaxEventEngine.detect(self.tenant, 2024, method=HIFO)
+        event = TaxEvent.objects.get(tenant=self.tenant, source_type='crypto')
+        self.assertEqual((event.event_type, event.amount), ('crypto_loss', Decimal('-150.00')))
+
+    def test_offset_alert_refreshed_once_from_aggregates(self):
+        """Test a run with gains and losses raises one offset alert in constant queries"""
+        TaxEvent.objects.create(
+            tenant=self.tenant, event_type='capital_gain', source_type='investment', amount=Decimal('500'),
+            tax_year=2024, event_date=T0.date(), realized=True
+        )
+        self._transfer('0xbuy3', '0xexchange', '0xops', '1', 10)
+        self._transfer('0xsell2', '0xops', '0xexchange', '1', 30)
+        # Settings, bank, crypto, 2 price, wallet, tenant lock, existing, insert,
+        # aggregate upsert (7), aggregate read, alert upsert (6) and savepoints
+        with self.assertNumQueries(25):
+            TaxEventEngine.detect(self.tenant, 2024, method=HIFO)
+        alert = TaxAlert.objects.get(tenant=self.tenant, alert_type='offset_opportunity')
+        self.assertEqual(alert.title, 'Tax Offset Opportunity - $300.00')
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class ConcurrentTaxEventInsertTest(TransactionTestCase):
+    """Stress test: concurrent detection runs must insert and aggregate each source once"""
+
+    threads = 6
+
+    def test_each_source_counted_once(self):
+        tenant = Tenant.objects.create(name='Concurrent Tax', slug='concurrent_tax', is_active=True)
+        source_ids = [uuid.uuid4() for _ in range(20)]
+        barrier = threading.Barrier(self.threads)
+        created, errors = [], []
+
+        def run():
+            try:
+                events = [
+                    TaxEvent(
+                        tenant=tenant, source_type='crypto', source_id=source_id, event_type='crypto_gain',
+                        amount=Decimal('10'), tax_year=2024, event_date=T0.date(), realized=True
+                    )
+                    for source_id in source_ids
+                ]
+                barrier.wait()
+                created.append(TaxEventEngine._insert(tenant, events))
+            except Exception as e:  # pragma: no cover - surfaced below
+                errors.append(e)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=run) for _ in range(self.threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(sum(created), len(source_ids))
+        totals = TaxAggregateService.totals(tenant.id, 2024)
+        self.assertEqual((totals.event_count, totals.gains), (len(source_ids), Decimal('200')))
+
+
+class TaxAggregateTest(TestCase):
+    """Test running tax event aggregates and their reconciliation"""
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name='Aggregate Tenant', slug='aggregate_tenant', is_active=True)
+
+    def _event(self, event_type, amount, **kwargs):
+        return TaxEvent.objects.create(
+            tenant=self.tenant, event_type=event_type, source_type='manual', amount=Decimal(amount),
+            tax_year=2024, event_date=T0.date(), realized=True, **kwargs
+        )
+
+    def test_aggregates_follow_event_changes(self):
+        """Test creates, updates and deletes move an event's contribution between rows"""
+        gain = self._event('capital_gain', '1000')
+        loss = self._event('capital_loss', '-400')
+        totals = TaxAggregateService.totals(self.tenant.id, 2024)
+        self.assertEqual((totals.event_count, totals.gains, totals.losses), (2, Decimal('1000'), Decimal('400')))
+        self.assertEqual(totals.offset_available, Decimal('400'))
+
+        loss.offset_applied, loss.offset_amount = True, Decimal('150')
+        loss.save()
+        gain.tax_year = 2025
+        gain.save()
+        totals = TaxAggregateService.totals(self.tenant.id, 2024)
+        self.assertEqual((totals.event_count, totals.gains, totals.offset_available), (1, 0, Decimal('250')))
+
+        loss.delete()
+        self.assertEqual(TaxAggregateService.totals(self.tenant.id, 2024).event_count, 0)
+        self.assertEqual(TaxAggregateService.reconcile(self.tenant), [])
+
+    def test_summary_reads_aggregates(self):
+        """Test the year summary is calculated from the aggregate rows"""
+        self._event('capital_gain', '1000')
+        self._event('dividend', '200')
+        self._event('capital_loss', '-300')
+        summary = TaxYearSummary.objects.create(tenant=self.tenant, tax_year=2024)
+        summary.calculate_summary()
+        self.assertEqual((summary.total_profit, summary.realized_gains), (Decimal('1200'), Decimal('1000')))
+        self.assertEqual((summary.realized_losses, summary.net_taxable_income), (Decimal('300'), Decimal('700')))
+
+    def test_reconcile_reports_and_repairs_drift(self):
+        """Test updates that bypass signals are reported and fixed by the command"""
+        self._event('capital_gain', '1000')
+        TaxEvent.objects.filter(tenant=self.tenant).update(amount=Decimal('1200'))
+
+        with self.assertRaises(CommandError):
+            call_command('reconcile_tax_aggregates', tenant='aggregate_tenant', stdout=StringIO())
+        out = StringIO()
+        call_command('reconcile_tax_aggregates', tenant='aggregate_tenant', fix=True, stdout=out)
+        self.assertIn('stored', out.getvalue())
+        self.assertEqual(TaxAggregateService.totals(self.tenant.id, 2024).gains, Decimal('1200'))
+        self.assertEqual(TaxAggregateService.reconcile(self.tenant), [])
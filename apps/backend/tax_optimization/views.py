@@ -21,6 +21,8 @@ from .serializers import (
     TaxYearSummarySerializer, TaxAlertSerializer, TaxSettingsSerializer,
     TaxOptimizationStatsSerializer
 )
+from .aggregates import TaxAggregateService
+from .tax_event_engine import COST_BASIS_METHODS, TaxEventEngine
 from authentication.permissions import IsAccountant, IsCFO, IsTenantMember
 
 logger = logging.getLogger(__name__)
@@ -72,70 +74,25 @@ class TaxEventDetailView(generics.RetrieveUpdateDestroyAPIView):
 @permission_classes([IsAccountant])
 def detect_tax_events(request):
     """Detect tax events from transactions and create events automatically"""
-    from banking.models import BankTransaction
-    from web3_integration.models import CryptoTransaction
-    
     tenant = request.user.tenant
-    tax_year = request.data.get('tax_year', timezone.now().year)
-    
-    events_created = 0
+    tax_year = int(request.data.get('tax_year', timezone.now().year))
+    method = request.data.get('cost_basis_method')
     
-    # Detect from bank transactions (fiat gains/losses)
-    bank_transactions = BankTransaction.objects.filter(
-        tenant=tenant,
-        date__year=tax_year,
-        is_reconciled=True
-    )
-    
-    for tx in bank_transactions:
-        if tx.type in ['deposit', 'interest']:
-            TaxEvent.objects.get_or_create(
-                tenant=tenant,
-                source_type='fiat',
-                source_id=tx.id,
-                defaults={
-                    'event_type': 'fiat_gain' if tx.amount > 0 else 'fiat_loss',
-                    'amount': abs(tx.amount),
-                    'currency': tx.currency,
-                    'tax_year': tax_year,
-                    'event_date': tx.date,
-                    'realized': True,
-                    'description': f"Bank transaction: {tx.description}"
-                }
-            )
-            events_created += 1
+    if method is not None and method not in COST_BASIS_METHODS:
+        return Response(
+            {'error': f"cost_basis_method must be one of: {', '.join(COST_BASIS_METHODS)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
     
-    # Detect from crypto transactions (crypto gains/losses)
-    crypto_transactions = CryptoTransaction.objects.filter(
-        wallet__tenant=tenant,
-        created_at__year=tax_year,
-        status='confirmed'
+    # Fiat events plus crypto gains/losses from lot tracking, inserted in bulk
+    result = TaxEventEngine.detect(
+        tenant, tax_year, method=method, lot_selections=request.data.get('lot_selections')
     )
     
-    for tx in crypto_transactions:
-        if tx.transaction_type in ['swap', 'transfer']:
-            # Calculate gain/loss based on price difference
-            # This is simplified - in reality, need cost basis tracking
-            TaxEvent.objects.get_or_create(
-                tenant=tenant,
-                source_type='crypto',
-                source_id=tx.id,
-                defaults={
-                    'event_type': 'crypto_gain',  # Simplified
-                    'amount': abs(float(tx.amount)) if tx.amount else Decimal('0'),
-                    'currency': 'USD',  # Convert to USD
-                    'tax_year': tax_year,
-                    'event_date': tx.created_at.date(),
-                    'realized': tx.status == 'confirmed',
-                    'description': f"Crypto transaction: {tx.tx_hash[:10]}..."
-                }
-            )
-            events_created += 1
-    
     return Response({
         'success': True,
-        'message': f'Created {events_created} tax events',
-        'events_created': events_created
+        'message': f"Created {result['events_created']} tax events",
+        **result
     })
 
 
@@ -206,12 +163,9 @@ def generate_strategies(request):
     
     strategies_created = []
     
-    # Get all tax events for the year
-    events = TaxEvent.objects.filter(tenant=tenant, tax_year=tax_year)
-    
-    # Calculate totals
-    total_gains = sum(e.amount for e in events if 'gain' in e.event_type)
-    total_losses = abs(sum(e.amount for e in events if 'loss' in e.event_type))
+    # Get the year's maintained event totals
+    totals = TaxAggregateService.totals(tenant.id, tax_year)
+    total_gains, total_losses = totals.gains, totals.losses
     
     # Strategy 1: Loss Harvesting Opportunity
     if total_losses > 0 and total_gains > 0:
@@ -400,9 +354,8 @@ def generate_alerts(request):
             alerts_created.append(alert.id)
     
     # Alert 2: Offset opportunity
-    events = TaxEvent.objects.filter(tenant=tenant, tax_year=current_year)
-    total_gains = sum(e.amount for e in events if 'gain' in e.event_type)
-    total_losses = abs(sum(e.amount for e in events if 'loss' in e.event_type))
+    totals = TaxAggregateService.totals(tenant.id, current_year)
+    total_gains, total_losses = totals.gains, totals.losses
     
     if total_losses > 0 and total_gains > 0:
         offset_available = min(total_losses, total_gains)
@@ -457,15 +410,12 @@ def tax_optimization_stats(request):
     tenant = request.user.tenant
     current_year = timezone.now().year
     
-    # Get events for current year
-    events = TaxEvent.objects.filter(tenant=tenant, tax_year=current_year)
-    
-    total_gains = sum(e.amount for e in events if 'gain' in e.event_type)
-    total_losses = abs(sum(e.amount for e in events if 'loss' in e.event_type))
+    # Get the current year's maintained event totals
+    totals = TaxAggregateService.totals(tenant.id, current_year)
+    total_gains, total_losses = totals.gains, totals.losses
     
     # Calculate offset available
-    loss_events = events.filter(event_type__in=['loss', 'capital_loss', 'crypto_loss', 'fiat_loss'])
-    offset_available = sum(e.remaining_offset_amount() for e in loss_events)
+    offset_available = totals.offset_available
     
     # Get strategies
     strategies = TaxOptimizationStrategy.objects.filter(
@@ -484,7 +434,7 @@ def tax_optimization_stats(request):
     
     stats = {
         'current_year': current_year,
-        'total_events': events.count(),
+        'total_events': totals.event_count,
         'total_gains': total_gains,
         'total_losses': total_losses,
         'net_taxable': max(Decimal('0'), total_gains - total_losses),
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class TenantsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tenants'
+
+    def ready(self):
+        # Parse the preset and navigation files once, before the first request
+        from presets.catalog import get_catalog
+        get_catalog()
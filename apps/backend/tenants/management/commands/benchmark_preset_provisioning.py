@@ -0,0 +1,84 @@
+"""
+Management command to benchmark tenant preset provisioning
+Usage: python manage.py benchmark_preset_provisioning --countries MY SG --repeat 5
+
+Provisions throwaway tenants (with a primary company and an admin user)
+through PresetEngine, serially and with the configured worker count,
+reports time and queries per tenant, then deletes the tenants.
+"""
+import statistics
+import time
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from accounting.models import ChartOfAccounts
+from authentication.models import User
+from invoicing.models import TaxRate
+from tenants.models import Company, Tenant
+from tenants.preset_engine import PresetEngine
+
+
+class Command(BaseCommand):
+    help = 'Benchmark provisioning presets for new tenants'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--countries', nargs='+', default=['MY', 'SG'], help='Country codes to provision')
+        parser.add_argument('--repeat', type=int, default=5, help='Tenants provisioned per country and mode')
+        parser.add_argument(
+            '--workers', type=int, default=settings.PRESET_PROVISIONING_WORKERS,
+            help='Threads for independent presets (compared against 1)'
+        )
+
+    def handle(self, *args, **options):
+        if connection.in_atomic_block:
+            self.stdout.write('Running inside a transaction: presets are provisioned serially')
+        for country_code in options['countries']:
+            for workers in sorted({1, options['workers']}):
+                with override_settings(PRESET_PROVISIONING_WORKERS=workers):
+                    self._report(country_code.upper(), workers, options['repeat'])
+
+    def _report(self, country_code, workers, repeat):
+        timings, query_counts, records = [], [], 0
+        for _ in range(repeat):
+            tenant, user = self._tenant(country_code)
+            try:
+                # Only the calling thread's queries are captured
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    result = PresetEngine().provision_tenant_presets(tenant, country_code, user=user)
+                    timings.append((time.perf_counter() - started) * 1000)
+                query_counts.append(len(queries))
+                records = sum(detail['record_count'] for detail in result['detailed_results'].values())
+            finally:
+                self._drop(tenant)
+        self.stdout.write(
+            f"{country_code} workers={workers}: p50 {statistics.median(timings):8.1f} ms  "
+            f"max {max(timings):8.1f} ms  {statistics.median(query_counts):.0f} queries on the calling thread  "
+            f"{records} records ({connection.vendor})"
+        )
+
+    @staticmethod
+    def _tenant(country_code):
+        suffix = uuid.uuid4().hex[:8]
+        tenant = Tenant.objects.create(
+            name=f'Preset benchmark {suffix}', slug=f'preset-bench-{suffix}', country_code=country_code
+        )
+        Company.objects.create(tenant=tenant, name=f'Preset benchmark {suffix}', is_primary=True)
+        user = User.objects.create_user(
+            username=f'preset-bench-{suffix}', email=f'preset-bench-{suffix}@example.com',
+            password=uuid.uuid4().hex, tenant=tenant
+        )
+        return tenant, user
+
+    @staticmethod
+    def _drop(tenant):
+        # Tax rates and accounts protect their codes and types from the tenant cascade
+        TaxRate.objects.filter(tenant=tenant).delete()
+        ChartOfAccounts.objects.filter(tenant=tenant, parent__isnull=False).delete()
+        ChartOfAccounts.objects.filter(tenant=tenant).delete()
+        User.objects.filter(tenant=tenant).delete()
+        tenant.delete()
@@ -0,0 +1,36 @@
+"""
+Management command to build golden tenant templates
+Usage: python manage.py build_tenant_templates --countries MY SG --industries retail
+
+Provisions one inactive template tenant per (country, industry) from the
+preset files. New tenants of that country and industry are then cloned from
+it (see tenants.template_cloning). Rerun after changing preset files; stale
+templates are ignored until then.
+"""
+from django.core.management.base import BaseCommand
+
+from presets.catalog import get_catalog
+from tenants.template_cloning import TenantTemplateService
+
+
+class Command(BaseCommand):
+    help = 'Build or rebuild the template tenants new tenants are cloned from'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--countries', nargs='+', default=None,
+            help='Country codes (default: every country in PRESETS_INDEX.json)'
+        )
+        parser.add_argument(
+            '--industries', nargs='+', default=[],
+            help='Industry codes to build besides the industry-independent template'
+        )
+
+    def handle(self, *args, **options):
+        countries = options['countries'] or list(get_catalog().countries)
+        industries = [None] + options['industries']
+        for country_code in countries:
+            for industry_code in industries:
+                template, counts = TenantTemplateService.build_template(country_code.upper(), industry_code)
+                summary = ', '.join(f"{count} {key}" for key, count in counts.items())
+                self.stdout.write(f"{template.slug}: {summary}")
@@ -244,8 +244,13 @@ class TenantOnboardingProgress(models.Model):
         """Get data for a specific step"""
         return self.step_data.get(str(step_number), {})
     
-    def update_preset_progress(self, preset_type: str, status: str, records_created: int, total_expected: int = None):
-        """Update progress for a specific preset module"""
+    def update_preset_progress(self, preset_type: str, status: str, records_created: int, total_expected: int = None,
+                               save: bool = True):
+        """
+        Update progress for a specific preset module
+
+        Pass save=False to batch several updates and write them with save_preset_progress()
+        """
         from django.utils import timezone
         if not self.preset_progress:
             self.preset_progress = {}
@@ -259,6 +264,11 @@ class TenantOnboardingProgress(models.Model):
             'percentage': min(percentage, 100),
             'updated_at': timezone.now().isoformat(),
         }
+        if save:
+            self.save_preset_progress()
+
+    def save_preset_progress(self):
+        """Write preset progress updated with save=False"""
         self.save(update_fields=['preset_progress', 'updated_at'])
     
     def get_preset_progress(self, preset_type: str = None) -> dict:
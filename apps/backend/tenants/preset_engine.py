@@ -1,11 +1,13 @@
 """
 Preset Engine - Auto-provision tenant presets based on industry and country
 """
-import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Callable, Tuple
-from django.db import transaction
+from django.conf import settings
+from django.db import connection, connections, transaction
 from django.utils import timezone
+from presets.catalog import get_catalog, thaw
 from .models import Tenant, TenantPreset, Company
 import logging
 
@@ -17,6 +19,9 @@ class PresetEngine:
     Stateless, deterministic preset provisioning engine
     """
     
+    # Presets that share no rows with each other, provisioned concurrently
+    CONCURRENT_PRESETS = ('currency', 'tax_categories', 'country_settings')
+    
     def __init__(self):
         self.presets_base_path = os.path.join(
             os.path.dirname(os.path.dirname(__file__)),
@@ -29,7 +34,8 @@ class PresetEngine:
         country_code: str,
         industry_code: Optional[str] = None,
         user=None,
-        progress_callback: Optional[Callable] = None
+        progress_callback: Optional[Callable] = None,
+        use_template: bool = True
     ) -> Dict[str, any]:
         """
         Provision all presets for a tenant based on country and industry
@@ -40,6 +46,7 @@ class PresetEngine:
             industry_code: Optional industry classification code
             user: User who triggered the provisioning (for audit)
             progress_callback: Optional callback function(current_preset, overall_progress, details)
+            use_template: Clone preset rows from a current golden template tenant when one exists
         
         Returns:
             Dict with preset_type -> detailed results including record counts
@@ -56,88 +63,100 @@ class PresetEngine:
             ('einvoice_config', 'E-Invoice Configuration'),
             ('country_settings', 'Country Settings'),
         ]
+        provisioners = {
+            'currency': lambda: self._provision_currency(tenant, country_code),
+            'tax_categories': lambda: self._provision_tax_categories(tenant, country_code, user),
+            'tax_rates': lambda: self._provision_tax_rates(tenant, country_code, user),
+            'account_types': lambda: self._provision_account_types(tenant),
+            'chart_of_accounts': lambda: self._provision_chart_of_accounts(
+                tenant, country_code, industry_code, user
+            ),
+            'invoice_numbering': lambda: self._provision_invoice_numbering(tenant, country_code),
+            'einvoice_config': lambda: self._provision_einvoice_config(tenant, country_code),
+            'country_settings': lambda: self._provision_country_settings(tenant, country_code),
+        }
+        names = dict(preset_types)
+        
+        # A golden template supplies the preset rows with one INSERT ... SELECT per table;
+        # the provisioners below then find them in place and only record preset metadata
+        cloned = self._clone_from_template(tenant, country_code, industry_code, user) if use_template else None
         
         total_presets = len(preset_types)
         results = {}
         detailed_results = {}
+        started = 0
         
+        progress = None
         try:
-            for index, (preset_type, preset_name) in enumerate(preset_types):
-                current_progress = (index / total_presets) * 100
-                
-                # Call progress callback if provided
-                if progress_callback:
-                    progress_callback(
-                        current_preset=preset_name,
-                        overall_progress=current_progress,
-                        current_step=index + 1,
-                        total_steps=total_presets,
-                        details={}
-                    )
-                
-                preset_result = None
-                record_count = 0
-                
-                try:
-                    if preset_type == 'chart_of_accounts':
-                        preset_result, record_count = self._provision_chart_of_accounts(
-                            tenant, country_code, industry_code, user
-                        )
-                    elif preset_type == 'tax_rates':
-                        preset_result, record_count = self._provision_tax_rates(
-                            tenant, country_code, user
-                        )
-                    elif preset_type == 'tax_categories':
-                        preset_result, record_count = self._provision_tax_categories(
-                            tenant, country_code, user
-                        )
-                    elif preset_type == 'currency':
-                        preset_result, record_count = self._provision_currency(
-                            tenant, country_code
-                        )
-                    elif preset_type == 'invoice_numbering':
-                        preset_result, record_count = self._provision_invoice_numbering(
-                            tenant, country_code
-                        )
-                    elif preset_type == 'einvoice_config':
-                        preset_result, record_count = self._provision_einvoice_config(
-                            tenant, country_code
-                        )
-                    elif preset_type == 'country_settings':
-                        preset_result, record_count = self._provision_country_settings(
-                            tenant, country_code
-                        )
-                    
-                    results[preset_type] = preset_result
-                    detailed_results[preset_type] = {
-                        'success': preset_result,
-                        'record_count': record_count,
-                        'name': preset_name,
-                    }
-                    
-                    # Update preset progress in TenantOnboardingProgress
-                    try:
-                        from .models import TenantOnboardingProgress
-                        progress, _ = TenantOnboardingProgress.objects.get_or_create(tenant=tenant)
-                        status = 'completed' if preset_result else 'failed'
-                        progress.update_preset_progress(
-                            preset_type=preset_type,
-                            status=status,
-                            records_created=record_count,
-                            total_expected=record_count if preset_result else 0
+            from .models import TenantOnboardingProgress
+            progress, _ = TenantOnboardingProgress.objects.get_or_create(tenant=tenant)
+        except Exception as e:
+            logger.warning(f"Failed to load preset progress: {e}")
+        
+        def report(preset_type):
+            nonlocal started
+            # Call progress callback if provided
+            if progress_callback:
+                progress_callback(
+                    current_preset=names[preset_type],
+                    overall_progress=(started / total_presets) * 100,
+                    current_step=started + 1,
+                    total_steps=total_presets,
+                    details={}
+                )
+            started += 1
+        
+        def record(preset_type, outcome):
+            preset_result, record_count, error = outcome
+            results[preset_type] = preset_result
+            detailed_results[preset_type] = {
+                'success': preset_result,
+                'record_count': record_count,
+                'name': names[preset_type],
+            }
+            if error is not None:
+                detailed_results[preset_type]['error'] = error
+            # Update preset progress in TenantOnboardingProgress (written once per stage)
+            if progress is not None:
+                progress.update_preset_progress(
+                    preset_type=preset_type,
+                    status='completed' if preset_result else 'failed',
+                    records_created=record_count,
+                    total_expected=record_count if preset_result else 0,
+                    save=False
+                )
+        
+        try:
+            # Stage 1: presets that share no rows run side by side
+            concurrent = [preset_type for preset_type, _ in preset_types if preset_type in self.CONCURRENT_PRESETS]
+            workers = self._concurrent_workers(len(concurrent))
+            if workers > 1:
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='preset') as executor:
+                    futures = {}
+                    for preset_type in concurrent:
+                        report(preset_type)
+                        futures[preset_type] = executor.submit(
+                            self._run_in_thread, self._run_preset, preset_type, provisioners.get(preset_type)
                         )
-                    except Exception as e:
-                        logger.warning(f"Failed to update preset progress: {e}")
-                    
-                except Exception as e:
-                    logger.error(f"Failed to provision {preset_type}: {e}")
-                    results[preset_type] = False
-                    detailed_results[preset_type] = {
-                        'success': False,
-                        'record_count': 0,
-                        'name': preset_name,
-                        'error': str(e),
-                    }
+                    for preset_type in concurrent:
+                        record(preset_type, futures[preset_type].result())
+            else:
+                for preset_type in concurrent:
+                    report(preset_type)
+                    record(preset_type, self._run_preset(preset_type, provisioners.get(preset_type)))
+            self._save_progress(progress)
+            
+            # Stage 2: the rest, in order
+            for preset_type, _ in preset_types:
+                if preset_type in concurrent:
+                    continue
+                report(preset_type)
+                record(preset_type, self._run_preset(preset_type, provisioners.get(preset_type)))
+            self._save_progress(progress)
+            
+            # Keep the documented preset order in the results
+            results = {preset_type: results[preset_type] for preset_type, _ in preset_types}
+            detailed_results = {preset_type: detailed_results[preset_type] for preset_type, _ in preset_types}
             
             # Update tenant system flags
             self._update_tenant_flags(tenant, country_code)
@@ -155,7 +174,8 @@ class PresetEngine:
             # Log audit
             logger.info(
                 f"Presets provisioned for tenant {tenant.id} "
-                f"(country: {country_code}, industry: {industry_code})"
+                f"(country: {country_code}, industry: {industry_code}, workers: {workers}, "
+                f"template: {cloned is not None})"
             )
         
         except Exception as e:
@@ -169,6 +189,75 @@ class PresetEngine:
             'successful_presets': sum(1 for r in results.values() if r),
         }
     
+    @staticmethod
+    def _clone_from_template(
+        tenant: Tenant, country_code: str, industry_code: Optional[str], user
+    ) -> Optional[Dict[str, int]]:
+        """Clone a current template's preset rows into the tenant, or None to provision from files"""
+        from .template_cloning import TenantTemplateService
+        
+        try:
+            template = TenantTemplateService.find_template(country_code, industry_code)
+            if template is None or template.pk == tenant.pk:
+                return None
+            return TenantTemplateService.clone(template, tenant, user)
+        except Exception as e:
+            logger.warning(f"Failed to clone tenant template for tenant {tenant.id}, provisioning from files: {e}")
+            return None
+    
+    @staticmethod
+    def _run_preset(preset_type: str, provisioner: Optional[Callable]) -> Tuple[Optional[bool], int, Optional[str]]:
+        """Run one provisioner, returning (result, record count, error message)"""
+        if provisioner is None:
+            return None, 0, None
+        try:
+            preset_result, record_count = provisioner()
+            return preset_result, record_count, None
+        except Exception as e:
+            logger.error(f"Failed to provision {preset_type}: {e}")
+            return False, 0, str(e)
+    
+    @staticmethod
+    def _run_in_thread(function, *args):
+        """Run function on a worker thread, closing that thread's database connection afterwards"""
+        try:
+            return function(*args)
+        finally:
+            connections.close_all()
+    
+    @staticmethod
+    def _concurrent_workers(preset_count: int) -> int:
+        """
+        Threads for the concurrent stage (1 runs it serially)
+        
+        Worker threads use their own connections, so they cannot see rows
+        of an open transaction (such as the tenant being registered) and run
+        serially inside one. SQLite serialises writers anyway.
+        """
+        workers = min(getattr(settings, 'PRESET_PROVISIONING_WORKERS', 1), preset_count)
+        if workers <= 1 or connection.in_atomic_block or connection.vendor == 'sqlite':
+            return 1
+        return workers
+    
+    @staticmethod
+    def _save_progress(progress):
+        if progress is None:
+            return
+        try:
+            progress.save_preset_progress()
+        except Exception as e:
+            logger.warning(f"Failed to update preset progress: {e}")
+    
+    def _provision_account_types(self, tenant: Tenant) -> Tuple[bool, int]:
+        """Provision the standard GL account types the chart of accounts is filed under"""
+        try:
+            from presets.loader import ensure_account_types
+            
+            return True, len(ensure_account_types(tenant))
+        except Exception as e:
+            logger.error(f"Failed to provision account types: {e}")
+            return False, 0
+    
     def _provision_chart_of_accounts(
         self,
         tenant: Tenant,
@@ -232,26 +321,11 @@ class PresetEngine:
     
     def _get_chart_of_accounts_data(self, country_code: str, industry_code: Optional[str] = None) -> dict:
         """Get chart of accounts JSON data based on industry_code AND country_code"""
-        preset_paths = []
-        
-        # Priority 1: Industry-specific for country (e.g., manufacturing_MY.json)
-        if industry_code and country_code:
-            preset_paths.append(f"chart_of_accounts/{industry_code}_{country_code}.json")
-        
-        # Priority 2: Industry-specific (e.g., manufacturing.json)
-        if industry_code:
-            preset_paths.append(f"chart_of_accounts/{industry_code}.json")
-        
-        # Priority 3: Country-specific (e.g., MY.json)
-        preset_paths.append(f"chart_of_accounts/{country_code}.json")
-        
-        # Try each path in order
-        for path in preset_paths:
-            full_path = os.path.join(self.presets_base_path, path)
-            if os.path.exists(full_path):
-                logger.info(f"Loading Chart of Accounts from: {path}")
-                with open(full_path, 'r') as f:
-                    return json.load(f)
+        # Priority: manufacturing_MY.json → manufacturing.json → MY.json
+        path, data = get_catalog().find('chart_of_accounts', country_code, industry_code)
+        if data is not None:
+            logger.info(f"Loading Chart of Accounts from: {path}")
+            return thaw(data)
         
         # Fallback to default
         logger.warning(f"No Chart of Accounts preset found for country={country_code}, industry={industry_code}, using default")
@@ -308,18 +382,13 @@ class PresetEngine:
     
     def _get_tax_rates_data(self, country_code: str) -> dict:
         """Get tax rates JSON data with Malaysia-specific SST logic"""
-        preset_path = os.path.join(
-            self.presets_base_path,
-            f"tax_rates/{country_code}.json"
-        )
-        
-        if os.path.exists(preset_path):
-            with open(preset_path, 'r') as f:
-                data = json.load(f)
-                # Malaysia-specific: Ensure SST rules are present
-                if country_code == 'MY':
-                    data = self._inject_malaysia_sst_rules(data)
-                return data
+        data = get_catalog().get(f"tax_rates/{country_code}.json")
+        if data is not None:
+            data = thaw(data)
+            # Malaysia-specific: Ensure SST rules are present
+            if country_code == 'MY':
+                data = self._inject_malaysia_sst_rules(data)
+            return data
         
         # Default to GST/Standard rules for non-Malaysia countries
         if country_code != 'MY':
@@ -476,20 +545,17 @@ class PresetEngine:
             }
             
             categories = default_categories.get(country_code, ['Sales Tax', 'VAT'])
-            record_count = 0
-            
-            for category_name in categories:
-                TaxCategory.objects.get_or_create(
+            TaxCategory.objects.bulk_create([
+                TaxCategory(
                     tenant=tenant,
                     code=category_name.upper().replace(' ', '_'),
-                    defaults={
-                        'name': category_name,
-                        'is_active': True,
-                    }
+                    name=category_name,
+                    is_active=True,
                 )
-                record_count += 1
+                for category_name in categories
+            ])
             
-            return True, record_count
+            return True, len(categories)
         except Exception as e:
             logger.error(f"Failed to provision tax categories: {e}")
             return False, 0
@@ -675,14 +741,9 @@ class PresetEngine:
     def _provision_country_settings(self, tenant: Tenant, country_code: str) -> tuple[bool, int]:
         """Provision Country Settings preset"""
         try:
-            preset_path = os.path.join(
-                self.presets_base_path,
-                f"country_settings/{country_code}.json"
-            )
-            
-            if os.path.exists(preset_path):
-                with open(preset_path, 'r') as f:
-                    preset_data = json.load(f)
+            preset_data = get_catalog().get(f"country_settings/{country_code}.json")
+            if preset_data is not None:
+                preset_data = thaw(preset_data)
             else:
                 # Use default country settings
                 preset_data = {
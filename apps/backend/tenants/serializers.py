@@ -2,10 +2,11 @@
 Serializers for tenants app
 """
 from rest_framework import serializers
+from backend.fieldsets import SparseFieldsetMixin
 from .models import Tenant, TenantOnboardingProgress, TenantPreset, Company, TenantInvitation
 
 
-class TenantSerializer(serializers.ModelSerializer):
+class TenantSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Tenant model"""
     class Meta:
         model = Tenant
@@ -20,7 +21,7 @@ class TenantSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class TenantStatsSerializer(serializers.ModelSerializer):
+class TenantStatsSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for tenant statistics"""
     active_users_count = serializers.SerializerMethodField()
     can_add_user = serializers.SerializerMethodField()
@@ -43,7 +44,7 @@ class TenantStatsSerializer(serializers.ModelSerializer):
         return obj.can_add_user()
 
 
-class CompanySerializer(serializers.ModelSerializer):
+class CompanySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Company model"""
     class Meta:
         model = Company
@@ -56,7 +57,7 @@ class CompanySerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class TenantInvitationSerializer(serializers.ModelSerializer):
+class TenantInvitationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for TenantInvitation model"""
     is_expired = serializers.SerializerMethodField()
     
@@ -73,7 +74,7 @@ class TenantInvitationSerializer(serializers.ModelSerializer):
         return obj.is_expired()
 
 
-class TenantOnboardingSerializer(serializers.ModelSerializer):
+class TenantOnboardingSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for tenant onboarding data"""
     class Meta:
         model = Tenant
@@ -87,7 +88,7 @@ class TenantOnboardingSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'onboarding_status', 'onboarded_at']
 
 
-class TenantOnboardingProgressSerializer(serializers.ModelSerializer):
+class TenantOnboardingProgressSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for onboarding progress"""
     class Meta:
         model = TenantOnboardingProgress
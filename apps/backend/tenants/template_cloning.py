@@ -0,0 +1,239 @@
+"""
+Tenant Template Cloning
+Golden template tenants per (country, industry) whose preset rows are copied into new tenants
+
+A template is an inactive tenant provisioned once by PresetEngine. A new
+tenant of the same country and industry then gets the template's account
+types, chart of accounts, tax categories, tax codes, tax rates and
+currencies with one INSERT ... SELECT per table instead of replaying the
+preset files. Row ids are remapped deterministically from the new tenant's
+id (md5(tenant seed + old id)), so foreign keys between cloned rows, such as
+an account's parent or account type, are remapped by the same expression
+without a lookup table.
+
+Templates remember the preset catalog fingerprint they were built from and
+are ignored once the preset files change, until rebuilt with
+`manage.py build_tenant_templates`.
+"""
+import hashlib
+from typing import Dict, List, Optional, Tuple
+from django.apps import apps
+from django.db import NotSupportedError, connection, transaction
+from django.utils import timezone
+import logging
+
+from presets.catalog import get_catalog
+from .models import Tenant
+
+logger = logging.getLogger(__name__)
+
+# (result key, model) in insert order: referenced tables before the tables pointing at them
+CLONED_TABLES = (
+    ('account_types', 'accounting.GLAccountType'),
+    ('chart_of_accounts', 'accounting.ChartOfAccounts'),
+    ('tax_categories', 'invoicing.TaxCategory'),
+    ('tax_codes', 'invoicing.TaxCode'),
+    ('tax_rates', 'invoicing.TaxRate'),
+    ('currencies', 'fx_conversion.Currency'),
+)
+
+# SQLite has no md5(); this function is registered on the connection instead
+SQLITE_REMAP_FUNCTION = 'tenant_clone_id'
+
+
+def _sqlite_clone_id(seed, value):
+    if value is None:
+        return None
+    return hashlib.md5(f"{seed}{value}".encode('utf-8')).hexdigest()
+
+
+class TenantTemplateService:
+    """
+    Service for building golden template tenants and cloning them into new tenants
+    """
+
+    SLUG_PREFIX = 'preset-template'
+
+    @classmethod
+    def template_slug(cls, country_code: str, industry_code: Optional[str] = None) -> str:
+        return f"{cls.SLUG_PREFIX}-{country_code}-{industry_code or 'any'}".lower()
+
+    @classmethod
+    def find_template(cls, country_code: str, industry_code: Optional[str] = None) -> Optional[Tenant]:
+        """
+        Template for a country and industry, if one was built from the current preset files
+
+        Returns:
+            Template Tenant, or None when missing or stale
+        """
+        template = Tenant.objects.filter(slug=cls.template_slug(country_code, industry_code)).first()
+        if template is None:
+            return None
+        built_from = (template.settings or {}).get('preset_template', {}).get('fingerprint')
+        if built_from != get_catalog().fingerprint(country_code, industry_code):
+            logger.info(f"Tenant template {template.slug} is stale; provisioning from preset files")
+            return None
+        return template
+
+    @classmethod
+    def build_template(cls, country_code: str, industry_code: Optional[str] = None) -> Tuple[Tenant, Dict[str, int]]:
+        """
+        Create or rebuild the template tenant for a country and industry
+
+        Args:
+            country_code: ISO 3166-1 alpha-2 country code
+            industry_code: Optional industry classification code
+
+        Returns:
+            Tuple of (template tenant, rows per cloned table)
+        """
+        from authentication.models import User
+        from .preset_engine import PresetEngine
+
+        slug = cls.template_slug(country_code, industry_code)
+        with transaction.atomic():
+            template, _ = Tenant.objects.get_or_create(
+                slug=slug,
+                defaults={
+                    'name': f"Preset template {country_code} {industry_code or ''}".strip(),
+                    'is_active': False,
+                    'country_code': country_code,
+                    'industry_code': industry_code or '',
+                }
+            )
+            # Tax rates need a creator; the template's own inactive user owns them
+            owner = User.objects.filter(tenant=template, username=slug).first()
+            if owner is None:
+                owner = User(username=slug, email=f"{slug}@templates.invalid", tenant=template, is_active=False)
+                owner.set_unusable_password()
+                owner.save()
+
+            # Rebuild from scratch, dependants first (account types and tax codes are PROTECTed)
+            for _, label in reversed(CLONED_TABLES):
+                apps.get_model(label).objects.filter(tenant=template).delete()
+            PresetEngine().provision_tenant_presets(
+                template, country_code, industry_code, user=owner, use_template=False
+            )
+
+            template.settings = dict(template.settings or {})
+            template.settings['preset_template'] = {
+                'country_code': country_code,
+                'industry_code': industry_code,
+                'fingerprint': get_catalog().fingerprint(country_code, industry_code),
+                'built_at': timezone.now().isoformat(),
+            }
+            template.save(update_fields=['settings'])
+
+        counts = {
+            key: apps.get_model(label).objects.filter(tenant=template).count()
+            for key, label in CLONED_TABLES
+        }
+        logger.info(f"Built tenant template {slug}: {counts}")
+        return template, counts
+
+    @classmethod
+    def clone(cls, template: Tenant, tenant: Tenant, user=None) -> Dict[str, int]:
+        """
+        Copy a template's preset rows into a tenant, one INSERT ... SELECT per table
+
+        Tables the tenant already has rows in are left alone. Tables with a
+        required creator (tax rates) are skipped when no user is given.
+
+        Args:
+            template: Template tenant to copy from
+            tenant: New tenant
+            user: User recorded as created_by on the copied rows
+
+        Returns:
+            Dict of result key -> rows inserted
+
+        Raises:
+            NotSupportedError: The database has no id remapping expression
+        """
+        from search.indexing import SearchIndexService
+
+        if connection.vendor not in ('postgresql', 'sqlite'):
+            raise NotSupportedError(f"Tenant template cloning is not supported on {connection.vendor}")
+        labels = {label for _, label in CLONED_TABLES}
+        seed = tenant.pk.hex
+        now = timezone.now()
+        counts = {}
+
+        with transaction.atomic():
+            connection.ensure_connection()
+            if connection.vendor == 'sqlite':
+                connection.connection.create_function(SQLITE_REMAP_FUNCTION, 2, _sqlite_clone_id, deterministic=True)
+            with connection.cursor() as cursor:
+                for key, label in CLONED_TABLES:
+                    model = apps.get_model(label)
+                    statement = cls._clone_statement(model, labels, template, tenant, user, seed, now)
+                    if statement is None:
+                        logger.warning(f"Not cloning {key} into tenant {tenant.id}: no user to record as creator")
+                        counts[key] = 0
+                        continue
+                    cursor.execute(*statement)
+                    counts[key] = max(cursor.rowcount, 0)
+
+            if counts['chart_of_accounts']:
+                ChartOfAccounts = apps.get_model('accounting.ChartOfAccounts')
+                SearchIndexService.reindex_queryset('account', ChartOfAccounts.objects.filter(tenant=tenant))
+
+        logger.info(f"Cloned tenant template {template.slug} into tenant {tenant.id}: {counts}")
+        return counts
+
+    @staticmethod
+    def _clone_statement(model, labels, template, tenant, user, seed, now) -> Optional[Tuple[str, List]]:
+        """
+        INSERT ... SELECT copying a model's template rows, or None if it cannot be copied
+
+        Ids and foreign keys into other cloned tables are remapped, the tenant,
+        creator and timestamps are replaced, every other column is copied.
+        """
+        from authentication.models import User
+
+        qn = connection.ops.quote_name
+
+        def value(field, param):
+            # Postgres cannot infer a parameter's type inside a SELECT list
+            if connection.vendor == 'sqlite':
+                return '%s', [field.get_db_prep_value(param, connection)]
+            return f"CAST(%s AS {field.db_type(connection)})", [field.get_db_prep_value(param, connection)]
+
+        def remap(column):
+            if connection.vendor == 'sqlite':
+                return f"{SQLITE_REMAP_FUNCTION}(%s, {column})", [seed]
+            return f"CAST(md5(%s || CAST({column} AS text)) AS uuid)", [seed]
+
+        columns, selects, params = [], [], []
+        tenant_column = None
+        for field in model._meta.concrete_fields:
+            column = qn(field.column)
+            related = field.related_model if field.is_relation else None
+            if field.primary_key or (related is not None and related._meta.label in labels):
+                sql, field_params = remap(column)
+            elif related is Tenant:
+                tenant_column = field
+                sql, field_params = value(field, tenant.pk)
+            elif related is User:
+                if user is None and not field.null:
+                    return None
+                sql, field_params = value(field, user.pk if user is not None else None)
+            elif getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                sql, field_params = value(field, now)
+            else:
+                sql, field_params = column, []
+            columns.append(column)
+            selects.append(sql)
+            params.extend(field_params)
+
+        table = qn(model._meta.db_table)
+        where, where_params = value(tenant_column, template.pk)
+        exists, exists_params = value(tenant_column, tenant.pk)
+        tenant_sql = qn(tenant_column.column)
+        sql = (
+            f"INSERT INTO {table} ({', '.join(columns)}) "
+            f"SELECT {', '.join(selects)} FROM {table} "
+            f"WHERE {tenant_sql} = {where} "
+            f"AND NOT EXISTS (SELECT 1 FROM {table} WHERE {tenant_sql} = {exists})"
+        )
+        return sql, params + where_params + exists_params
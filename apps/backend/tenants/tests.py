@@ -350,3 +350,177 @@ class TenantPermissionTest(APITestCase):
         response = self.client.get(url)
         
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class PresetProvisioningTest(TestCase):
+    """Test bulk preset provisioning"""
+    
+    def setUp(self):
+        self.tenant = Tenant.objects.create(
+            name='Preset Tenant',
+            slug='preset_tenant',
+            is_active=True
+        )
+        Company.objects.create(
+            tenant=self.tenant,
+            name='Preset Company',
+            registration_number='123456789',
+            is_primary=True
+        )
+        self.user = User.objects.create_user(
+            username='presets',
+            email='presets@example.com',
+            password='testpass123',
+            tenant=self.tenant
+        )
+    
+    def test_account_levels_put_parents_first(self):
+        """Test rows are grouped by depth whatever order they arrive in"""
+        from presets.loader import account_levels
+        
+        rows = [
+            {'code': '1110', 'parent': '1100'},
+            {'code': '1100', 'parent': '1000'},
+            {'code': '1000', 'parent': None},
+            {'code': '2100', 'parent': '2000'},  # parent outside the rows
+        ]
+        levels = account_levels(rows)
+        
+        self.assertEqual(
+            [[row['code'] for row in level] for level in levels],
+            [['1000', '2100'], ['1100'], ['1110']]
+        )
+    
+    def test_provision_inserts_each_level_once(self):
+        """Test a MY tenant gets its full chart with one insert per level and two progress writes"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from accounting.models import ChartOfAccounts
+        from invoicing.models import TaxRate
+        from presets.loader import account_levels, flatten_account_tree, load_json_file
+        from .models import TenantOnboardingProgress
+        from .preset_engine import PresetEngine
+        
+        tree = flatten_account_tree(load_json_file('chart_of_accounts/MY.json')['accounts'])
+        with CaptureQueriesContext(connection) as queries:
+            result = PresetEngine().provision_tenant_presets(self.tenant, 'MY', user=self.user)
+        statements = [query['sql'] for query in queries.captured_queries]
+        
+        self.assertTrue(all(result['results'].values()), result['detailed_results'])
+        self.assertEqual(ChartOfAccounts.objects.filter(tenant=self.tenant).count(), len(tree))
+        self.assertEqual(
+            sum(sql.startswith('INSERT INTO "chart_of_accounts"') for sql in statements), len(account_levels(tree))
+        )
+        current_assets = ChartOfAccounts.objects.get(tenant=self.tenant, code='1100')
+        self.assertEqual(current_assets.parent.code, '1000')
+        self.assertEqual(current_assets.account_type.code, 'asset')
+        self.assertEqual(TaxRate.objects.filter(tenant=self.tenant).count(), 3)
+        
+        self.assertEqual(sum(sql.startswith('UPDATE "tenant_onboarding_progress"') for sql in statements), 2)
+        progress = TenantOnboardingProgress.objects.get(tenant=self.tenant)
+        self.assertEqual(set(progress.preset_progress), set(result['results']))
+        
+        # Provisioning again adds nothing
+        PresetEngine().provision_tenant_presets(self.tenant, 'MY', user=self.user)
+        self.assertEqual(ChartOfAccounts.objects.filter(tenant=self.tenant).count(), len(tree))
+    
+    def test_clone_from_template_inserts_each_table_once(self):
+        """Test a tenant cloned from a template gets remapped rows with one insert per table"""
+        from unittest.mock import patch
+        from django.apps import apps
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from accounting.models import ChartOfAccounts
+        from invoicing.models import TaxRate
+        from .preset_engine import PresetEngine
+        from .template_cloning import CLONED_TABLES, TenantTemplateService
+        
+        template, counts = TenantTemplateService.build_template('MY')
+        self.assertFalse(template.is_active)
+        self.assertEqual(TenantTemplateService.find_template('MY'), template)
+        
+        with CaptureQueriesContext(connection) as queries:
+            result = PresetEngine().provision_tenant_presets(self.tenant, 'MY', user=self.user)
+        statements = [query['sql'] for query in queries.captured_queries]
+        
+        self.assertTrue(all(result['results'].values()), result['detailed_results'])
+        self.assertEqual(result['detailed_results']['chart_of_accounts']['record_count'], counts['chart_of_accounts'])
+        for _, label in CLONED_TABLES:
+            table = apps.get_model(label)._meta.db_table
+            self.assertEqual(sum(sql.startswith(f'INSERT INTO "{table}"') for sql in statements), 1, table)
+        current_assets = ChartOfAccounts.objects.get(tenant=self.tenant, code='1100')
+        self.assertEqual(current_assets.parent.tenant_id, self.tenant.id)
+        self.assertEqual(current_assets.account_type.tenant_id, self.tenant.id)
+        self.assertEqual(current_assets.created_by, self.user)
+        self.assertEqual(TaxRate.objects.filter(tenant=self.tenant, tax_code__tenant=self.tenant).count(), 3)
+        
+        # Changed preset files make the template stale
+        with patch('presets.catalog.PresetCatalog.fingerprint', return_value='changed'):
+            self.assertIsNone(TenantTemplateService.find_template('MY'))
+
+
+class PresetCatalogTest(TestCase):
+    """Test the preset catalog is read once, indexed, and reloaded on change"""
+    
+    def tearDown(self):
+        from presets.catalog import PresetCatalog
+        PresetCatalog.reload()
+    
+    def test_lookups_share_one_snapshot(self):
+        """Test lookups follow the fallback order and hand out private copies"""
+        from unittest.mock import patch
+        from presets.catalog import PresetCatalog, get_catalog
+        from presets.loader import get_country_info, load_json_file
+        
+        catalog = get_catalog()
+        with patch('builtins.open') as mock_open:
+            self.assertIs(get_catalog(), catalog)
+            self.assertEqual(catalog.find('chart_of_accounts', 'MY', 'retail')[0], 'chart_of_accounts/MY.json')
+            self.assertEqual(catalog.find('currencies', 'MY')[0], 'currencies/SEA.json')
+            self.assertEqual(catalog.find('country_settings', 'XX'), (None, None))
+            self.assertEqual(get_country_info('my')['country_code'], 'MY')
+            chart = load_json_file('chart_of_accounts/MY.json')
+        mock_open.assert_not_called()
+        
+        chart['accounts'].clear()
+        self.assertTrue(load_json_file('chart_of_accounts/MY.json')['accounts'])
+        with self.assertRaises(TypeError):
+            catalog.get('chart_of_accounts/MY.json')['accounts'] = []
+        self.assertEqual(
+            PresetCatalog.candidates('chart_of_accounts', 'MY', 'retail'),
+            ['chart_of_accounts/retail_MY.json', 'chart_of_accounts/retail.json', 'chart_of_accounts/MY.json']
+        )
+    
+    def test_autoreload_picks_up_changed_files(self):
+        """Test a changed file is reloaded and an invalid one is left out"""
+        import json
+        import os
+        import tempfile
+        from pathlib import Path
+        from unittest.mock import patch
+        from django.test import override_settings
+        from presets.catalog import PresetCatalog
+        
+        root = Path(tempfile.mkdtemp())
+        (root / 'tax_rates').mkdir()
+        path = root / 'tax_rates' / 'MY.json'
+        path.write_text(json.dumps({'tax_rates': [{'code': 'SST'}]}))
+        (root / 'tax_rates' / 'SG.json').write_text('{"rates": "not a list"}')
+        
+        with patch('presets.catalog.PRESETS_DIR', root), \
+                override_settings(PRESET_CATALOG_AUTORELOAD=True, PRESET_CATALOG_RELOAD_INTERVAL=0):
+            catalog = PresetCatalog.reload()
+            self.assertEqual(catalog.get('tax_rates/MY.json')['tax_rates'][0]['code'], 'SST')
+            self.assertIsNone(catalog.get('tax_rates/SG.json'))
+            self.assertIs(PresetCatalog.current(), catalog)
+            
+            path.write_text(json.dumps({'tax_rates': [{'code': 'GST'}]}))
+            stat = path.stat()
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+            reloaded = PresetCatalog.current()
+            self.assertIsNot(reloaded, catalog)
+            self.assertEqual(reloaded.get('tax_rates/MY.json')['tax_rates'][0]['code'], 'GST')
+            
+            with override_settings(PRESET_CATALOG_AUTORELOAD=False):
+                path.unlink()
+                self.assertIs(PresetCatalog.current(), reloaded)
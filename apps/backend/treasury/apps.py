@@ -5,3 +5,5 @@ class TreasuryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'treasury'
 
+    def ready(self):
+        import treasury.signals  # noqa
@@ -0,0 +1,29 @@
+"""
+Treasury Signals
+Invalidate cached treasury snapshots when balances change
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from banking.models import BankAccount, BankTransaction
+from web3_integration.models import CryptoTransaction, CryptoWallet
+from .treasury_engine import TreasuryEngine
+
+
+@receiver(post_save, sender=BankAccount)
+@receiver(post_delete, sender=BankAccount)
+@receiver(post_save, sender=BankTransaction)
+@receiver(post_delete, sender=BankTransaction)
+@receiver(post_save, sender=CryptoWallet)
+@receiver(post_delete, sender=CryptoWallet)
+def invalidate_treasury_on_balance_change(sender, instance, **kwargs):
+    """Rebuild the tenant's treasury snapshot and series on next request"""
+    TreasuryEngine.invalidate(instance.tenant_id)
+
+
+@receiver(post_save, sender=CryptoTransaction)
+@receiver(post_delete, sender=CryptoTransaction)
+def invalidate_treasury_on_crypto_transaction(sender, instance, **kwargs):
+    """Crypto transactions are scoped to a tenant through their wallet"""
+    tenant_id = CryptoWallet.objects.filter(id=instance.wallet_id).values_list('tenant_id', flat=True).first()
+    if tenant_id:
+        TreasuryEngine.invalidate(tenant_id)
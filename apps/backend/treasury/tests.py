@@ -0,0 +1,127 @@
+"""
+Unit tests for treasury app
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from tenants.models import Tenant, Company
+from authentication.models import User
+from banking.models import BankAccount, BankTransaction
+from fx_conversion.models import CurrencyConfig
+from fx_conversion.rate_engine import FXRateEngine
+from web3_integration.models import CryptoWallet, TokenPrice
+from .treasury_engine import TreasuryEngine
+from .treasury_service import TreasuryService
+
+
+class TreasuryEngineTest(TestCase):
+    """Test FX-converted treasury snapshots and balance series"""
+
+    def setUp(self):
+        cache.clear()
+        FXRateEngine.invalidate()
+        self.tenant = Tenant.objects.create(
+            name='Treasury Tenant',
+            slug='treasury_tenant',
+            is_active=True
+        )
+        self.company = Company.objects.create(
+            tenant=self.tenant,
+            name='Treasury Company',
+            registration_number='123456789'
+        )
+        self.user = User.objects.create_user(
+            username='treasury',
+            email='treasury@example.com',
+            password='testpass123',
+            tenant=self.tenant,
+            role='accountant'
+        )
+        CurrencyConfig.objects.create(tenant=self.tenant, base_currency='USD', auto_update_rates=False)
+        FXRateEngine.ingest_rates(
+            self.tenant, 'USD', {'MYR': '4', 'EUR': '0.5'},
+            valid_from=datetime(2020, 1, 1, tzinfo=dt_timezone.utc)
+        )
+        self.today = timezone.localdate()
+        self.myr_account = BankAccount.objects.create(
+            tenant=self.tenant,
+            company=self.company,
+            name='MYR Operating',
+            account_number='1001',
+            bank_name='Maybank',
+            account_type='checking',
+            currency='MYR',
+            opening_balance=Decimal('400.00'),
+            current_balance=Decimal('800.00')
+        )
+        BankAccount.objects.create(
+            tenant=self.tenant,
+            company=self.company,
+            name='USD Reserve',
+            account_number='1002',
+            bank_name='Chase',
+            account_type='savings',
+            currency='USD',
+            opening_balance=Decimal('50.00'),
+            current_balance=Decimal('50.00')
+        )
+        BankTransaction.objects.create(
+            tenant=self.tenant,
+            bank_account=self.myr_account,
+            date=self.today - timedelta(days=2),
+            description='Customer receipt',
+            type='deposit',
+            transaction_type='deposit',
+            amount=Decimal('400.00'),
+            balance_after=Decimal('800.00'),
+            is_reconciled=True
+        )
+        CryptoWallet.objects.create(
+            tenant=self.tenant,
+            user=self.user,
+            name='Ops wallet',
+            address='0xabc',
+            network='ethereum',
+            wallet_type='metamask',
+            balance=Decimal('2')
+        )
+        TokenPrice.objects.create(token_address='', token_symbol='ETH', network='ethereum', price_usd=Decimal('1000'))
+
+    def test_unified_treasury_converts_to_base(self):
+        """Test fiat balances use the rate matrix and crypto uses token prices"""
+        treasury = TreasuryService.get_unified_treasury(self.tenant, 'EUR')
+
+        self.assertEqual(treasury['base_currency'], 'EUR')
+        # 800 MYR -> 100 EUR, 50 USD -> 25 EUR, 2 ETH * 1000 USD -> 1000 EUR
+        self.assertEqual(treasury['total_fiat_usd'], Decimal('125'))
+        self.assertEqual(treasury['total_crypto_usd'], Decimal('1000'))
+        self.assertEqual(treasury['unconverted_currencies'], [])
+
+    def test_snapshot_cached_until_balance_changes(self):
+        """Test repeat calls are served from cache and invalidated by saves"""
+        TreasuryService.get_unified_treasury(self.tenant)
+        with self.assertNumQueries(0):
+            TreasuryService.calculate_runway(self.tenant, Decimal('100'))
+
+        self.myr_account.current_balance = Decimal('1200.00')
+        self.myr_account.save()
+        treasury = TreasuryService.get_unified_treasury(self.tenant)
+        self.assertEqual(treasury['total_fiat_usd'], Decimal('350'))
+
+    def test_historical_balance_series(self):
+        """Test daily balances come from reconciled flows and are cached"""
+        history = TreasuryService.get_historical_balance(self.tenant, days=5)
+
+        self.assertEqual(len(history), 5)
+        self.assertEqual(history[0]['date'], self.today.isoformat())
+        # Before the deposit: 400 MYR + 50 USD; from the deposit on: 800 MYR + 50 USD
+        self.assertEqual(history[3]['fiat_balance'], Decimal('150'))
+        self.assertEqual(history[2]['fiat_balance'], Decimal('250'))
+        self.assertEqual(history[0]['balance_usd'], Decimal('2250'))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(len(TreasuryEngine.get_balance_series(self.tenant, 'USD', days=365)), 365)
@@ -0,0 +1,398 @@
+"""
+Treasury Aggregation Engine
+FX-converted treasury snapshots and daily balance series.
+
+Positions are valued with the tenant's cached rate matrix (fiat) and the
+latest TokenPrice per symbol (crypto). Daily history comes from one grouped
+query per source plus a running sum, and every result is cached per tenant,
+base currency and day so dashboards and 365-day charts reuse it.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Case, DecimalField, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Lower, TruncDate
+from django.utils import timezone
+from web3_integration.valuation import NATIVE_TOKENS
+import logging
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal('0')
+AMOUNT_FIELD = DecimalField(max_digits=30, decimal_places=18)
+
+
+class TreasuryEngine:
+    """Builds and caches treasury snapshots and balance series"""
+
+    SERIES_DAYS = 365
+
+    @staticmethod
+    def get_cache_ttl() -> int:
+        """Seconds a snapshot or series is reused before rebuilding"""
+        return getattr(settings, 'TREASURY_CACHE_TTL_SECONDS', 600)
+
+    @staticmethod
+    def _version_key(tenant_id) -> str:
+        return f"treasury:version:{tenant_id}"
+
+    @classmethod
+    def _cache_key(cls, kind: str, tenant, base_currency: str, day: date) -> str:
+        version = cache.get(cls._version_key(tenant.id), 0)
+        return f"treasury:{kind}:{tenant.id}:{version}:{base_currency}:{day.isoformat()}"
+
+    @classmethod
+    def invalidate(cls, tenant_id):
+        """Drop cached snapshots and series for a tenant"""
+        key = cls._version_key(tenant_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+    # Snapshot
+
+    @classmethod
+    def get_snapshot(cls, tenant, base_currency: str = 'USD', refresh: bool = False) -> Dict:
+        """
+        Get today's treasury positions valued in base currency
+
+        Returns:
+            dict: {
+                'base_currency': str,
+                'fiat': [...],
+                'crypto': [...],
+                'unconverted_currencies': [...],
+                'as_of': datetime,
+            }
+        """
+        base_currency = base_currency.upper()
+        key = cls._cache_key('snapshot', tenant, base_currency, timezone.localdate())
+        if not refresh:
+            snapshot = cache.get(key)
+            if snapshot is not None:
+                return snapshot
+
+        snapshot = cls.build_snapshot(tenant, base_currency)
+        cache.set(key, snapshot, cls.get_cache_ttl())
+        return snapshot
+
+    @classmethod
+    def build_snapshot(cls, tenant, base_currency: str) -> Dict:
+        from fx_conversion.rate_engine import FXRateEngine
+
+        matrix = FXRateEngine.get_rate_matrix(tenant)
+        unconverted = set()
+        fiat = cls._fiat_positions(tenant, base_currency, matrix, unconverted)
+        crypto = cls._crypto_positions(tenant, base_currency, matrix, unconverted)
+        return {
+            'base_currency': base_currency,
+            'fiat': fiat,
+            'crypto': crypto,
+            'unconverted_currencies': sorted(unconverted),
+            'as_of': timezone.now(),
+        }
+
+    @staticmethod
+    def _fiat_positions(tenant, base_currency: str, matrix, unconverted: set) -> List[Dict]:
+        from banking.models import BankAccount
+
+        accounts = BankAccount.objects.filter(tenant=tenant, is_active=True).values(
+            'id', 'name', 'currency', 'current_balance', 'bank_name', 'account_type',
+            'is_reconciled', 'last_reconciliation_date',
+        )
+
+        positions = []
+        for account in accounts:
+            balance = account['current_balance']
+            converted = matrix.convert(balance, account['currency'], base_currency)
+            if converted is None:
+                unconverted.add(account['currency'])
+                converted = ZERO
+            last_reconciled = account['last_reconciliation_date']
+            positions.append({
+                'id': str(account['id']),
+                'name': account['name'],
+                'type': 'fiat',
+                'currency': account['currency'],
+                'balance': balance,
+                'balance_usd': converted,
+                'bank_name': account['bank_name'],
+                'account_type': account['account_type'],
+                'is_reconciled': account['is_reconciled'],
+                'last_reconciliation_date': last_reconciled.isoformat() if last_reconciled else None,
+            })
+        return positions
+
+    @classmethod
+    def _crypto_positions(cls, tenant, base_currency: str, matrix, unconverted: set) -> List[Dict]:
+        from web3_integration.models import CryptoWallet
+
+        wallets = list(CryptoWallet.objects.filter(tenant=tenant, is_active=True).values(
+            'id', 'name', 'network', 'address', 'wallet_type', 'balance', 'last_sync',
+        ))
+        if not wallets:
+            return []
+
+        prices = cls.get_token_prices_usd({NATIVE_TOKENS.get(w['network'], w['network'].upper()) for w in wallets})
+        usd_rate = matrix.rate('USD', base_currency)
+        if usd_rate is None:
+            unconverted.add('USD')
+
+        positions = []
+        for wallet in wallets:
+            symbol = NATIVE_TOKENS.get(wallet['network'], wallet['network'].upper())
+            price_usd = prices.get(symbol)
+            balance_usd = wallet['balance'] * price_usd if price_usd else ZERO
+            balance_base = balance_usd * usd_rate if usd_rate is not None else ZERO
+            positions.append({
+                'id': str(wallet['id']),
+                'name': wallet['name'],
+                'type': 'crypto',
+                'network': wallet['network'],
+                'address': wallet['address'],
+                'wallet_type': wallet['wallet_type'],
+                'total_balance_usd': balance_base,
+                'tokens': [{
+                    'symbol': symbol,
+                    'balance': wallet['balance'],
+                    'balance_usd': balance_base,
+                    'price_usd': float(price_usd) if price_usd else 0,
+                }],
+                'last_sync': wallet['last_sync'].isoformat() if wallet['last_sync'] else None,
+            })
+        return positions
+
+    @staticmethod
+    def get_token_prices_usd(symbols: Iterable[str]) -> Dict[str, Decimal]:
+        """Latest USD price per token symbol, in one query"""
+        from web3_integration.models import TokenPrice
+
+        symbols = [symbol for symbol in symbols if symbol]
+        if not symbols:
+            return {}
+        latest = TokenPrice.objects.filter(
+            token_symbol=OuterRef('token_symbol')
+        ).order_by('-timestamp').values('id')[:1]
+        return dict(
+            TokenPrice.objects.filter(token_symbol__in=symbols, id=Subquery(latest)).values_list(
+                'token_symbol', 'price_usd'
+            )
+        )
+
+    # Historical series
+
+    @classmethod
+    def get_balance_series(cls, tenant, base_currency: str = 'USD', days: int = 30,
+                           refresh: bool = False) -> List[Dict]:
+        """
+        Get daily closing balances in base currency, oldest first
+
+        Series of up to SERIES_DAYS days are sliced from one cached
+        SERIES_DAYS series per tenant, base currency and day.
+        """
+        base_currency = base_currency.upper()
+        today = timezone.localdate()
+        if days > cls.SERIES_DAYS:
+            return cls.build_balance_series(tenant, base_currency, today, days)
+
+        key = cls._cache_key('series', tenant, base_currency, today)
+        series = None if refresh else cache.get(key)
+        if series is None:
+            series = cls.build_balance_series(tenant, base_currency, today, cls.SERIES_DAYS)
+            cache.set(key, series, cls.get_cache_ttl())
+        return series[-days:] if days > 0 else []
+
+    @classmethod
+    def build_balance_series(cls, tenant, base_currency: str, end: date, days: int) -> List[Dict]:
+        """Compute daily fiat and crypto balances for the `days` days ending on `end`"""
+        from fx_conversion.historical import HistoricalRateIndex
+        from fx_conversion.rate_engine import FXRateEngine
+
+        start = end - timedelta(days=days - 1)
+        dates = [start + timedelta(days=offset) for offset in range(days)]
+
+        fiat = cls._fiat_daily_balances(tenant, start, end)
+        crypto = cls._crypto_daily_balances(tenant, start)
+        prices = cls._daily_token_prices_usd(crypto.keys(), start, end)
+
+        matrix = FXRateEngine.get_rate_matrix(tenant)
+        index = HistoricalRateIndex.load(tenant, currencies=list(fiat) + ['USD', base_currency], until=end)
+
+        def rate(currency, day):
+            value = index.rate_on(currency, base_currency, day)
+            # Days before the first stored rate use today's rate
+            return value if value is not None else matrix.rate(currency, base_currency)
+
+        series = []
+        for position, day in enumerate(dates):
+            fiat_total = ZERO
+            for currency, balances in fiat.items():
+                day_rate = rate(currency, day)
+                if day_rate is not None:
+                    fiat_total += balances[position] * day_rate
+
+            crypto_total = ZERO
+            usd_rate = rate('USD', day)
+            if usd_rate is not None:
+                for symbol, balances in crypto.items():
+                    price = prices[symbol][position]
+                    if price:
+                        crypto_total += balances[position] * price * usd_rate
+
+            series.append({
+                'date': day.isoformat(),
+                'fiat_balance': fiat_total,
+                'crypto_balance': crypto_total,
+                'balance_usd': fiat_total + crypto_total,
+            })
+        return series
+
+    @staticmethod
+    def _fiat_daily_balances(tenant, start: date, end: date) -> Dict[str, List[Decimal]]:
+        """
+        Daily reconciled balance per currency
+
+        Mirrors BankAccount.update_balance: opening balance plus reconciled
+        deposits minus every other reconciled transaction.
+        """
+        from banking.models import BankAccount, BankTransaction
+
+        opening = dict(
+            BankAccount.objects.filter(tenant=tenant, is_active=True).values('currency').annotate(
+                total=Sum('opening_balance')
+            ).values_list('currency', 'total')
+        )
+        flows = BankTransaction.objects.filter(
+            tenant=tenant,
+            is_reconciled=True,
+            bank_account__is_active=True,
+            date__lte=end,
+        ).values('bank_account__currency', 'date').annotate(
+            net=Sum(Case(
+                When(type='deposit', then=F('amount')),
+                default=-F('amount'),
+                output_field=DecimalField(max_digits=15, decimal_places=2),
+            ))
+        ).order_by('bank_account__currency', 'date').values_list('bank_account__currency', 'date', 'net')
+
+        daily: Dict[str, Dict[date, Decimal]] = {}
+        carried: Dict[str, Decimal] = {currency: total or ZERO for currency, total in opening.items()}
+        for currency, day, net in flows:
+            if day < start:
+                carried[currency] = carried.get(currency, ZERO) + net
+            else:
+                daily.setdefault(currency, {})[day] = net
+
+        days = (end - start).days + 1
+        balances = {}
+        for currency, balance in carried.items():
+            by_day = daily.get(currency, {})
+            running = []
+            for offset in range(days):
+                balance += by_day.get(start + timedelta(days=offset), ZERO)
+                running.append(balance)
+            balances[currency] = running
+        return balances
+
+    @staticmethod
+    def _crypto_daily_balances(tenant, start: date) -> Dict[str, List[Decimal]]:
+        """
+        Daily native-token balance per symbol
+
+        Works back from each wallet's synced balance by undoing confirmed
+        native-token transfers made after each day. Gas fees are not tracked
+        on CryptoTransaction rows, so they are not undone.
+        """
+        from web3_integration.models import CryptoTransaction, CryptoWallet
+
+        wallets = list(CryptoWallet.objects.filter(tenant=tenant, is_active=True).values_list(
+            'id', 'network', 'balance'
+        ))
+        if not wallets:
+            return {}
+        wallet_symbols = {wallet_id: NATIVE_TOKENS.get(network, network.upper()) for wallet_id, network, _ in wallets}
+
+        current: Dict[str, Decimal] = {}
+        for wallet_id, network, balance in wallets:
+            symbol = wallet_symbols[wallet_id]
+            current[symbol] = current.get(symbol, ZERO) + balance
+
+        flows = CryptoTransaction.objects.filter(
+            wallet__tenant=tenant,
+            wallet__is_active=True,
+            status='confirmed',
+            created_at__date__gt=start,
+        ).annotate(
+            wallet_address=Lower('wallet__address'),
+            to_lower=Lower('to_address'),
+            from_lower=Lower('from_address'),
+            day=TruncDate('created_at'),
+        ).values('wallet_id', 'token_symbol', 'day').annotate(
+            net=Sum(Case(
+                When(to_lower=F('wallet_address'), then=F('amount')),
+                When(from_lower=F('wallet_address'), then=-F('amount')),
+                default=Value(ZERO),
+                output_field=AMOUNT_FIELD,
+            ))
+        ).values_list('wallet_id', 'token_symbol', 'day', 'net')
+
+        # Net flow per symbol on each day after `start`
+        later: Dict[str, Dict[date, Decimal]] = {}
+        for wallet_id, token_symbol, day, net in flows:
+            symbol = wallet_symbols.get(wallet_id)
+            if symbol is None or (token_symbol or '').upper() != symbol or not net:
+                continue
+            by_day = later.setdefault(symbol, {})
+            by_day[day] = by_day.get(day, ZERO) + net
+
+        today = timezone.localdate()
+        days = (today - start).days + 1
+        balances = {}
+        for symbol, balance in current.items():
+            by_day = later.get(symbol, {})
+            running = [ZERO] * days
+            # Walk back from today: the close of day d excludes flows after d
+            for offset in range(days - 1, -1, -1):
+                running[offset] = balance
+                balance -= by_day.get(start + timedelta(days=offset), ZERO)
+            balances[symbol] = running
+        return balances
+
+    @classmethod
+    def _daily_token_prices_usd(cls, symbols: Iterable[str], start: date, end: date) -> Dict[str, List[Optional[Decimal]]]:
+        """Average USD price per symbol and day, carrying the last known price forward"""
+        from web3_integration.models import TokenPrice
+
+        symbols = list(symbols)
+        if not symbols:
+            return {}
+
+        rows = TokenPrice.objects.filter(
+            token_symbol__in=symbols,
+            timestamp__date__gte=start,
+            timestamp__date__lte=end,
+        ).annotate(day=TruncDate('timestamp')).values('token_symbol', 'day').annotate(
+            price=Avg('price_usd')
+        ).values_list('token_symbol', 'day', 'price')
+
+        by_symbol: Dict[str, Dict[date, Decimal]] = {}
+        for symbol, day, price in rows:
+            by_symbol.setdefault(symbol, {})[day] = price
+
+        latest = cls.get_token_prices_usd(symbols)
+        days = (end - start).days + 1
+        prices = {}
+        for symbol in symbols:
+            by_day = by_symbol.get(symbol, {})
+            # Before the first in-window price, fall back to the latest known price
+            first = min(by_day) if by_day else None
+            price = by_day[first] if first else latest.get(symbol)
+            series = []
+            for offset in range(days):
+                price = by_day.get(start + timedelta(days=offset), price)
+                series.append(price)
+            prices[symbol] = series
+        return prices
@@ -2,12 +2,13 @@
 Unified Treasury Service
 Aggregates fiat and crypto balances into a unified treasury view
 """
-from django.db.models import Sum, Q
 from decimal import Decimal
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, List, Optional
 import logging
 
+from .treasury_engine import TreasuryEngine
+
 logger = logging.getLogger(__name__)
 
 # Stablecoin addresses (for USD conversion)
@@ -34,10 +35,13 @@ class TreasuryService:
     """Service for unified treasury aggregation"""
     
     @staticmethod
-    def get_unified_treasury(tenant, base_currency: str = 'USD') -> Dict:
+    def get_unified_treasury(tenant, base_currency: str = 'USD', refresh: bool = False) -> Dict:
         """
         Get unified treasury view aggregating fiat and crypto
-        
+
+        Balances are converted to base_currency (the *_usd keys hold
+        base-currency values) from a snapshot cached per tenant and day.
+
         Returns:
             dict: {
                 'total_balance_usd': Decimal,
@@ -48,18 +52,19 @@ class TreasuryService:
                 'stablecoin_equivalent': Decimal,
             }
         """
-        # Get fiat balances
-        fiat_data = TreasuryService._get_fiat_balances(tenant)
-        
-        # Get crypto balances
-        crypto_data = TreasuryService._get_crypto_balances(tenant)
+        snapshot = TreasuryEngine.get_snapshot(tenant, base_currency, refresh=refresh)
+        fiat_data = snapshot['fiat']
+        crypto_data = [
+            dict(wallet, is_stablecoin=TreasuryService._is_stablecoin(wallet['network'], wallet['address']))
+            for wallet in snapshot['crypto']
+        ]
         
         # Calculate totals
         total_fiat_usd = sum(
-            acc.get('balance_usd', Decimal('0')) for acc in fiat_data
+            (acc.get('balance_usd', Decimal('0')) for acc in fiat_data), Decimal('0')
         )
         total_crypto_usd = sum(
-            wallet.get('balance_usd', Decimal('0')) for wallet in crypto_data
+            (wallet.get('total_balance_usd', Decimal('0')) for wallet in crypto_data), Decimal('0')
         )
         total_balance_usd = total_fiat_usd + total_crypto_usd
         
@@ -73,6 +78,7 @@ class TreasuryService:
         stablecoin_equivalent = TreasuryService._calculate_stablecoin_equivalent(crypto_data)
         
         return {
+            'base_currency': snapshot['base_currency'],
             'total_balance_usd': total_balance_usd,
             'total_fiat_usd': total_fiat_usd,
             'total_crypto_usd': total_crypto_usd,
@@ -81,98 +87,10 @@ class TreasuryService:
             'crypto_breakdown': crypto_data,
             'by_currency': by_currency,
             'by_network': by_network,
-            'last_updated': datetime.now().isoformat(),
+            'unconverted_currencies': snapshot['unconverted_currencies'],
+            'last_updated': snapshot['as_of'].isoformat(),
         }
     
-    @staticmethod
-    def _get_fiat_balances(tenant) -> List[Dict]:
-        """Get fiat account balances"""
-        try:
-            from banking.models import BankAccount
-            
-            accounts = BankAccount.objects.filter(
-                tenant=tenant,
-                is_active=True
-            )
-            
-            breakdown = []
-            for account in accounts:
-                # Convert to USD (simplified - would use FX rates)
-                balance_usd = account.current_balance
-                if account.currency != 'USD':
-                    # TODO: Use real FX conversion
-                    balance_usd = account.current_balance  # Placeholder
-                
-                breakdown.append({
-                    'id': str(account.id),
-                    'name': account.name,
-                    'type': 'fiat',
-                    'currency': account.currency,
-                    'balance': account.current_balance,
-                    'balance_usd': balance_usd,
-                    'bank_name': account.bank_name,
-                    'account_type': account.account_type,
-                    'is_reconciled': account.is_reconciled,
-                    'last_reconciliation_date': account.last_reconciliation_date.isoformat() if account.last_reconciliation_date else None,
-                })
-            
-            return breakdown
-        except Exception as e:
-            logger.error(f"Error getting fiat balances: {e}")
-            return []
-    
-    @staticmethod
-    def _get_crypto_balances(tenant) -> List[Dict]:
-        """Get crypto wallet balances"""
-        try:
-            from web3_integration.models import CryptoWallet, CryptoToken
-            
-            wallets = CryptoWallet.objects.filter(
-                tenant=tenant,
-                is_active=True
-            )
-            
-            breakdown = []
-            for wallet in wallets:
-                # Get token balances for this wallet
-                tokens = CryptoToken.objects.filter(wallet=wallet)
-                
-                wallet_total_usd = Decimal('0')
-                token_breakdown = []
-                
-                for token in tokens:
-                    # Convert to USD (simplified - would use price feeds)
-                    balance_usd = token.balance * token.price_usd if token.price_usd else Decimal('0')
-                    wallet_total_usd += balance_usd
-                    
-                    token_breakdown.append({
-                        'symbol': token.symbol,
-                        'balance': token.balance,
-                        'balance_usd': balance_usd,
-                        'price_usd': float(token.price_usd) if token.price_usd else 0,
-                    })
-                
-                # Check if stablecoin
-                is_stablecoin = TreasuryService._is_stablecoin(wallet.network, wallet.address)
-                
-                breakdown.append({
-                    'id': str(wallet.id),
-                    'name': wallet.name,
-                    'type': 'crypto',
-                    'network': wallet.network,
-                    'address': wallet.address,
-                    'wallet_type': wallet.wallet_type,
-                    'total_balance_usd': wallet_total_usd,
-                    'tokens': token_breakdown,
-                    'is_stablecoin': is_stablecoin,
-                    'last_sync': wallet.last_sync.isoformat() if wallet.last_sync else None,
-                })
-            
-            return breakdown
-        except Exception as e:
-            logger.error(f"Error getting crypto balances: {e}")
-            return []
-    
     @staticmethod
     def _is_stablecoin(network: str, address: str) -> bool:
         """Check if address is a known stablecoin"""
@@ -262,26 +180,15 @@ class TreasuryService:
         return stablecoin_value
     
     @staticmethod
-    def get_historical_balance(tenant, days: int = 30) -> List[Dict]:
-        """Get historical treasury balance"""
-        # This would query historical transaction data
-        # For now, return placeholder
-        historical_data = []
-        
-        for i in range(days):
-            date = datetime.now() - timedelta(days=i)
-            # TODO: Calculate historical balance from transactions
-            historical_data.append({
-                'date': date.date().isoformat(),
-                'balance_usd': Decimal('0'),  # Placeholder
-            })
-        
-        return historical_data
+    def get_historical_balance(tenant, days: int = 30, base_currency: str = 'USD') -> List[Dict]:
+        """Get daily treasury balance, most recent day first"""
+        series = TreasuryEngine.get_balance_series(tenant, base_currency, days)
+        return list(reversed(series))
     
     @staticmethod
-    def calculate_runway(tenant, monthly_burn_rate: Decimal) -> Dict:
+    def calculate_runway(tenant, monthly_burn_rate: Decimal, base_currency: str = 'USD') -> Dict:
         """Calculate runway in months based on treasury and burn rate"""
-        treasury = TreasuryService.get_unified_treasury(tenant)
+        treasury = TreasuryService.get_unified_treasury(tenant, base_currency)
         total_balance = Decimal(str(treasury['total_balance_usd']))
         
         if monthly_burn_rate <= 0:
@@ -30,15 +30,18 @@ def unified_treasury(request):
 def historical_balance(request):
     """Get historical treasury balance"""
     days = int(request.query_params.get('days', 30))
+    base_currency = request.query_params.get('currency', 'USD')
     
     historical_data = TreasuryService.get_historical_balance(
         tenant=request.user.tenant,
-        days=days
+        days=days,
+        base_currency=base_currency
     )
     
     return Response({
         'historical_balance': historical_data,
         'period_days': days,
+        'base_currency': base_currency.upper(),
     })
 
 
@@ -64,7 +67,8 @@ def treasury_runway(request):
     
     runway_data = TreasuryService.calculate_runway(
         tenant=request.user.tenant,
-        monthly_burn_rate=burn_rate
+        monthly_burn_rate=burn_rate,
+        base_currency=request.query_params.get('currency', 'USD')
     )
     
     return Response(runway_data)
@@ -0,0 +1,188 @@
+"""
+Chain Indexing
+Ingests wallet transfers from a chain indexer into CryptoTransaction rows.
+
+ChainIndexer is the pluggable source: a backend implements head_block() and
+fetch_transfers() for an address over a block range. ingest() walks a
+wallet's unindexed blocks in CHAIN_INDEXER_BATCH_BLOCKS windows; each
+window's new transfers are bulk-inserted and the wallet's indexed_block
+checkpoint advanced in one transaction, so an interrupted run resumes after
+the last complete window and re-running a window inserts nothing twice.
+
+FixtureChainIndexer serves transfers from a local JSON fixture (or dict) for
+development and tests; register other backends in CHAIN_INDEXERS.
+"""
+import json
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+import logging
+
+from .models import CryptoTransaction, CryptoWallet
+
+logger = logging.getLogger(__name__)
+
+
+def _timestamp(value) -> Optional[datetime]:
+    """Block time from an ISO string or unix seconds, as an aware datetime"""
+    if value in (None, ''):
+        return None
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, tz=dt_timezone.utc)
+    moment = value if isinstance(value, datetime) else parse_datetime(str(value))
+    if moment is not None and timezone.is_naive(moment):
+        moment = timezone.make_aware(moment, dt_timezone.utc)
+    return moment
+
+
+class ChainIndexer:
+    """
+    Source of confirmed wallet transfers
+
+    fetch_transfers() returns dicts with:
+        tx_hash, block_number, block_hash, timestamp, from, to, amount,
+        token_symbol, token_address, token_name, gas_fee, status
+    """
+
+    NAME = ''
+    CONFIRMATIONS = 12  # Blocks below the head treated as final
+
+    def __init__(self, batch_blocks: Optional[int] = None):
+        self.batch_blocks = max(1, batch_blocks or settings.CHAIN_INDEXER_BATCH_BLOCKS)
+
+    def head_block(self, network: str) -> int:
+        """Latest block number on a network"""
+        raise NotImplementedError
+
+    def fetch_transfers(self, network: str, address: str, from_block: int, to_block: int) -> List[Dict]:
+        """Transfers to or from an address in blocks from_block..to_block (inclusive)"""
+        raise NotImplementedError
+
+    def ingest(self, wallet: CryptoWallet, to_block: Optional[int] = None) -> Dict:
+        """
+        Ingest a wallet's transfers since its checkpoint
+
+        Args:
+            wallet: Wallet to index
+            to_block: Last block to index (default: the head less CONFIRMATIONS)
+
+        Returns:
+            dict: success, from_block, to_block, batches, transfers, created (and error)
+        """
+        start = (wallet.indexed_block + 1) if wallet.indexed_block is not None else 0
+        result = {'success': True, 'from_block': start, 'to_block': None, 'batches': 0, 'transfers': 0, 'created': 0}
+        try:
+            if to_block is None:
+                to_block = self.head_block(wallet.network) - self.CONFIRMATIONS
+            result['to_block'] = to_block
+            while start <= to_block:
+                end = min(start + self.batch_blocks - 1, to_block)
+                transfers = self.fetch_transfers(wallet.network, wallet.address, start, end)
+                result['created'] += self._write_batch(wallet, transfers, end)
+                result['transfers'] += len(transfers)
+                result['batches'] += 1
+                start = end + 1
+        except Exception as e:
+            logger.error(f"Error indexing wallet {wallet.id} at block {start}: {e}")
+            result.update(success=False, error=str(e))
+
+        if result['created']:
+            from purchase.vendor_verification_service import VendorVerificationService
+            from treasury.treasury_engine import TreasuryEngine
+            TreasuryEngine.invalidate(wallet.tenant_id)
+            VendorVerificationService.invalidate(wallet.tenant_id)
+        return result
+
+    def ingest_wallets(self, wallets: Iterable[CryptoWallet], to_block: Optional[int] = None) -> Dict[str, Dict]:
+        """Ingest several wallets, keyed by wallet id"""
+        return {str(wallet.id): self.ingest(wallet, to_block) for wallet in wallets}
+
+    def _write_batch(self, wallet: CryptoWallet, transfers: List[Dict], to_block: int) -> int:
+        """Insert a window's new transfers and advance the checkpoint past it"""
+        rows = {}
+        for transfer in transfers:
+            rows.setdefault(transfer['tx_hash'], transfer)
+        with transaction.atomic():
+            # tx_hash is unique across wallets: transfers already recorded are skipped
+            known = set(CryptoTransaction.objects.filter(tx_hash__in=list(rows)).values_list('tx_hash', flat=True))
+            created = CryptoTransaction.objects.bulk_create([
+                self._transaction(wallet, transfer) for tx_hash, transfer in rows.items() if tx_hash not in known
+            ])
+            CryptoWallet.objects.filter(pk=wallet.pk).update(indexed_block=to_block, last_sync=timezone.now())
+        wallet.indexed_block = to_block
+        return len(created)
+
+    @staticmethod
+    def _transaction(wallet: CryptoWallet, transfer: Dict) -> CryptoTransaction:
+        gas_fee = transfer.get('gas_fee')
+        return CryptoTransaction(
+            wallet=wallet,
+            tx_hash=transfer['tx_hash'],
+            from_address=transfer.get('from', ''),
+            to_address=transfer.get('to', ''),
+            amount=Decimal(str(transfer['amount'])),
+            token_symbol=transfer.get('token_symbol', ''),
+            token_address=transfer.get('token_address', ''),
+            token_name=transfer.get('token_name', ''),
+            gas_fee=Decimal(str(gas_fee)) if gas_fee not in (None, '') else None,
+            status=transfer.get('status', 'confirmed'),
+            block_number=transfer['block_number'],
+            block_hash=transfer.get('block_hash', ''),
+            block_timestamp=_timestamp(transfer.get('timestamp')),
+            transaction_type='transfer',
+        )
+
+
+class FixtureChainIndexer(ChainIndexer):
+    """
+    Transfers served from a local fixture
+
+    The fixture maps a network to its head block and transfers:
+        {"ethereum": {"head": 1200, "transfers": [{"tx_hash": ..., "block_number": ..., ...}]}}
+    Every fetch_transfers() call is kept in requests as (network, address, from_block, to_block).
+    """
+
+    NAME = 'fixture'
+    CONFIRMATIONS = 0
+
+    def __init__(self, chains: Optional[Dict] = None, path: Optional[str] = None, batch_blocks: Optional[int] = None):
+        super().__init__(batch_blocks)
+        if chains is None:
+            path = path or settings.CHAIN_INDEXER_FIXTURE
+            chains = {}
+            if path:
+                with open(path) as handle:
+                    chains = json.load(handle)
+        self.chains = chains
+        self.requests = []
+
+    def head_block(self, network):
+        chain = self.chains.get(network, {})
+        return chain.get('head', max((t['block_number'] for t in chain.get('transfers', [])), default=0))
+
+    def fetch_transfers(self, network, address, from_block, to_block):
+        self.requests.append((network, address, from_block, to_block))
+        address = address.lower()
+        return sorted(
+            (t for t in self.chains.get(network, {}).get('transfers', [])
+             if from_block <= t['block_number'] <= to_block
+             and address in (t.get('from', '').lower(), t.get('to', '').lower())),
+            key=lambda t: t['block_number']
+        )
+
+
+CHAIN_INDEXERS = {
+    'fixture': FixtureChainIndexer,
+}
+
+
+def get_chain_indexer(name: Optional[str] = None, **kwargs) -> ChainIndexer:
+    """Indexer backend by name (default: settings.CHAIN_INDEXER)"""
+    name = name or settings.CHAIN_INDEXER
+    if name not in CHAIN_INDEXERS:
+        raise ValueError(f"Unknown chain indexer: {name}")
+    return CHAIN_INDEXERS[name](**kwargs)
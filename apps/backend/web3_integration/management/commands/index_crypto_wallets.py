@@ -0,0 +1,38 @@
+"""
+Management command to ingest wallet transfers from the chain indexer
+Usage: python manage.py index_crypto_wallets [--wallet <id>] [--tenant <id>] [--to-block N] [--indexer fixture]
+
+Each wallet resumes from its indexed_block checkpoint.
+"""
+from django.core.management.base import BaseCommand
+
+from web3_integration.indexer import get_chain_indexer
+from web3_integration.models import CryptoWallet
+
+
+class Command(BaseCommand):
+    help = 'Ingest crypto wallet transfers in block-range batches since each wallet\'s checkpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--wallet', help='Index only this wallet id')
+        parser.add_argument('--tenant', help='Index only this tenant\'s wallets')
+        parser.add_argument('--to-block', type=int, help='Last block to index (default: the confirmed head)')
+        parser.add_argument('--indexer', help='Indexer backend (default: settings.CHAIN_INDEXER)')
+
+    def handle(self, *args, **options):
+        wallets = CryptoWallet.objects.filter(is_active=True)
+        if options['wallet']:
+            wallets = wallets.filter(pk=options['wallet'])
+        if options['tenant']:
+            wallets = wallets.filter(tenant_id=options['tenant'])
+        wallets = list(wallets)
+
+        indexer = get_chain_indexer(options['indexer'])
+        results = indexer.ingest_wallets(wallets, to_block=options['to_block'])
+        for wallet in wallets:
+            result = results[str(wallet.id)]
+            status = 'ok' if result['success'] else f"failed ({result['error']})"
+            self.stdout.write(
+                f"{wallet}: {status} - blocks {result['from_block']}..{result['to_block']}, "
+                f"{result['created']} new of {result['transfers']} transfers in {result['batches']} batches"
+            )
@@ -0,0 +1,33 @@
+# Generated by Django 4.2 on 2026-10-19 14:49
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web3_integration', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cryptotransaction',
+            name='block_timestamp',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='cryptowallet',
+            name='indexed_block',
+            field=models.BigIntegerField(blank=True, help_text='Last block whose transfers have been ingested by the chain indexer', null=True),
+        ),
+        migrations.AlterField(
+            model_name='tokenprice',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='tokenprice',
+            index=models.Index(fields=['token_symbol', 'network', 'timestamp'], name='token_prices_series_idx'),
+        ),
+    ]
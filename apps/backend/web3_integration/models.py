@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 import uuid
 from decimal import Decimal
 
@@ -33,6 +34,9 @@ class CryptoWallet(models.Model):
     is_primary = models.BooleanField(default=False)
     balance = models.DecimalField(max_digits=30, decimal_places=18, default=0)
     last_sync = models.DateTimeField(null=True, blank=True)
+    indexed_block = models.BigIntegerField(
+        null=True, blank=True, help_text='Last block whose transfers have been ingested by the chain indexer'
+    )
     public_key = models.CharField(max_length=255, blank=True)
     encrypted_private_key = models.TextField(blank=True)  # Encrypted private key
     mnemonic_phrase = models.TextField(blank=True)  # Encrypted mnemonic phrase
@@ -60,9 +64,9 @@ class CryptoWallet(models.Model):
         super().save(*args, **kwargs)
 
     def get_balance_usd(self):
-        """Get wallet balance in USD"""
-        # This would need integration with price APIs
-        return self.balance * 0  # Placeholder
+        """Get wallet balance in USD at the latest native-token price (0 if unpriced)"""
+        from .valuation import CryptoValuationService
+        return CryptoValuationService.wallet_balance_usd(self) or Decimal('0')
 
 
 class CryptoTransaction(models.Model):
@@ -89,6 +93,7 @@ class CryptoTransaction(models.Model):
     ])
     block_number = models.BigIntegerField(null=True, blank=True)
     block_hash = models.CharField(max_length=255, blank=True)
+    block_timestamp = models.DateTimeField(null=True, blank=True)
     transaction_type = models.CharField(max_length=50, choices=[
         ('transfer', 'Transfer'),
         ('swap', 'Swap'),
@@ -113,10 +118,17 @@ class CryptoTransaction(models.Model):
     def __str__(self):
         return f"{self.tx_hash[:10]}... - {self.amount} {self.token_symbol}"
 
+    @property
+    def valued_at(self):
+        """Moment the transaction is valued at: its block time, else when it was recorded"""
+        return self.block_timestamp or self.created_at
+
     def get_amount_usd(self):
-        """Get transaction amount in USD"""
-        # This would need integration with price APIs
-        return self.amount * 0  # Placeholder
+        """Get transaction amount in USD at the token price when it happened (0 if unpriced)"""
+        if 'amount_usd' not in self.__dict__:
+            from .valuation import CryptoValuationService
+            CryptoValuationService.enrich_transactions([self])
+        return self.amount_usd or Decimal('0')
 
 
 class SmartContract(models.Model):
@@ -249,7 +261,7 @@ class TokenPrice(models.Model):
     volume_24h = models.DecimalField(max_digits=30, decimal_places=2, null=True, blank=True)
     price_change_24h = models.DecimalField(max_digits=10, decimal_places=4, null=True, blank=True)
     source = models.CharField(max_length=100, default='coinmarketcap')
-    timestamp = models.DateTimeField(auto_now_add=True)
+    timestamp = models.DateTimeField(default=timezone.now)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -258,6 +270,9 @@ class TokenPrice(models.Model):
         verbose_name = 'Token Price'
         verbose_name_plural = 'Token Prices'
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['token_symbol', 'network', 'timestamp'], name='token_prices_series_idx'),
+        ]
 
     def __str__(self):
         return f"{self.token_symbol} - ${self.price_usd}"
@@ -1,4 +1,6 @@
+from django.db import models
 from rest_framework import serializers
+from backend.fieldsets import SparseFieldsetMixin
 from decimal import Decimal
 from .models import (
     CryptoWallet, CryptoTransaction, SmartContract, DeFiProtocol, 
@@ -10,9 +12,26 @@ from .gnosis.models import (
 from .coinbase.models import (
     CoinbasePrimeConnection, CoinbasePrimeAccount, CoinbasePrimeOrder
 )
+from .valuation import CryptoValuationService
 
 
-class CryptoWalletSerializer(serializers.ModelSerializer):
+class CryptoWalletListSerializer(serializers.ListSerializer):
+    """Prices a page of wallets with one bulk price load"""
+
+    def to_representation(self, data):
+        data = data.all() if isinstance(data, models.Manager) else data
+        return super().to_representation(CryptoValuationService.enrich_wallets(data))
+
+
+class CryptoTransactionListSerializer(serializers.ListSerializer):
+    """Values a page of transactions with one bulk price load"""
+
+    def to_representation(self, data):
+        data = data.all() if isinstance(data, models.Manager) else data
+        return super().to_representation(CryptoValuationService.enrich_transactions(data))
+
+
+class CryptoWalletSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Crypto Wallet"""
     balance_usd = serializers.SerializerMethodField()
     total_transactions = serializers.SerializerMethodField()
@@ -23,30 +42,24 @@ class CryptoWalletSerializer(serializers.ModelSerializer):
             'id', 'tenant', 'user', 'name', 'address', 'network', 'wallet_type',
             'is_active', 'is_primary', 'balance', 'last_sync', 'public_key',
             'encrypted_private_key', 'mnemonic_phrase', 'balance_usd', 
-            'total_transactions', 'created_at', 'updated_at'
+            'total_transactions', 'indexed_block', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'indexed_block', 'created_at', 'updated_at']
+        list_serializer_class = CryptoWalletListSerializer
     
     def get_balance_usd(self, obj):
-        # Calculate total balance in USD based on latest TokenPrice
-        try:
-            # Assuming 'ETH' for ethereum network, could be dynamic
-            token_price = TokenPrice.objects.filter(
-                token_symbol='ETH',
-                tenant=obj.tenant
-            ).latest('timestamp')
-            return obj.balance * token_price.price_usd
-        except TokenPrice.DoesNotExist:
-            return Decimal('0.00')
+        # Balance at the latest native-token price
+        return obj.get_balance_usd()
     
     def get_total_transactions(self, obj):
         return obj.transactions.count()
 
 
-class CryptoTransactionSerializer(serializers.ModelSerializer):
+class CryptoTransactionSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Crypto Transaction"""
     wallet_name = serializers.CharField(source='wallet.name', read_only=True)
     transaction_hash_short = serializers.SerializerMethodField()
+    amount_usd = serializers.SerializerMethodField()
     
     class Meta:
         model = CryptoTransaction
@@ -54,18 +67,23 @@ class CryptoTransactionSerializer(serializers.ModelSerializer):
             'id', 'wallet', 'wallet_name', 'tx_hash', 'transaction_hash_short',
             'transaction_type', 'amount', 'token_symbol', 'token_address', 'token_name',
             'gas_fee', 'gas_price', 'gas_limit', 'status', 'block_number', 'block_hash',
-            'from_address', 'to_address', 'contract_address', 'function_name', 
-            'function_args', 'created_at', 'updated_at'
+            'block_timestamp', 'from_address', 'to_address', 'contract_address', 'function_name',
+            'function_args', 'amount_usd', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
+        list_serializer_class = CryptoTransactionListSerializer
     
     def get_transaction_hash_short(self, obj):
         if obj.tx_hash:
             return f"{obj.tx_hash[:10]}...{obj.tx_hash[-10:]}"
         return None
 
+    def get_amount_usd(self, obj):
+        # Amount at the token price when the transaction happened
+        return obj.get_amount_usd()
+
 
-class SmartContractSerializer(serializers.ModelSerializer):
+class SmartContractSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Smart Contract"""
     contract_type_display = serializers.CharField(source='get_contract_type_display', read_only=True)
     
@@ -80,7 +98,7 @@ class SmartContractSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class DeFiProtocolSerializer(serializers.ModelSerializer):
+class DeFiProtocolSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for DeFi Protocol"""
     total_value_locked = serializers.SerializerMethodField()
     
@@ -118,7 +136,7 @@ class DeFiProtocolSerializer(serializers.ModelSerializer):
         return total_usd
 
 
-class DeFiPositionSerializer(serializers.ModelSerializer):
+class DeFiPositionSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for DeFi Position"""
     protocol_name = serializers.CharField(source='protocol.name', read_only=True)
     wallet_name = serializers.CharField(source='wallet.name', read_only=True)
@@ -133,7 +151,7 @@ class DeFiPositionSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class TokenPriceSerializer(serializers.ModelSerializer):
+class TokenPriceSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Token Price"""
     class Meta:
         model = TokenPrice
@@ -145,7 +163,7 @@ class TokenPriceSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'timestamp']
 
 
-class Web3IntegrationSettingsSerializer(serializers.ModelSerializer):
+class Web3IntegrationSettingsSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Web3 Integration Settings"""
     class Meta:
         model = Web3IntegrationSettings
@@ -202,7 +220,7 @@ class Web3StatsSerializer(serializers.Serializer):
 
 
 # Gnosis Safe Serializers
-class GnosisSafeOwnerSerializer(serializers.ModelSerializer):
+class GnosisSafeOwnerSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Gnosis Safe Owner"""
     
     class Meta:
@@ -213,7 +231,7 @@ class GnosisSafeOwnerSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'added_at']
 
 
-class GnosisSafeConfirmationSerializer(serializers.ModelSerializer):
+class GnosisSafeConfirmationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Gnosis Safe Confirmation"""
     owner_address = serializers.CharField(source='owner.owner_address', read_only=True)
     owner_name = serializers.CharField(source='owner.name', read_only=True)
@@ -227,7 +245,7 @@ class GnosisSafeConfirmationSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'confirmed_at']
 
 
-class GnosisSafeTransactionSerializer(serializers.ModelSerializer):
+class GnosisSafeTransactionSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Gnosis Safe Transaction"""
     safe_name = serializers.CharField(source='safe.name', read_only=True)
     safe_address = serializers.CharField(source='safe.safe_address', read_only=True)
@@ -246,7 +264,7 @@ class GnosisSafeTransactionSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at', 'submitted_at', 'executed_at']
 
 
-class GnosisSafeSerializer(serializers.ModelSerializer):
+class GnosisSafeSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Gnosis Safe"""
     owners = GnosisSafeOwnerSerializer(many=True, read_only=True)
     total_transactions = serializers.SerializerMethodField()
@@ -270,7 +288,7 @@ class GnosisSafeSerializer(serializers.ModelSerializer):
 
 
 # Coinbase Prime Serializers
-class CoinbasePrimeConnectionSerializer(serializers.ModelSerializer):
+class CoinbasePrimeConnectionSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Coinbase Prime Connection"""
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
     total_accounts = serializers.SerializerMethodField()
@@ -294,7 +312,7 @@ class CoinbasePrimeConnectionSerializer(serializers.ModelSerializer):
         return obj.accounts.count()
 
 
-class CoinbasePrimeAccountSerializer(serializers.ModelSerializer):
+class CoinbasePrimeAccountSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Coinbase Prime Account"""
     connection_name = serializers.CharField(source='connection.name', read_only=True)
     
@@ -308,7 +326,7 @@ class CoinbasePrimeAccountSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at', 'last_sync']
 
 
-class CoinbasePrimeOrderSerializer(serializers.ModelSerializer):
+class CoinbasePrimeOrderSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Coinbase Prime Order"""
     connection_name = serializers.CharField(source='connection.name', read_only=True)
     
@@ -1,3 +1,133 @@
+"""
+Unit tests for web3_integration app
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
 from django.test import TestCase
 
-# Create your tests here.
+from authentication.models import User
+from tenants.models import Tenant
+from .indexer import FixtureChainIndexer
+from .models import CryptoTransaction, CryptoWallet, TokenPrice
+from .valuation import CryptoValuationService, PriceBook, PriceSeries
+
+T0 = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class CryptoValuationTest(TestCase):
+    """Test point-in-time USD valuation from TokenPrice history"""
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name='Web3 Tenant', slug='web3_tenant', is_active=True)
+        self.user = User.objects.create_user(
+            username='web3', email='web3@example.com', password='testpass123', tenant=self.tenant
+        )
+        self.wallet = CryptoWallet.objects.create(
+            tenant=self.tenant, user=self.user, name='Ops', address='0xAbC', network='ethereum',
+            wallet_type='metamask', balance=Decimal('2')
+        )
+        for day, price in ((0, '1000'), (2, '1200'), (4, '900')):
+            TokenPrice.objects.create(
+                token_address='', token_symbol='ETH', network='ethereum', price_usd=Decimal(price),
+                timestamp=T0 + timedelta(days=day)
+            )
+        TokenPrice.objects.create(
+            token_address='', token_symbol='USDC', network='polygon', price_usd=Decimal('1'), timestamp=T0
+        )
+
+    def _transaction(self, tx_hash, amount, symbol='ETH', day=None):
+        return CryptoTransaction.objects.create(
+            wallet=self.wallet, tx_hash=tx_hash, from_address='0xfeed', to_address='0xabc',
+            amount=Decimal(amount), token_symbol=symbol, status='confirmed',
+            block_timestamp=T0 + timedelta(days=day) if day is not None else None
+        )
+
+    def test_price_series_binary_search(self):
+        """Test the last price at or before a moment is used"""
+        series = PriceSeries([(T0 + timedelta(days=2), Decimal('2')), (T0, Decimal('1'))])
+        self.assertIsNone(series.price_at(T0 - timedelta(seconds=1)))
+        self.assertEqual(series.price_at(T0), Decimal('1'))
+        self.assertEqual(series.price_at(T0 + timedelta(days=1)), Decimal('1'))
+        self.assertEqual(series.price_at(T0 + timedelta(days=2)), Decimal('2'))
+        self.assertEqual(series.price_at(), Decimal('2'))
+
+    def test_price_book_loads_window_and_carried_price(self):
+        """Test a window load includes the last price before it, and other networks as fallback"""
+        with self.assertNumQueries(2):
+            book = PriceBook.load(['eth', 'USDC'], start=T0 + timedelta(days=3), end=T0 + timedelta(days=5))
+        self.assertEqual(len(book.series[('ETH', 'ethereum')]), 2)  # Day 2 carried in, day 4 in the window
+        self.assertEqual(book.price_at('ETH', 'ethereum', T0 + timedelta(days=3)), Decimal('1200'))
+        self.assertEqual(book.price_at('usdc', 'ethereum', T0 + timedelta(days=3)), Decimal('1'))
+        self.assertIsNone(book.price_at('BTC', 'bitcoin'))
+
+    def test_enrich_transactions_values_at_block_time(self):
+        """Test bulk enrichment values each transaction at its own time in constant queries"""
+        self._transaction('0x1', '1', day=1)
+        self._transaction('0x2', '2', day=4)
+        self._transaction('0x3', '5', symbol='NOPE', day=4)
+        with self.assertNumQueries(3):  # Transactions with wallets, window, carried prices
+            transactions = CryptoValuationService.enrich_transactions(
+                CryptoTransaction.objects.filter(wallet=self.wallet).order_by('tx_hash')
+            )
+        self.assertEqual([tx.amount_usd for tx in transactions], [Decimal('1000'), Decimal('1800'), None])
+        with self.assertNumQueries(0):
+            self.assertEqual(transactions[2].get_amount_usd(), Decimal('0'))
+
+        self.assertEqual(CryptoTransaction.objects.get(tx_hash='0x2').get_amount_usd(), Decimal('1800'))
+        self.assertEqual(self.wallet.get_balance_usd(), Decimal('1800'))
+
+
+class ChainIndexerTest(TestCase):
+    """Test block-range ingestion with checkpoints"""
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name='Index Tenant', slug='index_tenant', is_active=True)
+        self.user = User.objects.create_user(
+            username='indexer', email='indexer@example.com', password='testpass123', tenant=self.tenant
+        )
+        self.wallet = CryptoWallet.objects.create(
+            tenant=self.tenant, user=self.user, name='Ops', address='0xAbC', network='ethereum',
+            wallet_type='metamask'
+        )
+        self.chains = {'ethereum': {'head': 250, 'transfers': [
+            {'tx_hash': f"0x{block}", 'block_number': block, 'timestamp': 1704067200 + block,
+             'from': '0xfeed', 'to': '0xabc', 'amount': '1.5', 'token_symbol': 'ETH'}
+            for block in (5, 99, 100, 180)
+        ] + [
+            {'tx_hash': '0xother', 'block_number': 50, 'from': '0xfeed', 'to': '0xbeef', 'amount': '1',
+             'token_symbol': 'ETH'},
+        ]}}
+
+    def test_ingest_in_batches_and_resume_from_checkpoint(self):
+        """Test transfers are read in block windows and a re-run starts after the checkpoint"""
+        indexer = FixtureChainIndexer(self.chains, batch_blocks=100)
+        result = indexer.ingest(self.wallet, to_block=150)
+        self.assertEqual((result['batches'], result['created']), (2, 3))
+        self.assertEqual(indexer.requests, [('ethereum', '0xAbC', 0, 99), ('ethereum', '0xAbC', 100, 150)])
+        self.wallet.refresh_from_db()
+        self.assertEqual(self.wallet.indexed_block, 150)
+        tx = CryptoTransaction.objects.get(tx_hash='0x99')
+        self.assertEqual(tx.block_timestamp, datetime(2024, 1, 1, 0, 1, 39, tzinfo=dt_timezone.utc))
+
+        indexer = FixtureChainIndexer(self.chains, batch_blocks=100)
+        result = indexer.ingest(self.wallet)
+        self.assertEqual((result['from_block'], result['to_block'], result['created']), (151, 250, 1))
+        self.assertEqual(CryptoTransaction.objects.filter(wallet=self.wallet).count(), 4)
+
+    def test_failed_batch_keeps_last_checkpoint(self):
+        """Test a failing window leaves the checkpoint after the last written one"""
+        indexer = FixtureChainIndexer(self.chains, batch_blocks=100)
+        fetch_transfers = indexer.fetch_transfers
+
+        def fail_second_window(network, address, from_block, to_block):
+            if from_block:
+                raise ConnectionError('node unavailable')
+            return fetch_transfers(network, address, from_block, to_block)
+
+        indexer.fetch_transfers = fail_second_window
+        result = indexer.ingest(self.wallet)
+        self.assertFalse(result['success'])
+        self.wallet.refresh_from_db()
+        self.assertEqual(self.wallet.indexed_block, 99)
+        self.assertEqual(CryptoTransaction.objects.filter(wallet=self.wallet).count(), 2)
@@ -0,0 +1,206 @@
+"""
+Crypto Valuation
+Point-in-time USD valuation of crypto amounts from TokenPrice history.
+
+Prices for the requested symbols are read in bulk (the window being valued
+plus the last price before it) into one sorted PriceSeries per
+(symbol, network). Each valuation is then a binary search for the last price
+at or before the moment being valued, so enriching a page of transactions
+costs the same two queries however many rows it holds.
+"""
+from bisect import bisect_right
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+from django.db.models import OuterRef, QuerySet, Subquery
+import logging
+
+from .models import CryptoTransaction, CryptoWallet, TokenPrice
+
+logger = logging.getLogger(__name__)
+
+# Native token of each CryptoWallet network (CryptoWallet.balance is held in it)
+NATIVE_TOKENS = {
+    'ethereum': 'ETH',
+    'polygon': 'MATIC',
+    'bsc': 'BNB',
+    'solana': 'SOL',
+    'bitcoin': 'BTC',
+    'cardano': 'ADA',
+    'polkadot': 'DOT',
+}
+
+
+def native_token(network: str) -> str:
+    """Symbol a network's wallet balances are held in"""
+    return NATIVE_TOKENS.get(network, (network or '').upper())
+
+
+class PriceSeries:
+    """USD prices of one token, sorted by time"""
+
+    def __init__(self, points: Iterable[Tuple[datetime, Decimal]]):
+        points = sorted(points, key=lambda point: point[0])
+        self.times = [moment for moment, _ in points]
+        self.prices = [price for _, price in points]
+
+    def __len__(self):
+        return len(self.times)
+
+    def price_at(self, moment: Optional[datetime] = None) -> Optional[Decimal]:
+        """
+        Last price at or before a moment
+
+        Args:
+            moment: Time to price at (None for the latest price)
+
+        Returns:
+            Decimal: USD price, or None when the series starts after the moment
+        """
+        if not self.times:
+            return None
+        if moment is None:
+            return self.prices[-1]
+        index = bisect_right(self.times, moment)
+        return self.prices[index - 1] if index else None
+
+
+class PriceBook:
+    """
+    PriceSeries per (symbol, network), loaded in bulk
+
+    Symbols are matched case-insensitively. A token priced on another network
+    only (wrapped/bridged assets) falls back to its prices across all networks.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[str, str, datetime, Decimal]] = ()):
+        points: Dict[Tuple[str, str], List[Tuple[datetime, Decimal]]] = {}
+        for symbol, network, moment, price in rows:
+            points.setdefault(((symbol or '').upper(), (network or '').lower()), []).append((moment, price))
+        self.series = {key: PriceSeries(values) for key, values in points.items()}
+
+        merged: Dict[str, List[Tuple[datetime, Decimal]]] = {}
+        for (symbol, _), values in points.items():
+            merged.setdefault(symbol, []).extend(values)
+        self.by_symbol = {symbol: PriceSeries(values) for symbol, values in merged.items()}
+
+    @classmethod
+    def load(cls, symbols: Iterable[str], start: Optional[datetime] = None,
+             end: Optional[datetime] = None) -> 'PriceBook':
+        """
+        Load the prices needed to value moments in [start, end]
+
+        Args:
+            symbols: Token symbols to load
+            start: Earliest moment to value (None: only the latest price is needed)
+            end: Latest moment to value (None: now)
+
+        Returns:
+            PriceBook: Every price in the window plus, per (symbol, network),
+            the last price before it
+        """
+        symbols = {symbol for symbol in symbols if symbol}
+        symbols |= {symbol.upper() for symbol in symbols}
+        if not symbols:
+            return cls()
+
+        prices = TokenPrice.objects.filter(token_symbol__in=symbols)
+        columns = ('token_symbol', 'network', 'timestamp', 'price_usd')
+        rows = []
+        carried = prices
+        if start is not None:
+            window = prices.filter(timestamp__gte=start)
+            if end is not None:
+                window = window.filter(timestamp__lte=end)
+            rows.extend(window.values_list(*columns))
+            carried = prices.filter(timestamp__lt=start)
+        elif end is not None:
+            carried = prices.filter(timestamp__lte=end)
+
+        # Last price per (symbol, network) before the window, through the series index
+        last = carried.filter(
+            token_symbol=OuterRef('token_symbol'), network=OuterRef('network')
+        ).order_by('-timestamp').values('id')[:1]
+        rows.extend(carried.filter(id=Subquery(last)).values_list(*columns))
+        return cls(rows)
+
+    def price_at(self, symbol: str, network: str, moment: Optional[datetime] = None) -> Optional[Decimal]:
+        """USD price of a token at a moment (None if unknown)"""
+        symbol = (symbol or '').upper()
+        series = self.series.get((symbol, (network or '').lower()))
+        price = series.price_at(moment) if series else None
+        if price is None and symbol in self.by_symbol:
+            price = self.by_symbol[symbol].price_at(moment)
+        return price
+
+    def value(self, amount: Decimal, symbol: str, network: str,
+              moment: Optional[datetime] = None) -> Optional[Decimal]:
+        """USD value of an amount of a token at a moment (None if unpriced)"""
+        price = self.price_at(symbol, network, moment)
+        if price is None or amount is None:
+            return None
+        return amount * price
+
+
+class CryptoValuationService:
+    """Bulk USD valuation of crypto transactions and wallets"""
+
+    @staticmethod
+    def enrich_transactions(transactions) -> List[CryptoTransaction]:
+        """
+        Attach point-in-time USD prices to transactions
+
+        Sets price_usd and amount_usd (None when the token has no price by
+        then) on every transaction, valued at its block time.
+
+        Args:
+            transactions: CryptoTransaction queryset or iterable
+
+        Returns:
+            list: The transactions, evaluated
+        """
+        if isinstance(transactions, QuerySet):
+            transactions = transactions.select_related('wallet')
+        transactions = list(transactions)
+        if not transactions:
+            return transactions
+
+        moments = [tx.valued_at for tx in transactions if tx.valued_at]
+        book = PriceBook.load(
+            {tx.token_symbol for tx in transactions},
+            start=min(moments) if moments else None,
+            end=max(moments) if moments else None,
+        )
+        for tx in transactions:
+            tx.price_usd = book.price_at(tx.token_symbol, tx.wallet.network, tx.valued_at)
+            tx.amount_usd = tx.amount * tx.price_usd if tx.price_usd is not None else None
+        return transactions
+
+    @staticmethod
+    def enrich_wallets(wallets, book: Optional[PriceBook] = None) -> List[CryptoWallet]:
+        """
+        Attach the latest native-token USD price to wallets
+
+        Sets price_usd and balance_usd (None when unpriced) on every wallet.
+
+        Args:
+            wallets: CryptoWallet queryset or iterable
+            book: Already loaded latest prices (loaded for the wallets' networks if omitted)
+
+        Returns:
+            list: The wallets, evaluated
+        """
+        wallets = list(wallets)
+        if book is None:
+            book = PriceBook.load({native_token(wallet.network) for wallet in wallets})
+        for wallet in wallets:
+            wallet.price_usd = book.price_at(native_token(wallet.network), wallet.network)
+            wallet.balance_usd = wallet.balance * wallet.price_usd if wallet.price_usd is not None else None
+        return wallets
+
+    @classmethod
+    def wallet_balance_usd(cls, wallet: CryptoWallet) -> Optional[Decimal]:
+        """Wallet balance at the latest native-token price, reusing an enriched value"""
+        if 'balance_usd' not in wallet.__dict__:
+            cls.enrich_wallets([wallet])
+        return wallet.balance_usd
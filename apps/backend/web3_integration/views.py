@@ -28,11 +28,12 @@ from .serializers import (
     GnosisSafeConfirmationSerializer, CoinbasePrimeConnectionSerializer,
     CoinbasePrimeAccountSerializer, CoinbasePrimeOrderSerializer
 )
+from backend.query_planning import QueryPlanMixin
 from backend.tenant_utils import get_request_tenant
 from authentication.permissions import IsTenantMember
 
 
-class CryptoWalletListView(generics.ListCreateAPIView):
+class CryptoWalletListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create crypto wallets"""
     serializer_class = CryptoWalletSerializer
     permission_classes = [IsTenantMember]
@@ -47,7 +48,7 @@ class CryptoWalletListView(generics.ListCreateAPIView):
         serializer.save(tenant=self.request.user.tenant)
 
 
-class CryptoWalletDetailView(generics.RetrieveUpdateDestroyAPIView):
+class CryptoWalletDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete crypto wallet"""
     serializer_class = CryptoWalletSerializer
     permission_classes = [IsTenantMember]
@@ -56,7 +57,7 @@ class CryptoWalletDetailView(generics.RetrieveUpdateDestroyAPIView):
         return CryptoWallet.objects.filter(tenant=self.request.user.tenant)
 
 
-class CryptoTransactionListView(generics.ListCreateAPIView):
+class CryptoTransactionListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create crypto transactions"""
     serializer_class = CryptoTransactionSerializer
     permission_classes = [IsTenantMember]
@@ -76,7 +77,7 @@ class CryptoTransactionListView(generics.ListCreateAPIView):
         serializer.save(wallet=wallet)
 
 
-class CryptoTransactionDetailView(generics.RetrieveUpdateDestroyAPIView):
+class CryptoTransactionDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete crypto transaction"""
     serializer_class = CryptoTransactionSerializer
     permission_classes = [IsTenantMember]
@@ -85,7 +86,7 @@ class CryptoTransactionDetailView(generics.RetrieveUpdateDestroyAPIView):
         return CryptoTransaction.objects.filter(wallet__tenant=self.request.user.tenant)
 
 
-class SmartContractListView(generics.ListCreateAPIView):
+class SmartContractListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create smart contracts"""
     serializer_class = SmartContractSerializer
     permission_classes = [IsTenantMember]
@@ -100,7 +101,7 @@ class SmartContractListView(generics.ListCreateAPIView):
         serializer.save(tenant=self.request.user.tenant)
 
 
-class SmartContractDetailView(generics.RetrieveUpdateDestroyAPIView):
+class SmartContractDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete smart contract"""
     serializer_class = SmartContractSerializer
     permission_classes = [IsTenantMember]
@@ -109,7 +110,7 @@ class SmartContractDetailView(generics.RetrieveUpdateDestroyAPIView):
         return SmartContract.objects.filter(tenant=self.request.user.tenant)
 
 
-class DeFiProtocolListView(generics.ListCreateAPIView):
+class DeFiProtocolListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create DeFi protocols"""
     serializer_class = DeFiProtocolSerializer
     permission_classes = [IsTenantMember]
@@ -124,7 +125,7 @@ class DeFiProtocolListView(generics.ListCreateAPIView):
         serializer.save(tenant=self.request.user.tenant)
 
 
-class DeFiProtocolDetailView(generics.RetrieveUpdateDestroyAPIView):
+class DeFiProtocolDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete DeFi protocol"""
     serializer_class = DeFiProtocolSerializer
     permission_classes = [IsTenantMember]
@@ -133,7 +134,7 @@ class DeFiProtocolDetailView(generics.RetrieveUpdateDestroyAPIView):
         return DeFiProtocol.objects.filter(tenant=self.request.user.tenant)
 
 
-class DeFiPositionListView(generics.ListCreateAPIView):
+class DeFiPositionListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create DeFi positions"""
     serializer_class = DeFiPositionSerializer
     permission_classes = [IsTenantMember]
@@ -147,7 +148,7 @@ class DeFiPositionListView(generics.ListCreateAPIView):
         serializer.save(tenant=self.request.user.tenant)
 
 
-class DeFiPositionDetailView(generics.RetrieveUpdateDestroyAPIView):
+class DeFiPositionDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete DeFi position"""
     serializer_class = DeFiPositionSerializer
     permission_classes = [IsTenantMember]
@@ -156,7 +157,7 @@ class DeFiPositionDetailView(generics.RetrieveUpdateDestroyAPIView):
         return DeFiPosition.objects.filter(tenant=self.request.user.tenant)
 
 
-class TokenPriceListView(generics.ListCreateAPIView):
+class TokenPriceListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create token prices"""
     serializer_class = TokenPriceSerializer
     permission_classes = [IsTenantMember]
@@ -170,7 +171,7 @@ class TokenPriceListView(generics.ListCreateAPIView):
         serializer.save(tenant=self.request.user.tenant)
 
 
-class TokenPriceDetailView(generics.RetrieveUpdateDestroyAPIView):
+class TokenPriceDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete token price"""
     serializer_class = TokenPriceSerializer
     permission_classes = [IsTenantMember]
@@ -179,7 +180,7 @@ class TokenPriceDetailView(generics.RetrieveUpdateDestroyAPIView):
         return TokenPrice.objects.filter(tenant=self.request.user.tenant)
 
 
-class Web3IntegrationSettingsListView(generics.ListCreateAPIView):
+class Web3IntegrationSettingsListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create Web3 integration settings"""
     serializer_class = Web3IntegrationSettingsSerializer
     permission_classes = [IsTenantMember]
@@ -194,7 +195,7 @@ class Web3IntegrationSettingsListView(generics.ListCreateAPIView):
         serializer.save(tenant=self.request.user.tenant)
 
 
-class Web3IntegrationSettingsDetailView(generics.RetrieveUpdateDestroyAPIView):
+class Web3IntegrationSettingsDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete Web3 integration settings"""
     serializer_class = Web3IntegrationSettingsSerializer
     permission_classes = [IsTenantMember]
@@ -658,7 +659,7 @@ def token_price_history(request, token_address):
 
 
 # Gnosis Safe Views
-class GnosisSafeListView(generics.ListCreateAPIView):
+class GnosisSafeListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create Gnosis Safes"""
     serializer_class = GnosisSafeSerializer
     permission_classes = [IsTenantMember]
@@ -677,7 +678,7 @@ class GnosisSafeListView(generics.ListCreateAPIView):
         serializer.save(tenant=tenant)
 
 
-class GnosisSafeDetailView(generics.RetrieveUpdateDestroyAPIView):
+class GnosisSafeDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete Gnosis Safe"""
     serializer_class = GnosisSafeSerializer
     permission_classes = [IsTenantMember]
@@ -689,7 +690,7 @@ class GnosisSafeDetailView(generics.RetrieveUpdateDestroyAPIView):
         return GnosisSafe.objects.filter(tenant=tenant)
 
 
-class GnosisSafeOwnerListView(generics.ListCreateAPIView):
+class GnosisSafeOwnerListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create Gnosis Safe Owners"""
     serializer_class = GnosisSafeOwnerSerializer
     permission_classes = [IsTenantMember]
@@ -702,7 +703,7 @@ class GnosisSafeOwnerListView(generics.ListCreateAPIView):
         return GnosisSafeOwner.objects.filter(safe=safe)
 
 
-class GnosisSafeTransactionListView(generics.ListCreateAPIView):
+class GnosisSafeTransactionListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create Gnosis Safe Transactions"""
     serializer_class = GnosisSafeTransactionSerializer
     permission_classes = [IsTenantMember]
@@ -728,7 +729,7 @@ class GnosisSafeTransactionListView(generics.ListCreateAPIView):
         serializer.save(tenant=tenant, created_by=self.request.user)
 
 
-class GnosisSafeTransactionDetailView(generics.RetrieveUpdateDestroyAPIView):
+class GnosisSafeTransactionDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete Gnosis Safe Transaction"""
     serializer_class = GnosisSafeTransactionSerializer
     permission_classes = [IsTenantMember]
@@ -796,7 +797,7 @@ def confirm_gnosis_transaction(request, pk):
 
 
 # Coinbase Prime Views
-class CoinbasePrimeConnectionListView(generics.ListCreateAPIView):
+class CoinbasePrimeConnectionListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create Coinbase Prime Connections"""
     serializer_class = CoinbasePrimeConnectionSerializer
     permission_classes = [IsTenantMember]
@@ -815,7 +816,7 @@ class CoinbasePrimeConnectionListView(generics.ListCreateAPIView):
         serializer.save(tenant=tenant, created_by=self.request.user)
 
 
-class CoinbasePrimeConnectionDetailView(generics.RetrieveUpdateDestroyAPIView):
+class CoinbasePrimeConnectionDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete Coinbase Prime Connection"""
     serializer_class = CoinbasePrimeConnectionSerializer
     permission_classes = [IsTenantMember]
@@ -827,7 +828,7 @@ class CoinbasePrimeConnectionDetailView(generics.RetrieveUpdateDestroyAPIView):
         return CoinbasePrimeConnection.objects.filter(tenant=tenant)
 
 
-class CoinbasePrimeAccountListView(generics.ListCreateAPIView):
+class CoinbasePrimeAccountListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create Coinbase Prime Accounts"""
     serializer_class = CoinbasePrimeAccountSerializer
     permission_classes = [IsTenantMember]
@@ -850,7 +851,7 @@ class CoinbasePrimeAccountListView(generics.ListCreateAPIView):
         serializer.save(tenant=tenant)
 
 
-class CoinbasePrimeAccountDetailView(generics.RetrieveUpdateDestroyAPIView):
+class CoinbasePrimeAccountDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete Coinbase Prime Account"""
     serializer_class = CoinbasePrimeAccountSerializer
     permission_classes = [IsTenantMember]
@@ -862,7 +863,7 @@ class CoinbasePrimeAccountDetailView(generics.RetrieveUpdateDestroyAPIView):
         return CoinbasePrimeAccount.objects.filter(tenant=tenant)
 
 
-class CoinbasePrimeOrderListView(generics.ListCreateAPIView):
+class CoinbasePrimeOrderListView(QueryPlanMixin, generics.ListCreateAPIView):
     """List and create Coinbase Prime Orders"""
     serializer_class = CoinbasePrimeOrderSerializer
     permission_classes = [IsTenantMember]
@@ -888,7 +889,7 @@ class CoinbasePrimeOrderListView(generics.ListCreateAPIView):
         serializer.save(tenant=tenant)
 
 
-class CoinbasePrimeOrderDetailView(generics.RetrieveUpdateDestroyAPIView):
+class CoinbasePrimeOrderDetailView(QueryPlanMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete Coinbase Prime Order"""
     serializer_class = CoinbasePrimeOrderSerializer
     permission_classes = [IsTenantMember]